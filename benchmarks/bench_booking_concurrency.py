@@ -0,0 +1,149 @@
+# Benchmark: concurrent interview bookings against the fake Calendar server.
+#
+# Part 1: many sessions (threads) try to book a handful of contested slots at
+# the same time. Compares the previous behaviour (insert without any check), a
+# naive check-then-insert, and the reservation-based booking, and counts the
+# double bookings left in the calendar.
+# Part 2: books many distinct slots one request at a time vs. one batch.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_booking_concurrency --sessions 40 --slots 5
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytz
+
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from src.tools.calendar_client import get_calendar_client, reset_calendar_client
+from src.tools.calendar_sync import query_freebusy
+from src.tools.tools import calendar_book_slot_fn, calendar_book_slots_fn
+
+CALENDAR_ID = "recruiter@example.com"
+TZ = pytz.timezone("Europe/Rome")
+
+
+def contested_slots(n):
+    day = datetime.now(TZ).date() + timedelta(days=30)
+    return [
+        (TZ.localize(datetime(day.year, day.month, day.day, 9 + i)).isoformat(),
+         TZ.localize(datetime(day.year, day.month, day.day, 10 + i)).isoformat())
+        for i in range(n)
+    ]
+
+
+def book_without_check(start, end):
+    """Previous calendar_book_slot_fn: insert straight away."""
+    service = get_calendar_client().service()
+    event = service.events().insert(calendarId=CALENDAR_ID, body={
+        "summary": "Interview", "start": {"dateTime": start}, "end": {"dateTime": end},
+    }).execute()
+    return {"status": "success", "event_id": event["id"]}
+
+
+def book_check_then_insert(start, end):
+    """Naive fix: freebusy check, then insert (racy)."""
+    service = get_calendar_client().service()
+    if query_freebusy(service, [CALENDAR_ID], start, end):
+        return {"status": "error", "type": "SLOT_UNAVAILABLE"}
+    return book_without_check(start, end)
+
+
+def book_with_reservation(start, end):
+    return json.loads(calendar_book_slot_fn(start, end))
+
+
+def count_double_bookings(server):
+    events = server.list_events(CALENDAR_ID)
+    per_slot = Counter(event["start"]["dateTime"] for event in events)
+    return len(events), sum(count - 1 for count in per_slot.values())
+
+
+def run_contention(server, label, book, sessions, slots, seed):
+    server.events.clear()
+    rng = random.Random(seed)
+    picks = [rng.choice(slots) for _ in range(sessions)]
+    barrier = threading.Barrier(sessions)
+
+    def session(pick):
+        barrier.wait()
+        start = time.perf_counter()
+        result = book(*pick)
+        return result["status"], time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        outcomes = list(pool.map(session, picks))
+    latencies = sorted(latency for _, latency in outcomes)
+    booked = sum(status == "success" for status, _ in outcomes)
+    events, doubles = count_double_bookings(server)
+    print(f"[{label:22}] {sessions} sessions / {len(slots)} slots: booked {booked:3}  rejected {sessions - booked:3}  "
+          f"events {events:3}  double bookings {doubles:3}  "
+          f"p50 {statistics.median(latencies) * 1000:6.1f} ms  p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:6.1f} ms")
+
+
+def run_batch(server, n):
+    def slots_on(day):
+        first = TZ.localize(datetime(day.year, day.month, day.day, 8))
+        return [
+            {"start": (first + timedelta(minutes=15 * i)).isoformat(),
+             "end": (first + timedelta(minutes=15 * i + 15)).isoformat(),
+             "summary": f"Interview {i}"}
+            for i in range(n)
+        ]
+
+    # Each variant books on its own day, so earlier bookings do not conflict.
+    day = datetime.now(TZ).date() + timedelta(days=60)
+    for offset, (label, book) in enumerate((
+        ("one request per slot", lambda slots: [json.loads(calendar_book_slot_fn(s["start"], s["end"], s["summary"])) for s in slots]),
+        ("batch", lambda slots: json.loads(calendar_book_slots_fn(slots))["results"]),
+    )):
+        slots = slots_on(day + timedelta(days=offset))
+        server.events.clear()
+        server.stats.clear()
+        start = time.perf_counter()
+        results = book(slots)
+        elapsed = time.perf_counter() - start
+        requests = sum(v for k, v in server.stats.items() if not k.startswith("bytes.") and k not in ("token", "events.insert"))
+        if server.stats["batch"] == 0:
+            requests += server.stats["events.insert"]
+        print(f"[{label:22}] {n} slots: booked {sum(r['status'] == 'success' for r in results):3}  "
+              f"HTTP round trips {requests:3}  total {elapsed * 1000:7.1f} ms")
+
+
+def main(sessions, n_slots, latency, seed):
+    with FakeCalendarServer(latency=latency) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "GOOGLE_CLIENT_ID": "bench-client",
+            "GOOGLE_CLIENT_SECRET": "bench-secret",
+            "GOOGLE_REFRESH_TOKEN": "bench-refresh-token",
+            "GOOGLE_TOKEN_URI": server.token_uri,
+            "CALENDAR_API_ENDPOINT": server.api_endpoint,
+            "CALENDAR_ID": CALENDAR_ID,
+            "BOOKINGS_DB_PATH": os.path.join(tmp, "bookings.db"),
+        })
+        reset_calendar_client()
+        slots = contested_slots(n_slots)
+
+        run_contention(server, "no check (previous)", book_without_check, sessions, slots, seed)
+        run_contention(server, "check then insert", book_check_then_insert, sessions, slots, seed)
+        run_contention(server, "reservations", book_with_reservation, sessions, slots, seed)
+        run_batch(server, sessions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent booking benchmark.")
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--slots", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake API latency per request (s).")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.sessions, args.slots, args.latency, args.seed)
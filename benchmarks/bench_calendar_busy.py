@@ -0,0 +1,93 @@
+# Benchmark: busy-time lookup modes (events list vs. freebusy vs. sync mirror).
+#
+# Runs repeated availability checks for several calendars against the local fake
+# Calendar server, adding one event between checks, and reports API requests,
+# response bytes and latency per mode. The busy cache is cleared before every
+# check so each one reaches the API. Finally, expires the sync tokens to show
+# the full resync after 410 Gone.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_calendar_busy --calendars 3 --events 1500 --checks 10
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from src.tools.calendar_client import reset_calendar_client
+from src.tools.calendar_sync import get_calendar_mirror, reset_calendar_mirrors
+from src.tools.scheduling import busy_cache
+from src.tools.tools import _fetch_busy_slots
+
+WINDOW_START = datetime(2030, 1, 7, tzinfo=timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(days=7)
+
+
+def populate(server, calendar_ids, events_per_calendar, seed=7):
+    rng = random.Random(seed)
+    year_start = WINDOW_START - timedelta(days=180)
+    for calendar_id in calendar_ids:
+        for _ in range(events_per_calendar):
+            start = year_start + timedelta(days=rng.randrange(365), hours=rng.randrange(8, 18))
+            server.add_event(calendar_id, start.isoformat(), (start + timedelta(minutes=30 * rng.randint(1, 4))).isoformat(),
+                             summary="Meeting " + "x" * rng.randrange(10, 60))
+
+
+def run_mode(server, mode, calendar_ids, checks):
+    server.stats.clear()
+    latencies = []
+    first_bytes = 0
+    for i in range(checks):
+        busy_cache.invalidate()
+        start = time.perf_counter()
+        slots = _fetch_busy_slots(calendar_ids, WINDOW_START.isoformat(), WINDOW_END.isoformat(), mode)
+        latencies.append(time.perf_counter() - start)
+        if i == 0:
+            first_bytes = sum(v for k, v in server.stats.items() if k.startswith("bytes."))
+        # One new meeting between checks.
+        moment = WINDOW_START + timedelta(days=i % 5, hours=8)
+        server.add_event(calendar_ids[i % len(calendar_ids)], moment.isoformat(), (moment + timedelta(minutes=30)).isoformat())
+
+    requests = sum(v for k, v in server.stats.items() if not k.startswith("bytes.") and k != "token")
+    received = sum(v for k, v in server.stats.items() if k.startswith("bytes."))
+    print(f"[{mode:8}] {checks} checks: first {latencies[0] * 1000:7.1f} ms  "
+          f"later p50 {statistics.median(latencies[1:]) * 1000:6.1f} ms  "
+          f"requests {requests:3}  bytes first {first_bytes:>9,} later {(received - first_bytes) // (checks - 1):>7,}/check  "
+          f"last check {len(slots)} busy slots")
+
+
+def main(n_calendars, events_per_calendar, checks):
+    calendar_ids = [f"interviewer{i}@example.com" for i in range(n_calendars)]
+    with FakeCalendarServer() as server:
+        populate(server, calendar_ids, events_per_calendar)
+        os.environ.update({
+            "GOOGLE_CLIENT_ID": "bench-client",
+            "GOOGLE_CLIENT_SECRET": "bench-secret",
+            "GOOGLE_REFRESH_TOKEN": "bench-refresh-token",
+            "GOOGLE_TOKEN_URI": server.token_uri,
+            "CALENDAR_API_ENDPOINT": server.api_endpoint,
+        })
+        reset_calendar_client()
+        reset_calendar_mirrors()
+
+        for mode in ("events", "freebusy", "sync"):
+            run_mode(server, mode, calendar_ids, checks)
+
+        server.expire_sync_tokens()
+        server.stats.clear()
+        busy_cache.invalidate()
+        _fetch_busy_slots(calendar_ids, WINDOW_START.isoformat(), WINDOW_END.isoformat(), "sync")
+        mirror = get_calendar_mirror(calendar_ids[0])
+        print(f"[sync 410] after token expiry: requests {server.stats['events.list']}, mirror {mirror.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busy-time lookup modes benchmark.")
+    parser.add_argument("--calendars", type=int, default=3)
+    parser.add_argument("--events", type=int, default=1500, help="Events per calendar, spread over a year.")
+    parser.add_argument("--checks", type=int, default=10, help="Availability checks per mode (at least 2).")
+    args = parser.parse_args()
+    main(args.calendars, args.events, args.checks)
@@ -0,0 +1,96 @@
+# Benchmark: Calendar service construction, cached client vs. per-call build.
+#
+# Runs events().list() calls against the local fake Calendar server, either
+# building a fresh service and token per call (the previous behaviour) or using
+# the cached client from src/tools/calendar_client.py, sequentially and from
+# several threads.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_calendar_client --calls 50 --threads 8
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from src.tools.calendar_client import CALENDAR_SCOPES, get_calendar_client, reset_calendar_client
+
+CALENDAR_ID = "recruiter@example.com"
+TIME_MIN = "2030-01-07T00:00:00+00:00"
+TIME_MAX = "2030-01-12T00:00:00+00:00"
+
+
+def legacy_service(server):
+    """Previous behaviour: new credentials (token refresh) and a new service on every call."""
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+
+    creds = Credentials(
+        token=None,
+        refresh_token="bench-refresh-token",
+        token_uri=server.token_uri,
+        client_id="bench-client",
+        client_secret="bench-secret",
+        scopes=CALENDAR_SCOPES,
+    )
+    return build("calendar", "v3", credentials=creds, client_options={"api_endpoint": server.api_endpoint})
+
+
+def list_events(service):
+    return service.events().list(
+        calendarId=CALENDAR_ID, timeMin=TIME_MIN, timeMax=TIME_MAX,
+        singleEvents=True, orderBy="startTime"
+    ).execute()
+
+
+def run(label, server, get_service, calls, threads):
+    server.stats.clear()
+
+    def one_call(_):
+        start = time.perf_counter()
+        list_events(get_service())
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(one_call, range(calls)))
+    else:
+        latencies = [one_call(i) for i in range(calls)]
+    elapsed = time.perf_counter() - start
+
+    print(f"[{label:22}] {calls} calls, {threads} thread(s): "
+          f"mean {statistics.mean(latencies) * 1000:7.1f} ms  p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+          f"total {elapsed:6.2f}s  token refreshes {server.stats['token']}")
+
+
+def main(calls, threads, latency, token_latency):
+    with FakeCalendarServer(latency=latency, token_latency=token_latency) as server:
+        for day in range(7, 12):
+            server.add_event(CALENDAR_ID, f"2030-01-{day:02d}T09:00:00+00:00", f"2030-01-{day:02d}T10:00:00+00:00")
+
+        os.environ.update({
+            "GOOGLE_CLIENT_ID": "bench-client",
+            "GOOGLE_CLIENT_SECRET": "bench-secret",
+            "GOOGLE_REFRESH_TOKEN": "bench-refresh-token",
+            "GOOGLE_TOKEN_URI": server.token_uri,
+            "CALENDAR_API_ENDPOINT": server.api_endpoint,
+        })
+        reset_calendar_client()
+
+        for n_threads in sorted({1, threads}):
+            run("per-call build", server, lambda: legacy_service(server), calls, n_threads)
+            reset_calendar_client()
+            run("cached client", server, lambda: get_calendar_client().service(), calls, n_threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calendar service construction benchmark.")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake API latency per request (s).")
+    parser.add_argument("--token-latency", type=float, default=0.05, help="Fake OAuth latency per refresh (s).")
+    args = parser.parse_args()
+    main(args.calls, args.threads, args.latency, args.token_latency)
@@ -0,0 +1,162 @@
+# Benchmark: submission-to-verdict latency of the code grading paths.
+#
+# Compares the three ways a code submission can be graded, using a stub model
+# with a fixed per-call latency instead of live Gemini calls:
+#   - agent: orchestrator -> code_assessment_agent -> code_execution_tool (old path)
+#   - tool:  orchestrator -> code_grading_tool (direct grading path)
+#   - ui:    grade_code_submission_fn called by the app, orchestrator only gets the verdict
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_grading_latency --runs 10 --model-latency 0.5
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from google.adk.agents import Agent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import AgentTool
+from google.genai import types
+
+from src.tools.assessments import PRESENTED_PROBLEM_KEY, PresentedProblem
+from src.tools.tools import (
+    code_execution_tool,
+    code_grading_tool,
+    grade_code_submission_fn,
+)
+
+
+PROBLEM_STATE = {
+    "problem_generated": True,
+    PRESENTED_PROBLEM_KEY: PresentedProblem("70\n0\n-50\n250").to_dict(),
+}
+
+SUBMISSION = """def calculate_balance(transactions):
+    balance = 0
+    for t in transactions:
+        if t['type'] == 'deposit':
+            balance += t['amount']
+        else:
+            balance -= t['amount']
+    return balance
+
+print(calculate_balance([{'type': 'deposit', 'amount': 100}, {'type': 'withdrawal', 'amount': 30}]))
+print(calculate_balance([]))
+print(calculate_balance([{'type': 'withdrawal', 'amount': 50}]))
+print(calculate_balance([{'type': 'deposit', 'amount': 200}, {'type': 'deposit', 'amount': 150}, {'type': 'withdrawal', 'amount': 100}]))"""
+
+# Argument name the stub passes to each tool.
+TOOL_ARGUMENTS = {
+    "code_assessment_agent": "request",
+    "run_code_assignment": "code",
+    "grade_code_submission_fn": "code",
+}
+
+MODEL_CALLS = {"count": 0}
+
+
+class StubLlm(BaseLlm):
+    """Scripted model: calls its first tool with the user's code, then answers with the verdict."""
+
+    latency: float = 0.0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        MODEL_CALLS["count"] += 1
+        await asyncio.sleep(self.latency)
+
+        last = llm_request.contents[-1]
+        responses = [p.function_response for p in last.parts if p.function_response]
+        if responses:
+            raw = json.dumps(responses[0].response, ensure_ascii=False)
+            verdict = "pass" if ("✅ PASS" in raw or '"pass"' in raw) else "not pass"
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=verdict)]))
+            return
+
+        text = "".join(p.text or "" for p in last.parts)
+        if not llm_request.tools_dict or text.startswith("Code assessment result:"):
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Noted.")]))
+            return
+
+        tool_name = next(iter(llm_request.tools_dict))
+        call = types.FunctionCall(name=tool_name, args={TOOL_ARGUMENTS[tool_name]: text})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+
+
+def build_runner(path, latency):
+    """Builds an orchestrator for the given grading path, backed by the stub model."""
+    model = StubLlm(model="stub", latency=latency)
+    if path == "agent":
+        code_assessment_agent = Agent(
+            name="code_assessment_agent",
+            model=model,
+            description="Executes candidate code and returns pass/not pass",
+            tools=[code_execution_tool],
+        )
+        tools = [AgentTool(code_assessment_agent)]
+    elif path == "tool":
+        tools = [code_grading_tool]
+    else:
+        tools = []
+    orchestrator = LlmAgent(name="manager", model=model, tools=tools)
+    return InMemoryRunner(agent=orchestrator, app_name="bench")
+
+
+async def run_once(path, latency, index):
+    """Runs one submission and returns (verdict latency, total turn latency, model calls)."""
+    runner = build_runner(path, latency)
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="bench", session_id=f"s{index}", state=dict(PROBLEM_STATE)
+    )
+    calls_before = MODEL_CALLS["count"]
+    start = time.perf_counter()
+
+    if path == "ui":
+        verdict = grade_code_submission_fn(SUBMISSION, context=dict(PROBLEM_STATE))
+        verdict_time = time.perf_counter() - start
+        message = f"Code assessment result: {verdict}"
+    else:
+        verdict_time = None
+        message = SUBMISSION
+
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=content):
+        if verdict_time is None and event.get_function_responses():
+            verdict_time = time.perf_counter() - start
+
+    total_time = time.perf_counter() - start
+    return verdict_time, total_time, MODEL_CALLS["count"] - calls_before
+
+
+def summarize(values):
+    return f"mean {statistics.mean(values):.3f}s  p50 {statistics.median(values):.3f}s  max {max(values):.3f}s"
+
+
+async def main(runs, latency):
+    print(f"Stub model latency: {latency:.3f}s per call, {runs} runs per path\n")
+    for path in ("agent", "tool", "ui"):
+        verdicts, totals, calls = [], [], []
+        for i in range(runs):
+            verdict_time, total_time, model_calls = await run_once(path, latency, i)
+            verdicts.append(verdict_time)
+            totals.append(total_time)
+            calls.append(model_calls)
+        print(f"[{path:5}] model calls/turn: {statistics.mean(calls):.1f}")
+        print(f"        submission -> verdict: {summarize(verdicts)}")
+        print(f"        full turn:             {summarize(totals)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Submission-to-verdict latency of the code grading paths.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--model-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    # Graded runs are recorded: keep them out of the app's assessments table.
+    os.environ["ASSESSMENTS_DB_PATH"] = str(Path(tempfile.mkdtemp()) / "assessments.db")
+    asyncio.run(main(args.runs, args.model_latency))
@@ -0,0 +1,94 @@
+# Benchmark: import-time breakdown of the app's modules.
+#
+# Runs `python -X importtime` in a fresh interpreter for each target and
+# reports the cumulative import time, the time per top-level package and the
+# slowest individual modules, so cold-start regressions are easy to spot.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_import_time
+#   python -m benchmarks.bench_import_time --target "from src.agents import get_agent; get_agent('orchestrator')"
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+DEFAULT_TARGETS = [
+    "import src.agents",
+    "from src.agents import get_agent",
+    "from src.agents import get_agent; get_agent('orchestrator')",
+    "import src.tools",
+]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def package_of(module: str) -> str:
+    """Groups google.* modules by their second component (google.adk, google.genai, ...)."""
+    parts = module.split(".")
+    if parts[0] == "google" and len(parts) > 1:
+        return ".".join(parts[:2])
+    return parts[0]
+
+
+def measure(statement: str, repeat: int) -> dict:
+    """Runs the statement under -X importtime and returns the best of `repeat` runs."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        modules = []
+        for line in proc.stderr.splitlines():
+            match = _LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us), int(cumulative_us), len(indent)))
+        total_us = sum(self_us for _, self_us, _, _ in modules)
+        if best is None or total_us < best["total_us"]:
+            by_package = defaultdict(int)
+            for name, self_us, _, _ in modules:
+                by_package[package_of(name)] += self_us
+            best = {
+                "statement": statement,
+                "returncode": proc.returncode,
+                "total_us": total_us,
+                "module_count": len(modules),
+                "by_package": dict(sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)),
+                "slowest": sorted(((n, s) for n, s, _, _ in modules), key=lambda kv: kv[1], reverse=True)[:10],
+            }
+    return best
+
+
+def report(result: dict, top: int) -> None:
+    status = "" if result["returncode"] == 0 else f"  (exit code {result['returncode']})"
+    print(f"\n=== {result['statement']}{status}")
+    print(f"Total: {result['total_us'] / 1000:.1f} ms across {result['module_count']} modules")
+    print("By package:")
+    for package, self_us in list(result["by_package"].items())[:top]:
+        print(f"  {package:35} {self_us / 1000:8.1f} ms")
+    print("Slowest modules (self time):")
+    for name, self_us in result["slowest"][:top]:
+        print(f"  {name:35} {self_us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the app's modules.")
+    parser.add_argument("--target", action="append", help="Python statement to measure (repeatable).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target; the fastest is reported.")
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON.")
+    args = parser.parse_args()
+
+    results = [measure(target, args.repeat) for target in (args.target or DEFAULT_TARGETS)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            report(result, args.top)
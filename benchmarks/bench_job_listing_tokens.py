@@ -0,0 +1,74 @@
+# Benchmark: prompt tokens of job listings, text vs. compact mode.
+#
+# Measures the size of list_jobs_from_db output in the previous text format
+# and in compact JSON mode (plus one get_job_details call for the selected
+# job), on the bundled catalog and on a synthetic multi-tenant catalog.
+# Tokens are estimated with the same chars-per-token ratio used for context
+# budgeting (src/agents/context_compaction.py).
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_job_listing_tokens --results 5
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.tools import job_store
+from src.tools.tools import get_job_details_fn, list_jobs_from_db
+
+CHARS_PER_TOKEN = 4
+SKILLS = "Python, Docker, PyTorch, SQL, FastAPI"
+
+
+def tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def timed(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples) * 1000
+
+
+def measure(label, results):
+    text, text_ms = timed(lambda: list_jobs_from_db(SKILLS, max_results=results))
+    compact, compact_ms = timed(lambda: list_jobs_from_db(SKILLS, mode="compact", limit=results))
+    first_id = json.loads(compact)["jobs"][0]["id"]
+    details, _ = timed(lambda: get_job_details_fn(first_id))
+
+    text_tokens, compact_tokens, details_tokens = tokens(text), tokens(compact), tokens(details)
+    print(f"[{label}] {results} results")
+    print(f"  {'text':20} ~{text_tokens:6} tokens  ({text_ms:6.1f} ms)")
+    print(f"  {'compact':20} ~{compact_tokens:6} tokens  ({compact_ms:6.1f} ms)  "
+          f"-{100 * (1 - compact_tokens / text_tokens):.0f}%")
+    print(f"  {'compact + 1 detail':20} ~{compact_tokens + details_tokens:6} tokens  "
+          f"{'':13}-{100 * (1 - (compact_tokens + details_tokens) / text_tokens):.0f}%")
+
+
+def main(results, tenants, jobs_per_tenant):
+    measure("bundled catalog", results)
+
+    from benchmarks.bench_job_shards import generate
+    with tempfile.TemporaryDirectory() as tmp:
+        store = job_store.JobStore(Path(tmp) / "shards", default_db=None)
+        for company, jobs in generate(tenants, jobs_per_tenant).items():
+            store.add_jobs(company, jobs)
+        job_store._store = store
+        measure(f"synthetic {tenants}x{jobs_per_tenant}", results)
+        store.close()
+        job_store._store = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Job listing token benchmark.")
+    parser.add_argument("--results", type=int, default=5)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=500, help="Jobs per tenant in the synthetic catalog.")
+    args = parser.parse_args()
+    main(args.results, args.tenants, args.jobs)
@@ -0,0 +1,83 @@
+# Benchmark: ranking cache of the job store.
+#
+# Replays a stream of candidate skill lists where popular profiles recur (the
+# same candidate over several turns, similar profiles across candidates), with
+# the cache disabled and enabled, then adds a job to one shard and checks that
+# the next lookups see it (the catalog version triggers invalidate the cache).
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_job_ranking_cache --lookups 2000 --profiles 200
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_job_shards import SKILLS, generate
+from src.tools.job_store import JobStore
+
+
+def skill_stream(lookups, profiles, seed):
+    """Skill lists drawn from `profiles` recurring profiles (Zipf-like), in random order and case."""
+    rng = random.Random(seed)
+    pool = [rng.sample(SKILLS, rng.randint(3, 6)) for _ in range(profiles)]
+    weights = [1 / (rank + 1) for rank in range(profiles)]
+    stream = []
+    for profile in rng.choices(pool, weights, k=lookups):
+        skills = [s.upper() if rng.random() < 0.3 else s for s in rng.sample(profile, len(profile))]
+        stream.append(skills)
+    return stream
+
+
+def replay(store, stream, k):
+    samples = []
+    for skills in stream:
+        start = time.perf_counter()
+        store.top_jobs(skills, k)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95)] * 1000, sum(samples)
+
+
+def main(tenants, jobs_per_tenant, lookups, profiles, k, seed):
+    stream = skill_stream(lookups, profiles, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        builder = JobStore(Path(tmp) / "shards", default_db=None, cache_size=0)
+        for company, jobs in generate(tenants, jobs_per_tenant).items():
+            builder.add_jobs(company, jobs)
+        builder.close()
+        print(f"catalog: {tenants} tenants x {jobs_per_tenant} jobs; {lookups} lookups over {profiles} profiles")
+
+        for label, cache_size in (("no cache", 0), ("LRU cache", 256)):
+            store = JobStore(Path(tmp) / "shards", default_db=None, cache_size=cache_size)
+            p50, p95, total = replay(store, stream, k)
+            stats = store.cache.stats()
+            print(f"[{label:9}] p50 {p50:7.2f} ms  p95 {p95:7.2f} ms  total {total:6.2f}s  "
+                  f"hits {stats['hits']:5}  misses {stats['misses']:5}  hit rate {stats['hit_rate']:.2f}")
+
+        skills = stream[0]
+        store.top_jobs(skills, k)
+        tenant = store.tenants()[-1]
+        store.add_jobs(tenant, [{"title": "Fresh posting", "company": tenant, "skills_required": skills}])
+        after = store.top_jobs(skills, k)
+        uncached = JobStore(Path(tmp) / "shards", default_db=None, cache_size=0)
+        expected = uncached.top_jobs(skills, k)
+        uncached.close()
+        print(f"[invalidate] after an insert, cached ranking matches a fresh one: "
+              f"{[j['id'] for j in after] == [j['id'] for j in expected]}  "
+              f"(stale entries dropped: {store.cache.stats()['stale']})")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Job ranking cache benchmark.")
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs per tenant.")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--profiles", type=int, default=200, help="Distinct recurring skill profiles.")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.tenants, args.jobs, args.lookups, args.profiles, args.k, args.seed)
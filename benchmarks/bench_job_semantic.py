@@ -0,0 +1,126 @@
+# Benchmark: semantic job search, IVF index vs. exact scan.
+#
+# Part 1: embedding throughput of the hashing vectorizer on synthetic postings,
+# and end-to-end semantic listing on a sharded catalog.
+# Part 2: recall@k and query latency of the IVF index against a brute-force
+# scan, for several nprobe values, on a large set of clustered vectors (jobs
+# are not embedded one by one here, so millions of rows build in seconds). The
+# vectors are saved and memory-mapped exactly as job indexes are.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_job_semantic --rows 1000000 --queries 100
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_job_shards import CANDIDATE_SKILLS, generate
+from src.tools.job_embeddings import DEFAULT_DIM, IvfIndex, build_job_index, embed_job, embed_query
+from src.tools.job_store import JobStore
+
+
+def clustered_vectors(rows, dim, topics, rng):
+    """Normalized vectors around `topics` random directions (postings of similar roles)."""
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = np.empty((rows, dim), dtype=np.float32)
+    for start in range(0, rows, 100_000):
+        end = min(rows, start + 100_000)
+        vectors[start:end] = centers[rng.integers(0, topics, end - start)]
+        vectors[start:end] += 1.5 * rng.standard_normal((end - start, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+def bench_embedding(tenants, jobs_per_tenant, k):
+    catalog = generate(tenants, jobs_per_tenant)
+    jobs = [{**job, "skills": job["skills_required"]} for jobs in catalog.values() for job in jobs]
+    start = time.perf_counter()
+    for job in jobs:
+        embed_job(job)
+    elapsed = time.perf_counter() - start
+    print(f"[embedding] {len(jobs):,} jobs in {elapsed:.2f}s ({len(jobs) / elapsed:,.0f} jobs/s, dim {DEFAULT_DIM})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(Path(tmp) / "shards", default_db=None)
+        for company, company_jobs in catalog.items():
+            store.add_jobs(company, company_jobs)
+        query = ", ".join(CANDIDATE_SKILLS)
+        start = time.perf_counter()
+        for tenant in store.tenants():
+            build_job_index(store.shard_path(tenant))
+        print(f"[semantic listing] offline build of {tenants} shard indexes: {(time.perf_counter() - start) * 1000:8.1f} ms")
+        start = time.perf_counter()
+        store.semantic_top_jobs(query, k)
+        print(f"[semantic listing] first query (loads the indexes): {(time.perf_counter() - start) * 1000:8.1f} ms")
+        samples = []
+        for _ in range(20):
+            start = time.perf_counter()
+            store.semantic_top_jobs(query, k)
+            samples.append(time.perf_counter() - start)
+        print(f"[semantic listing] warm query across {tenants} shards: p50 {percentile(samples, 0.5):6.2f} ms")
+        store.close()
+
+
+def bench_index(rows, dim, queries, k, nprobes, seed):
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    vectors = clustered_vectors(rows, dim, topics=max(16, rows // 2000), rng=rng)
+    ids = np.arange(1, rows + 1, dtype=np.int64)
+    query_vectors = vectors[rng.choice(rows, queries, replace=False)] + 0.05 * rng.standard_normal((queries, dim)).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    print(f"[vectors] {rows:,} x {dim} float32 ({vectors.nbytes / 2**20:,.0f} MiB) in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "jobs.db"
+        start = time.perf_counter()
+        built = IvfIndex.build(vectors, ids)
+        del vectors
+        built.save(db_path)
+        del built
+        index = IvfIndex.load(db_path)
+        print(f"[ivf build] {len(index.centroids):,} lists in {time.perf_counter() - start:.1f}s (vectors memory-mapped)")
+
+        exact, exact_samples = [], []
+        for q in query_vectors:
+            start = time.perf_counter()
+            exact.append({job_id for job_id, _ in index.search_exact(q, k)})
+            exact_samples.append(time.perf_counter() - start)
+        print(f"[exact     ] p50 {percentile(exact_samples, 0.5):8.2f} ms  p95 {percentile(exact_samples, 0.95):8.2f} ms  recall@{k} 1.000")
+
+        for nprobe in nprobes:
+            samples, recalls = [], []
+            for q, truth in zip(query_vectors, exact):
+                start = time.perf_counter()
+                found = {job_id for job_id, _ in index.search(q, k, nprobe)}
+                samples.append(time.perf_counter() - start)
+                recalls.append(len(found & truth) / len(truth))
+            p50 = percentile(samples, 0.5)
+            print(f"[ivf {nprobe:5}] p50 {p50:8.2f} ms  p95 {percentile(samples, 0.95):8.2f} ms  "
+                  f"recall@{k} {statistics.mean(recalls):.3f}  speedup {percentile(exact_samples, 0.5) / p50:6.1f}x")
+
+
+def main(args):
+    bench_embedding(args.tenants, args.jobs, args.k)
+    bench_index(args.rows, args.dim, args.queries, args.k, args.nprobe, args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic job search benchmark.")
+    parser.add_argument("--rows", type=int, default=200_000, help="Vectors in the ANN benchmark.")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--tenants", type=int, default=20, help="Tenants in the embedding/listing benchmark.")
+    parser.add_argument("--jobs", type=int, default=500, help="Jobs per tenant in the embedding/listing benchmark.")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
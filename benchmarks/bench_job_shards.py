@@ -0,0 +1,121 @@
+# Benchmark: single job catalog vs. per-tenant shards.
+#
+# Generates a synthetic catalog (tenants x jobs per tenant) twice, as one
+# database and as one shard per tenant, then compares the previous full-scan
+# ranking with the sharded store for a single-tenant lookup and for a
+# cross-tenant top-k.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_job_shards --tenants 100 --jobs 1000
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.tools.job_store import JOBS_SCHEMA, JobStore
+
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "JavaScript", "TypeScript", "SQL", "NoSQL databases", "Docker",
+    "Kubernetes", "AWS", "GCP", "Azure", "PyTorch", "TensorFlow", "scikit-learn", "Pandas", "Numpy",
+    "React", "Node.js", "FastAPI", "Flask", "Django", "Spark", "Airflow", "Terraform", "Linux", "Git",
+]
+CANDIDATE_SKILLS = ["python", "docker", "pytorch", "sql", "fastapi"]
+
+
+def generate(tenants, jobs_per_tenant, seed=7):
+    rng = random.Random(seed)
+    catalog = {}
+    for t in range(tenants):
+        company = f"Company {t:04d}"
+        catalog[company] = [
+            {
+                "title": f"Engineer {i}",
+                "company": company,
+                "location": rng.choice(["Remote", "London, UK", "Milan, IT", "Berlin, DE"]),
+                "description": "Build and operate services. " * 8,
+                "responsibilities": "- Design\n- Implement\n- Review",
+                "skills_required": rng.sample(SKILLS, rng.randint(3, 8)),
+            }
+            for i in range(jobs_per_tenant)
+        ]
+    return catalog
+
+
+def build_monolith(path, catalog):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(JOBS_SCHEMA)
+        conn.executemany(
+            "INSERT INTO jobs (title, company, location, description, responsibilities, skills_required) VALUES (?, ?, ?, ?, ?, ?)",
+            [(j["title"], j["company"], j["location"], j["description"], j["responsibilities"], json.dumps(j["skills_required"]))
+             for jobs in catalog.values() for j in jobs],
+        )
+    conn.close()
+
+
+def full_scan_top_k(path, skills, k, company=None):
+    """Previous list_jobs_from_db ranking: read every row, score in Python."""
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT id, title, company, location, description, responsibilities, skills_required FROM jobs").fetchall()
+    conn.close()
+    wanted = set(skills)
+    scored = []
+    for row in rows:
+        if company and row[2] != company:
+            continue
+        score = len(wanted & {s.lower() for s in json.loads(row[6])})
+        if score > 0:
+            scored.append((score, row))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:k]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(tenants, jobs_per_tenant, k, repeat):
+    catalog = generate(tenants, jobs_per_tenant)
+    target = next(iter(catalog))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        start = time.perf_counter()
+        build_monolith(tmp / "jobs.db", catalog)
+        store = JobStore(tmp / "shards", default_db=None, cache_size=0)
+        for company, jobs in catalog.items():
+            store.add_jobs(company, jobs)
+        print(f"catalog: {tenants} tenants x {jobs_per_tenant} jobs = {tenants * jobs_per_tenant:,} jobs "
+              f"(built in {time.perf_counter() - start:.1f}s)")
+
+        single_old = timed(lambda: full_scan_top_k(tmp / "jobs.db", CANDIDATE_SKILLS, k, company=target), repeat)
+        single_new = timed(lambda: store.top_jobs(CANDIDATE_SKILLS, k, tenants=[store.tenants()[0]]), repeat)
+        print(f"[single tenant] full scan {single_old:8.1f} ms   shard {single_new:8.1f} ms   speedup {single_old / single_new:6.1f}x")
+
+        cross_old = timed(lambda: full_scan_top_k(tmp / "jobs.db", CANDIDATE_SKILLS, k), repeat)
+        cross_new = timed(lambda: store.top_jobs(CANDIDATE_SKILLS, k), repeat)
+        print(f"[all tenants  ] full scan {cross_old:8.1f} ms   shards+heap merge {cross_new:8.1f} ms   speedup {cross_old / cross_new:6.1f}x")
+
+        old_scores = [score for score, _ in full_scan_top_k(tmp / "jobs.db", CANDIDATE_SKILLS, k)]
+        new_scores = [job["score"] for job in store.top_jobs(CANDIDATE_SKILLS, k)]
+        print(f"top-{k} scores match: {old_scores == new_scores} {new_scores}")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded job catalog benchmark.")
+    parser.add_argument("--tenants", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs per tenant.")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.tenants, args.jobs, args.k, args.repeat)
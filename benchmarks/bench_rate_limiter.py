@@ -0,0 +1,157 @@
+# Benchmark: concurrent sessions against a quota-limited model, with and
+# without the shared rate limiter.
+#
+# A fake Gemini backend enforces a per-window request quota and answers 429
+# beyond it. Many sessions issue model calls at the same time:
+#   - previous: each call retries 429s on its own (exponential backoff,
+#     base 7, no jitter), like the former retry_config;
+#   - limiter: calls go through RateLimitedGemini (shared token buckets,
+#     concurrency cap, jittered pause on 429).
+# Reports completed calls, 429s received, wall time and latency percentiles.
+# Delays are scaled down (--time-scale) so the run takes seconds.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_rate_limiter --sessions 30 --calls 4
+
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from src.agents import rate_limiter
+from src.agents.rate_limiter import RateLimitedGemini
+
+MODEL = "gemini-2.5-flash-lite"
+
+
+class QuotaExceeded(Exception):
+    code = 429
+
+
+class FakeQuota:
+    """Sliding-window request quota, as enforced by the API."""
+
+    def __init__(self, per_window, window):
+        self.per_window = per_window
+        self.window = window
+        self.calls = deque()
+        self.rejected = 0
+
+    def admit(self):
+        now = time.monotonic()
+        while self.calls and now - self.calls[0] > self.window:
+            self.calls.popleft()
+        if len(self.calls) >= self.per_window:
+            self.rejected += 1
+            return False
+        self.calls.append(now)
+        return True
+
+
+class FakeBackend(Gemini):
+    """Gemini stand-in: fixed latency, 429 beyond the quota."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if not QUOTA.admit():
+            await asyncio.sleep(0.005)
+            raise QuotaExceeded("429 RESOURCE_EXHAUSTED")
+        await asyncio.sleep(LATENCY)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="ok")]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=500),
+        )
+
+
+class LimitedBackend(RateLimitedGemini, FakeBackend):
+    """RateLimitedGemini in front of the fake backend."""
+
+
+QUOTA = None
+LATENCY = 0.05
+
+
+def request():
+    return LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text="Analyze this CV " * 50)])])
+
+
+async def call_previous(model, scale):
+    """Former behaviour: per-call exponential backoff (initial 1 s, base 7, 5 attempts), no jitter."""
+    for attempt in range(5):
+        try:
+            async for _ in model.generate_content_async(request()):
+                pass
+            return attempt
+        except QuotaExceeded:
+            if attempt == 4:
+                raise
+            await asyncio.sleep(1 * 7 ** attempt * scale)
+
+
+async def call_limited(model, scale):
+    async for _ in model.generate_content_async(request()):
+        pass
+    return 0
+
+
+async def run(label, model, call, sessions, calls, scale):
+    latencies, failures = [], 0
+
+    async def session():
+        nonlocal failures
+        for _ in range(calls):
+            start = time.monotonic()
+            try:
+                await call(model, scale)
+                latencies.append(time.monotonic() - start)
+            except Exception:
+                failures += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    wall = time.monotonic() - start
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else 0
+    print(f"[{label:8}] done {len(latencies):4}  failed {failures:3}  429s {QUOTA.rejected:4}  wall {wall:6.2f}s  "
+          f"p50 {p(0.5):8.1f} ms  p95 {p(0.95):8.1f} ms  max {p(1.0):8.1f} ms")
+
+
+def main(sessions, calls, quota, window, scale):
+    global QUOTA
+    # The limiter is configured slightly under the quota (requests per minute equivalent).
+    os.environ.update({
+        "GEMINI_RPM": str(quota / window * 60 * 0.9),
+        "GEMINI_MAX_CONCURRENCY": str(max(1, quota)),
+        "GEMINI_BURST_SECONDS": str(window / 4),
+        "GEMINI_RATE_LIMIT_ENABLED": "True",
+    })
+    rate_limiter.BACKOFF_BASE_SECONDS = 2.0 * scale
+    print(f"{sessions} sessions x {calls} calls, quota {quota} requests / {window}s, backoff scale {scale}")
+
+    QUOTA = FakeQuota(quota, window)
+    asyncio.run(run("previous", FakeBackend(model=MODEL), call_previous, sessions, calls, scale))
+
+    time.sleep(window)
+    QUOTA = FakeQuota(quota, window)
+    rate_limiter.reset_rate_limiters()
+    asyncio.run(run("limiter", LimitedBackend(model=MODEL), call_limited, sessions, calls, scale))
+    stats = rate_limiter.rate_limiter_stats()[MODEL]
+    print(f"           limiter metrics: requests {stats['requests']}  throttled {stats['throttled']}  "
+          f"delayed {stats['delayed']}  avg queue wait {stats['avg_queue_wait_s'] * 1000:.0f} ms  "
+          f"max {stats['max_queue_wait_s'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared rate limiter benchmark.")
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--calls", type=int, default=4, help="Model calls per session.")
+    parser.add_argument("--quota", type=int, default=20, help="Requests allowed per window.")
+    parser.add_argument("--window", type=float, default=1.0, help="Quota window (s).")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Scale of the backoff delays.")
+    args = parser.parse_args()
+    main(args.sessions, args.calls, args.quota, args.window, args.time_scale)
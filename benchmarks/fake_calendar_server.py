@@ -0,0 +1,301 @@
+# Local fake Google Calendar API server for benchmarks and manual testing.
+#
+# Implements the subset of the Calendar v3 API and OAuth token endpoint used by
+# src/tools (events list/insert with paging and sync tokens, freeBusy, batch
+# requests), keeps events in memory, and counts requests and response bytes per
+# endpoint. Point the app at it with:
+#   GOOGLE_TOKEN_URI=<server.token_uri>  CALENDAR_API_ENDPOINT=<server.api_endpoint>
+
+import json
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class FakeCalendarServer:
+    """
+    In-memory Calendar API server running on a background thread.
+
+    Args:
+        latency: Seconds added to every Calendar API request.
+        token_latency: Seconds added to every OAuth token request.
+        token_ttl: Lifetime in seconds of the issued access tokens.
+    """
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0, token_ttl: int = 3600):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.token_ttl = token_ttl
+        self.events = {}          # calendar_id -> {event_id: event}
+        self.stats = Counter()    # endpoint -> request count, "bytes.<endpoint>" -> bytes sent
+        self._seq = 0             # Change counter; event["_seq"] is its last change.
+        self._generation = 0      # Sync tokens of older generations get 410 Gone.
+        self.lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        server = self
+
+        class Handler(_Handler):
+            fake = server
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128  # Many concurrent sessions connect at once.
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/"
+
+    @property
+    def api_endpoint(self) -> str:
+        """Base URL of the Calendar API (replaces https://www.googleapis.com/calendar/v3/)."""
+        return self.url + "calendar/v3/"
+
+    @property
+    def token_uri(self) -> str:
+        return self.url + "token"
+
+    # --- Data ---
+
+    def add_event(self, calendar_id: str, start: str, end: str, summary: str = "Busy",
+                  transparency: str = "opaque") -> dict:
+        with self.lock:
+            self._seq += 1
+            event = {
+                "id": uuid.uuid4().hex,
+                "status": "confirmed",
+                "summary": summary,
+                "transparency": transparency,
+                "start": {"dateTime": start},
+                "end": {"dateTime": end},
+                "_seq": self._seq,
+            }
+            self.events.setdefault(calendar_id, {})[event["id"]] = event
+        return _public(event)
+
+    def delete_event(self, calendar_id: str, event_id: str) -> None:
+        with self.lock:
+            self._seq += 1
+            event = self.events[calendar_id][event_id]
+            event["status"] = "cancelled"
+            event["_seq"] = self._seq
+
+    def expire_sync_tokens(self) -> None:
+        """Invalidates all issued sync tokens (clients must do a full resync)."""
+        with self.lock:
+            self._generation += 1
+
+    def _sync_token(self) -> str:
+        return f"g{self._generation}-{self._seq}"
+
+    def list_events(self, calendar_id: str, time_min: str = None, time_max: str = None,
+                    show_deleted: bool = False) -> list:
+        with self.lock:
+            events = list(self.events.get(calendar_id, {}).values())
+        if not show_deleted:
+            events = [e for e in events if e["status"] != "cancelled"]
+        if time_min:
+            events = [e for e in events if _parse_time(e["end"]["dateTime"]) > _parse_time(time_min)]
+        if time_max:
+            events = [e for e in events if _parse_time(e["start"]["dateTime"]) < _parse_time(time_max)]
+        return sorted(events, key=lambda e: _parse_time(e["start"]["dateTime"]))
+
+    def changes_since(self, calendar_id: str, sync_token: str):
+        """Returns the events changed after a sync token, or None if the token expired."""
+        generation, seq = sync_token[1:].split("-")
+        with self.lock:
+            if int(generation) != self._generation:
+                return None
+            return [e for e in self.events.get(calendar_id, {}).values() if e["_seq"] > int(seq)]
+
+    def free_busy(self, calendar_id: str, time_min: str, time_max: str) -> list:
+        """Merged busy intervals of a calendar, like the freeBusy endpoint."""
+        merged = []
+        for event in self.list_events(calendar_id, time_min, time_max):
+            if event.get("transparency") == "transparent":
+                continue
+            start = max(_parse_time(event["start"]["dateTime"]), _parse_time(time_min))
+            end = min(_parse_time(event["end"]["dateTime"]), _parse_time(time_max))
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        fmt = lambda moment: moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return [{"start": fmt(start), "end": fmt(end)} for start, end in merged]
+
+
+def _public(event: dict) -> dict:
+    return {k: v for k, v in event.items() if not k.startswith("_")}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeCalendarServer = None
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, endpoint: str = None):
+        body = json.dumps(payload).encode("utf-8")
+        if endpoint:
+            self.fake.stats[f"bytes.{endpoint}"] += len(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _route(self, method: str):
+        body = self._read_body()
+        if method == "POST" and urlparse(self.path).path.strip("/") == "batch/calendar/v3":
+            return self._batch(body)
+        status, payload, endpoint = self._dispatch(method, self.path, body, self.headers.get("Authorization", ""))
+        self._send_json(status, payload, endpoint)
+
+    def _batch(self, body: bytes):
+        """Handles a multipart/mixed batch request: one round trip, one sub-response per part."""
+        self.fake.stats["batch"] += 1
+        time.sleep(self.fake.latency)
+        message = BytesParser().parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+        )
+        boundary = f"batch_{uuid.uuid4().hex}"
+        chunks = []
+        for part in message.get_payload():
+            request = part.get_payload()
+            head, _, part_body = request.partition("\r\n\r\n") if "\r\n\r\n" in request else request.partition("\n\n")
+            lines = head.splitlines()
+            method, path, _ = lines[0].split(" ", 2)
+            headers = dict(line.split(":", 1) for line in lines[1:] if ":" in line)
+            authorization = next((v.strip() for k, v in headers.items() if k.lower() == "authorization"),
+                                 self.headers.get("Authorization", ""))
+            status, payload, _ = self._dispatch(method, path, part_body.encode("utf-8"), authorization, latency=False)
+            content_id = part["Content-ID"].strip("<>")
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        response = ("".join(chunks) + f"--{boundary}--\r\n").encode("utf-8")
+        self.fake.stats["bytes.batch"] += len(response)
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def _dispatch(self, method: str, path: str, body: bytes, authorization: str, latency: bool = True):
+        """Returns (status, payload, endpoint) for a single API request."""
+        parsed = urlparse(path)
+        parts = [unquote(p) for p in parsed.path.strip("/").split("/")]
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+        if method == "POST" and parts == ["token"]:
+            self.fake.stats["token"] += 1
+            time.sleep(self.fake.token_latency)
+            return 200, {
+                "access_token": f"fake-{uuid.uuid4().hex}",
+                "expires_in": self.fake.token_ttl,
+                "token_type": "Bearer",
+            }, None
+
+        if not authorization.startswith("Bearer "):
+            return 401, {"error": {"code": 401, "message": "Missing access token"}}, None
+        if latency:
+            time.sleep(self.fake.latency)
+
+        # /calendar/v3/freeBusy
+        if method == "POST" and parts == ["calendar", "v3", "freeBusy"]:
+            self.fake.stats["freebusy"] += 1
+            payload = json.loads(body or b"{}")
+            calendars = {
+                item["id"]: {"busy": self.fake.free_busy(item["id"], payload["timeMin"], payload["timeMax"])}
+                for item in payload.get("items", [])
+            }
+            return 200, {
+                "kind": "calendar#freeBusy",
+                "timeMin": payload["timeMin"],
+                "timeMax": payload["timeMax"],
+                "calendars": calendars,
+            }, "freebusy"
+
+        # /calendar/v3/calendars/{calendarId}/events
+        if parts[:3] == ["calendar", "v3", "calendars"] and len(parts) == 5 and parts[4] == "events":
+            calendar_id = parts[3]
+            if method == "GET":
+                self.fake.stats["events.list"] += 1
+                with self.fake.lock:
+                    next_sync_token = self.fake._sync_token()
+                if "syncToken" in query:
+                    items = self.fake.changes_since(calendar_id, query["syncToken"])
+                    if items is None:
+                        return 410, {"error": {"code": 410, "message": "Sync token is no longer valid, a full sync is required."}}, "events.list"
+                else:
+                    items = self.fake.list_events(
+                        calendar_id, query.get("timeMin"), query.get("timeMax"),
+                        show_deleted=query.get("showDeleted") == "true",
+                    )
+                offset = int(query.get("pageToken", 0))
+                page_size = int(query.get("maxResults", 250))
+                page = items[offset:offset + page_size]
+                response = {"kind": "calendar#events", "items": [_public(e) for e in page]}
+                if offset + page_size < len(items):
+                    response["nextPageToken"] = str(offset + page_size)
+                else:
+                    response["nextSyncToken"] = next_sync_token
+                return 200, response, "events.list"
+            if method == "POST":
+                self.fake.stats["events.insert"] += 1
+                payload = json.loads(body or b"{}")
+                if "dateTime" not in payload.get("start", {}) or "dateTime" not in payload.get("end", {}):
+                    return 400, {"error": {"code": 400, "message": "Missing start or end time."}}, "events.insert"
+                event = self.fake.add_event(
+                    calendar_id,
+                    payload["start"]["dateTime"],
+                    payload["end"]["dateTime"],
+                    payload.get("summary", ""),
+                )
+                return 200, event, "events.insert"
+
+        return 404, {"error": {"code": 404, "message": f"Not found: {parsed.path}"}}, None
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
@@ -0,0 +1,159 @@
+# Load test: N concurrent candidate sessions through the full agent pipeline,
+# with a stub model backend (see src/agents/model_backends.py).
+#
+# Every session plays the app's conversation through run_agent_async on one
+# shared runner:
+#   1. "I've uploaded my CV file: ..."  (CV analysis + profile fan-out)
+#   2. "1"                             (job selection, coding problem)
+#   3. local grading, then "Code assessment result: <verdict>"
+# The model answers with the scripted policies (or replays recordings) after
+# an injected latency, so the run costs nothing and the reported overhead
+# (turn latency minus simulated model time) is the pipeline's own: ADK, tools,
+# sessions, response cache, rate limiter.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.load_test_agents --sessions 50 --latency-ms 200 --jitter-ms 50
+#   python -m benchmarks.load_test_agents --backend replay --recordings cache/model_recordings.jsonl
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+SOLUTION = """def solve(*args, **kwargs):
+    return None
+"""
+
+CV_TEXT = """Jane Doe - Backend Engineer
+Skills: Python, Docker, SQL, FastAPI, PostgreSQL
+Languages: English (Native), Spanish (B2)
+Experience: 5 years building REST APIs and microservices.
+"""
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+
+
+async def candidate_session(runner, index, cv_path, results):
+    from src.agents.model_backends import stub_model_time
+    from src.agents.runtime import grade_code_async, run_agent_async, set_session_state_async
+    from src.tools.upload_store import UPLOAD_SESSION_KEY, get_upload_store
+
+    session_id, user_id = f"load-{index}", "load_user"
+    # Uploaded as the app does: the CV tool only reads the session's own uploads.
+    get_upload_store().put(session_id, cv_path.name, cv_path.read_bytes())
+    await set_session_state_async(runner, {UPLOAD_SESSION_KEY: session_id}, session_id=session_id, user_id=user_id)
+
+    async def turn(label, prompt):
+        spent = []
+        token = stub_model_time.set(spent)
+        start = time.perf_counter()
+        try:
+            response = await run_agent_async(runner, prompt, session_id=session_id, user_id=user_id,
+                                             quiet=True, log_events=False)
+        finally:
+            stub_model_time.reset(token)
+        elapsed = time.perf_counter() - start
+        results.append({"turn": label, "latency": elapsed, "model": sum(spent), "calls": len(spent),
+                        "error": response.startswith("⚠️")})
+        return response
+
+    await turn("cv", f"I've uploaded my CV file: {cv_path.name}\n\nPlease analyze it and help me find suitable job opportunities.")
+    await turn("select", "1")
+    start = time.perf_counter()
+    verdict = await grade_code_async(runner, SOLUTION, session_id=session_id, user_id=user_id)
+    results.append({"turn": "grade", "latency": time.perf_counter() - start, "model": 0.0, "calls": 0,
+                    "error": verdict is None})
+    await turn("verdict", f"Code assessment result: {verdict}")
+    await runner.session_service.delete_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    get_upload_store().clear_session(session_id)
+
+
+async def run(sessions, ramp_seconds, cv_path):
+    from google.adk.runners import InMemoryRunner
+    from src.agents import get_agent
+
+    runner = InMemoryRunner(agent=get_agent("orchestrator"), app_name="agents")
+    results = []
+
+    async def start(index):
+        await asyncio.sleep(ramp_seconds * index / max(1, sessions))
+        await candidate_session(runner, index, cv_path, results)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(start(i) for i in range(sessions)))
+    return results, time.perf_counter() - started
+
+
+def report(results, wall, sessions):
+    print(f"{'turn':8} {'n':>5} {'err':>4} {'calls':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'overhead p50':>13} {'overhead p95':>13}")
+    for label in ("cv", "select", "grade", "verdict", "all"):
+        rows = [r for r in results if label == "all" or r["turn"] == label]
+        if not rows:
+            continue
+        latency = [r["latency"] for r in rows]
+        overhead = [max(0.0, r["latency"] - r["model"]) for r in rows]
+        calls = sum(r["calls"] for r in rows) / len(rows)
+        print(f"{label:8} {len(rows):5} {sum(r['error'] for r in rows):4} {calls:5.1f} "
+              f"{percentile(latency, 0.5):9.1f} {percentile(latency, 0.95):9.1f} {percentile(latency, 0.99):9.1f} "
+              f"{percentile(overhead, 0.5):13.1f} {percentile(overhead, 0.95):13.1f}")
+    print(f"{sessions} sessions in {wall:.2f}s ({sessions / wall * 60:.0f} sessions/min)")
+
+
+def main(args):
+    os.environ.update({
+        "AGENT_MODEL_BACKEND": args.backend,
+        "STUB_LATENCY_MS": str(args.latency_ms),
+        "STUB_LATENCY_JITTER_MS": str(args.jitter_ms),
+        "LLM_CACHE_ENABLED": str(not args.no_cache),
+        "GEMINI_RATE_LIMIT_ENABLED": str(not args.no_rate_limit),
+        "GEMINI_RPM": str(args.rpm),
+        "GEMINI_TPM": str(args.tpm),
+        "GEMINI_MAX_CONCURRENCY": str(args.max_concurrency),
+    })
+    if args.recordings:
+        os.environ["STUB_RECORDINGS_PATH"] = str(args.recordings)
+    # Keeps the load test's uploads out of the app's upload store.
+    os.environ.setdefault("UPLOADS_DIR", tempfile.mkdtemp())
+    # Stub assessments must never land in the real assessment history.
+    os.environ["ASSESSMENTS_DB_PATH"] = str(Path(tempfile.mkdtemp()) / "load_test_assessments.db")
+    if not args.no_cache:
+        # Keeps the stub responses out of the real response cache.
+        os.environ.setdefault("LLM_CACHE_PATH", str(Path(tempfile.mkdtemp()) / "load_test_cache.db"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cv_path = Path(tmp) / "load_test_cv.txt"
+        cv_path.write_text(CV_TEXT, encoding="utf-8")
+        print(f"{args.sessions} sessions, backend {args.backend}, model latency {args.latency_ms}±{args.jitter_ms} ms, "
+              f"cache {'off' if args.no_cache else 'on'}, rate limiter {'off' if args.no_rate_limit else 'on'}")
+        results, wall = asyncio.run(run(args.sessions, args.ramp, cv_path))
+    report(results, wall, args.sessions)
+
+    from src.agents.llm_cache import llm_cache_stats
+    from src.agents.rate_limiter import rate_limiter_stats
+    if not args.no_cache:
+        print(f"response cache: {llm_cache_stats()}")
+    for model, stats in rate_limiter_stats().items():
+        print(f"rate limiter [{model}]: requests {stats['requests']}  delayed {stats['delayed']}  "
+              f"avg queue wait {stats['avg_queue_wait_s'] * 1000:.1f} ms  max {stats['max_queue_wait_s'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent candidate sessions against a stub model backend.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--backend", choices=("scripted", "replay"), default="scripted")
+    parser.add_argument("--recordings", type=Path, help="Recordings file for --backend replay.")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Simulated model latency per call.")
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which sessions start.")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache.")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Disable the shared rate limiter.")
+    parser.add_argument("--rpm", type=float, default=100_000, help="Limiter requests per minute (default: not binding).")
+    parser.add_argument("--tpm", type=float, default=1e9, help="Limiter tokens per minute (default: not binding).")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Limiter requests in flight.")
+    main(parser.parse_args())
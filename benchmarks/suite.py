@@ -0,0 +1,466 @@
+# Benchmark suite: hot paths of the tools, the sandbox and the runtime, with
+# stored results and regression thresholds.
+#
+# Cases (select with -k, a substring of the name):
+#   sandbox.execute_code.*       trivial, CPU-heavy, over the memory limit, timeout;
+#                                javascript, go, sql runners, sql on a dataset copy
+#   tools.run_code_assignment.*  store expected output, compare, plain run
+#   assessments.summary.*        verdicts aggregated per problem over 100k assessments
+#   jobs.list_jobs_from_db.*     text and compact mode at 1k / 100k / 1M jobs
+#   cv.read_cv_fn.*              text CV, multi-page PDFs
+#   runtime.log_agent_event      events appended to the log file
+#
+# Each run is saved to benchmarks/results/<timestamp>-<commit>.json and
+# compared with the previous run (or --baseline): a case whose median grew by
+# more than its threshold (default 20%, 50% for the sandbox cases, which fork
+# a process) is reported as a regression and the exit code is 1. Generated
+# job catalogs and PDFs are kept in cache/benchmarks/ between runs.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.suite                  # all cases, save, compare
+#   python -m benchmarks.suite --quick -k jobs  # fewer samples, no 1M catalog
+#   python -m benchmarks.suite --history        # medians of the stored runs
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+REPO_ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+DATA_DIR = REPO_ROOT / "cache" / "benchmarks"
+DEFAULT_THRESHOLD = 1.20   # Median ratio above which a case is a regression.
+NOISE_FLOOR_MS = 0.005     # Absolute changes below this are never regressions.
+JOB_SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+ASSESSMENT_ROWS = 100_000
+PDF_PAGES = (1, 10, 50)
+LOG_EVENTS_PER_SAMPLE = 1000
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], object]
+    repeat: int = 20
+    warmup: int = 1
+    threshold: float = DEFAULT_THRESHOLD
+    per_call: int = 1  # Operations per fn() call (the reported time is per operation).
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, repeat: int = 20, warmup: int = 1, threshold: float = DEFAULT_THRESHOLD, per_call: int = 1):
+    """
+    Registers a benchmark case. `fn` is a factory returning the callable to time
+    (setup runs once), or None to skip the case on this machine.
+    """
+    def register(factory):
+        CASES.append(Case(name, factory, repeat, warmup, threshold, per_call))
+        return factory
+    return register
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "JavaScript", "TypeScript", "SQL", "NoSQL databases", "Docker",
+    "Kubernetes", "AWS", "GCP", "Azure", "PyTorch", "TensorFlow", "scikit-learn", "Pandas", "Numpy",
+    "React", "Node.js", "FastAPI", "Flask", "Django", "Spark", "Airflow", "Terraform", "Linux", "Git",
+]
+CANDIDATE_SKILLS = "Python, Docker, PyTorch, SQL, FastAPI"
+
+
+def job_catalog(rows: int) -> Path:
+    """Builds (once) a single-tenant catalog of `rows` jobs with the skills index and version table."""
+    from src.tools.job_store import JOBS_SCHEMA, SKILLS_SCHEMA, install_catalog_version
+
+    path = DATA_DIR / f"jobs_{rows}.db"
+    if path.exists():
+        return path
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(rows)
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    with conn:
+        conn.execute(JOBS_SCHEMA)
+        conn.execute(SKILLS_SCHEMA)
+        for start in range(0, rows, 50_000):
+            batch = [rng.sample(SKILLS, rng.randint(3, 8)) for _ in range(min(50_000, rows - start))]
+            conn.executemany(
+                "INSERT INTO jobs (id, title, company, location, description, responsibilities, skills_required) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(start + i + 1, f"Engineer {start + i}", "Benchmark Corp", "Remote", "Build and operate services. " * 8,
+                  "- Design\n- Implement\n- Review", json.dumps(skills)) for i, skills in enumerate(batch)],
+            )
+            conn.executemany(
+                "INSERT INTO job_skills (skill, job_id) VALUES (?, ?)",
+                [(skill.lower(), start + i + 1) for i, skills in enumerate(batch) for skill in skills],
+            )
+    install_catalog_version(conn)
+    conn.close()
+    tmp.rename(path)
+    return path
+
+
+def use_catalog(path: Path):
+    """Points the process-wide job store at a catalog, with the ranking cache off."""
+    from src.tools import job_store
+
+    os.environ.update({"JOBS_DB_PATH": str(path), "JOBS_SHARDS_DIR": str(DATA_DIR / "no_shards"),
+                       "JOB_RANKING_CACHE_SIZE": "0"})
+    if job_store._store is not None:
+        job_store._store.close()
+    job_store._store = None
+
+
+def assessment_table(rows: int) -> Path:
+    """Builds (once) an assessments table of `rows` graded results over the problem bank."""
+    from src.tools.assessments import AssessmentResult, AssessmentStore
+
+    path = DATA_DIR / f"assessments_{rows}.db"
+    if path.exists():
+        return path
+    rng = random.Random(rows)
+    problems = ["list-statistics-calculator", "text-sentiment-analyzer", "monthly-revenue-report",
+                "sliding-window-maximum", "user-data-aggregation"]
+    statuses = ["pass"] * 6 + ["fail"] * 3 + ["timeout", "error", "security_violation"]
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    store = AssessmentStore(tmp)
+    for start in range(0, rows, 50_000):
+        entries = []
+        for i in range(start, min(rows, start + 50_000)):
+            status = rng.choice(statuses)
+            total = rng.randint(4, 20)
+            result = AssessmentResult(status=status, language="python", graded=True,
+                                      problem_id=rng.choice(problems), tests_total=total,
+                                      tests_passed=total if status == "pass" else rng.randint(0, total - 1),
+                                      execution_ms=round(rng.uniform(20, 400), 1))
+            entries.append((result, f"candidate-{i // 2}", f"Engineer {i % 50}"))
+        store.record_many(entries)
+    tmp.rename(path)
+    return path
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def cv_pdf(pages: int) -> Path:
+    """Writes (once) a text PDF of `pages` pages (Helvetica, 45 lines each)."""
+    path = DATA_DIR / f"cv_{pages}p.pdf"
+    if path.exists():
+        return path
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} - Experience: built Python services with Docker, SQL and FastAPI ({i})"
+                 for i in range(45)]
+        stream = "BT /F1 10 Tf 14 TL 50 790 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+    return path
+
+
+# =============================================================================
+# Cases
+# =============================================================================
+
+SANDBOX_CODE = {
+    "trivial": "print(sum(range(10)))",
+    "cpu": "total = 0\nfor i in range(2_000_000):\n    total += i * i % 7\nprint(total)",
+    "memory": "data = [0] * 50_000_000\nprint(len(data))",  # 400 MB: hits the memory limit.
+}
+
+for _label, _code in SANDBOX_CODE.items():
+    @case(f"sandbox.execute_code.{_label}", repeat=10, threshold=1.5)
+    def _sandbox(code=_code):
+        from src.tools.code_sandbox import execute_code
+        return lambda: execute_code(code)
+
+
+@case("sandbox.execute_code.timeout", repeat=3, warmup=0, threshold=1.5)
+def _sandbox_timeout():
+    from src.tools.code_sandbox import execute_code
+    return lambda: execute_code("while True:\n    pass", timeout=1)
+
+
+RUNNER_CODE = {
+    "javascript": "console.log([...Array(10).keys()].reduce((a, b) => a + b, 0))",
+    "go": 'package main\n\nimport "fmt"\n\nfunc main() {\n\ts := 0\n\tfor i := 0; i < 10; i++ {\n\t\ts += i\n\t}\n\tfmt.Println(s)\n}\n',
+    "sql": "WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < 9) SELECT sum(i) FROM n;",
+}
+
+for _language, _code in RUNNER_CODE.items():
+    # Warm path: pre-started JavaScript workers, cached Go binary (the warm-up run compiles it).
+    @case(f"sandbox.execute_code.{_language}", repeat=10, threshold=1.5)
+    def _runner(language=_language, code=_code):
+        from src.tools.code_sandbox import execute_code, get_runner
+        if not get_runner(language).available():
+            return None  # Toolchain not installed: skipped.
+        return lambda: execute_code(code, language=language)
+
+
+@case("sandbox.execute_code.sql_dataset", repeat=20)
+def _sql_dataset():
+    # A query on a private copy of a problem dataset (template built in the warm-up run).
+    from src.tools.code_sandbox import execute_code
+    from src.tools.sql_assessment import register_datasets
+    register_datasets()
+    query = "SELECT c.country, count(*) FROM customers c JOIN orders o ON o.customer_id = c.id GROUP BY c.country;"
+    return lambda: execute_code(query, language="sql", dataset="shop")
+
+
+@case("tools.run_code_assignment.store", repeat=10, threshold=1.5)
+def _assignment_store():
+    from src.tools.tools import run_code_assignment
+    return lambda: run_code_assignment(SANDBOX_CODE["trivial"], expected_output="45", context={})
+
+
+@case("tools.run_code_assignment.compare", repeat=10, threshold=1.5)
+def _assignment_compare():
+    from src.tools.tools import run_code_assignment
+    from src.tools import assessments
+    from src.tools.assessments import PRESENTED_PROBLEM_KEY, AssessmentStore, PresentedProblem
+
+    assessments._store = AssessmentStore(Path(tempfile.mkdtemp()) / "assessments.db")
+    context = {"problem_generated": True, PRESENTED_PROBLEM_KEY: PresentedProblem("45").to_dict()}
+    return lambda: run_code_assignment(SANDBOX_CODE["trivial"], context=context)
+
+
+@case("tools.run_code_assignment.plain", repeat=10, threshold=1.5)
+def _assignment_plain():
+    from src.tools.tools import run_code_assignment
+    return lambda: run_code_assignment(SANDBOX_CODE["trivial"])
+
+
+@case("assessments.summary.100k", repeat=10)
+def _assessment_summary():
+    from src.tools.assessments import AssessmentStore
+
+    store = AssessmentStore(assessment_table(ASSESSMENT_ROWS))
+    return lambda: store.summary("problem_id")
+
+
+for _size, _rows in JOB_SIZES.items():
+    for _mode in ("text", "compact"):
+        @case(f"jobs.list_jobs_from_db.{_mode}.{_size}", repeat=20 if _rows < 1_000_000 else 5)
+        def _list_jobs(rows=_rows, mode=_mode):
+            from src.tools.tools import list_jobs_from_db
+            use_catalog(job_catalog(rows))
+            return lambda: list_jobs_from_db(CANDIDATE_SKILLS, max_results=5, mode=mode)
+
+
+@case("cv.read_cv_fn.txt", repeat=50)
+def _read_cv_txt():
+    from src.tools.tools import read_cv_fn
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / "cv.txt"
+    path.write_text("Jane Doe - Backend Engineer\nSkills: Python, Docker, SQL\n" * 200, encoding="utf-8")
+    return lambda: read_cv_fn(str(path.resolve()))
+
+
+for _pages in PDF_PAGES:
+    @case(f"cv.read_cv_fn.pdf_{_pages}p", repeat=10 if _pages < 50 else 3)
+    def _read_cv_pdf(pages=_pages):
+        from src.tools.tools import read_cv_fn
+        path = cv_pdf(pages).resolve()
+        return lambda: read_cv_fn(str(path))
+
+
+@case("runtime.log_agent_event", repeat=10, per_call=LOG_EVENTS_PER_SAMPLE)
+def _log_agent_event():
+    from google.genai import types
+    from src.agents import runtime
+
+    runtime.LOG_FILE = Path(tempfile.mkdtemp()) / "runner_events.log"
+    parts = [
+        types.Part(text="Here are the jobs matching your profile. " * 10),
+        types.Part(function_call=types.FunctionCall(name="list_jobs_from_db", args={"cv_summary": CANDIDATE_SKILLS})),
+        types.Part(function_response=types.FunctionResponse(name="list_jobs_from_db", response={"result": "1. Engineer" * 50})),
+    ]
+    events = [SimpleNamespace(agent_name="manager", content=types.Content(role="model", parts=[parts[i % 3]]))
+              for i in range(LOG_EVENTS_PER_SAMPLE)]
+
+    def run():
+        for event in events:
+            runtime.log_agent_event(event)
+        runtime.LOG_FILE.unlink()
+    return run
+
+
+# =============================================================================
+# Runner & Results
+# =============================================================================
+
+def measure(bench: Case, quick: bool) -> Optional[dict]:
+    fn = bench.fn()
+    if fn is None:
+        return None
+    for _ in range(bench.warmup):
+        fn()
+    repeat = max(2, bench.repeat // 4) if quick else bench.repeat
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000 / bench.per_call)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(samples[0], 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "samples": len(samples),
+        "threshold": bench.threshold,
+    }
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def environment() -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()}-{platform.machine()}-{os.cpu_count()}cpu-{platform.node()}",
+    }
+
+
+def stored_runs(results_dir: Path) -> List[Path]:
+    return sorted(results_dir.glob("*.json")) if results_dir.is_dir() else []
+
+
+def find_baseline(results_dir: Path, ref: Optional[str], names: List[str],
+                  exclude: Optional[Path] = None) -> Optional[Path]:
+    """
+    A results file path, or the latest stored run (of commit `ref` if given)
+    that measured at least one of the selected cases.
+    """
+    if ref and Path(ref).is_file():
+        return Path(ref)
+    for path in reversed(stored_runs(results_dir)):
+        run = json.loads(path.read_text())
+        if path != exclude and (not ref or run["env"]["commit"].startswith(ref)) \
+                and any(name in run["results"] for name in names):
+            return path
+    return None
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """Prints the comparison table; returns the names of the regressed cases."""
+    regressions = []
+    if current["env"]["machine"] != baseline["env"]["machine"]:
+        print(f"⚠️ Baseline was recorded on another machine ({baseline['env']['machine']}): ratios are indicative only.")
+    print(f"\n{'case':42} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:42} {'-':>12} {result['median_ms']:12.3f} {'new':>7}")
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        regressed = ratio > result["threshold"] and result["median_ms"] - before["median_ms"] > NOISE_FLOOR_MS
+        mark = "❌" if regressed else ("✅" if ratio < 1 / result["threshold"] else "")
+        print(f"{name:42} {before['median_ms']:12.3f} {result['median_ms']:12.3f} {ratio:7.2f} {mark}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def history(results_dir: Path, pattern: Optional[str]) -> None:
+    runs = [json.loads(p.read_text()) for p in stored_runs(results_dir)]
+    names = sorted({name for run in runs for name in run["results"] if not pattern or pattern in name})
+    for name in names:
+        trend = "  ".join(
+            f"{run['env']['commit']}:{run['results'][name]['median_ms']:.3f}" for run in runs if name in run["results"]
+        )
+        print(f"{name:42} {trend}")
+
+
+def main(args) -> int:
+    if args.history:
+        history(args.results_dir, args.k)
+        return 0
+
+    selected = [c for c in CASES if (not args.k or args.k in c.name) and not (args.quick and c.name.endswith(".1m"))]
+    if args.threshold:
+        for bench in selected:
+            bench.threshold = args.threshold
+    current = {"env": environment(), "results": {}}
+    for bench in selected:
+        result = measure(bench, args.quick)
+        if result is None:
+            print(f"{bench.name:42} skipped (not available on this machine)", flush=True)
+            continue
+        current["results"][bench.name] = result
+        print(f"{bench.name:42} median {result['median_ms']:10.3f} ms   p95 {result['p95_ms']:10.3f} ms   "
+              f"({result['samples']} samples)", flush=True)
+
+    saved = None
+    if not args.no_save:
+        args.results_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        saved = args.results_dir / f"{stamp}-{current['env']['commit']}{'-dirty' if current['env']['dirty'] else ''}.json"
+        saved.write_text(json.dumps(current, indent=2))
+        print(f"\n✅ Results saved to {saved}")
+
+    baseline_path = find_baseline(args.results_dir, args.baseline, list(current["results"]), exclude=saved)
+    if baseline_path is None:
+        print("No baseline to compare with yet.")
+        return 0
+    print(f"Baseline: {baseline_path.name}")
+    regressions = compare(current, json.loads(baseline_path.read_text()))
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite with stored results and regression thresholds.")
+    parser.add_argument("-k", help="Only run the cases whose name contains this string.")
+    parser.add_argument("--quick", action="store_true", help="Fewer samples, skip the 1M-job catalog.")
+    parser.add_argument("--baseline", help="Results file or commit to compare with (default: the previous run).")
+    parser.add_argument("--threshold", type=float, help="Override every case's regression ratio (e.g. 1.1).")
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run.")
+    parser.add_argument("--history", action="store_true", help="Print the stored medians per case and exit.")
+    sys.exit(main(parser.parse_args()))
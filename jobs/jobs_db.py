@@ -18,6 +18,22 @@ CREATE TABLE IF NOT EXISTS jobs (
     skills_required TEXT -- JSON array di skills
 )
 """)
+
+# Versione del catalogo: incrementata dai trigger a ogni modifica dei job,
+# così le classifiche in cache sanno quando il catalogo è cambiato.
+cursor.executescript("""
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS jobs_version_insert AFTER INSERT ON jobs
+BEGIN UPDATE catalog_version SET version = version + 1; END;
+CREATE TRIGGER IF NOT EXISTS jobs_version_update AFTER UPDATE ON jobs
+BEGIN UPDATE catalog_version SET version = version + 1; END;
+CREATE TRIGGER IF NOT EXISTS jobs_version_delete AFTER DELETE ON jobs
+BEGIN UPDATE catalog_version SET version = version + 1; END;
+""")
 conn.commit()
 
 # Esempio di job da inserire
@@ -5,15 +5,21 @@ from dotenv import load_dotenv
 load_dotenv()
 import streamlit as st
 import os
-import asyncio
 import html
+import uuid
 
 from pathlib import Path
-import json
-from datetime import datetime
-from google.adk.runners import InMemoryRunner
 
-from src.agents import *  # Imports all agents, including the orchestrator.
+# ADK and the agents are imported lazily (see show_analysis_dialog),
+# so the landing page renders without loading them.
+from src.agents.runtime import (
+    extract_code_submission,
+    grade_code_sync,
+    is_code_submission,
+    log_user_input,
+    run_agent_sync,
+    set_session_state_sync,
+)
 
 
 # Explicitly set environment variables for ADK (needed for Streamlit)
@@ -52,147 +58,17 @@ if 'show_analysis' not in st.session_state:
     st.session_state.show_analysis = False
 if 'uploaded_file_content' not in st.session_state:
     st.session_state.uploaded_file_content = None
-
-# Logging
-LOG_DIR = Path(__file__).parent / "log_files"
-LOG_DIR.mkdir(exist_ok=True)
-LOG_FILE = LOG_DIR / "runner_events.log"
-
-
-def log_agent_event(event):
-    """
-    Logs agent events, parsing nested content for Tools and Text.
-    Handles NoneType safely.
-    """
-    log_entry = {
-        "timestamp": datetime.now().timestamp(),
-        "agent_name": getattr(event, "agent_name", "Orchestrator"),
-        "tool_name": None,
-        "input_text": None,
-        "output_text": None,
-        "type": "unknown"
-    }
-
-    has_content = False
-
-    # Parse content parts
-    if hasattr(event, "content") and event.content:
-        parts = getattr(event.content, "parts", [])
-        if parts:
-            for part in parts:
-                # Agent Text
-                if hasattr(part, "text") and part.text:
-                    log_entry["type"] = "response"
-                    current = log_entry["output_text"] or ""
-                    log_entry["output_text"] = current + part.text
-                    has_content = True
-
-                # Handles tool call logging.
-                if hasattr(part, "function_call") and getattr(part, "function_call", None):
-                    log_entry["type"] = "tool_call"
-                    log_entry["tool_name"] = getattr(part.function_call, "name", None)
-                    try:
-                        args_dict = getattr(part.function_call, "args", {})
-                        if args_dict is not None:
-                            if hasattr(args_dict, "items"):
-                                args_dict = dict(args_dict.items())
-                            log_entry["input_text"] = json.dumps(args_dict, ensure_ascii=False)
-                        else:
-                            log_entry["input_text"] = None
-                    except Exception:
-                        log_entry["input_text"] = str(getattr(part.function_call, "args", None))
-                    has_content = True
-
-                # Handles tool response logging.
-                if hasattr(part, "function_response") and getattr(part, "function_response", None):
-                    log_entry["type"] = "tool_result"
-                    log_entry["tool_name"] = getattr(part.function_response, "name", None)
-                    try:
-                        resp_dict = getattr(part.function_response, "response", {})
-                        if resp_dict is not None:
-                            if hasattr(resp_dict, "items"):
-                                resp_dict = dict(resp_dict.items())
-                            log_entry["output_text"] = json.dumps(resp_dict, ensure_ascii=False)
-                        else:
-                            log_entry["output_text"] = None
-                    except Exception:
-                        log_entry["output_text"] = str(getattr(part.function_response, "response", None))
-                    has_content = True
-
-    # Fallback for logging user input.
-    if not has_content and hasattr(event, "user_content"):
-        log_entry["type"] = "user_input"
-        input_text = getattr(event.user_content, "text", None)
-        if not input_text and hasattr(event.user_content, "parts"):
-            parts = getattr(event.user_content, "parts", [])
-            texts = [p.text for p in parts if hasattr(p, "text") and p.text]
-            if texts:
-                input_text = " ".join(texts)
-        log_entry["input_text"] = input_text
-        if input_text:
-            has_content = True
-
-    # Write log only if content exists
-    if has_content:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-
-
-def extract_agent_response(events):
-    """
-    Extracts all text from agent events.
-    Safely handles NoneType and missing parts.
-    """
-    if not events:
-        return None
-
-    full_text = []
-
-    for event in events:
-        log_agent_event(event)  # Always log the event.
-        content = getattr(event, 'content', None)
-        parts = getattr(content, 'parts', []) if content and getattr(content, 'parts', None) else []
-
-        for part in parts:
-            text = getattr(part, 'text', None)
-            if text:
-                full_text.append(text)
-            else:
-                # Debug: non-textual parts detected.
-                print("DEBUG: non-text part detected", part)
-
-    return "".join(full_text) if full_text else None
-
-
-async def run_agent_async(runner, prompt):
-    """Runs the agent asynchronously and returns its response. Never returns None."""
-    if runner is None:
-        return "⚠️ Error: agent runner is not initialized."
-    try:
-        response = await runner.run_debug(prompt)
-        text = extract_agent_response(response)
-        if text is None or text.strip() == "":
-            return "⚠️ The agent processed your request but produced no output."
-        return text
-    except Exception as e:
-        return f"⚠️ Error running agent asynchronously: {str(e)}"
-
-
-def run_agent_sync(runner, prompt):
-    """Synchronous wrapper for asynchronous agent calls. Never returns None."""
-    if runner is None:
-        return "⚠️ Error: agent runner is not initialized."
-    try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(run_agent_async(runner, prompt))
-        loop.close()
-        return result
-    except Exception as e:
-        return f"⚠️ Error running agent synchronously: {str(e)}"
-
-
-def analyze_cv_with_runner(runner, filename):
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = None
+    st.session_state.upload_signature = None
+if 'upload_status' not in st.session_state:
+    # Final status of upload_key, once done or failed (the poller then stops).
+    st.session_state.upload_status = None
+if 'upload_session_id' not in st.session_state:
+    # Identifies this browser session's files in the upload store.
+    st.session_state.upload_session_id = uuid.uuid4().hex
+
+def analyze_cv_with_runner(runner, filename, profile=None):
     """Calls the orchestrator agent to analyze a CV. Never returns None."""
     if runner is None:
         return "⚠️ Error: agent runner is not initialized."
@@ -200,6 +76,9 @@ def analyze_cv_with_runner(runner, filename):
     prompt = f"""I've uploaded my CV file: {filename}
 
 Please analyze it and help me find suitable job opportunities."""
+    if profile and profile.get("skills"):
+        # Extracted at upload time (see process_upload); saves a round of guessing.
+        prompt += f"\nSkills detected in the file: {', '.join(profile['skills'])}"
     
     try:
         with st.spinner("🤖 Orchestrator Agent starting workflow..."):
@@ -213,25 +92,109 @@ Please analyze it and help me find suitable job opportunities."""
         return f"⚠️ Error during CV analysis: {str(e)}"
 
 
+# Seconds the Analyze dialog waits for the background extraction to finish.
+UPLOAD_WAIT_SECONDS = 30
+
+
+def _build_orchestrator():
+    from src.agents import get_agent
+    get_agent("orchestrator")
+
+
+def process_upload(uploaded_file):
+    """
+    Saves a new upload in the upload store (under this session) and queues its
+    text and profile extraction in the background (see src/tools/upload_pipeline.py).
+    Returns the job key.
+    """
+    from src.tools.upload_pipeline import get_upload_pipeline
+    from src.tools.upload_store import get_upload_store
+
+    signature = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, "file_id", None))
+    if st.session_state.upload_signature != signature:
+        blob_path = get_upload_store().put(
+            st.session_state.upload_session_id, uploaded_file.name, uploaded_file.getvalue()
+        )
+
+        pipeline = get_upload_pipeline()
+        st.session_state.upload_key = pipeline.submit(blob_path, uploaded_file.name)
+        st.session_state.upload_signature = signature
+        if st.session_state.runner is None:
+            # Agents are built while the user reads, not when Analyze is clicked.
+            pipeline.warm_up(_build_orchestrator)
+    return st.session_state.upload_key
+
+
+def _render_upload_status(status):
+    """Renders the processing state of an upload as captions."""
+    if status["status"] == "done":
+        profile = status["profile"] or {}
+        st.caption(f"✅ CV processed in {sum(status['timings'].values()):.1f}s")
+        if profile.get("skills"):
+            st.caption(f"🧠 Skills detected: {', '.join(profile['skills'])}")
+        if profile.get("languages"):
+            st.caption("🌍 Languages: " + ", ".join(
+                f"{language} ({level})" if level else language for language, level in profile["languages"].items()
+            ))
+    elif status["status"] == "error":
+        st.caption(f"⚠️ Could not pre-process the file: {status['error']}")
+    else:
+        st.caption(f"⏳ Processing CV ({status['status']})...")
+
+
+@st.fragment(run_every=1)
+def _poll_upload_status(key):
+    """Polls the background processing of the upload until it is done."""
+    final = st.session_state.upload_status
+    if final is not None and final["key"] == key:
+        # Recorded by the analysis dialog: rerunning now would close it, so the
+        # timer stops at the next full run instead.
+        _render_upload_status(final)
+        return
+    from src.tools.upload_pipeline import get_upload_pipeline
+
+    status = get_upload_pipeline().status(key)
+    if status is None or status["status"] in ("done", "error"):
+        # Full rerun: show_upload_status then renders it without this timer.
+        if status is not None:
+            st.session_state.upload_status = status
+        st.rerun()
+    _render_upload_status(status)
+
+
+def show_upload_status(key):
+    """Shows the upload's processing state, polling only while it is still running."""
+    status = st.session_state.upload_status
+    if status is None or status["key"] != key:
+        from src.tools.upload_pipeline import get_upload_pipeline
+
+        status = get_upload_pipeline().status(key)
+        if status is None:
+            return  # Unknown job (e.g. dropped from the pipeline): nothing to poll.
+        if status["status"] not in ("done", "error"):
+            _poll_upload_status(key)
+            return
+        st.session_state.upload_status = status
+    _render_upload_status(status)
+
+
 @st.dialog("📊 CV Analysis & Chat", width="large")
 def show_analysis_dialog(uploaded_file):
     """Displays CV analysis and chat in a modal dialog."""
 
     if st.session_state.runner is None:
+        from google.adk.runners import InMemoryRunner
+        from src.agents import get_agent
+
         st.session_state.runner = InMemoryRunner(
-            agent=orchestrator,
+            agent=get_agent("orchestrator"),
             app_name="agents"
         )
-
-    temp_uploads_dir = Path(__file__).parent / "temp_uploads"
-    temp_uploads_dir.mkdir(exist_ok=True)
-    
-    temp_file_path = temp_uploads_dir / uploaded_file.name
-
-    # Saves the file only if it's new.
-    if st.session_state.current_cv_file != uploaded_file.name:
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Lets read_cv resolve file names to this session's uploads.
+        from src.tools.upload_store import UPLOAD_SESSION_KEY
+        set_session_state_sync(
+            st.session_state.runner, {UPLOAD_SESSION_KEY: st.session_state.upload_session_id}
+        )
 
     # Updates session state only if it's a new file.
     if st.session_state.current_cv_file != uploaded_file.name:
@@ -241,8 +204,18 @@ def show_analysis_dialog(uploaded_file):
         st.subheader("🔍 Initial CV Analysis")
         st.caption(f"Analyzing: **{uploaded_file.name}** ({uploaded_file.type})")
 
+        # The file was saved and queued for extraction at upload time.
+        from src.tools.upload_pipeline import get_upload_pipeline
+        with st.spinner("📥 Finishing CV extraction..."):
+            upload = get_upload_pipeline().wait(process_upload(uploaded_file), timeout=UPLOAD_WAIT_SECONDS)
+        if upload is not None and upload["status"] in ("done", "error"):
+            # Keeps the status poller from rerunning the app (and closing this dialog).
+            st.session_state.upload_status = upload
+
         # Calls the agent for analysis.
-        analysis_result = analyze_cv_with_runner(st.session_state.runner, uploaded_file.name)
+        analysis_result = analyze_cv_with_runner(
+            st.session_state.runner, uploaded_file.name, (upload or {}).get("profile")
+        )
 
         if analysis_result is not None:
             st.session_state.messages.append({
@@ -290,20 +263,12 @@ def show_analysis_dialog(uploaded_file):
 
     if prompt:
         # Logs user input.
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps({
-                "timestamp": datetime.now().timestamp(),
-                "agent_name": "User",
-                "tool_name": None,
-                "input_text": prompt,
-                "output_text": None,
-                "type": "user_input"
-            }, ensure_ascii=False) + "\n")
+        log_user_input(prompt)
         
         st.session_state.messages.append({"role": "user", "content": prompt})
         with chat_container:
             # Checks if message contains code for proper rendering.
-            if "\n" in prompt or prompt.strip().startswith(("def ", "import ", "from ", "class ")):
+            if "\n" in prompt or is_code_submission(prompt):
                 # Render as markdown code block for proper formatting
                 with st.chat_message("user"):
                     st.code(prompt, language="python")
@@ -320,11 +285,19 @@ def show_analysis_dialog(uploaded_file):
             with st.chat_message("assistant"):
                 with st.spinner("🤖 AI Agent thinking..."):
                     try:
-                        if "```" in prompt or prompt.strip().startswith("import") or "def " in prompt:
-                            feedback = run_agent_sync(
-                                st.session_state.runner,
-                                f"Please execute this Python code safely in sandbox:\n{prompt}"
-                            )
+                        if is_code_submission(prompt):
+                            # Grades locally first; the orchestrator only receives the verdict.
+                            verdict = grade_code_sync(st.session_state.runner, extract_code_submission(prompt))
+                            if verdict is not None:
+                                feedback = run_agent_sync(
+                                    st.session_state.runner,
+                                    f"Code assessment result: {verdict}"
+                                )
+                            else:
+                                feedback = run_agent_sync(
+                                    st.session_state.runner,
+                                    f"Please grade this code submission with code_grading_tool:\n{prompt}"
+                                )
                             st.markdown(feedback)
                             st.session_state.messages.append({"role": "assistant", "content": feedback})
                         else:
@@ -415,6 +388,9 @@ def main():
         with st.expander("📋 File Details", expanded=False):
             for key, value in file_details.items():
                 st.write(f"**{key}:** {value}")
+
+        # Extraction starts now, while the user reads.
+        show_upload_status(process_upload(uploaded_file))
         
         # Action buttons for analysis and reset.
         col_btn1, col_btn2 = st.columns(2)
@@ -425,26 +401,23 @@ def main():
                 
         with col_btn2:
             if st.button("🗑️ Clear & Reset", use_container_width=True):
-                # Deletes all files from the temp_uploads folder.
-                temp_uploads_dir = Path(__file__).parent / "temp_uploads"
-                if temp_uploads_dir.exists():
-                    try:
-                        # Delete all files in the temp_uploads directory
-                        deleted_count = 0
-                        for file in temp_uploads_dir.iterdir():
-                            if file.is_file():  # Only delete files, not directories
-                                file.unlink()
-                                deleted_count += 1
-                        if deleted_count > 0:
-                            st.success(f"🗑️ Deleted {deleted_count} file(s) from temp_uploads")
-                    except Exception as e:
-                        st.error(f"Could not delete files: {e}")
+                # Deletes this session's uploads (other users' files are untouched).
+                try:
+                    from src.tools.upload_store import get_upload_store
+                    deleted_count = get_upload_store().clear_session(st.session_state.upload_session_id)
+                    if deleted_count > 0:
+                        st.success(f"🗑️ Deleted {deleted_count} uploaded file(s)")
+                except Exception as e:
+                    st.error(f"Could not delete files: {e}")
                 
                 # Clears all relevant session state variables.
                 st.session_state.messages = []
                 st.session_state.current_cv_file = None
                 st.session_state.show_analysis = False
                 st.session_state.uploaded_file_content = None
+                st.session_state.upload_key = None
+                st.session_state.upload_signature = None
+                st.session_state.upload_status = None
                 # Clears the file uploader by resetting its key.
                 if 'cv_uploader' in st.session_state:
                     del st.session_state['cv_uploader']
@@ -1,21 +1,12 @@
 """
 AGERE - Agents Module
 Contains all agent definitions for the Agentic Recruiter system.
+
+Agents and ADK classes are resolved lazily: importing this package is cheap,
+and each agent is built on first access (see get_agent).
 """
 
-from .agents import (
-    CV_analysis_agent,
-    job_listing_agent,
-    orchestrator,
-    Agent,
-    InMemoryRunner,
-    LlmAgent,
-    google_search,
-    types,
-    code_assessment_agent,
-    language_assessment_agent,
-    scheduler_agent
-)
+import importlib
 
 __all__ = [
     'CV_analysis_agent',
@@ -28,5 +19,14 @@ __all__ = [
     'types',
     'code_assessment_agent',
     'language_assessment_agent',
-    'scheduler_agent'
+    'scheduler_agent',
+    'profile_fanout_agent',
+    'get_agent',
+    'list_agents',
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return getattr(importlib.import_module(".agents", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,13 +3,22 @@
 from dotenv import load_dotenv
 load_dotenv()
 # Packages Import
-from google.adk.agents import Agent, LlmAgent
+from google.adk.agents import Agent, LlmAgent, ParallelAgent
 from google.adk.tools import google_search, AgentTool, FunctionTool
 from google.genai import types
-from google.adk.models.google_llm import Gemini
+from src.agents.model_backends import agent_model
+from src.agents.context_compaction import (
+    capture_structured_state,
+    compact_context,
+    record_prompt_tokens,
+)
 from src.tools.code_sandbox import execute_code
+from src.tools.problem_bank import get_problem_bank
 from google.adk.runners import InMemoryRunner
 from pathlib import Path
+from typing import List, Optional
+import logging
+import threading
 
 
 
@@ -18,175 +27,112 @@ from src.tools import (
     list_available_cvs, 
     compare_candidates, 
     job_listing_tool,
+    job_details_tool,
     calendar_get_busy,
     calendar_book_slot,
+    calendar_book_slots,
+    find_free_slots,
     code_execution_tool,
+    code_grading_tool,
     problem_presenter_tool,
 )
 
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
-# Pre-programmed Coding Problems
+# Coding Problems
 # ============================================================================
+# Problems live in the problem bank (problems/*.json, see src/tools/problem_bank.py),
+# tagged with roles, skills and difficulty; edits are picked up without a restart.
 
-def get_coding_problem(job_title: str = "default") -> dict:
+def get_coding_problem(job_title: str = "default", skills: Optional[List[str]] = None,
+                       difficulty: Optional[str] = None) -> dict:
     """
-    Returns a pre-programmed coding problem based on the job category.
+    Returns the coding problem for a job from the problem bank.
     These are simple, well-tested problems suitable for the sandbox environment.
     
     Args:
         job_title: The job title to determine which problem to use.
+        skills: The job's skills_required; problems are picked mainly by these.
+        difficulty: Optional difficulty (easy, medium, hard).
         
     Returns:
-        A dictionary with 'title', 'description', 'test_code', 'expected_output'.
+        A dictionary with 'title', 'description', 'test_code', 'language', 'id',
+        'tags' and 'reference_solution' (or, for problems without one, 'expected_output').
+        SQL problems also carry 'dataset' (the tables the query runs against) and
+        'ordered' (whether row order is graded).
     """
     
     # Handle None, empty, or non-string job_title.
     if not job_title or not isinstance(job_title, str):
         job_title = "default"
-    
-    # Normalize job title for matching
-    job_lower = job_title.lower()
-    
-    # Computer Vision / Image Processing Problems (check FIRST - most specific)
-    if any(word in job_lower for word in ['vision', 'computer vision', 'image', 'cv']):
-        return {
-            'title': 'Image Feature Extractor',
-            'description': '''Write a function `extract_features(image_data)` that processes 2D image data.
-image_data is a list of lists of pixel intensity values (0-255).
-Return the top 3 most frequent pixel values in descending order of frequency.
-If fewer than 3 unique values, return all of them.
-If empty, return empty list.''',
-            'test_code': '''# Test Case 1
-image1 = [[10, 20, 10], [30, 10, 20]]
-print(extract_features(image1))
-
-# Test Case 2
-image2 = [[5, 5, 5], [5, 10, 15]]
-print(extract_features(image2))
-
-# Test Case 3
-image3 = []
-print(extract_features(image3))
-
-# Test Case 4
-image4 = [[7]]
-print(extract_features(image4))''',
-            'expected_output': '[10, 20, 30]\n[5, 10, 15]\n[]\n[7]'
-        }
-    
-    # Backend / API / Microservices Problems
-    elif any(word in job_lower for word in ['backend', 'api', 'microservice']):
-        return {
-            'title': 'User Data Aggregation',
-            'description': '''Write a function `sum_even_user_values(users)` that takes a list of dictionaries. 
-Each dictionary has 'id' and 'value' keys. Sum the 'value' for users with even 'id'. 
-If the sum exceeds 1000, return double the sum. Otherwise, return the sum as is.''',
-            'test_code': '''# Test Case 1: Basic test
-users1 = [{'id': 1, 'value': 100}, {'id': 2, 'value': 200}, {'id': 3, 'value': 300}, {'id': 4, 'value': 400}]
-print(sum_even_user_values(users1))
-
-# Test Case 2: Sum exceeds 1000
-users2 = [{'id': 2, 'value': 500}, {'id': 4, 'value': 600}, {'id': 6, 'value': 700}]
-print(sum_even_user_values(users2))
-
-# Test Case 3: No even IDs
-users3 = [{'id': 1, 'value': 100}, {'id': 3, 'value': 300}, {'id': 5, 'value': 500}]
-print(sum_even_user_values(users3))
-
-# Test Case 4: Empty list
-users4 = []
-print(sum_even_user_values(users4))
-
-# Test Case 5: Sum equals 1000
-users5 = [{'id': 2, 'value': 500}, {'id': 3, 'value': 100}, {'id': 4, 'value': 500}]
-print(sum_even_user_values(users5))''',
-            'expected_output': '600\n3600\n0\n0\n1000'
-        }
-    
-    # Data Science / NLP / ML Problems
-    elif any(word in job_lower for word in ['data', 'scientist', 'nlp', 'machine learning', 'ml ']):
-        return {
-            'title': 'Text Sentiment Analyzer',
-            'description': '''Write a function `analyze_sentiment(text_list)` that takes a list of strings.
-For each text, determine sentiment: 'positive', 'negative', or 'neutral'.
-- Contains 'good', 'great', 'excellent', 'love' → 'positive'
-- Contains 'bad', 'terrible', 'awful', 'hate' → 'negative'
-- Negative keywords take precedence if both present
-- Otherwise → 'neutral'
-Return a list of sentiment labels.''',
-            'test_code': '''# Test Case 1
-print(analyze_sentiment(["This is good", "I hate this", "It was excellent", "The weather"]))
-
-# Test Case 2
-print(analyze_sentiment([]))
-
-# Test Case 3
-print(analyze_sentiment(["This is not good, but it's bad"]))
-
-# Test Case 4
-print(analyze_sentiment(["Love the product!", "Terrible service"]))''',
-            'expected_output': "['positive', 'negative', 'positive', 'neutral']\n[]\n['negative']\n['positive', 'negative']"
-        }
-    
-    # Full-Stack / Frontend / General Developer Problems
-    elif any(word in job_lower for word in ['full', 'stack', 'frontend', 'developer', 'software', 'engineer']):
-        return {
-            'title': 'Transaction Balance Calculator',
-            'description': '''Write a function `calculate_balance(transactions)` that takes a list of transaction dictionaries.
-Each has 'type' ('deposit' or 'withdrawal') and 'amount' keys.
-Return the final balance: add deposits, subtract withdrawals.
-Start from balance 0.''',
-            'test_code': '''# Test Case 1
-trans1 = [{'type': 'deposit', 'amount': 100}, {'type': 'withdrawal', 'amount': 30}]
-print(calculate_balance(trans1))
-
-# Test Case 2
-trans2 = []
-print(calculate_balance(trans2))
-
-# Test Case 3
-trans3 = [{'type': 'withdrawal', 'amount': 50}]
-print(calculate_balance(trans3))
-
-# Test Case 4
-trans4 = [{'type': 'deposit', 'amount': 200}, {'type': 'deposit', 'amount': 150}, {'type': 'withdrawal', 'amount': 100}]
-print(calculate_balance(trans4))''',
-            'expected_output': '70\n0\n-50\n250'
-        }
-    
-    # Default problem for any other job
-    else:
-        return {
-            'title': 'List Statistics Calculator',
-            'description': '''Write a function `calculate_stats(numbers)` that takes a list of numbers.
-Return a dictionary with: 'sum', 'average', 'min', 'max'.
-If list is empty, return all values as 0.
-Round average to 2 decimal places.''',
-            'test_code': '''# Test Case 1
-print(calculate_stats([10, 20, 30, 40]))
-
-# Test Case 2
-print(calculate_stats([]))
-
-# Test Case 3
-print(calculate_stats([5]))
-
-# Test Case 4
-print(calculate_stats([1, 2, 3, 4, 5, 6, 7, 8, 9, 10]))''',
-            'expected_output': "{'sum': 100, 'average': 25.0, 'min': 10, 'max': 40}\n{'sum': 0, 'average': 0, 'min': 0, 'max': 0}\n{'sum': 5, 'average': 5.0, 'min': 5, 'max': 5}\n{'sum': 55, 'average': 5.5, 'min': 1, 'max': 10}"
-        }
-
-print("✅ ADK components imported successfully.")
-print("✅ ADK will auto-initialize client from environment variables")
-
-# Retry options for API calls.
+
+    problem = get_problem_bank().select(job_title, skills, difficulty)
+    if problem is None:
+        raise RuntimeError(f"The problem bank ({get_problem_bank().directory}) has no problems.")
+    return problem
+
+
+# ============================================================================
+# Agent Registry
+# ============================================================================
+# Agents are built on first use, so importing this module does not create
+# any model clients. Use get_agent(name) or access the agent by attribute.
+
+_AGENT_BUILDERS = {}
+_AGENTS = {}
+_AGENTS_LOCK = threading.RLock()  # Re-entrant: the orchestrator builds its sub-agents.
+
+
+def register_agent(name: str):
+    """Decorator that registers a builder function for the agent with the given name."""
+    def decorator(builder):
+        _AGENT_BUILDERS[name] = builder
+        return builder
+    return decorator
+
+
+def get_agent(name: str):
+    """
+    Returns the agent with the given name, building it on first use.
+
+    Args:
+        name: Registered agent name (e.g., 'orchestrator', 'CV_analysis_agent').
+
+    Returns:
+        The agent instance, shared by all callers in the process.
+    """
+    with _AGENTS_LOCK:
+        if name not in _AGENTS:
+            if name not in _AGENT_BUILDERS:
+                raise KeyError(f"Unknown agent '{name}'. Available agents: {', '.join(_AGENT_BUILDERS)}")
+            _AGENTS[name] = _AGENT_BUILDERS[name]()
+            logger.info("Agent %s defined.", name)
+        return _AGENTS[name]
+
+
+def list_agents() -> list:
+    """Returns the names of all registered agents."""
+    return list(_AGENT_BUILDERS)
+
+
+def __getattr__(name):
+    # Backwards compatible access, e.g. `from src.agents.agents import orchestrator`.
+    if name in _AGENT_BUILDERS:
+        return get_agent(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Retry options for API calls. 429s are not retried here: the shared rate
+# limiter (src/agents/rate_limiter.py) backs off all sessions of a model together.
 retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
+    attempts=3,  # Maximum retry attempts
+    exp_base=2,  # Delay multiplier
     initial_delay=1,
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
+    max_delay=20,
+    jitter=1,  # Random extra delay (s), so concurrent retries do not line up
+    http_status_codes=[500, 503, 504] # Retry on these HTTP errors
 )
 
 # Agent Definitions
@@ -194,11 +140,13 @@ retry_config=types.HttpRetryOptions(
 # from environment variables.
 
 # Agent for CV analysis and insights.
-CV_analysis_agent = Agent(
-    name="CV_analysis_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    description="Professional HR assistant that reads, analyzes, and provides insights on candidate CVs.",
-    instruction="""
+@register_agent("CV_analysis_agent")
+def build_CV_analysis_agent():
+    return Agent(
+        name="CV_analysis_agent",
+        model=agent_model("CV_analysis_agent", retry_options=retry_config),
+        description="Professional HR assistant that reads, analyzes, and provides insights on candidate CVs.",
+        instruction="""
     You are a professional HR assistant specializing in CV analysis and candidate evaluation.
     
     WORKFLOW:
@@ -266,40 +214,51 @@ CV_analysis_agent = Agent(
     - Simply provide the filename with the correct extension
     - Examples: 'resume.txt', 'cv_candidate.pdf'
     """,
-    tools=[read_cv, list_available_cvs, compare_candidates]
-)
-
-print("✅ Root Agent defined with custom CV tools.")
+        tools=[read_cv, list_available_cvs, compare_candidates]
+    )
 
 # Agent to match candidates to job descriptions.
-job_listing_agent = Agent(
-    name="job_listing_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    description="Agent Assistant that lists job opportunities from the SQLite database and matches candidate skills.",
-    instruction="""
+def _job_listing_agent(name: str, output_key: str = None):
+    return Agent(
+        name=name,
+        model=agent_model(name, retry_options=retry_config),
+        description="Agent Assistant that lists job opportunities from the SQLite database and matches candidate skills.",
+        instruction="""
     Agent Assistant that MUST PROVIDE job listings to candidates.
-    Use the 'job_listing_tool' to fetch jobs from the local SQLite database.
+    Use the 'job_listing_tool' to fetch jobs from the local SQLite database,
+    ALWAYS with mode="compact" and limit=5.
     Always expect to receive a string of skills in 'cv_summary' input to match jobs.
     If cv_summary is empty, fetch jobs without filtering.
+    If the request names a specific client company, pass it as 'company' to search only its catalog.
+    If the request asks for more jobs after a job id, pass it as 'after_id'.
+    If the request asks for similar roles rather than exact skill matches, use mode="semantic"
+    with the whole cv_summary (semantic results are not paginated).
+    Return the tool's JSON exactly as received, with no other text.
     """,
-    tools=[job_listing_tool],
-)
+        tools=[job_listing_tool],
+        output_key=output_key,
+    )
+
 
-print("✅ job_listing_agent defined.")
+@register_agent("job_listing_agent")
+def build_job_listing_agent():
+    return _job_listing_agent("job_listing_agent")
 
 # Agent for creating and evaluating code interview assessments.
-code_assessment_agent = Agent(
-    name="code_assessment_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    description="Executes candidate code and returns pass/not pass",
-    instruction="""You have ONE job: execute code using code_execution_tool.
+@register_agent("code_assessment_agent")
+def build_code_assessment_agent():
+    return Agent(
+        name="code_assessment_agent",
+        model=agent_model("code_assessment_agent", retry_options=retry_config),
+        description="Executes candidate code and returns pass/not pass",
+        instruction="""You have ONE job: execute code using code_execution_tool.
 
 **MANDATORY PROCESS:**
 1. User gives you code
 2. You MUST call: code_execution_tool(code="<exact code string>")
-3. Read tool response
-4. If contains "✅ PASS" → respond ONLY: `pass`
-5. If contains "❌" → respond ONLY: `not pass`
+3. Read the "verdict" field of the JSON tool response
+4. If "verdict" is "pass" → respond ONLY: `pass`
+5. Otherwise → respond ONLY: `not pass`
 
 **FORBIDDEN:**
 - DO NOT analyze code manually
@@ -309,31 +268,35 @@ code_assessment_agent = Agent(
 **Example:**
 User: "def add(a,b): return a+b\nprint(add(1,2))"
 You: code_execution_tool(code="def add(a,b): return a+b\nprint(add(1,2))")
-Tool: "✅ PASS: Output matches!"
+Tool: {"status":"pass","verdict":"pass","feedback":"✅ PASS: ..."}
 You: pass""",
-    tools=[code_execution_tool]
-)
+        tools=[code_execution_tool]
+    )
 
 # Problem Presenter Agent (Shows pre-programmed problems).
-problem_presenter_agent = Agent(
-    name="problem_presenter_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    description="Presents coding problems using the problem_presenter_tool",
-    instruction="""Call problem_presenter_tool(job_title="<job title>") and return its complete output.
+@register_agent("problem_presenter_agent")
+def build_problem_presenter_agent():
+    return Agent(
+        name="problem_presenter_agent",
+        model=agent_model("problem_presenter_agent", retry_options=retry_config),
+        description="Presents coding problems using the problem_presenter_tool",
+        instruction="""Call problem_presenter_tool(job_title="<job title>") and return its complete output.
 
 DO NOT add commentary. Just call the tool and show its output.""",
-    tools=[problem_presenter_tool]
-)
+        tools=[problem_presenter_tool]
+    )
 
 # Language Assessment Agent.
-language_assessment_agent = Agent(
-    name="language_assessment_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    description="""
+@register_agent("language_assessment_agent")
+def build_language_assessment_agent():
+    return Agent(
+        name="language_assessment_agent",
+        model=agent_model("language_assessment_agent", retry_options=retry_config, cache_enabled=False),  # Not cached: test prompts should vary between candidates.
+        description="""
         Professional language proficiency assessment agent. Creates a simple language test
         based on the candidate's CV languages, evaluates their response, and provides proficiency feedback.
         """,
-    instruction="""
+        instruction="""
     You are an expert language assessment agent. You have two distinct modes of operation.
 
     **MODE 1: Language Test Generation**
@@ -387,15 +350,51 @@ language_assessment_agent = Agent(
     - Only test ONE language per assessment
     - If they respond in the wrong language, note this in evaluation
     """,
-    tools=[]  # No tools needed for language assessment
-)
+        tools=[]  # No tools needed for language assessment
+    )
+
+# Parallel stage run right after CV analysis: job matching and language test
+# generation only depend on the CV profile, not on each other.
+# Each branch is a separate agent instance (an agent can only have one parent).
+@register_agent("profile_fanout_agent")
+def build_profile_fanout_agent():
+    language_test_agent = Agent(
+        name="language_test_generator",
+        model=agent_model("language_test_generator", retry_options=retry_config, cache_enabled=False),  # Not cached: test prompts should vary between candidates.
+        description="Generates a language test from the candidate's CV languages.",
+        instruction="""
+    You prepare the language assessment for a candidate. The request lists the candidate's skills and CV languages.
+
+    - If the candidate only lists English (or no languages), respond ONLY: NO_LANGUAGE_TEST
+    - Otherwise:
+      1. Select the highest proficiency language OTHER THAN English.
+      2. Create a SIMPLE conversational prompt in that language, appropriate for the claimed level
+         (A1-A2: introduction, daily activities; B1-B2: experience, opinions; C1-C2: complex, professional topics).
+      3. State which language you're testing, the proficiency level, and ask the candidate to respond in that language.
+    """,
+        tools=[],
+        output_key="language_test",
+    )
+    return ParallelAgent(
+        name="profile_fanout_agent",
+        description=(
+            "Runs job matching and language test generation concurrently. "
+            "Request format: 'Skills: <comma-separated skills>. Languages: <languages with levels>.'"
+        ),
+        sub_agents=[
+            _job_listing_agent("job_matcher", output_key="job_listings"),
+            language_test_agent,
+        ],
+    )
 
 # Agent for scheduling live interviews.
-scheduler_agent = Agent(
-    name="scheduler_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    description="Agent that schedules interviews using Google Calendar, with robust token handling.",
-    instruction="""
+@register_agent("scheduler_agent")
+def build_scheduler_agent():
+    return Agent(
+        name="scheduler_agent",
+        model=agent_model("scheduler_agent", retry_options=retry_config, cache_enabled=False),  # Not cached: free slots depend on the current date and calendar.
+        description="Agent that schedules interviews using Google Calendar, with robust token handling.",
+        instruction="""
     You schedule interviews only AFTER receiving 'assignment_result: pass'.
 
     INTELLIGENT WORKFLOW:
@@ -404,15 +403,20 @@ scheduler_agent = Agent(
     2. Verify Google Calendar credentials (GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_REFRESH_TOKEN).
        - If missing, respond: "Google Calendar credentials are missing. Please configure them in environment variables."
     3. Refresh access token using refresh token. Stop with clear error if refresh fails.
-    4. Fetch busy slots using `calendar_get_busy` for the next 5 business days.
-       - Only consider **future slots**, after the current datetime.
-       - If fetching fails, log the error but continue with booking if token is valid.
-    5. Identify 3-5 free time slots that do not conflict with busy slots.
-       - Present these options **to the candidate**.
+    4. Call `find_free_slots` (defaults: 60 minutes, next 5 business days, up to 5 slots).
+       - It already excludes busy times, past times and non-working hours: present its slots as they are,
+         do NOT compute free slots yourself.
+       - Use `calendar_get_busy` only if the user asks about specific busy times.
+       - If it fails, report the error message.
+    5. Present the returned slots **to the candidate**.
        - If the candidate email is missing, **ask for it explicitly** before booking.
     6. Once the candidate selects a slot:
        - Book the event using `calendar_book_slot`, passing the candidate email.
+       - If it returns SLOT_UNAVAILABLE, the slot was just taken: call `find_free_slots` again and offer the new options.
        - Confirm the booking with event ID, start, end, and event link.
+       - To book several interviews at once (e.g. a panel or a series of rounds), call
+         `calendar_book_slots` ONCE with all the slots instead of `calendar_book_slot` per slot.
+         Report each result; re-offer free slots for any that failed with SLOT_UNAVAILABLE.
     7. Log everything:
        - Access token used
        - API responses
@@ -423,15 +427,17 @@ scheduler_agent = Agent(
     - API errors (401, 403, 404) → only actionable messages: "Failed to create event: check your Google Calendar account or token."
     - Do not reveal "integration not configured" if credentials exist.
     """,
-    tools=[calendar_get_busy, calendar_book_slot]
-)
+        tools=[find_free_slots, calendar_get_busy, calendar_book_slot, calendar_book_slots]
+    )
 
 
 # Orchestrator Agent.
-orchestrator = LlmAgent(
-    name="manager",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    instruction="""
+@register_agent("orchestrator")
+def build_orchestrator():
+    return LlmAgent(
+        name="manager",
+        model=agent_model("manager", retry_options=retry_config, cache_enabled=False),  # Not cached: conversational turns rarely repeat.
+        instruction="""
 You are a job applicant assistant orchestrator. Coordinate a team of specialized agents to help 
 candidates find their ideal job match. You MUST delegate tasks to your sub-agents.
 
@@ -441,51 +447,56 @@ WORKFLOW, MANDATORY TO FOLLOW STRICTLY:
    - When a user uploads a CV, DELEGATE to 'CV_analysis_agent'.
    - **CRITICAL**: The agent will return a detailed analysis. You MUST display the FULL analysis to the user.
      Show ALL sections: Candidate Information, Technical Skills, Languages, Work Experience, Education, Key Strengths, Overall Assessment.
-   - After showing the full analysis, extract key technical skills from it automatically.
+   - After showing the full analysis, extract key technical skills and the CV languages from it automatically.
    - Provide a brief summary of the candidate's profile.
-   - Then ask: "Would you like me to find job listings that match your profile?"
+   - In the SAME turn, IMMEDIATELY call 'profile_fanout_agent' with:
+     "Skills: [comma-separated skills]. Languages: [full language list with levels]."
+     It runs job matching and language test generation concurrently and returns both
+     `job_listings` and `language_test`. Then continue with STEP 2 without asking for confirmation.
 
 2. STEP 2: Job Listings Matching
-   - If user agrees, call 'job_listing_agent' passing the extracted skills as `cv_summary`.
-   - The agent will return job listings. You MUST format and display them properly.
+   - Use the `job_listings` returned by 'profile_fanout_agent'. Only if they are missing or the user asks
+     for different jobs, call 'job_listing_agent' passing the extracted skills as `cv_summary`.
+   - The listings are compact JSON: each job has an `id`, `title`, `company`, `score` and `matched` skills.
    - **CRITICAL**: YOU MUST Display jobs in this EXACT format:
    
    1. **Job Title** at Company
-      - Location: [location]
-      - Description: [description]
-      - Responsibilities: [responsibilities]
-      - Required Skills: [skills]
+      - Matching skills: [matched] (score: [score])
    
    2. **Job Title** at Company
-      - Location: [location]
-      - Description: [description]
-      - Responsibilities: [responsibilities]
-      - Required Skills: [skills]
+      - Matching skills: [matched] (score: [score])
    
-   - After displaying ALL jobs with numbers, ask: "Which job interests you most? (Choose by selecting the number)".
+   - After displaying ALL jobs with numbers, ask: "Which job interests you most? (Choose by selecting the number,
+     or ask for the details of a job)". If `next_after_id` is not null, also offer to show more jobs.
+   - If the user asks for the details of a job, call 'job_details_tool' (get_job_details_fn) with its `id` and display the full posting
+     (Location, Description, Responsibilities, Required Skills).
+   - If the user asks for more jobs, call 'job_listing_agent' with the skills and "after_id: [next_after_id]",
+     and continue the numbering.
    - When user provides a number, map it to the corresponding job and proceed to code assessment.
 
 3. STEP 3: Code Assessment (TWO-PHASE PROCESS)
    - **MANDATORY**: ALL software/engineering jobs require a code assessment. Do NOT skip this step.
    
    **PHASE 1: Present Pre-Programmed Problem**
-   - After user selects a job number, call 'problem_presenter_tool' DIRECTLY with the job title string.
+   - After user selects a job number, call 'problem_presenter_tool' DIRECTLY with the job title string
+     (and the job's id from the listing as job_id, if shown): the problem is picked by the job's required skills.
    - Example: problem_presenter_tool(job_title="Machine Learning Engineer – Computer Vision Focus")
    - The tool will return the complete problem with test cases and constraints.
    - **CRITICAL**: Display the FULL problem to the user exactly as the tool returns it.
    - Wait for the candidate to provide their solution in the chat window.
    
    **PHASE 2: Evaluate Submission**  
-   - When user submits code, IMMEDIATELY call code_assessment_agent.
+   - When user submits code, IMMEDIATELY call 'code_grading_tool' DIRECTLY.
    - Pass the code EXACTLY as submitted, with NO other text.
-   - DO NOT say "I'll evaluate this" or "Please execute" - JUST CALL THE AGENT.
-   - Wait for agent response: 'pass' or 'not pass'.
-   - Store result for scheduling.
+   - DO NOT say "I'll evaluate this" or "Please execute" - JUST CALL THE TOOL.
+   - The tool returns 'pass' or 'not pass' and stores the result for scheduling.
+   - If the user message already states "Code assessment result: pass" or "Code assessment result: not pass",
+     the submission was graded by the app. Use that result and DO NOT call the tool again.
    
    **Example flow:**
    User: [submits code]
-   You: code_assessment_agent(code="[exact code user submitted]")
-   Agent: "pass"
+   You: code_grading_tool(code="[exact code user submitted]")
+   Tool: "pass"
    You: "Great! Your code passed the assessment." 
    THEN MOVE TO STEP 4: LANGUAGE ASSESSMENT, YOU MUST DO THAT AFTER THE CODE ASSESSMENT PASSED.
 
@@ -501,7 +512,8 @@ WORKFLOW, MANDATORY TO FOLLOW STRICTLY:
    
    **PHASE 1: Generate Language Test**
    1. Identify the highest proficiency non-English language from CV
-   2. IMMEDIATELY call 'language_assessment_agent' with:
+   2. If `language_test` in the SESSION STATE contains a test (not NO_LANGUAGE_TEST), display it and skip to step 4.
+      Otherwise IMMEDIATELY call 'language_assessment_agent' with:
       "Generate a language test for candidate [Name]. CV Languages: [full language list]. Selected job: [Job Title]. Test [Language] at [Level] level."
    3. Display the FULL language test to the user
    4. Wait for candidate's response in the tested language
@@ -542,17 +554,29 @@ CRITICAL RULES:
 - Parse numeric input to select the correct job from the numbered list.
 - **ALWAYS display the FULL response from sub-agents to the user. NEVER summarize or paraphrase.**
 - When CV_analysis_agent returns analysis, show the ENTIRE analysis with all sections.
-- When job_listing_agent returns jobs, format them with clear numbers (1, 2, 3...) and ALL details.
-- When code_assessment_agent returns an assignment, show the ENTIRE problem statement to the user.
+- When job_listing_agent returns jobs, format them with clear numbers (1, 2, 3...) as shown in STEP 2.
+- When problem_presenter_tool returns an assignment, show the ENTIRE problem statement to the user.
 - **DO NOT SKIP showing information. Users CANNOT see what sub-agents return unless you display it.**
-- **WORKFLOW ORDER: CV Analysis → Job Selection → Code Assessment → (if pass) Scheduling**
+- **WORKFLOW ORDER: CV Analysis → (Job Matching + Language Test in parallel) → Job Selection → Code Assessment → (if pass) Scheduling**
+
+SESSION STATE:
+- Results of earlier steps (candidate_profile, job_listings, language_test, selected_job,
+  assignment_result, language_assessment) are kept in the SESSION STATE block appended to these instructions.
+- Older messages may be compacted. Use the SESSION STATE block instead of asking the user again
+  or calling a sub-agent again for information you already have.
 """,
-    tools=[
-        AgentTool(CV_analysis_agent),
-        AgentTool(job_listing_agent),
-        problem_presenter_tool,  # Direct tool call instead of agent
-        AgentTool(code_assessment_agent),
-        AgentTool(language_assessment_agent),
-        AgentTool(scheduler_agent),
-    ],
-)
\ No newline at end of file
+        tools=[
+            AgentTool(get_agent("CV_analysis_agent")),
+            AgentTool(get_agent("profile_fanout_agent")),
+            AgentTool(get_agent("job_listing_agent")),
+            job_details_tool,  # Full job posting on demand
+            problem_presenter_tool,  # Direct tool call instead of agent
+            code_grading_tool,  # Direct grading instead of code_assessment_agent
+            AgentTool(get_agent("language_assessment_agent")),
+            AgentTool(get_agent("scheduler_agent")),
+        ],
+        # Keeps long sessions within the prompt token budget.
+        before_model_callback=compact_context,
+        after_model_callback=record_prompt_tokens,
+        after_tool_callback=capture_structured_state,
+    )
\ No newline at end of file
@@ -0,0 +1,279 @@
+# BATCH RUNNER 📦
+# Headless pre-screening of a folder of CVs, without the Streamlit app.
+#
+# Each CV gets its own orchestrator session: CV analysis and job matching run
+# as in the app's first turn, and a pre-submitted solution (<cv stem>.py in the
+# solutions folder) is graded locally against the problem of the best-matching
+# job. Candidates run concurrently (bounded) and their start rate is limited.
+# Every result is appended to a JSONL file as soon as it is ready; the file is
+# also the checkpoint: a rerun skips the CVs (by content hash) already done.
+#
+# Usage (from the repository root):
+#   python -m src.agents.batch_runner cvs/ --out results/batch.jsonl --concurrency 8 --rate 30
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.agents.runtime import run_agent_async, set_session_state_async
+
+# --- Configuration ---
+CV_SUFFIXES = (".pdf", ".txt")
+BATCH_USER_ID = "batch_user"
+BATCH_APP_NAME = "agents"
+DEFAULT_CONCURRENCY = 4           # Candidates processed at the same time.
+DEFAULT_RATE_PER_MINUTE = 30      # Candidates started per minute (0: unlimited).
+DEFAULT_TIMEOUT_SECONDS = 300     # Per candidate.
+
+CV_PROMPT = """I've uploaded my CV file: {filename}
+
+Please analyze it and help me find suitable job opportunities."""
+
+
+# =============================================================================
+# Inputs & Checkpoint
+# =============================================================================
+
+def discover_cvs(cv_dir: Path) -> List[Path]:
+    """Returns the CV files (.pdf, .txt) under a folder, in a stable order."""
+    return sorted(p for p in Path(cv_dir).rglob("*") if p.is_file() and p.suffix.lower() in CV_SUFFIXES)
+
+
+def cv_key(path: Path) -> str:
+    """Content hash of a CV: a renamed CV is not processed twice, an edited one is."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def load_checkpoint(out_path: Path) -> Dict[str, dict]:
+    """Returns the successful results already in the output file, by CV key."""
+    done = {}
+    if out_path.exists():
+        with open(out_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial line from an interrupted run.
+                if record.get("status") == "ok":
+                    done[record["key"]] = record
+    return done
+
+
+def _parse_json(text: Optional[str]):
+    """Parses the JSON object in an agent output (possibly wrapped in prose or fences)."""
+    if not text:
+        return None
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+class RateLimiter:
+    """Spaces out starts so that at most `per_minute` happen per minute (0: unlimited)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# =============================================================================
+# Candidate Pipeline
+# =============================================================================
+
+def grade_solution(state: dict, code: str) -> dict:
+    """
+    Grades a pre-submitted solution against the problem of the best-matching job
+    (the one the orchestrator would present if the candidate picked job 1).
+    The result is recorded in the assessments table under the candidate's key.
+    """
+    from src.tools.tools import grade_code_submission_fn, present_coding_problem_fn
+
+    listings = _parse_json(state.get("job_listings")) or {}
+    jobs = listings.get("jobs") or []
+    job_title = jobs[0]["title"] if jobs else "default"
+    present_coding_problem_fn(job_title, context=state)
+    verdict = grade_code_submission_fn(code, context=state)
+    return {"selected_job": job_title, "assignment_result": verdict, "assessment": state.get("last_assessment")}
+
+
+async def assess_candidate(runner, cv_path: Path, key: str, solution: Optional[Path],
+                           timeout: float, log_events: bool) -> dict:
+    """
+    Runs one CV through the orchestrator in its own session and returns its result record.
+    The CV is uploaded to the upload store under the session, as the app does,
+    so the agents can only read this candidate's file.
+    """
+    from src.tools.upload_store import UPLOAD_SESSION_KEY, get_upload_store
+
+    session_id = f"batch-{key}"
+    record = {"key": key, "cv": str(cv_path), "session_id": session_id}
+    start = time.perf_counter()
+    try:
+        get_upload_store().put(session_id, cv_path.name, cv_path.read_bytes())
+        await set_session_state_async(runner, {UPLOAD_SESSION_KEY: session_id},
+                                      session_id=session_id, user_id=BATCH_USER_ID)
+        response = await asyncio.wait_for(
+            run_agent_async(runner, CV_PROMPT.format(filename=cv_path.name), session_id=session_id,
+                            user_id=BATCH_USER_ID, quiet=True, log_events=log_events),
+            timeout,
+        )
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=BATCH_USER_ID, session_id=session_id
+        )
+        state = dict(session.state) if session else {}
+        record.update({
+            "status": "error" if response.startswith("⚠️") else "ok",
+            "response": response,
+            "candidate_profile": state.get("candidate_profile"),
+            "job_listings": _parse_json(state.get("job_listings")) or state.get("job_listings"),
+            "language_test": state.get("language_test"),
+            "prompt_tokens": sum(turn["prompt_tokens"] for turn in state.get("prompt_tokens_per_turn", [])),
+        })
+        if record["status"] == "error":
+            record["error"] = response
+        if solution is not None and record["status"] == "ok":
+            # The sandbox blocks: grading runs off the event loop.
+            state["candidate_id"] = key
+            record.update(await asyncio.to_thread(grade_solution, state, solution.read_text(encoding="utf-8")))
+    except asyncio.TimeoutError:
+        record.update({"status": "error", "error": f"Timed out after {timeout:.0f}s"})
+    except Exception as e:
+        record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        # Bounds memory: completed sessions are not kept in the runner, nor their uploads.
+        try:
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id=BATCH_USER_ID, session_id=session_id
+            )
+            get_upload_store().clear_session(session_id)
+        except Exception:
+            pass
+    record["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+async def run_batch(cv_dir: Path, out_path: Path, concurrency: int = DEFAULT_CONCURRENCY,
+                    rate_per_minute: float = DEFAULT_RATE_PER_MINUTE, solutions_dir: Optional[Path] = None,
+                    timeout: float = DEFAULT_TIMEOUT_SECONDS, limit: Optional[int] = None,
+                    log_events: bool = False, runner=None) -> dict:
+    """
+    Processes every CV of a folder not already in the checkpoint.
+
+    Args:
+        cv_dir: Folder of CVs (.pdf, .txt), searched recursively.
+        out_path: JSONL results file, also used as checkpoint.
+        concurrency: Maximum candidates in flight.
+        rate_per_minute: Maximum candidates started per minute (0: unlimited).
+        solutions_dir: Optional folder of pre-submitted solutions (<cv stem>.py).
+        timeout: Per-candidate timeout in seconds.
+        limit: Optional maximum number of CVs to process in this run.
+        log_events: Also write every agent event to log_files/runner_events.log.
+        runner: Runner to use (default: an InMemoryRunner over the orchestrator).
+
+    Returns:
+        Summary with processed/ok/error/skipped counts and candidates per minute.
+    """
+    if runner is None:
+        from google.adk.runners import InMemoryRunner
+        from src.agents import get_agent
+        runner = InMemoryRunner(agent=get_agent("orchestrator"), app_name=BATCH_APP_NAME)
+
+    done = load_checkpoint(out_path)
+    pending = [(path, key) for path in discover_cvs(cv_dir) if (key := cv_key(path)) not in done]
+    skipped = len(done)
+    if limit is not None:
+        pending = pending[:limit]
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = RateLimiter(rate_per_minute)
+    counts = {"ok": 0, "error": 0}
+    start = time.perf_counter()
+
+    async def process(path: Path, key: str) -> None:
+        async with semaphore:
+            await limiter.acquire()
+            solution = None
+            if solutions_dir is not None and (Path(solutions_dir) / f"{path.stem}.py").exists():
+                solution = Path(solutions_dir) / f"{path.stem}.py"
+            record = await assess_candidate(runner, path, key, solution, timeout, log_events)
+        # Appended from the event loop thread only: lines never interleave.
+        with open(out_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        counts[record["status"]] += 1
+        finished = counts["ok"] + counts["error"]
+        per_minute = finished / max(time.perf_counter() - start, 1e-9) * 60
+        print(f"[{finished}/{len(pending)}] {path.name}: {record['status']} ({record['elapsed_s']:.1f}s) "
+              f"- {per_minute:.1f} candidates/min")
+
+    await asyncio.gather(*(process(path, key) for path, key in pending))
+    elapsed = time.perf_counter() - start
+    return {
+        "processed": len(pending),
+        "ok": counts["ok"],
+        "error": counts["error"],
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 1),
+        "candidates_per_minute": round(len(pending) / elapsed * 60, 2) if elapsed and pending else 0.0,
+    }
+
+
+def export_parquet(jsonl_path: Path, parquet_path: Path) -> int:
+    """Writes the successful results of a JSONL file to Parquet (nested fields as JSON strings)."""
+    import pandas as pd
+
+    records = list(load_checkpoint(jsonl_path).values())
+    for record in records:
+        for field, value in record.items():
+            if isinstance(value, (dict, list)):
+                record[field] = json.dumps(value, ensure_ascii=False)
+    pd.DataFrame(records).to_parquet(parquet_path, index=False)
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless batch pre-screening of CVs.")
+    parser.add_argument("cv_dir", type=Path, help="Folder of CVs (.pdf, .txt).")
+    parser.add_argument("--out", type=Path, default=Path("results/batch.jsonl"), help="JSONL results / checkpoint file.")
+    parser.add_argument("--parquet", type=Path, help="Also export the results to this Parquet file (needs pyarrow).")
+    parser.add_argument("--solutions", type=Path, help="Folder of pre-submitted solutions (<cv stem>.py) to grade.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_MINUTE, help="Candidates started per minute (0: unlimited).")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="Per-candidate timeout (s).")
+    parser.add_argument("--limit", type=int, help="Process at most this many CVs in this run.")
+    parser.add_argument("--log-events", action="store_true", help="Also log every agent event to log_files/.")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_batch(
+        args.cv_dir, args.out, args.concurrency, args.rate, args.solutions, args.timeout, args.limit, args.log_events,
+    ))
+    print(f"✅ {summary['ok']} ok, {summary['error']} errors, {summary['skipped']} already done "
+          f"in {summary['elapsed_s']}s ({summary['candidates_per_minute']} candidates/min)")
+    if args.parquet:
+        try:
+            print(f"✅ {export_parquet(args.out, args.parquet)} results written to {args.parquet}")
+        except ImportError as e:
+            print(f"❌ Parquet export requires pyarrow: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# CONTEXT COMPACTION 🗜️
+# Keeps long orchestrator sessions within a prompt token budget.
+#
+# Structured results (candidate profile, job listings, selected job, assessment
+# results) are captured into session state when the tools return, and injected
+# into the system instruction as a compact block. Once the conversation passes
+# the token budget, older events are compacted: tool outputs are replaced by a
+# pointer to the state key that holds them, long texts are truncated, and the
+# oldest turns are dropped entirely if that is still not enough.
+
+import json
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Optional
+
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+# --- Configuration ---
+DEFAULT_TOKEN_BUDGET = 8000       # Estimated prompt tokens before compaction starts.
+DEFAULT_KEEP_RECENT = 6           # Most recent contents that are never compacted.
+TRUNCATED_TEXT_CHARS = 600        # Length kept from old text parts.
+STATE_VALUE_CHARS = 2500          # Length of each state value injected in the instruction.
+CHARS_PER_TOKEN = 4               # Rough token estimate, good enough for budgeting.
+
+# Tool name -> session state key that stores its latest output.
+TOOL_STATE_KEYS = {
+    "CV_analysis_agent": "candidate_profile",
+    "job_listing_agent": "job_listings",
+    "language_assessment_agent": "language_assessment",
+    "scheduler_agent": "scheduling_status",
+}
+
+# Parallel stages whose branches write their results to state (output_key).
+# The stage's tool response is replaced by the merged branch outputs.
+FANOUT_STATE_KEYS = {
+    "profile_fanout_agent": ["job_listings", "language_test"],
+}
+
+# State keys shown to the model, in display order.
+STRUCTURED_STATE_KEYS = [
+    "candidate_profile",
+    "job_listings",
+    "language_test",
+    "selected_job",
+    "assignment_result",
+    "language_assessment",
+    "scheduling_status",
+]
+
+
+def _token_budget() -> int:
+    return int(os.getenv("CONTEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+
+def _keep_recent() -> int:
+    return int(os.getenv("CONTEXT_KEEP_RECENT", DEFAULT_KEEP_RECENT))
+
+
+def estimate_tokens(contents) -> int:
+    """Estimates the token count of a list of contents from its character length."""
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            if part.function_call:
+                chars += len(json.dumps(part.function_call.args or {}, ensure_ascii=False, default=str))
+            if part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, ensure_ascii=False, default=str))
+    return chars // CHARS_PER_TOKEN
+
+
+def _tool_output_text(tool_response) -> str:
+    if isinstance(tool_response, dict) and "result" in tool_response:
+        tool_response = tool_response["result"]
+    if isinstance(tool_response, str):
+        return tool_response
+    return json.dumps(tool_response, ensure_ascii=False, default=str)
+
+
+# =============================================================================
+# Callbacks
+# =============================================================================
+
+def capture_structured_state(tool, args, tool_context, tool_response) -> Optional[dict]:
+    """
+    after_tool_callback: stores the output of the workflow tools in session
+    state, so it survives compaction of the chat history. For parallel stages,
+    returns the merged branch outputs as the tool response.
+    """
+    if tool.name in FANOUT_STATE_KEYS:
+        return {key: tool_context.state.get(key) for key in FANOUT_STATE_KEYS[tool.name]}
+
+    state_key = TOOL_STATE_KEYS.get(tool.name)
+    if state_key:
+        tool_context.state[state_key] = _tool_output_text(tool_response)
+    return None
+
+
+def _compact_part(part: types.Part) -> types.Part:
+    if part.function_response:
+        name = part.function_response.name
+        state_keys = FANOUT_STATE_KEYS.get(name) or ([TOOL_STATE_KEYS[name]] if name in TOOL_STATE_KEYS else [])
+        note = f"[compacted: see session state {', '.join(state_keys)}]" if state_keys else "[compacted tool output]"
+        return types.Part(function_response=types.FunctionResponse(
+            id=part.function_response.id,
+            name=name,
+            response={"result": note},
+        ))
+    if part.text and len(part.text) > TRUNCATED_TEXT_CHARS:
+        return types.Part(text=part.text[:TRUNCATED_TEXT_CHARS] + " …[compacted]")
+    return part
+
+
+def _is_user_text(content: types.Content) -> bool:
+    return content.role == "user" and any(p.text for p in content.parts or [])
+
+
+def _compact_contents(contents: list, budget: int, keep_recent: int) -> list:
+    """Returns a compacted copy of the contents that fits the budget where possible."""
+    # The recent window starts at a user message, so function calls stay
+    # paired with their responses.
+    split = max(len(contents) - keep_recent, 0)
+    while split > 0 and not _is_user_text(contents[split]):
+        split -= 1
+    if split == 0:
+        return contents
+    old, recent = contents[:split], contents[split:]
+
+    old = [types.Content(role=c.role, parts=[_compact_part(p) for p in c.parts or []]) for c in old]
+
+    # Drops the oldest turns (user message up to the next user message) until the budget is met.
+    while old and estimate_tokens(old + recent) > budget:
+        old.pop(0)
+        while old and not _is_user_text(old[0]):
+            old.pop(0)
+
+    compacted = old + recent
+    note = types.Part(text="[Earlier conversation was compacted. Structured results are in the SESSION STATE block.]")
+    compacted[0] = types.Content(role=compacted[0].role, parts=[note] + list(compacted[0].parts or []))
+    return compacted
+
+
+def _state_block(state) -> Optional[str]:
+    lines = []
+    for key in STRUCTURED_STATE_KEYS:
+        value = state.get(key)
+        if value in (None, ""):
+            continue
+        value = str(value)
+        if len(value) > STATE_VALUE_CHARS:
+            value = value[:STATE_VALUE_CHARS] + " …[truncated]"
+        lines.append(f"- {key}: {value}")
+    if not lines:
+        return None
+    return "SESSION STATE (authoritative results of earlier steps):\n" + "\n".join(lines)
+
+
+def compact_context(callback_context, llm_request) -> None:
+    """
+    before_model_callback: injects structured session state into the system
+    instruction and compacts the conversation once it passes the token budget.
+    """
+    block = _state_block(callback_context.state)
+    if block:
+        llm_request.append_instructions([block])
+
+    budget = _token_budget()
+    before = estimate_tokens(llm_request.contents)
+    if before > budget:
+        llm_request.contents = _compact_contents(llm_request.contents, budget, _keep_recent())
+        after = estimate_tokens(llm_request.contents)
+        if after < before:
+            logger.debug("Context compacted for %s: ~%d -> ~%d tokens", callback_context.agent_name, before, after)
+    return None
+
+
+# =============================================================================
+# Prompt Token Reporting
+# =============================================================================
+
+_PROMPT_TOKENS = defaultdict(lambda: deque(maxlen=200))
+_PROMPT_TOKENS_LOCK = threading.Lock()
+
+
+def record_prompt_tokens(callback_context, llm_response) -> None:
+    """
+    after_model_callback: records the prompt token count reported by the model
+    for each call, keyed by invocation (one invocation = one user turn).
+    """
+    usage = llm_response.usage_metadata
+    if usage is None or usage.prompt_token_count is None:
+        return None
+    with _PROMPT_TOKENS_LOCK:
+        _PROMPT_TOKENS[callback_context.invocation_id].append(usage.prompt_token_count)
+        # Bounds memory for long-running processes.
+        while len(_PROMPT_TOKENS) > 500:
+            _PROMPT_TOKENS.pop(next(iter(_PROMPT_TOKENS)))
+
+    turns = list(callback_context.state.get("prompt_tokens_per_turn", []))
+    if turns and turns[-1]["invocation_id"] == callback_context.invocation_id:
+        turns[-1] = {**turns[-1], "prompt_tokens": turns[-1]["prompt_tokens"] + usage.prompt_token_count, "model_calls": turns[-1]["model_calls"] + 1}
+    else:
+        turns.append({"invocation_id": callback_context.invocation_id, "prompt_tokens": usage.prompt_token_count, "model_calls": 1})
+    callback_context.state["prompt_tokens_per_turn"] = turns[-50:]
+    return None
+
+
+def prompt_token_report() -> list:
+    """Returns prompt tokens per turn (total and per model call) for recent invocations."""
+    with _PROMPT_TOKENS_LOCK:
+        return [
+            {"invocation_id": invocation_id, "prompt_tokens": sum(calls), "model_calls": list(calls)}
+            for invocation_id, calls in _PROMPT_TOKENS.items()
+        ]
@@ -0,0 +1,255 @@
+# LLM RESPONSE CACHE 🗄️
+# Caches Gemini responses for deterministic sub-agent calls, so repeated
+# workloads (same CV, same skill list) skip the network call entirely.
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.agents.rate_limiter import RateLimitedGemini
+
+
+# --- Configuration ---
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / "cache" / "llm_responses.db"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_MB = 64
+
+# Request config fields that do not influence the generated content.
+_IGNORED_CONFIG_FIELDS = {"system_instruction", "tools", "http_options", "labels"}
+
+
+def _normalize(value):
+    """
+    Recursively normalizes request data: drops thought signatures and collapses
+    whitespace, so formatting-only differences still hit the cache.
+    """
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k != "thought_signature"}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    return value
+
+
+def _strip_call_ids(content: dict) -> dict:
+    """
+    Removes function call ids, which ADK generates randomly per call and would
+    otherwise make identical requests hash differently.
+    """
+    for part in content.get("parts", []):
+        for field in ("function_call", "function_response"):
+            if field in part:
+                part[field].pop("id", None)
+    return content
+
+
+def _hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(llm_request: LlmRequest, model_name: str, namespace: str = "") -> str:
+    """
+    Builds the cache key of a request from the model name, the instruction hash,
+    the tool set and the normalized conversation contents. `namespace` is
+    prefixed to the model name (ADK always sets llm_request.model, so it must
+    not be folded into `model_name`).
+    """
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if instruction is not None and not isinstance(instruction, str):
+        instruction = instruction.model_dump(mode="json", exclude_none=True)
+
+    tool_declarations = []
+    if config and config.tools:
+        tool_declarations = [t.model_dump(mode="json", exclude_none=True) for t in config.tools]
+
+    generation_config = {}
+    if config:
+        generation_config = config.model_dump(mode="json", exclude_none=True, exclude=_IGNORED_CONFIG_FIELDS)
+
+    contents = [_strip_call_ids(c.model_dump(mode="json", exclude_none=True)) for c in llm_request.contents]
+
+    return _hash({
+        "model": namespace + (llm_request.model or model_name),
+        "instruction": _hash(_normalize(instruction)),
+        "tools": sorted(llm_request.tools_dict.keys()),
+        "tool_declarations": _hash(tool_declarations),
+        "config": generation_config,
+        "contents": _normalize(contents),
+    })
+
+
+class LlmResponseCache:
+    """
+    Size-bounded on-disk store of model responses with a TTL and LRU eviction.
+    Each entry holds the full list of serialized LlmResponse objects produced by one call.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evictions": 0}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    responses TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[list]:
+        """Returns the cached responses for a key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            row = conn.execute("SELECT responses, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            responses, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+        return json.loads(responses)
+
+    def put(self, key: str, model: str, responses: list) -> None:
+        """Stores responses for a key and evicts least recently used entries above the size cap."""
+        payload = json.dumps(responses, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, responses, size, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, payload, size, now, now)
+            )
+            self._stats["stores"] += 1
+            self._evict(conn)
+
+    def _evict(self, conn) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall():
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._stats["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the hit rate since process start."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[LlmResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LlmResponseCache]:
+    """
+    Returns the process-wide response cache configured from environment variables,
+    or None if caching is disabled with LLM_CACHE_ENABLED=False.
+    """
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "True").lower() in ("false", "0", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LlmResponseCache(
+                path=Path(os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+            )
+        return _cache
+
+
+def llm_cache_stats() -> dict:
+    """Returns the cache hit-rate metrics, or an empty dict if caching is disabled."""
+    cache = get_llm_cache()
+    return cache.stats() if cache else {}
+
+
+class CachedGemini(RateLimitedGemini):
+    """
+    Gemini model with a response cache in front of the API call.
+    Cache hits do not count against the rate limits (see rate_limiter).
+    Set cache_enabled=False for agents whose output should vary between calls.
+    Stub backends set a cache_namespace so their responses never mix with real ones.
+    """
+
+    cache_enabled: bool = True
+    cache_namespace: str = ""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cache = get_llm_cache() if self.cache_enabled and not stream else None
+        if cache is None:
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+            return
+
+        key = make_cache_key(llm_request, self.model, self.cache_namespace)
+        cached = cache.get(key)
+        if cached is not None:
+            for raw in cached:
+                yield LlmResponse.model_validate_json(raw)
+            return
+
+        responses = []
+        async for response in super().generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+
+        # Only complete, error-free responses are cached.
+        if responses and not any(r.error_code or r.partial for r in responses):
+            cache.put(key, self.model, [_serialize_response(r) for r in responses])
+
+
+def _serialize_response(response: LlmResponse) -> str:
+    """Serializes a response without function call ids, so ADK assigns fresh ones on replay."""
+    data = json.loads(response.model_dump_json(exclude_none=True))
+    if data.get("content"):
+        _strip_call_ids(data["content"])
+    return json.dumps(data, ensure_ascii=False)
@@ -0,0 +1,300 @@
+# MODEL BACKENDS 🎭
+# Pluggable model backend for the agents, selected with AGENT_MODEL_BACKEND:
+#
+#   gemini    Live Gemini calls (default).
+#   record    Live Gemini calls, each request/response pair appended to a
+#             recordings file (STUB_RECORDINGS_PATH).
+#   replay    Responses served from the recordings file; a request that was
+#             not recorded falls back to the scripted policy
+#             (STUB_REPLAY_FALLBACK=scripted, default) or fails (=error).
+#   scripted  Deterministic tool-calling policies per agent (SCRIPTS below),
+#             no network at all.
+#
+# Stub backends (replay, scripted) sit where the API call would be: the
+# response cache and the rate limiter still run in front of them, so load
+# tests measure the application's own overhead. STUB_LATENCY_MS and
+# STUB_LATENCY_JITTER_MS inject a simulated model latency.
+
+import asyncio
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Union
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from src.agents.llm_cache import CachedGemini, _serialize_response, make_cache_key
+
+
+# --- Configuration ---
+BACKENDS = ("gemini", "record", "replay", "scripted")
+DEFAULT_RECORDINGS_PATH = Path(__file__).parent.parent.parent / "cache" / "model_recordings.jsonl"
+
+# Simulated model time of the current task (a list the stubs append to), set by load tests.
+stub_model_time: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("stub_model_time", default=None)
+
+
+def model_backend() -> str:
+    backend = os.getenv("AGENT_MODEL_BACKEND", "gemini").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown AGENT_MODEL_BACKEND '{backend}'. Use one of: {', '.join(BACKENDS)}.")
+    return backend
+
+
+# =============================================================================
+# Recordings
+# =============================================================================
+
+class Recordings:
+    """
+    Append-only JSONL file of recorded model calls, indexed by request key
+    (the response cache key: model, instruction, tools and conversation).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[str]] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._entries[entry["key"]] = entry["responses"]
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def add(self, key: str, agent_name: str, responses: List[str]) -> None:
+        with self._lock:
+            self._entries[key] = responses
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "agent": agent_name, "responses": responses}, ensure_ascii=False) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_recordings: Optional[Recordings] = None
+_recordings_lock = threading.Lock()
+
+
+def get_recordings() -> Recordings:
+    """Returns the process-wide recordings (STUB_RECORDINGS_PATH overrides the location)."""
+    global _recordings
+    with _recordings_lock:
+        if _recordings is None:
+            _recordings = Recordings(Path(os.getenv("STUB_RECORDINGS_PATH", DEFAULT_RECORDINGS_PATH)))
+        return _recordings
+
+
+def reset_recordings() -> None:
+    global _recordings
+    with _recordings_lock:
+        _recordings = None
+
+
+# =============================================================================
+# Scripted Policies
+# =============================================================================
+
+@dataclass
+class Step:
+    """
+    One model response of a script: a tool call or a final text.
+    `args` and `text` may be callables: args(user_text, match) -> dict,
+    text(last_tool_output) -> str.
+    """
+    call: Optional[str] = None
+    args: Union[dict, Callable[[str, Optional[re.Match]], dict]] = field(default_factory=dict)
+    text: Union[str, Callable[[str], str], None] = None
+
+
+def _echo(output: str) -> str:
+    return output or "OK"
+
+
+# Agent name -> [(pattern on the latest user message, steps)]. The first matching
+# pattern picks the script; the number of tool results since that message picks the step.
+SCRIPTS: Dict[str, List[tuple]] = {
+    "manager": [
+        (r"CV file", [
+            Step(call="CV_analysis_agent", args=lambda text, m: {"request": text}),
+            Step(call="profile_fanout_agent", args={"request": "Skills: Python, Docker, SQL. Languages: English (Native)."}),
+            Step(text=lambda output: f"Here is your CV analysis and the matching jobs.\n\n{output}"),
+        ]),
+        (r"^\s*\d+\s*$", [
+            Step(call="present_coding_problem_fn", args={"job_title": "Backend Engineer – API & Microservices"}),
+            Step(text=_echo),
+        ]),
+        (r"Code assessment result", [
+            Step(text="Thanks, your assessment result has been recorded."),
+        ]),
+        (r"def |```", [
+            Step(call="grade_code_submission_fn", args=lambda text, m: {"code": text}),
+            Step(text=lambda output: f"Code assessment result: {output}"),
+        ]),
+    ],
+    "CV_analysis_agent": [
+        (r"CV file: (\S+)", [
+            Step(call="read_cv_fn", args=lambda text, m: {"filename": m.group(1)}),
+            Step(text=lambda output: "Candidate Information: scripted analysis.\nTechnical Skills: Python, Docker, SQL\n"
+                                     "Languages: English (Native)\n" + output[:500]),
+        ]),
+    ],
+    "job_listing_agent": [
+        (r"", [
+            Step(call="list_jobs_from_db", args={"cv_summary": "Python, Docker, SQL", "mode": "compact", "limit": 5}),
+            Step(text=_echo),
+        ]),
+    ],
+    "job_matcher": [
+        (r"", [
+            Step(call="list_jobs_from_db", args={"cv_summary": "Python, Docker, SQL", "mode": "compact", "limit": 5}),
+            Step(text=_echo),
+        ]),
+    ],
+    "language_test_generator": [
+        (r"", [Step(text="NO_LANGUAGE_TEST")]),
+    ],
+}
+
+
+def _latest_user_text(llm_request: LlmRequest) -> tuple:
+    """Returns (latest user text, number of tool results after it, last tool output)."""
+    tool_results, last_output = 0, None
+    for content in reversed(llm_request.contents):
+        for part in reversed(content.parts or []):
+            if part.function_response is not None:
+                tool_results += 1
+                if last_output is None:
+                    response = part.function_response.response or {}
+                    last_output = response.get("result", response) if isinstance(response, dict) else response
+            elif part.text and content.role == "user":
+                return part.text, tool_results, "" if last_output is None else str(last_output)
+    return "", tool_results, "" if last_output is None else str(last_output)
+
+
+def scripted_response(agent_name: str, llm_request: LlmRequest) -> LlmResponse:
+    """Next response of the agent's script for this conversation."""
+    user_text, position, last_output = _latest_user_text(llm_request)
+    steps, match = [Step(text=_echo)], None
+    for pattern, script in SCRIPTS.get(agent_name, []):
+        match = re.search(pattern, user_text, re.MULTILINE)
+        if match:
+            steps = script
+            break
+    step = steps[min(position, len(steps) - 1)]
+
+    if step.call and step.call in llm_request.tools_dict:
+        args = step.args(user_text, match) if callable(step.args) else dict(step.args)
+        part = types.Part(function_call=types.FunctionCall(name=step.call, args=args))
+    else:
+        text = step.text(last_output) if callable(step.text) else (step.text or _echo(last_output))
+        part = types.Part(text=text)
+    return LlmResponse(
+        content=types.Content(role="model", parts=[part]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=0),
+    )
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+async def _simulate_latency() -> None:
+    latency = float(os.getenv("STUB_LATENCY_MS", 0)) / 1000
+    jitter = float(os.getenv("STUB_LATENCY_JITTER_MS", 0)) / 1000
+    delay = max(0.0, latency + random.uniform(-jitter, jitter))
+    if delay:
+        await asyncio.sleep(delay)
+    spent = stub_model_time.get()
+    if spent is not None:
+        spent.append(delay)
+
+
+class _StubBackend(Gemini):
+    """Base of the stub backends: replaces the API call, after a simulated latency."""
+
+    agent_name: str = ""
+
+    def _respond(self, llm_request: LlmRequest) -> List[LlmResponse]:
+        raise NotImplementedError
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await _simulate_latency()
+        for response in self._respond(llm_request):
+            yield response
+
+
+class _ScriptedBackend(_StubBackend):
+    def _respond(self, llm_request: LlmRequest) -> List[LlmResponse]:
+        return [scripted_response(self.agent_name, llm_request)]
+
+
+class _ReplayBackend(_StubBackend):
+    def _respond(self, llm_request: LlmRequest) -> List[LlmResponse]:
+        recorded = get_recordings().get(make_cache_key(llm_request, self.model))
+        if recorded is not None:
+            return [LlmResponse.model_validate_json(raw) for raw in recorded]
+        if os.getenv("STUB_REPLAY_FALLBACK", "scripted").lower() == "error":
+            raise LookupError(f"No recorded response for this {self.agent_name} request.")
+        return [scripted_response(self.agent_name, llm_request)]
+
+
+class ScriptedGemini(CachedGemini, _ScriptedBackend):
+    """Agent model answering with the scripted policies."""
+
+
+class ReplayGemini(CachedGemini, _ReplayBackend):
+    """Agent model replaying recorded responses."""
+
+
+class RecordingGemini(CachedGemini):
+    """Live agent model that records every request/response pair."""
+
+    agent_name: str = ""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = make_cache_key(llm_request, self.model)
+        responses = []
+        async for response in super().generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+        if responses and not any(r.error_code or r.partial for r in responses):
+            get_recordings().add(key, self.agent_name, [_serialize_response(r) for r in responses])
+
+
+def agent_model(agent_name: str, model: str = "gemini-2.5-flash-lite", retry_options=None,
+                cache_enabled: bool = True) -> Gemini:
+    """
+    Returns the model of an agent for the configured backend (AGENT_MODEL_BACKEND).
+
+    Args:
+        agent_name: Name of the agent (selects its script in scripted/replay mode).
+        model: Gemini model name.
+        retry_options: HTTP retry options for live calls.
+        cache_enabled: Whether responses go through the response cache.
+    """
+    backend = model_backend()
+    if backend == "gemini":
+        return CachedGemini(model=model, retry_options=retry_options, cache_enabled=cache_enabled)
+    cls = {"record": RecordingGemini, "replay": ReplayGemini, "scripted": ScriptedGemini}[backend]
+    return cls(model=model, retry_options=retry_options, cache_enabled=cache_enabled,
+               cache_namespace="" if backend == "record" else f"{backend}:", agent_name=agent_name)
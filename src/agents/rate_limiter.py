@@ -0,0 +1,309 @@
+# GEMINI RATE LIMITER 🚦
+# Process-wide request governor shared by every Gemini model of the agents.
+#
+# Each model name has a token bucket for requests per minute, one for tokens
+# per minute, and a cap on concurrent requests. A request waits for its turn
+# before it is sent (no 429 in the first place); if the API still answers 429,
+# the model's buckets are paused for a jittered backoff and the request queues
+# again, so concurrent sessions spread out instead of retrying in lockstep.
+# The limiter works across threads and event loops (the Streamlit app runs
+# each turn in a new loop).
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator, Dict, Optional
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+logger = logging.getLogger(__name__)
+
+
+# --- Configuration ---
+DEFAULT_RPM = 60                  # Requests per minute, per model.
+DEFAULT_TPM = 1_000_000           # Tokens per minute, per model.
+DEFAULT_MAX_CONCURRENCY = 8       # Requests in flight, per model.
+DEFAULT_MAX_THROTTLE_RETRIES = 4  # Retries of a request answered with 429.
+DEFAULT_BURST_SECONDS = 2.0       # Bucket capacity, in seconds of refill.
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+CHARS_PER_TOKEN = 4               # Rough token estimate used before the call.
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `reserve` takes tokens immediately (the balance
+    may go negative) and returns how long the caller must wait, so waiting
+    callers are served in reservation order at the refill rate.
+
+    Args:
+        per_minute: Refill rate.
+        burst_seconds: Capacity, in seconds of refill (a small burst keeps
+            requests evenly spread over the minute).
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = max(self._updated, now)
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` tokens; returns the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait + max(0.0, self._paused_until - now), 0.0)
+
+    def adjust(self, amount: float) -> None:
+        """Gives back (positive) or takes (negative) tokens after the actual usage is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def pause(self, seconds: float) -> None:
+        """Stops the refill for `seconds` and drops the accumulated burst."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._paused_until = max(self._paused_until, now + seconds)
+
+
+class ConcurrencyGate:
+    """Semaphore usable from any thread and event loop (asyncio.Semaphore is bound to one loop)."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over just before the cancellation: give it back.
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if not loop.is_closed():
+                    # The slot passes to the waiter; `active` is unchanged.
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+            self.active -= 1
+
+    def _hand_over(self, future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ModelLimiter:
+    """
+    Request and token budgets of one model, plus its metrics.
+
+    Args:
+        rpm: Requests per minute.
+        tpm: Tokens per minute.
+        max_concurrency: Requests in flight.
+        max_retries: Retries of a request answered with 429.
+        burst_seconds: Burst allowed by the buckets, in seconds of refill.
+    """
+
+    def __init__(self, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_retries: int = DEFAULT_MAX_THROTTLE_RETRIES,
+                 burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.gate = ConcurrencyGate(max_concurrency)
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "throttled": 0, "retries": 0, "delayed": 0,
+                       "queue_wait_s": 0.0, "max_queue_wait_s": 0.0, "tokens": 0}
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Waits for a request slot; returns the time spent waiting (seconds)."""
+        start = time.monotonic()
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self.gate.acquire()
+        waited = time.monotonic() - start
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["delayed"] += waited > 0.001
+            self._stats["queue_wait_s"] += waited
+            self._stats["max_queue_wait_s"] = max(self._stats["max_queue_wait_s"], waited)
+        return waited
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int]) -> None:
+        """Frees the slot and settles the token budget with the actual usage."""
+        self.gate.release()
+        if used_tokens is not None:
+            self.tokens.adjust(estimated_tokens - used_tokens)
+            with self._lock:
+                self._stats["tokens"] += used_tokens
+
+    def throttled(self, attempt: int) -> float:
+        """Records a 429 and pauses the model's budgets for a jittered backoff; returns it."""
+        delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        self.requests.pause(delay)
+        self.tokens.pause(delay)
+        with self._lock:
+            self._stats["throttled"] += 1
+            self._stats["retries"] += attempt < self.max_retries
+        return delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = self.gate.active
+        stats["avg_queue_wait_s"] = round(stats["queue_wait_s"] / stats["requests"], 4) if stats["requests"] else 0.0
+        stats["queue_wait_s"] = round(stats["queue_wait_s"], 3)
+        stats["max_queue_wait_s"] = round(stats["max_queue_wait_s"], 3)
+        return stats
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _model_limits(model: str) -> dict:
+    """
+    Limits of a model: GEMINI_RPM / GEMINI_TPM / GEMINI_MAX_CONCURRENCY /
+    GEMINI_MAX_THROTTLE_RETRIES / GEMINI_BURST_SECONDS, overridden per
+    model by GEMINI_MODEL_LIMITS (JSON, e.g. {"gemini-2.5-flash": {"rpm": 10, "tpm": 250000}}).
+    """
+    limits = {
+        "rpm": float(os.getenv("GEMINI_RPM", DEFAULT_RPM)),
+        "tpm": float(os.getenv("GEMINI_TPM", DEFAULT_TPM)),
+        "max_concurrency": int(os.getenv("GEMINI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        "max_retries": int(os.getenv("GEMINI_MAX_THROTTLE_RETRIES", DEFAULT_MAX_THROTTLE_RETRIES)),
+        "burst_seconds": float(os.getenv("GEMINI_BURST_SECONDS", DEFAULT_BURST_SECONDS)),
+    }
+    try:
+        overrides = json.loads(os.getenv("GEMINI_MODEL_LIMITS") or "{}").get(model, {})
+    except (json.JSONDecodeError, AttributeError):
+        logger.warning("Ignoring invalid GEMINI_MODEL_LIMITS")
+        overrides = {}
+    limits.update({k: v for k, v in overrides.items() if k in limits})
+    return limits
+
+
+def get_rate_limiter(model: str) -> ModelLimiter:
+    """Returns the process-wide limiter of a model."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = ModelLimiter(**_model_limits(model))
+        return limiter
+
+
+def reset_rate_limiters() -> None:
+    """Drops the limiters (the next request reads the limits from the environment again)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def rate_limiter_stats() -> dict:
+    """Returns queue wait and throttle metrics per model."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
+
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """Rough prompt size of a request, reserved from the token budget before the call."""
+    chars = sum(len(content.model_dump_json(exclude_none=True)) for content in llm_request.contents)
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(instruction, str):
+        chars += len(instruction)
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+def rate_limit_enabled() -> bool:
+    return os.getenv("GEMINI_RATE_LIMIT_ENABLED", "True").lower() not in ("false", "0", "no")
+
+
+class RateLimitedGemini(Gemini):
+    """
+    Gemini model whose requests go through the process-wide limiter of its model
+    name. 429 responses are retried here, after a jittered pause shared by all
+    requests to the same model.
+    """
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if not rate_limit_enabled():
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+            return
+
+        limiter = get_rate_limiter(llm_request.model or self.model)
+        estimated = estimate_tokens(llm_request)
+        attempt = 0
+        while True:
+            await limiter.acquire(estimated)
+            used, responses = None, []
+            try:
+                # The whole response is collected before anything is yielded:
+                # ADK runs tools and AgentTool sub-agents while this generator
+                # is paused at a yield, and their calls go through the same
+                # limiter. A slot held across the yield would deadlock as soon
+                # as the children need the slots their parents hold.
+                async for response in super().generate_content_async(llm_request, stream):
+                    if response.usage_metadata and response.usage_metadata.total_token_count:
+                        used = response.usage_metadata.total_token_count
+                    responses.append(response)
+            except Exception as e:
+                # Only a request that produced nothing yet can be retried transparently.
+                if getattr(e, "code", None) != 429 or responses:
+                    raise
+                delay = limiter.throttled(attempt)
+                if attempt >= limiter.max_retries:
+                    raise
+                # Counted in the limiter stats ("throttled", "retries").
+                logger.debug("%s throttled (429), retrying after %.1fs", llm_request.model or self.model, delay)
+                attempt += 1
+                continue
+            finally:
+                limiter.release(estimated, used)
+            for response in responses:
+                yield response
+            return
@@ -0,0 +1,279 @@
+# AGENT RUNTIME 🏃
+# Helpers to drive an ADK runner outside of any UI: run a prompt in a session,
+# extract the text response, log events, and grade code submissions locally.
+# Used by the Streamlit app (main.py) and by the headless batch runner.
+
+import asyncio
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Session identifiers used by InMemoryRunner.run_debug.
+RUNNER_USER_ID = "debug_user_id"
+RUNNER_SESSION_ID = "debug_session_id"
+
+# Logging
+LOG_DIR = Path(__file__).parent.parent.parent / "log_files"
+LOG_DIR.mkdir(exist_ok=True)
+LOG_FILE = LOG_DIR / "runner_events.log"
+
+
+def log_agent_event(event):
+    """
+    Logs agent events, parsing nested content for Tools and Text.
+    Handles NoneType safely.
+    """
+    log_entry = {
+        "timestamp": datetime.now().timestamp(),
+        "agent_name": getattr(event, "agent_name", "Orchestrator"),
+        "tool_name": None,
+        "input_text": None,
+        "output_text": None,
+        "type": "unknown"
+    }
+
+    has_content = False
+
+    # Parse content parts
+    if hasattr(event, "content") and event.content:
+        parts = getattr(event.content, "parts", [])
+        if parts:
+            for part in parts:
+                # Agent Text
+                if hasattr(part, "text") and part.text:
+                    log_entry["type"] = "response"
+                    current = log_entry["output_text"] or ""
+                    log_entry["output_text"] = current + part.text
+                    has_content = True
+
+                # Handles tool call logging.
+                if hasattr(part, "function_call") and getattr(part, "function_call", None):
+                    log_entry["type"] = "tool_call"
+                    log_entry["tool_name"] = getattr(part.function_call, "name", None)
+                    try:
+                        args_dict = getattr(part.function_call, "args", {})
+                        if args_dict is not None:
+                            if hasattr(args_dict, "items"):
+                                args_dict = dict(args_dict.items())
+                            log_entry["input_text"] = json.dumps(args_dict, ensure_ascii=False)
+                        else:
+                            log_entry["input_text"] = None
+                    except Exception:
+                        log_entry["input_text"] = str(getattr(part.function_call, "args", None))
+                    has_content = True
+
+                # Handles tool response logging.
+                if hasattr(part, "function_response") and getattr(part, "function_response", None):
+                    log_entry["type"] = "tool_result"
+                    log_entry["tool_name"] = getattr(part.function_response, "name", None)
+                    try:
+                        resp_dict = getattr(part.function_response, "response", {})
+                        if resp_dict is not None:
+                            if hasattr(resp_dict, "items"):
+                                resp_dict = dict(resp_dict.items())
+                            log_entry["output_text"] = json.dumps(resp_dict, ensure_ascii=False)
+                        else:
+                            log_entry["output_text"] = None
+                    except Exception:
+                        log_entry["output_text"] = str(getattr(part.function_response, "response", None))
+                    has_content = True
+
+    # Fallback for logging user input.
+    if not has_content and hasattr(event, "user_content"):
+        log_entry["type"] = "user_input"
+        input_text = getattr(event.user_content, "text", None)
+        if not input_text and hasattr(event.user_content, "parts"):
+            parts = getattr(event.user_content, "parts", [])
+            texts = [p.text for p in parts if hasattr(p, "text") and p.text]
+            if texts:
+                input_text = " ".join(texts)
+        log_entry["input_text"] = input_text
+        if input_text:
+            has_content = True
+
+    # Write log only if content exists
+    if has_content:
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+
+
+def log_user_input(prompt):
+    """Logs a message typed by the user."""
+    with open(LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "timestamp": datetime.now().timestamp(),
+            "agent_name": "User",
+            "tool_name": None,
+            "input_text": prompt,
+            "output_text": None,
+            "type": "user_input"
+        }, ensure_ascii=False) + "\n")
+
+
+def extract_agent_response(events, log_events=True):
+    """
+    Extracts all text from agent events.
+    Safely handles NoneType and missing parts.
+    """
+    if not events:
+        return None
+
+    full_text = []
+
+    for event in events:
+        if log_events:
+            log_agent_event(event)
+        content = getattr(event, 'content', None)
+        parts = getattr(content, 'parts', []) if content and getattr(content, 'parts', None) else []
+
+        for part in parts:
+            text = getattr(part, 'text', None)
+            if text:
+                full_text.append(text)
+            else:
+                logger.debug("Non-text part in the response: %r", part)
+
+    return "".join(full_text) if full_text else None
+
+
+async def run_agent_async(runner, prompt, session_id=RUNNER_SESSION_ID, user_id=RUNNER_USER_ID,
+                          quiet=False, log_events=True):
+    """
+    Runs the agent asynchronously and returns its response. Never returns None.
+    Each session_id is a separate conversation within the runner.
+    """
+    if runner is None:
+        return "⚠️ Error: agent runner is not initialized."
+    try:
+        response = await runner.run_debug(prompt, user_id=user_id, session_id=session_id, quiet=quiet)
+        text = extract_agent_response(response, log_events=log_events)
+        if text is None or text.strip() == "":
+            return "⚠️ The agent processed your request but produced no output."
+        return text
+    except Exception as e:
+        return f"⚠️ Error running agent asynchronously: {str(e)}"
+
+
+def run_agent_sync(runner, prompt):
+    """Synchronous wrapper for asynchronous agent calls. Never returns None."""
+    if runner is None:
+        return "⚠️ Error: agent runner is not initialized."
+    try:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        result = loop.run_until_complete(run_agent_async(runner, prompt))
+        loop.close()
+        return result
+    except Exception as e:
+        return f"⚠️ Error running agent synchronously: {str(e)}"
+
+
+async def set_session_state_async(runner, state, session_id=RUNNER_SESSION_ID, user_id=RUNNER_USER_ID):
+    """Writes keys into the runner session's state, creating the session if needed."""
+    from google.adk.events import Event, EventActions
+
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+    if session is None:
+        await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session_id, state=dict(state)
+        )
+        return
+    await runner.session_service.append_event(
+        session,
+        Event(author="user", actions=EventActions(state_delta=dict(state)))
+    )
+
+
+def set_session_state_sync(runner, state):
+    """Synchronous wrapper for set_session_state_async."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(set_session_state_async(runner, state))
+    finally:
+        loop.close()
+
+
+# Line starts that mark a chat message as code: Python, JavaScript, Go.
+CODE_LINE_RE = re.compile(
+    r"^\s*(?:import\s|from\s+[\w.]+\s+import\b|def\s|class\s+\w"
+    r"|function\s*\w*\s*\(|(?:const|let|var)\s+\w+\s*="
+    r"|package\s+main\b|func\s+\w+\s*\()",
+    re.MULTILINE,
+)
+
+
+def is_code_submission(prompt):
+    """Whether a chat message is a code submission: fenced, or code in one of the sandbox languages."""
+    text = prompt.strip()
+    return "```" in text or "def " in text or CODE_LINE_RE.search(text) is not None \
+        or text.upper().startswith(("SELECT ", "WITH "))
+
+
+def extract_code_submission(prompt):
+    """Strips markdown code fences from a chat message containing code."""
+    text = prompt.strip()
+    if "```" in text:
+        blocks = text.split("```")
+        if len(blocks) >= 3:
+            text = blocks[1]
+            # Drops the language tag of the fence (e.g. ```python).
+            first_line, _, rest = text.partition("\n")
+            if first_line.strip().isidentifier():
+                text = rest
+    return text.strip()
+
+
+async def grade_code_async(runner, code, session_id=RUNNER_SESSION_ID, user_id=RUNNER_USER_ID):
+    """
+    Grades a code submission locally against the problem stored in the runner session.
+    Returns the verdict ('pass' or 'not pass'), or None if no problem was presented yet.
+    """
+    from google.adk.events import Event, EventActions
+    from src.tools.tools import grade_code_submission_fn
+
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+    if session is None or not session.state.get("problem_generated"):
+        return None
+
+    state = dict(session.state)
+    verdict = grade_code_submission_fn(code, context=state)
+
+    # Persists the same state keys the orchestrator's code_grading_tool would set.
+    state_delta = {
+        "assignment_result": state["assignment_result"],
+        "last_assignment_feedback": state["last_assignment_feedback"],
+        "last_assessment": state["last_assessment"],
+    }
+    await runner.session_service.append_event(
+        session,
+        Event(author="user", actions=EventActions(state_delta=state_delta))
+    )
+    return verdict
+
+
+def grade_code_sync(runner, code):
+    """Synchronous wrapper for grade_code_async. Returns None if grading is not possible."""
+    if runner is None:
+        return None
+    try:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        result = loop.run_until_complete(grade_code_async(runner, code))
+        loop.close()
+        return result
+    except Exception as e:
+        logger.debug("Local grading failed: %r", e)
+        return None
@@ -10,9 +10,13 @@ from .tools import (
     list_available_cvs, 
     compare_candidates, 
     job_listing_tool,
+    job_details_tool,
     calendar_get_busy_fn as calendar_get_busy,
     calendar_book_slot_fn as calendar_book_slot,
+    calendar_book_slots_fn as calendar_book_slots,
+    find_free_slots_fn as find_free_slots,
     code_execution_tool,
+    code_grading_tool,
     problem_presenter_tool,
 )
 
@@ -28,9 +32,13 @@ __all__ = [
     'list_available_cvs',
     'compare_candidates',
     'job_listing_tool',
+    'job_details_tool',
     'calendar_get_busy',
     'calendar_book_slot',
+    'calendar_book_slots',
+    'find_free_slots',
     'code_execution_tool',
+    'code_grading_tool',
     # Helper functions
     'read_cv_file',
     'load_all_cvs',
@@ -0,0 +1,340 @@
+# ASSESSMENTS 📝
+# Typed results of code assessments, and the table they are recorded in.
+#
+# A graded submission produces an AssessmentResult: its status (pass, fail or
+# why the run failed), the outcome of each check (one per expected output line:
+# problems print one line per test case, SQL queries one row), timings and
+# resource use. The tool response is its compact JSON; the emoji-prefixed
+# feedback for the candidate is one of its fields. Graded results are also
+# appended to an assessments table (SQLite), so verdicts can be aggregated
+# across candidates, problems and jobs with plain SQL.
+#
+# Summarize recorded assessments:
+#   python -m src.tools.assessments [problem_id|job_title|language|candidate_id]
+
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+
+# --- Configuration ---
+DEFAULT_ASSESSMENTS_PATH = Path(__file__).parent.parent.parent / "cache" / "assessments.db"
+MAX_LISTED_FAILURES = 5           # Failed checks detailed in a result; the rest are only counted.
+PRESENTED_PROBLEM_KEY = "presented_problem"  # Session state key of the problem being assessed.
+CANDIDATE_ID_KEY = "candidate_id"            # Session state key identifying the candidate, if known.
+
+SUMMARY_GROUPS = ("problem_id", "job_title", "language", "candidate_id")
+
+
+@dataclass
+class PresentedProblem:
+    """The problem a session is being assessed on, as kept in session state."""
+    expected_output: str = ""              # Normalized; empty when graded by digest.
+    language: str = "python"
+    problem_id: Optional[str] = None
+    expected_digest: Optional[str] = None  # Set for outputs too large to keep in the session.
+    expected_version: Optional[str] = None
+    dataset: Optional[str] = None
+    ordered: bool = True
+    reference_solution: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["PresentedProblem"]:
+        if not data:
+            return None
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class TestOutcome:
+    """One failed check: an expected output line (None: missing) and the line printed."""
+    line: int
+    expected: Optional[str]
+    actual: Optional[str]
+
+
+@dataclass
+class AssessmentResult:
+    """
+    Outcome of running (and, if a problem was presented, grading) a submission.
+
+    status is "pass", "fail" (output mismatch), "output_limit" (output
+    truncated by the sandbox), a sandbox failure ("timeout", "memory_error",
+    "security_violation", "error") or "success" for an ungraded run.
+    """
+    status: str
+    language: str
+    feedback: str = ""
+    problem_id: Optional[str] = None
+    problem_version: Optional[str] = None
+    graded: bool = False
+    tests_total: Optional[int] = None      # Checks run: only once the output was compared.
+    tests_passed: Optional[int] = None
+    failed_tests: List[TestOutcome] = field(default_factory=list)
+    execution_ms: float = 0.0
+    cpu_ms: Optional[float] = None
+    memory_limit_mb: Optional[int] = None
+    output_chars: int = 0
+    output_truncated: bool = False
+    vm_steps: Optional[int] = None         # SQL: virtual machine instructions executed.
+    reference_steps: Optional[int] = None
+    inefficient: bool = False
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "pass"
+
+    @property
+    def verdict(self) -> str:
+        return "pass" if self.passed else "not pass"
+
+    @classmethod
+    def from_execution(cls, result: dict, language: str, memory_limit_mb: Optional[int] = None) -> "AssessmentResult":
+        """Status, timings and resource use of an execute_code result (not graded yet)."""
+        cpu_time = result.get("cpu_time")
+        return cls(
+            status=result["status"],
+            language=language,
+            execution_ms=round(result.get("execution_time", 0.0) * 1000, 1),
+            cpu_ms=round(cpu_time * 1000, 1) if cpu_time is not None else None,
+            memory_limit_mb=memory_limit_mb,
+            output_chars=len(result.get("output") or ""),
+            output_truncated=bool(result.get("output_truncated")),
+            vm_steps=result.get("vm_steps"),
+            error=result.get("error_msg"),
+        )
+
+    def to_dict(self) -> dict:
+        """Fields with a value only (no None, empty list or False)."""
+        data = asdict(self)
+        data["verdict"] = self.verdict if self.graded else None
+        return {name: value for name, value in data.items()
+                if value is not None and value is not False and value != []}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yields the lines of text one at a time, without building a list."""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def compare_lines(actual, expected, max_listed: int = MAX_LISTED_FAILURES) -> tuple:
+    """
+    Compares two outputs line by line; every line of either is one check.
+
+    Args:
+        actual, expected: Output text, or an iterable of its lines (e.g. a
+            stored expected output read from disk).
+        max_listed: Failed checks returned in detail.
+
+    Returns:
+        (checks, checks passed, the first failed checks as TestOutcomes).
+    """
+    actual_lines, expected_lines = (iter_lines(x) if isinstance(x, str) else iter(x) for x in (actual, expected))
+    total = passed = 0
+    failures = []
+    while True:
+        actual_line, expected_line = next(actual_lines, None), next(expected_lines, None)
+        if actual_line is None and expected_line is None:
+            return total, passed, failures
+        total += 1
+        if actual_line == expected_line:
+            passed += 1
+        elif len(failures) < max_listed:
+            failures.append(TestOutcome(total, expected_line, actual_line))
+
+
+# =============================================================================
+# Assessment Store
+# =============================================================================
+
+class AssessmentStore:
+    """
+    Append-only table of graded assessments.
+
+    The aggregated columns live in `assessments`; the full JSON result is kept
+    in `assessment_results`, so summaries scan narrow rows however long the
+    feedback is.
+
+    Args:
+        path: SQLite database file.
+    """
+
+    def __init__(self, path: Path = DEFAULT_ASSESSMENTS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS assessments (
+                    id INTEGER PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    candidate_id TEXT,
+                    job_title TEXT,
+                    problem_id TEXT,
+                    problem_version TEXT,
+                    language TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    passed INTEGER NOT NULL,
+                    tests_passed INTEGER,
+                    tests_total INTEGER,
+                    execution_ms REAL NOT NULL,
+                    cpu_ms REAL,
+                    vm_steps INTEGER
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS assessment_results (
+                    assessment_id INTEGER PRIMARY KEY REFERENCES assessments(id),
+                    result TEXT NOT NULL  -- AssessmentResult.to_json()
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_problem ON assessments(problem_id, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_job ON assessments(job_title, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_candidate ON assessments(candidate_id, created_at)")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, result: AssessmentResult, candidate_id: Optional[str] = None,
+               job_title: Optional[str] = None) -> int:
+        """Appends a graded result; returns its row id."""
+        return self.record_many([(result, candidate_id, job_title)])[0]
+
+    def record_many(self, entries: Iterable[tuple]) -> List[int]:
+        """Appends (result, candidate_id, job_title) entries in one transaction."""
+        now = time.time()
+        ids = []
+        with self._transaction() as conn:
+            for result, candidate_id, job_title in entries:
+                cursor = conn.execute(
+                    "INSERT INTO assessments (created_at, candidate_id, job_title, problem_id, problem_version, "
+                    "language, status, passed, tests_passed, tests_total, execution_ms, cpu_ms, vm_steps) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (now, candidate_id, job_title, result.problem_id, result.problem_version, result.language,
+                     result.status, int(result.passed), result.tests_passed, result.tests_total,
+                     result.execution_ms, result.cpu_ms, result.vm_steps),
+                )
+                conn.execute("INSERT INTO assessment_results (assessment_id, result) VALUES (?, ?)",
+                             (cursor.lastrowid, result.to_json()))
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def summary(self, group_by: str = "problem_id", since: Optional[float] = None,
+                job_title: Optional[str] = None, problem_id: Optional[str] = None) -> List[dict]:
+        """
+        Verdicts aggregated per problem, job, language or candidate.
+
+        Args:
+            group_by: One of SUMMARY_GROUPS.
+            since: Only assessments recorded after this Unix time.
+            job_title, problem_id: Only assessments of this job / problem.
+
+        Returns:
+            One dict per group, most attempted first: attempts, candidates,
+            candidates_passed, pass_rate, avg/max execution_ms, avg test pass
+            ratio and the count of each status.
+        """
+        if group_by not in SUMMARY_GROUPS:
+            raise ValueError(f"group_by must be one of {', '.join(SUMMARY_GROUPS)}")
+        conditions, params = [], []
+        for column, value in (("created_at >", since), ("job_title =", job_title), ("problem_id =", problem_id)):
+            if value is not None:
+                conditions.append(f"{column} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._transaction() as conn:
+            # Per (group, status): a handful of rows, folded into the groups below.
+            status_rows = conn.execute(f"""
+                SELECT {group_by}, status, COUNT(*), SUM(passed), SUM(execution_ms), MAX(execution_ms),
+                       SUM(CASE WHEN tests_total > 0 THEN 1.0 * tests_passed / tests_total END),
+                       COUNT(CASE WHEN tests_total > 0 THEN 1 END)
+                FROM assessments {where}
+                GROUP BY {group_by}, status
+            """, params).fetchall()
+            candidates = {key: (count, passed) for key, count, passed in conn.execute(f"""
+                SELECT {group_by}, COUNT(DISTINCT candidate_id), COUNT(DISTINCT CASE WHEN passed THEN candidate_id END)
+                FROM assessments {where}
+                GROUP BY {group_by}
+            """, params)}
+
+        groups = {}
+        for key, status, count, passed, total_ms, max_ms, ratios, compared in status_rows:
+            group = groups.setdefault(key, {"attempts": 0, "passed": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                            "ratios": 0.0, "compared": 0, "statuses": {}})
+            group["attempts"] += count
+            group["passed"] += passed
+            group["total_ms"] += total_ms
+            group["max_ms"] = max(group["max_ms"], max_ms)
+            group["ratios"] += ratios or 0.0
+            group["compared"] += compared
+            group["statuses"][status] = count
+        return [{
+            group_by: key,
+            "attempts": group["attempts"],
+            "candidates": candidates.get(key, (0, 0))[0],
+            "candidates_passed": candidates.get(key, (0, 0))[1],
+            "pass_rate": round(group["passed"] / group["attempts"], 4),
+            "avg_execution_ms": round(group["total_ms"] / group["attempts"], 1),
+            "max_execution_ms": round(group["max_ms"], 1),
+            "avg_tests_passed": round(group["ratios"] / group["compared"], 4) if group["compared"] else None,
+            "statuses": group["statuses"],
+        } for key, group in sorted(groups.items(), key=lambda item: -item[1]["attempts"])]
+
+    def history(self, candidate_id: str, limit: int = 20) -> List[dict]:
+        """A candidate's recorded results, most recent first."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT a.created_at, a.job_title, r.result FROM assessments a "
+                "JOIN assessment_results r ON r.assessment_id = a.id "
+                "WHERE a.candidate_id = ? ORDER BY a.created_at DESC LIMIT ?", (candidate_id, limit),
+            ).fetchall()
+        return [dict(json.loads(result), created_at=created_at, job_title=job_title)
+                for created_at, job_title, result in rows]
+
+
+_store: Optional[AssessmentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_assessment_store() -> AssessmentStore:
+    """Returns the process-wide assessment store (ASSESSMENTS_DB_PATH overrides its location)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AssessmentStore(Path(os.getenv("ASSESSMENTS_DB_PATH", DEFAULT_ASSESSMENTS_PATH)))
+        return _store
+
+
+if __name__ == "__main__":
+    import sys
+
+    group = sys.argv[1] if len(sys.argv) > 1 else "problem_id"
+    for row in get_assessment_store().summary(group):
+        statuses = ", ".join(f"{status}={count}" for status, count in sorted(row["statuses"].items()))
+        print(f"{str(row[group]):34} {row['attempts']:6} attempts  {row['candidates']:5} candidates  "
+              f"pass rate {row['pass_rate']:.1%}  avg {row['avg_execution_ms']:.0f} ms  [{statuses}]")
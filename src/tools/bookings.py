@@ -0,0 +1,284 @@
+# Interview bookings with conflict-safe local reservations.
+#
+# Before an event is created, its exact [start, end) range is reserved in a
+# local SQLite table. A trigger rejects any insert overlapping a reservation of
+# the same calendar, so two sessions (threads or processes) can never hold
+# overlapping reservations, while back-to-back slots (10:00-10:20, 10:20-11:00)
+# do not conflict. Reservations carry a lease: if a session dies between
+# reserving and booking, its range is freed once the lease expires. Reserved
+# slots are re-checked with a freebusy query (to catch events created outside
+# the app) and the events are then created with a single batch HTTP request.
+# Booked rows are only needed until the calendar shows their event: they are
+# dropped once a freebusy re-check covers them, or when their lease expires.
+
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytz
+
+from .calendar_sync import query_freebusy
+from .scheduling import DEFAULT_TIMEZONE, BusyIndex, busy_cache, parse_calendar_time
+
+# --- Configuration ---
+DEFAULT_BOOKINGS_PATH = Path(__file__).parent.parent.parent / "cache" / "bookings.db"
+DEFAULT_LEASE_SECONDS = 120       # How long a reservation (held or booked) is kept before it can be reclaimed.
+BATCH_MAX_REQUESTS = 50           # Calendar API limit on requests per batch.
+
+
+def _utc(moment: datetime) -> str:
+    # Fixed-width UTC strings compare like the datetimes they represent.
+    return moment.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class ReservationStore:
+    """
+    SQLite-backed slot reservations shared by all sessions on this machine.
+
+    Args:
+        path: SQLite database file.
+        lease_seconds: Lifetime of a reservation that has not been confirmed.
+    """
+
+    def __init__(self, path: Path, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS slot_reservations (
+                    reservation_id TEXT PRIMARY KEY,
+                    calendar_id TEXT NOT NULL,
+                    slot_start TEXT NOT NULL,
+                    slot_end TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    lease_expires REAL,
+                    event_id TEXT
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_slot_calendar ON slot_reservations(calendar_id, slot_start)"
+            )
+            # No two reservations of a calendar may overlap (a range "unique constraint").
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS slot_reservations_no_overlap
+                BEFORE INSERT ON slot_reservations
+                WHEN EXISTS (
+                    SELECT 1 FROM slot_reservations
+                    WHERE calendar_id = NEW.calendar_id AND slot_start < NEW.slot_end AND slot_end > NEW.slot_start
+                )
+                BEGIN
+                    SELECT RAISE(ABORT, 'overlapping reservation');
+                END
+            """)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def reserve(self, calendar_id: str, start: datetime, end: datetime) -> Optional[str]:
+        """
+        Reserves [start, end) on a calendar.
+
+        Returns:
+            The reservation ID, or None if an overlapping reservation is held.
+        """
+        reservation_id = uuid.uuid4().hex
+        now = time.time()
+        slot_start, slot_end = _utc(start), _utc(end)
+        try:
+            with self._transaction() as conn:
+                # Takes the write lock first, so the cleanup and the insert see the same rows.
+                conn.execute("BEGIN IMMEDIATE")
+                # Frees expired leases and past bookings first.
+                conn.execute(
+                    "DELETE FROM slot_reservations WHERE lease_expires < ? OR slot_end < ?",
+                    (now, _utc(datetime.now(dt_timezone.utc))),
+                )
+                conn.execute(
+                    "INSERT INTO slot_reservations (reservation_id, calendar_id, slot_start, slot_end, status, lease_expires) "
+                    "VALUES (?, ?, ?, ?, 'held', ?)",
+                    (reservation_id, calendar_id, slot_start, slot_end, now + self.lease_seconds),
+                )
+            return reservation_id
+        except sqlite3.IntegrityError:
+            return None
+
+    def confirm(self, reservation_id: str, event_id: str) -> None:
+        """Marks a reservation as booked; it is kept for one more lease, until freebusy shows the event."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE slot_reservations SET status = 'booked', lease_expires = ?, event_id = ? WHERE reservation_id = ?",
+                (time.time() + self.lease_seconds, event_id, reservation_id),
+            )
+
+    def release(self, reservation_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM slot_reservations WHERE reservation_id = ?", (reservation_id,))
+
+    def forget_visible(self, calendar_id: str, busy: BusyIndex, start: datetime, end: datetime) -> int:
+        """
+        Drops the booked reservations in [start, end) that the calendar's busy
+        intervals already cover: the freebusy check protects them from now on.
+
+        Returns:
+            Number of reservations dropped.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT reservation_id, slot_start, slot_end FROM slot_reservations "
+                "WHERE calendar_id = ? AND status = 'booked' AND slot_start >= ? AND slot_end <= ?",
+                (calendar_id, _utc(start), _utc(end)),
+            ).fetchall()
+            visible = [
+                (reservation_id,) for reservation_id, slot_start, slot_end in rows
+                if not busy.free_gaps(datetime.fromisoformat(slot_start.replace("Z", "+00:00")),
+                                      datetime.fromisoformat(slot_end.replace("Z", "+00:00")))
+            ]
+            conn.executemany("DELETE FROM slot_reservations WHERE reservation_id = ?", visible)
+        return len(visible)
+
+    def stats(self) -> dict:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM slot_reservations GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+
+_store: Optional[ReservationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_reservation_store() -> ReservationStore:
+    """Returns the process-wide reservation store configured from .env."""
+    global _store
+    with _store_lock:
+        path = Path(os.getenv("BOOKINGS_DB_PATH", DEFAULT_BOOKINGS_PATH))
+        if _store is None or _store.path != path:
+            _store = ReservationStore(path, float(os.getenv("BOOKING_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)))
+        return _store
+
+
+def _error(error_type: str, message: str, **extra) -> dict:
+    return {"status": "error", "type": error_type, "message": message, **extra}
+
+
+def book_slots(service, calendar_id: str, slots: List[Dict[str, str]],
+               store: Optional[ReservationStore] = None, timezone: Optional[str] = None) -> List[dict]:
+    """
+    Books several interview slots on a calendar without double-booking.
+
+    Each slot is reserved locally, re-checked against the calendar with one
+    freebusy query, and the remaining ones are created with one batch request.
+
+    Args:
+        service: Calendar API service.
+        calendar_id: Calendar to book on.
+        slots: Dicts with "start", "end" (ISO with timezone), and optional
+            "summary" and "attendee_email".
+        store: Reservation store (default: the process-wide one).
+        timezone: Time zone of the created events (default: SCHEDULER_TIMEZONE).
+
+    Returns:
+        One result dict per slot, in order: {"status": "success", "event_id", ...}
+        or {"status": "error", "type", "message"}.
+    """
+    store = store or get_reservation_store()
+    timezone = timezone or os.getenv("SCHEDULER_TIMEZONE", DEFAULT_TIMEZONE)
+    tz = pytz.timezone(timezone)
+    now = datetime.now(tz)
+    results: List[Optional[dict]] = [None] * len(slots)
+    held = {}  # index -> (reservation_id, start, end)
+
+    # 1. Local reservations.
+    for i, slot in enumerate(slots):
+        try:
+            start = parse_calendar_time(slot["start"], tz).astimezone(tz)
+            end = parse_calendar_time(slot["end"], tz).astimezone(tz)
+        except (KeyError, ValueError) as e:
+            results[i] = _error("INVALID_DATE", f"Invalid slot {slot}: {e}")
+            continue
+        if end <= start:
+            results[i] = _error("INVALID_DATE", "The end of the slot must be after its start.")
+        elif start < now:
+            results[i] = _error("INVALID_DATE", f"Cannot book in the past. Next available start datetime is after {now.isoformat()}")
+        else:
+            reservation_id = store.reserve(calendar_id, start, end)
+            if reservation_id is None:
+                results[i] = _error("SLOT_UNAVAILABLE", "This slot is being booked in another session. Please pick another slot.")
+            else:
+                held[i] = (reservation_id, start, end)
+
+    # 2. Final check against the calendar, for events created outside this app.
+    if held:
+        try:
+            window_start = min(start for _, start, _ in held.values())
+            window_end = max(end for _, _, end in held.values())
+            busy = BusyIndex(
+                (parse_calendar_time(b["start"], tz), parse_calendar_time(b["end"], tz))
+                for b in query_freebusy(service, [calendar_id], window_start.isoformat(), window_end.isoformat())
+            )
+        except Exception as e:
+            for i, (reservation_id, _, _) in held.items():
+                store.release(reservation_id)
+                results[i] = _error("CALENDAR_API_ERROR", str(e), error_type=type(e).__name__)
+            return results
+        for i in [i for i, (_, start, end) in held.items() if busy.overlaps(start, end)]:
+            store.release(held.pop(i)[0])
+            results[i] = _error("SLOT_UNAVAILABLE", "This slot is no longer free in the calendar. Please pick another slot.")
+        store.forget_visible(calendar_id, busy, window_start, window_end)
+
+    # 3. Batch insert.
+    def on_response(request_id, response, exception):
+        i = int(request_id)
+        reservation_id = held[i][0]
+        if exception is not None:
+            store.release(reservation_id)
+            results[i] = _error("CALENDAR_BOOKING_ERROR", str(exception), error_type=type(exception).__name__)
+            return
+        store.confirm(reservation_id, response.get("id"))
+        results[i] = {
+            "status": "success",
+            "event_id": response.get("id"),
+            "summary": response.get("summary"),
+            "start": response["start"].get("dateTime"),
+            "end": response["end"].get("dateTime"),
+        }
+
+    indexes = sorted(held)
+    for chunk_start in range(0, len(indexes), BATCH_MAX_REQUESTS):
+        batch = service.new_batch_http_request(callback=on_response)
+        for i in indexes[chunk_start:chunk_start + BATCH_MAX_REQUESTS]:
+            _, start, end = held[i]
+            event = {
+                "summary": slots[i].get("summary") or "Interview",
+                "start": {"dateTime": start.isoformat(), "timeZone": timezone},
+                "end": {"dateTime": end.isoformat(), "timeZone": timezone},
+            }
+            if slots[i].get("attendee_email"):
+                event["attendees"] = [{"email": slots[i]["attendee_email"]}]
+            batch.add(service.events().insert(calendarId=calendar_id, body=event), request_id=str(i))
+        try:
+            batch.execute()
+        except Exception as e:
+            for i in indexes[chunk_start:chunk_start + BATCH_MAX_REQUESTS]:
+                if results[i] is None:
+                    store.release(held[i][0])
+                    results[i] = _error("CALENDAR_BOOKING_ERROR", str(e), error_type=type(e).__name__)
+
+    if held:
+        # The cached busy windows no longer reflect the calendar.
+        busy_cache.invalidate(calendar_id)
+    return results
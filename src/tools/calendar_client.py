@@ -0,0 +1,134 @@
+# Google Calendar client shared by the calendar tools.
+#
+# Building the Calendar service used to parse the discovery document and
+# refresh the OAuth token on every tool call. This module keeps one set of
+# credentials per process (the access token is reused until it expires and
+# refreshed by a single thread), loads the static discovery document once,
+# and gives each thread its own service with a persistent HTTP connection
+# (httplib2 transports are not thread-safe, so they are not shared).
+
+import json
+import os
+import threading
+from typing import Optional
+
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+DEFAULT_TOKEN_URI = "https://oauth2.googleapis.com/token"
+HTTP_TIMEOUT_SECONDS = 30
+
+
+class CalendarClient:
+    """
+    Process-wide Calendar API client.
+
+    Args:
+        client_id: OAuth client ID.
+        client_secret: OAuth client secret.
+        refresh_token: Long-lived refresh token.
+        token_uri: OAuth token endpoint (overridable for local fake servers).
+        api_endpoint: Calendar API root URL (overridable for local fake servers).
+    """
+
+    def __init__(self, client_id: str, client_secret: str, refresh_token: str,
+                 token_uri: str = DEFAULT_TOKEN_URI, api_endpoint: Optional[str] = None):
+        # Imported here so the OAuth stack is only loaded when the calendar is used.
+        from google.oauth2.credentials import Credentials
+
+        self.api_endpoint = api_endpoint
+        self._credentials = Credentials(
+            token=None,
+            refresh_token=refresh_token,
+            token_uri=token_uri,
+            client_id=client_id,
+            client_secret=client_secret,
+            scopes=CALENDAR_SCOPES
+        )
+        self._refresh_lock = threading.Lock()
+        self._local = threading.local()
+        self._discovery_doc = None
+        self.token_refreshes = 0
+
+    def _ensure_token(self, http) -> None:
+        """Refreshes the access token if it is missing or about to expire (one thread at a time)."""
+        if self._credentials.valid:
+            return
+        import google_auth_httplib2
+
+        with self._refresh_lock:
+            # Another thread may have refreshed while we were waiting.
+            if not self._credentials.valid:
+                self._credentials.refresh(google_auth_httplib2.Request(http))
+                self.token_refreshes += 1
+
+    def _load_discovery_doc(self) -> dict:
+        if self._discovery_doc is None:
+            from googleapiclient.discovery_cache import get_static_doc
+
+            doc = json.loads(get_static_doc("calendar", "v3"))
+            service_path = doc["servicePath"]
+            if self.api_endpoint and self.api_endpoint.endswith(service_path):
+                # Batch requests are sent to rootUrl + batchPath, which client_options
+                # does not override.
+                doc["rootUrl"] = self.api_endpoint[:-len(service_path)]
+            self._discovery_doc = doc
+        return self._discovery_doc
+
+    def service(self):
+        """Returns this thread's Calendar service, with a valid access token."""
+        import httplib2
+
+        local = self._local
+        if getattr(local, "service", None) is None:
+            import google_auth_httplib2
+            from googleapiclient.discovery import build_from_document
+
+            local.transport = httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+            http = google_auth_httplib2.AuthorizedHttp(self._credentials, http=local.transport)
+            client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+            local.service = build_from_document(
+                self._load_discovery_doc(), http=http, client_options=client_options
+            )
+        self._ensure_token(local.transport)
+        return local.service
+
+
+_client: Optional[CalendarClient] = None
+_client_config: Optional[tuple] = None
+_client_lock = threading.Lock()
+
+
+def get_calendar_client() -> CalendarClient:
+    """
+    Returns the process-wide Calendar client configured from .env.
+    A new client is created if the credentials in the environment change.
+
+    Raises:
+        ValueError: If the OAuth credentials are not configured.
+    """
+    global _client, _client_config
+    config = (
+        os.getenv("GOOGLE_CLIENT_ID"),
+        os.getenv("GOOGLE_CLIENT_SECRET"),
+        os.getenv("GOOGLE_REFRESH_TOKEN"),
+        os.getenv("GOOGLE_TOKEN_URI", DEFAULT_TOKEN_URI),
+        os.getenv("CALENDAR_API_ENDPOINT") or None,
+    )
+    if not all(config[:3]):
+        raise ValueError(
+            "Google Calendar credentials not configured. "
+            "Please set GOOGLE_REFRESH_TOKEN, GOOGLE_CLIENT_ID, and GOOGLE_CLIENT_SECRET in .env file."
+        )
+    with _client_lock:
+        if _client is None or _client_config != config:
+            client_id, client_secret, refresh_token, token_uri, api_endpoint = config
+            _client = CalendarClient(client_id, client_secret, refresh_token, token_uri, api_endpoint)
+            _client_config = config
+        return _client
+
+
+def reset_calendar_client() -> None:
+    """Drops the cached client (e.g. after rotating credentials)."""
+    global _client, _client_config
+    with _client_lock:
+        _client = None
+        _client_config = None
@@ -0,0 +1,188 @@
+# Busy-time sources for the calendar tools.
+#
+# - freebusy: one freebusy().query request for up to 50 calendars, returning
+#   only merged busy intervals (no summaries, no paging).
+# - sync: a local mirror of each calendar kept up to date with events.list
+#   sync tokens. The first lookup downloads the calendar once; later lookups
+#   only transfer the events that changed. When Google expires a sync token
+#   (HTTP 410 Gone) the mirror is rebuilt with a full sync.
+
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FREEBUSY_MAX_CALENDARS = 50     # API limit on calendars per freebusy request.
+SYNC_PAGE_SIZE = 2500           # Maximum events per events.list page.
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def query_freebusy(service, calendar_ids: List[str], start: str, end: str) -> List[dict]:
+    """
+    Returns the busy intervals of several calendars with freebusy().query.
+
+    Args:
+        service: Calendar API service.
+        calendar_ids: Calendars to query (batched by 50 per request).
+        start: ISO start of the window.
+        end: ISO end of the window.
+
+    Returns:
+        List of {"start", "end", "calendar"} dicts.
+
+    Raises:
+        RuntimeError: If the API reports an error for one of the calendars.
+    """
+    busy_slots = []
+    for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+        chunk = calendar_ids[i:i + FREEBUSY_MAX_CALENDARS]
+        response = service.freebusy().query(body={
+            "timeMin": start,
+            "timeMax": end,
+            "items": [{"id": calendar_id} for calendar_id in chunk],
+        }).execute()
+        for calendar_id, calendar in response.get("calendars", {}).items():
+            if calendar.get("errors"):
+                reasons = ", ".join(error.get("reason", "unknown") for error in calendar["errors"])
+                raise RuntimeError(f"freebusy query failed for {calendar_id}: {reasons}")
+            busy_slots.extend(
+                {"start": slot["start"], "end": slot["end"], "calendar": calendar_id}
+                for slot in calendar.get("busy", [])
+            )
+    return busy_slots
+
+
+class CalendarMirror:
+    """
+    Local copy of a calendar's events, kept current with sync tokens.
+
+    Args:
+        calendar_id: Calendar to mirror.
+    """
+
+    def __init__(self, calendar_id: str):
+        self.calendar_id = calendar_id
+        self.events: Dict[str, dict] = {}
+        self.sync_token: Optional[str] = None
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.expired_tokens = 0
+        self.events_received = 0
+        self._lock = threading.Lock()
+
+    def _list_pages(self, service, sync_token: Optional[str]):
+        page_token = None
+        while True:
+            params = {"calendarId": self.calendar_id, "singleEvents": True, "maxResults": SYNC_PAGE_SIZE}
+            if sync_token:
+                params["syncToken"] = sync_token
+            if page_token:
+                params["pageToken"] = page_token
+            response = service.events().list(**params).execute()
+            yield response
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    def _apply(self, events: Dict[str, dict], items: list) -> None:
+        for event in items:
+            self.events_received += 1
+            if event.get("status") == "cancelled":
+                events.pop(event["id"], None)
+                continue
+            events[event["id"]] = {
+                "start": event["start"].get("dateTime", event["start"].get("date")),
+                "end": event["end"].get("dateTime", event["end"].get("date")),
+                "summary": event.get("summary", ""),
+                "transparent": event.get("transparency") == "transparent",
+            }
+
+    def _full_sync(self, service) -> None:
+        events: Dict[str, dict] = {}
+        sync_token = None
+        for response in self._list_pages(service, None):
+            self._apply(events, response.get("items", []))
+            sync_token = response.get("nextSyncToken", sync_token)
+        self.events, self.sync_token = events, sync_token
+        self.full_syncs += 1
+
+    def sync(self, service) -> None:
+        """Brings the mirror up to date (full sync first, then deltas only)."""
+        from googleapiclient.errors import HttpError
+
+        with self._lock:
+            if self.sync_token is None:
+                self._full_sync(service)
+                return
+            try:
+                # Deltas are applied to a copy, so a failure mid-way leaves the mirror consistent.
+                events = dict(self.events)
+                sync_token = self.sync_token
+                for response in self._list_pages(service, self.sync_token):
+                    self._apply(events, response.get("items", []))
+                    sync_token = response.get("nextSyncToken", sync_token)
+                self.events, self.sync_token = events, sync_token
+                self.incremental_syncs += 1
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                # Sync token expired: the mirror must be rebuilt.
+                self.expired_tokens += 1
+                logger.info("Sync token expired for %s, running a full sync", self.calendar_id)
+                self._full_sync(service)
+
+    def busy(self, start: str, end: str) -> List[dict]:
+        """Returns the mirrored busy events overlapping [start, end), sorted by start."""
+        window_start, window_end = _parse_iso(start), _parse_iso(end)
+        busy_slots = []
+        with self._lock:
+            events = list(self.events.values())
+        for event in events:
+            if event["transparent"]:
+                continue
+            if len(event["start"]) == 10:
+                # All-day events (dates without time zone, end exclusive) span midnight to midnight.
+                event_start, event_end = (datetime.fromisoformat(event[key]).replace(tzinfo=window_start.tzinfo)
+                                          for key in ("start", "end"))
+            else:
+                event_start, event_end = _parse_iso(event["start"]), _parse_iso(event["end"])
+            if event_end > window_start and event_start < window_end:
+                busy_slots.append({"start": event["start"], "end": event["end"], "summary": event["summary"]})
+        def sort_key(slot):
+            if len(slot["start"]) == 10:
+                return datetime.fromisoformat(slot["start"]).replace(tzinfo=window_start.tzinfo)
+            return _parse_iso(slot["start"])
+
+        return sorted(busy_slots, key=sort_key)
+
+    def stats(self) -> dict:
+        return {
+            "events": len(self.events),
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "expired_tokens": self.expired_tokens,
+            "events_received": self.events_received,
+        }
+
+
+_mirrors: Dict[str, CalendarMirror] = {}
+_mirrors_lock = threading.Lock()
+
+
+def get_calendar_mirror(calendar_id: str) -> CalendarMirror:
+    """Returns the process-wide mirror of a calendar."""
+    with _mirrors_lock:
+        if calendar_id not in _mirrors:
+            _mirrors[calendar_id] = CalendarMirror(calendar_id)
+        return _mirrors[calendar_id]
+
+
+def reset_calendar_mirrors() -> None:
+    """Drops all mirrors (the next lookup does a full sync)."""
+    with _mirrors_lock:
+        _mirrors.clear()
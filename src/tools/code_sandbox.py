@@ -1,11 +1,26 @@
 import multiprocessing
 import sys
 import io
+import os
+import codecs
 import contextlib
+import hashlib
+import logging
+import shutil
+import signal
+import sqlite3
+import subprocess
+import tempfile
+import threading
 import time
 import traceback
 import re
 import platform
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
 
 # Set the multiprocessing start method for better compatibility
 # This prevents issues with Streamlit and macOS/Linux
@@ -31,8 +46,75 @@ except ImportError:
 # --- Configuration ---
 DEFAULT_TIMEOUT_SECONDS = 3  
 DEFAULT_MEMORY_LIMIT_MB = 128 # Default memory limit in Megabytes
+DEFAULT_MAX_OUTPUT_BYTES = 256 * 1024  # Captured stdout kept per run (head + tail), in characters
+
+
+def max_output_bytes() -> int:
+    return int(os.getenv("SANDBOX_MAX_OUTPUT_BYTES", DEFAULT_MAX_OUTPUT_BYTES))
+
+
+class BoundedOutput(io.TextIOBase):
+    """
+    Memory-bounded stdout capture. Keeps the first half of the cap and a ring
+    buffer of the most recent output for the other half; the output in between
+    is dropped and replaced by a truncation marker in getvalue(). Sizes are
+    counted in characters (bytes for ASCII output), so write() stays cheap.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self._head = []
+        self._head_room = self.head_limit
+        self._tail = deque()
+        self._tail_size = 0
+        self.total_size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        size = len(text)
+        self.total_size += size
+        if self._head_room:
+            kept = text[:self._head_room]
+            self._head.append(kept)
+            self._head_room -= len(kept)
+            text = text[len(kept):]
+            if not text:
+                return size
+        text = text[-self.tail_limit:] if self.tail_limit else ""
+        tail = self._tail
+        tail.append(text)
+        self._tail_size += len(text)
+        # Whole chunks are dropped; getvalue trims the oldest one to the cap.
+        while self._tail_size - len(tail[0]) >= self.tail_limit:
+            self._tail_size -= len(tail.popleft())
+        return size
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_size > self.head_limit + self.tail_limit
+
+    def getvalue(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)[-self.tail_limit:] if self.tail_limit else ""
+        if not self.truncated:
+            return head + tail
+        dropped = self.total_size - len(head) - len(tail)
+        return f"{head}\n... [output truncated: {dropped} characters omitted] ...\n{tail}"
 
-def _unsafe_execute(code, return_dict, memory_limit_mb):
+
+def _address_space_in_use() -> int:
+    """Bytes of address space mapped by this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _unsafe_execute(code, return_dict, memory_limit_mb, output_limit=DEFAULT_MAX_OUTPUT_BYTES):
     """
     Internal function running inside the separate process.
     Captures stdout, handles execution scope, and sets resource limits.
@@ -41,8 +123,10 @@ def _unsafe_execute(code, return_dict, memory_limit_mb):
     # --- Set Resource Limits (if on Unix) ---
     if IS_UNIX:
         try:
-            # Set memory limit (in bytes)
-            memory_bytes = memory_limit_mb * 1024 * 1024
+            # Set memory limit (in bytes), on top of what the forked child inherits:
+            # a parent that imported the agent framework already maps more than
+            # the limit, which would leave submissions no memory at all.
+            memory_bytes = _address_space_in_use() + memory_limit_mb * 1024 * 1024
             resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
         except (ValueError, OSError) as e:
             # On macOS, setrlimit may fail with "current limit exceeds maximum limit"
@@ -53,7 +137,10 @@ def _unsafe_execute(code, return_dict, memory_limit_mb):
         # that aren't simple infinite loops. The p.join() timeout is still the primary guard.
         # resource.setrlimit(resource.RLIMIT_CPU, (TIMEOUT_SECONDS, TIMEOUT_SECONDS))
 
-    output_capture = io.StringIO()
+    # Bounded: a submission printing in a loop cannot exhaust memory or flood the result.
+    output_capture = BoundedOutput(output_limit)
+    safe_globals = {}
+    cpu_start = time.process_time()
     
     try:
         # Capture stdout/print statements
@@ -68,53 +155,38 @@ def _unsafe_execute(code, return_dict, memory_limit_mb):
                 "sorted": sorted, "enumerate": enumerate, "zip": zip,
                 "reversed": reversed  # Added for common algorithmic patterns
             }
-            safe_globals = {"__builtins__": safe_builtins}
+            safe_globals["__builtins__"] = safe_builtins
             exec(code, safe_globals)
             
         return_dict["output"] = output_capture.getvalue()
+        return_dict["output_truncated"] = output_capture.truncated
         return_dict["status"] = "success"
         
     except MemoryError:
+        # Frees the submission's objects so the captured output can be assembled.
+        safe_globals.clear()
         return_dict["output"] = output_capture.getvalue()
+        return_dict["output_truncated"] = output_capture.truncated
         return_dict["status"] = "memory_error"
         return_dict["error_msg"] = f"Memory usage exceeded the limit of {memory_limit_mb}MB."
     except Exception as e:
         return_dict["output"] = output_capture.getvalue()
+        return_dict["output_truncated"] = output_capture.truncated
         return_dict["status"] = "error"
         return_dict["error_msg"] = traceback.format_exc()
+    finally:
+        return_dict["cpu_time"] = round(time.process_time() - cpu_start, 4)
 
-def execute_code(code_string: str, timeout: int = DEFAULT_TIMEOUT_SECONDS) -> dict:
-    """
-    THE MAIN TOOL: Called by the Agent.
-    Manages the Sandbox (Process), Timeout logic, and Resource Limits.
-    
-    Args:
-        code_string (str): The Python code to execute.
-        timeout (int): The maximum execution time in seconds.
-        
-    Returns:
-        dict: Contains 'status', 'output', 'error_msg', and 'execution_time'.
-    """
-    
-    # 1. Improved Security Scan (static check for obvious malicious keywords)
-    # This is a fast-path rejection. The primary security comes from the restricted __builtins__.
-    forbidden_keywords = ["import", "os", "sys", "subprocess", "open", "input", "eval", "exec", "compile", "__"]
-    # Use regex to find whole words to avoid false positives on variable names
-    for keyword in forbidden_keywords:
-        if re.search(r'\b' + keyword + r'\b', code_string):
-            return {
-                "status": "security_violation", 
-                "output": f"Forbidden keyword detected: '{keyword}'",
-                "error_msg": "Security Policy Violation: Use of potentially unsafe keywords is not allowed.",
-                "execution_time": 0.0
-            }
-
+def _execute_python(code_string: str, timeout: int, memory_limit_mb: int) -> dict:
+    """Runs Python code in a forked process (see _unsafe_execute)."""
     # 2. Prepare the separate Process
     manager = multiprocessing.Manager()
     return_dict = manager.dict()
     
     # Create the Process (the "sandbox environment")
-    p = multiprocessing.Process(target=_unsafe_execute, args=(code_string, return_dict, DEFAULT_MEMORY_LIMIT_MB))
+    p = multiprocessing.Process(
+        target=_unsafe_execute, args=(code_string, return_dict, memory_limit_mb, max_output_bytes())
+    )
     
     # 3. Execution and Time Monitoring
     start_time = time.time()
@@ -141,7 +213,737 @@ def execute_code(code_string: str, timeout: int = DEFAULT_TIMEOUT_SECONDS) -> di
         "status": return_dict.get("status", "unknown_error"),
         "output": return_dict.get("output", "").strip(),
         "error_msg": return_dict.get("error_msg", None),
-        "execution_time": execution_time
+        "execution_time": execution_time,
+        "output_truncated": return_dict.get("output_truncated", False),
+        "cpu_time": return_dict.get("cpu_time"),
     }
     
-    return result
\ No newline at end of file
+    return result
+
+
+# =============================================================================
+# Language Runners
+# =============================================================================
+# Every language is served by a Runner with the same contract as the Python
+# sandbox: a wall-clock timeout, a memory limit, bounded output and the result
+# dict of execute_code (status, output, error_msg, execution_time,
+# output_truncated). Interpreters and compiled programs run as separate
+# processes under rlimits; SQL runs in-process on a private in-memory SQLite
+# database.
+
+SANDBOX_CACHE_DIR = Path(os.getenv("SANDBOX_CACHE_DIR", Path(__file__).parent.parent.parent / "cache" / "sandbox"))
+DEFAULT_WARM_WORKERS = 2            # Pre-started interpreter processes per runner.
+DEFAULT_COMPILE_TIMEOUT_SECONDS = 30
+DEFAULT_GO_CACHE_ENTRIES = 256      # Compiled Go programs kept on disk.
+MAX_CPU_SECONDS = 30                # RLIMIT_CPU backstop; the wall-clock timeout is the primary guard.
+STDERR_LIMIT = 16 * 1024
+
+LANGUAGE_ALIASES = {
+    "py": "python", "python3": "python",
+    "js": "javascript", "node": "javascript", "nodejs": "javascript",
+    "golang": "go",
+    "sqlite": "sql", "sqlite3": "sql",
+}
+
+
+def _timeout_result(timeout, execution_time) -> dict:
+    return {
+        "status": "timeout",
+        "output": "",
+        "error_msg": f"Code execution exceeded the {timeout} seconds time limit.",
+        "execution_time": execution_time,
+        "output_truncated": False,
+    }
+
+
+def _memory_error_msg(memory_limit_mb) -> str:
+    return f"Memory usage exceeded the limit of {memory_limit_mb}MB."
+
+
+def _limit_resources(memory_limit_mb: int):
+    """
+    preexec_fn for runner processes. RLIMIT_DATA rather than RLIMIT_AS: the Go
+    and V8 runtimes reserve far more address space than they use and refuse to
+    start under a 128MB RLIMIT_AS, while RLIMIT_DATA bounds what they allocate.
+    """
+    if not IS_UNIX:
+        return None
+
+    def apply():
+        memory_bytes = memory_limit_mb * 1024 * 1024
+        for limit, value in (
+            (resource.RLIMIT_DATA, memory_bytes),
+            (resource.RLIMIT_CPU, MAX_CPU_SECONDS),
+            (resource.RLIMIT_FSIZE, 0),  # Submissions never write files.
+            (resource.RLIMIT_CORE, 0),
+        ):
+            try:
+                resource.setrlimit(limit, (value, value))
+            except (ValueError, OSError):
+                pass  # See _unsafe_execute: rely on the timeout where a limit is refused.
+    return apply
+
+
+def _drain(stream, sink: BoundedOutput) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in iter(lambda: stream.read(65536), b""):
+        sink.write(decoder.decode(chunk))
+    sink.write(decoder.decode(b"", final=True))
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)  # The process group: includes anything it spawned.
+    except (OSError, AttributeError):
+        proc.kill()
+    proc.wait()
+
+
+def _run_process(proc: subprocess.Popen, stdin_data: Optional[bytes], timeout: int, memory_limit_mb: int,
+                 memory_signals: tuple = ()) -> dict:
+    """
+    Feeds a started process its input, collects bounded stdout/stderr and
+    enforces the wall-clock timeout. Returns the execute_code result dict.
+    `memory_signals` are signals the runtime dies of when an allocation is refused.
+    """
+    stdout, stderr = BoundedOutput(max_output_bytes()), BoundedOutput(STDERR_LIMIT)
+    readers = [threading.Thread(target=_drain, args=(proc.stdout, stdout), daemon=True),
+               threading.Thread(target=_drain, args=(proc.stderr, stderr), daemon=True)]
+    start_time = time.time()
+    for reader in readers:
+        reader.start()
+    try:
+        if stdin_data is not None:
+            proc.stdin.write(stdin_data)
+        proc.stdin.close()
+    except (BrokenPipeError, OSError, AttributeError):
+        pass  # Exited early (or no stdin): the return code tells why.
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        _kill(proc)
+        return _timeout_result(timeout, round(time.time() - start_time, 4))
+    for reader in readers:
+        reader.join(1)
+    execution_time = round(time.time() - start_time, 4)
+
+    errors = stderr.getvalue().strip()
+    result = {
+        "status": "success",
+        "output": stdout.getvalue().strip(),
+        "error_msg": None,
+        "execution_time": execution_time,
+        "output_truncated": stdout.truncated,
+    }
+    if IS_UNIX and proc.returncode == -signal.SIGXCPU:
+        return _timeout_result(timeout, execution_time)
+    if any(marker in errors.lower() for marker in ("out of memory", "cannot allocate memory")) \
+            or -proc.returncode in memory_signals:
+        result.update(status="memory_error", error_msg=_memory_error_msg(memory_limit_mb))
+    elif proc.returncode != 0:
+        result.update(status="error", error_msg=errors or f"Process exited with code {proc.returncode}.")
+    return result
+
+
+class WarmPool:
+    """
+    Pre-started single-use worker processes. A worker is spawned (interpreter
+    loaded, resource limits applied) before it is needed and waits for its
+    program on stdin; each submission takes one and a replacement is started in
+    the background, so the interpreter start-up is off the request path while
+    every submission still gets a fresh process.
+
+    Args:
+        spawn: Starts one worker process.
+        size: Idle workers to keep (0 starts every worker on demand).
+    """
+
+    def __init__(self, spawn: Callable[[], subprocess.Popen], size: int = DEFAULT_WARM_WORKERS):
+        self._spawn = spawn
+        self.size = max(0, size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._filling = False
+        self._stats = {"warm": 0, "cold": 0, "spawn_errors": 0}
+
+    def acquire(self) -> subprocess.Popen:
+        proc = None
+        with self._lock:
+            while self._idle and proc is None:
+                candidate = self._idle.popleft()
+                if candidate.poll() is None:
+                    proc = candidate
+            self._stats["warm" if proc is not None else "cold"] += 1
+        if proc is None:
+            proc = self._spawn()
+        self.fill(background=True)
+        return proc
+
+    def fill(self, background: bool = False) -> None:
+        """Starts workers until `size` are idle."""
+        with self._lock:
+            if self._filling or len(self._idle) >= self.size:
+                return
+            self._filling = True
+        if background:
+            threading.Thread(target=self._fill, daemon=True).start()
+        else:
+            self._fill()
+
+    def _fill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if len(self._idle) >= self.size:
+                        return
+                proc = self._spawn()
+                with self._lock:
+                    self._idle.append(proc)
+        except OSError as e:
+            with self._lock:
+                self._stats["spawn_errors"] += 1
+            logger.warning("Could not start sandbox worker: %r", e)
+        finally:
+            with self._lock:
+                self._filling = False
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for proc in idle:
+            _kill(proc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, idle=len(self._idle))
+        total = stats["warm"] + stats["cold"]
+        stats["hit_rate"] = round(stats["warm"] / total, 4) if total else 0.0
+        return stats
+
+
+class Runner:
+    """
+    Executes submissions in one language. Subclasses implement run(); check()
+    is the language's fast static rejection (as the keyword scan for Python).
+    """
+
+    language = ""
+
+    def available(self) -> bool:
+        """Whether the toolchain is installed."""
+        return True
+
+    def check(self, code: str) -> Optional[str]:
+        """Returns a description of a forbidden construct, or None."""
+        return None
+
+    def run(self, code: str, timeout: int, memory_limit_mb: int, **options) -> dict:
+        """Executes `code`; `options` are runner-specific (e.g. the dataset of an SQL problem)."""
+        raise NotImplementedError
+
+    def warm_up(self) -> None:
+        """Prepares the runner (pre-started workers, build caches) ahead of the first submission."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class PythonRunner(Runner):
+    """Restricted exec() in a forked process (the original sandbox)."""
+
+    language = "python"
+    forbidden_keywords = ["import", "os", "sys", "subprocess", "open", "input", "eval", "exec", "compile", "__"]
+
+    def check(self, code):
+        # 1. Improved Security Scan (static check for obvious malicious keywords)
+        # This is a fast-path rejection. The primary security comes from the restricted __builtins__.
+        # Use regex to find whole words to avoid false positives on variable names
+        for keyword in self.forbidden_keywords:
+            if re.search(r'\b' + keyword + r'\b', code):
+                return f"Forbidden keyword detected: '{keyword}'"
+        return None
+
+    def run(self, code, timeout, memory_limit_mb, **options):
+        return _execute_python(code, timeout, memory_limit_mb)
+
+
+# Reads the program from stdin and runs it in an empty vm context: no require,
+# no process, only console. With code generation from strings disallowed, the
+# usual escape (this.constructor.constructor("return process")) throws.
+NODE_BOOTSTRAP = r"""
+const vm = require('vm');
+const util = require('util');
+const chunks = [];
+process.stdin.on('data', (chunk) => chunks.push(chunk));
+process.stdin.on('end', () => {
+  const code = Buffer.concat(chunks).toString('utf8');
+  if (!code) return;
+  const log = (...args) => { process.stdout.write(util.format(...args) + '\n'); };
+  try {
+    vm.runInNewContext(code, { console: { log, info: log, warn: log, error: log } }, { filename: 'solution.js' });
+  } catch (e) {
+    process.stderr.write(String((e && e.stack) || e) + '\n');
+    process.exitCode = 1;
+  }
+});
+"""
+
+
+class NodeRunner(Runner):
+    """JavaScript on Node.js, in a vm context of a pre-started worker process."""
+
+    language = "javascript"
+    forbidden_patterns = [
+        (r"\b(require|process|import|eval|Function|globalThis|module|exports|Reflect)\b", None),
+        (r"\.\s*constructor\b|\[\s*['\"`]constructor", "constructor"),
+        (r"__proto__", None),
+    ]
+
+    def __init__(self, binary: str = "node", warm_workers: int = DEFAULT_WARM_WORKERS):
+        self.binary = binary
+        self.warm_workers = warm_workers
+        self._pool: Optional[WarmPool] = None
+        self._pool_lock = threading.Lock()
+
+    def available(self):
+        return shutil.which(self.binary) is not None
+
+    def check(self, code):
+        for pattern, label in self.forbidden_patterns:
+            match = re.search(pattern, code)
+            if match:
+                return f"Forbidden keyword detected: '{label or match.group(0)}'"
+        return None
+
+    def _spawn(self, memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB) -> subprocess.Popen:
+        return subprocess.Popen(
+            [self.binary, f"--max-old-space-size={memory_limit_mb}", "--disallow-code-generation-from-strings",
+             "-e", NODE_BOOTSTRAP],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            env={"PATH": os.environ.get("PATH", "")}, cwd=tempfile.gettempdir(),
+            preexec_fn=_limit_resources(memory_limit_mb), start_new_session=True,
+        )
+
+    def pool(self) -> WarmPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = WarmPool(self._spawn, self.warm_workers)
+            return self._pool
+
+    def run(self, code, timeout, memory_limit_mb, **options):
+        # Pre-started workers carry the default limit; other limits get a fresh process.
+        proc = self.pool().acquire() if memory_limit_mb == DEFAULT_MEMORY_LIMIT_MB else self._spawn(memory_limit_mb)
+        # V8 crashes rather than throwing when RLIMIT_DATA refuses an allocation.
+        return _run_process(proc, code.encode("utf-8"), timeout, memory_limit_mb,
+                            memory_signals=(signal.SIGSEGV, signal.SIGABRT) if IS_UNIX else ())
+
+    def warm_up(self):
+        self.pool().fill()
+
+    def stats(self):
+        return self.pool().stats() if self._pool is not None else {}
+
+
+class GoRunner(Runner):
+    """
+    Go programs (package main), compiled once per distinct source: binaries are
+    cached on disk by a hash of the source and the toolchain version, and the
+    toolchain's own build cache keeps the standard library compiled, so a
+    resubmission only pays the process start.
+    """
+
+    language = "go"
+    allowed_imports = {
+        "fmt", "strings", "strconv", "sort", "math", "math/bits", "errors", "unicode", "unicode/utf8",
+        "bytes", "container/heap", "container/list", "slices", "maps", "regexp", "time",
+    }
+
+    def __init__(self, binary: str = "go", cache_dir: Path = SANDBOX_CACHE_DIR / "go",
+                 max_entries: int = DEFAULT_GO_CACHE_ENTRIES):
+        self.binary = binary
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self._version: Optional[str] = None
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {"compiled": 0, "cache_hits": 0, "compile_errors": 0}
+
+    def available(self):
+        return shutil.which(self.binary) is not None
+
+    def check(self, code):
+        if re.search(r"//\s*go:|\bunsafe\b|\bsyscall\b", code):
+            return "Forbidden keyword detected: compiler directives, unsafe and syscall are not allowed"
+        imports = []
+        for block in re.findall(r"\bimport\s*\(([^)]*)\)", code):
+            imports += re.findall(r'"([^"]+)"', block)
+        imports += re.findall(r'\bimport\s+(?:[\w.]+\s+)?"([^"]+)"', code)
+        for package in imports:
+            if package not in self.allowed_imports:
+                return f"Forbidden import: '{package}'"
+        return None
+
+    def _env(self) -> dict:
+        return {
+            "PATH": os.environ.get("PATH", ""),
+            "HOME": os.environ.get("HOME", tempfile.gettempdir()),
+            "GOCACHE": str(self.cache_dir / "build"),
+            "GOPATH": str(self.cache_dir / "gopath"),
+            "CGO_ENABLED": "0",
+            "GOPROXY": "off",
+            "GOTOOLCHAIN": "local",
+            "GOFLAGS": "-trimpath",
+        }
+
+    def version(self) -> str:
+        if self._version is None:
+            self._version = subprocess.run([self.binary, "version"], capture_output=True, text=True,
+                                           env=self._env()).stdout.strip()
+        return self._version
+
+    def compile(self, code: str) -> tuple:
+        """
+        Returns (binary path, None, cached) or (None, compiler errors, False).
+        Concurrent submissions of the same source compile it once.
+        """
+        key = hashlib.sha256(f"{self.version()}\0{code}".encode("utf-8")).hexdigest()[:32]
+        binary = self.cache_dir / "bin" / key
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                if binary.exists():
+                    os.utime(binary)  # Recency for eviction.
+                    with self._lock:
+                        self._stats["cache_hits"] += 1
+                    return binary, None, True
+                errors = self._build(code, binary)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        with self._lock:
+            self._stats["compile_errors" if errors else "compiled"] += 1
+        if errors:
+            return None, errors, False
+        self._evict()
+        return binary, None, False
+
+    def _build(self, code: str, binary: Path) -> Optional[str]:
+        """Compiles `code` to `binary`; returns the compiler errors, or None."""
+        binary.parent.mkdir(parents=True, exist_ok=True)
+        partial = binary.with_name(f".{binary.name}.{threading.get_ident()}.tmp")
+        with tempfile.TemporaryDirectory(prefix="go-src-") as tmp:
+            (Path(tmp) / "main.go").write_text(code, encoding="utf-8")
+            try:
+                build = subprocess.run(
+                    [self.binary, "build", "-o", str(partial), "main.go"], cwd=tmp,
+                    capture_output=True, text=True, env=self._env(), timeout=DEFAULT_COMPILE_TIMEOUT_SECONDS,
+                )
+            except subprocess.TimeoutExpired:
+                return f"Compilation exceeded {DEFAULT_COMPILE_TIMEOUT_SECONDS} seconds."
+            if build.returncode != 0:
+                return build.stderr.replace(tmp + os.sep, "").strip()[:STDERR_LIMIT] or "Compilation failed."
+        os.replace(partial, binary)
+        return None
+
+    def _evict(self) -> None:
+        binaries = sorted((self.cache_dir / "bin").iterdir(), key=lambda path: path.stat().st_mtime)
+        for path in binaries[:max(0, len(binaries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def run(self, code, timeout, memory_limit_mb, **options):
+        start_time = time.time()
+        binary, errors, cached = self.compile(code)
+        compile_time = round(time.time() - start_time, 4)
+        if binary is None:
+            return {"status": "error", "output": "", "error_msg": f"Compilation failed:\n{errors}",
+                    "execution_time": 0.0, "output_truncated": False, "compile_time": compile_time}
+        proc = subprocess.Popen(
+            [str(binary)], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            env={"GOMAXPROCS": "1"}, cwd=tempfile.gettempdir(),
+            preexec_fn=_limit_resources(memory_limit_mb), start_new_session=True,
+        )
+        result = _run_process(proc, None, timeout, memory_limit_mb)
+        result.update(compile_time=compile_time, compile_cached=cached)
+        return result
+
+    def warm_up(self):
+        # Fills the toolchain's build cache with the standard library packages.
+        self.compile('package main\n\nimport "fmt"\n\nfunc main() { fmt.Println("ok") }\n')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["compiled"] + stats["cache_hits"]
+        stats["hit_rate"] = round(stats["cache_hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Pragmas a query may read; anything else could lift the limits below.
+SQL_ALLOWED_PRAGMAS = {"table_info", "table_xinfo", "table_list", "index_list", "index_info", "foreign_key_list"}
+
+
+def split_sql(script: str) -> List[str]:
+    """Splits a script into complete statements."""
+    statements, current = [], ""
+    for piece in script.split(";"):
+        current += piece + ";"
+        if sqlite3.complete_statement(current):
+            if current.strip(" \t\r\n;"):
+                statements.append(current.strip())
+            current = ""
+    if current.strip(" \t\r\n;"):
+        statements.append(current.strip().rstrip(";"))
+    return statements
+
+
+def format_sql_value(value) -> str:
+    return "NULL" if value is None else str(value)
+
+
+class SQLiteRunner(Runner):
+    """
+    SQL statements on a private in-memory SQLite database, in-process: the
+    timeout is a progress handler, the memory limit a page count cap, and an
+    authorizer denies ATTACH (files), extensions and limit-changing pragmas.
+    Rows of each statement are printed one per line, columns joined by "|".
+
+    Problems with data register a dataset (a setup script). Its template
+    database is built once, on first use; every run gets a private copy made
+    with the backup API, which copies pages instead of replaying the script.
+    """
+
+    language = "sql"
+    progress_interval = 100  # Virtual machine instructions between progress handler calls.
+
+    def __init__(self):
+        self._datasets: Dict[str, str] = {}
+        self._templates: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self._stats = {"snapshots": 0, "templates_built": 0}
+
+    def register_dataset(self, name: str, script: str) -> None:
+        """Adds (or replaces) a dataset; its template is rebuilt on next use."""
+        with self._lock:
+            if self._datasets.get(name) == script:
+                return
+            self._datasets[name] = script
+            template = self._templates.pop(name, None)
+        if template is not None:
+            template.close()
+
+    def datasets(self) -> List[str]:
+        return list(self._datasets)
+
+    def dataset_digest(self, name: str) -> Optional[str]:
+        """Hash of a dataset's setup script (None if unknown), e.g. to version outputs computed on it."""
+        script = self._datasets.get(name)
+        return hashlib.sha256(script.encode("utf-8")).hexdigest() if script is not None else None
+
+    def _template(self, name: str) -> sqlite3.Connection:
+        # Called with the lock held: the template connection is shared between threads.
+        template = self._templates.get(name)
+        if template is None:
+            if name not in self._datasets:
+                raise KeyError(f"Unknown SQL dataset: '{name}'")
+            template = sqlite3.connect(":memory:", check_same_thread=False)
+            template.executescript(self._datasets[name])
+            template.execute("ANALYZE")  # Statistics for the planner, copied into every snapshot.
+            self._templates[name] = template
+            self._stats["templates_built"] += 1
+        return template
+
+    def connect(self, dataset: Optional[str] = None) -> sqlite3.Connection:
+        """The database a submission runs against: empty, or a copy of a dataset's template."""
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        if dataset is not None:
+            with self._lock:
+                self._template(dataset).backup(conn)
+                self._stats["snapshots"] += 1
+        return conn
+
+    @staticmethod
+    def _authorize(action, arg1, arg2, db_name, trigger):
+        if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+            return sqlite3.SQLITE_DENY
+        if action == sqlite3.SQLITE_PRAGMA and arg1 not in SQL_ALLOWED_PRAGMAS:
+            return sqlite3.SQLITE_DENY
+        if action == sqlite3.SQLITE_FUNCTION and arg2 == "load_extension":
+            return sqlite3.SQLITE_DENY
+        return sqlite3.SQLITE_OK
+
+    def execute(self, conn: sqlite3.Connection, code: str, timeout: float,
+                memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB) -> dict:
+        """
+        Runs a script on `conn` under the sandbox limits. Returns the execute_code
+        result dict plus `vm_steps` (virtual machine instructions executed, to the
+        nearest progress_interval) and `query_plan` (EXPLAIN QUERY PLAN of the
+        last statement returning rows).
+        """
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        conn.execute(f"PRAGMA max_page_count = {memory_limit_mb * 1024 * 1024 // page_size}")
+        conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, max_output_bytes() * 4)
+        conn.set_authorizer(self._authorize)
+        start_time = time.time()
+        deadline = time.monotonic() + timeout
+        steps = [0]
+
+        def progress():
+            steps[0] += 1
+            return time.monotonic() > deadline  # A true value interrupts the statement.
+
+        conn.set_progress_handler(progress, self.progress_interval)
+
+        output = BoundedOutput(max_output_bytes())
+        result = {"status": "success", "output": "", "error_msg": None, "output_truncated": False}
+        last_query = None
+        try:
+            for number, statement in enumerate(split_sql(code), start=1):
+                try:
+                    cursor = conn.execute(statement)
+                    if cursor.description is not None:
+                        last_query = statement
+                    for row in cursor:
+                        output.write("|".join(format_sql_value(value) for value in row) + "\n")
+                except sqlite3.Error as e:
+                    message = str(e)
+                    if message == "interrupted":
+                        return _timeout_result(timeout, round(time.time() - start_time, 4))
+                    if "full" in message or "too big" in message:
+                        result.update(status="memory_error", error_msg=_memory_error_msg(memory_limit_mb))
+                    else:
+                        result.update(status="error", error_msg=f"Statement {number}: {type(e).__name__}: {message}")
+                    break
+            execution_time = round(time.time() - start_time, 4)
+            conn.set_progress_handler(None, 0)
+            if result["status"] == "success" and last_query is not None:
+                result["query_plan"] = self.query_plan(conn, last_query)
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.set_authorizer(None)
+        result.update(output=output.getvalue().strip(), output_truncated=output.truncated,
+                      execution_time=execution_time, vm_steps=steps[0] * self.progress_interval)
+        return result
+
+    @staticmethod
+    def query_plan(conn: sqlite3.Connection, statement: str) -> List[str]:
+        """EXPLAIN QUERY PLAN of a statement, one indented line per plan node."""
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {statement.rstrip(';')}").fetchall()
+        except sqlite3.Error:
+            return []
+        depth = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + detail)
+        return lines
+
+    def run(self, code, timeout, memory_limit_mb, dataset: Optional[str] = None, **options):
+        try:
+            conn = self.connect(dataset)
+        except KeyError as e:
+            return {"status": "error", "output": "", "error_msg": str(e.args[0]), "execution_time": 0.0,
+                    "output_truncated": False}
+        try:
+            return self.execute(conn, code, timeout, memory_limit_mb)
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, datasets=len(self._datasets), templates=len(self._templates))
+
+
+RUNNERS: Dict[str, Runner] = {}
+
+
+def register_runner(runner: Runner) -> Runner:
+    """Adds (or replaces) the runner of a language."""
+    RUNNERS[runner.language] = runner
+    return runner
+
+
+def normalize_language(language: Optional[str]) -> str:
+    language = (language or "python").strip().lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def get_runner(language: Optional[str] = "python") -> Optional[Runner]:
+    return RUNNERS.get(normalize_language(language))
+
+
+def available_languages() -> List[str]:
+    """Languages whose toolchain is installed."""
+    return [language for language, runner in RUNNERS.items() if runner.available()]
+
+
+def warm_up_runners(languages: Optional[List[str]] = None, background: bool = False) -> None:
+    """
+    Pre-starts workers and fills build caches, e.g. for the language of a
+    problem when it is presented, before the candidate submits.
+    """
+    if background:
+        threading.Thread(target=warm_up_runners, args=(languages,), daemon=True).start()
+        return
+    for language in languages or available_languages():
+        runner = get_runner(language)
+        if runner is not None and runner.available():
+            try:
+                runner.warm_up()
+            except Exception as e:
+                logger.warning("Sandbox warm-up failed for %s: %r", language, e)
+
+
+def runner_stats() -> Dict[str, dict]:
+    return {language: runner.stats() for language, runner in RUNNERS.items()}
+
+
+register_runner(PythonRunner())
+register_runner(NodeRunner(warm_workers=int(os.getenv("SANDBOX_WARM_WORKERS", DEFAULT_WARM_WORKERS))))
+register_runner(GoRunner(max_entries=int(os.getenv("SANDBOX_GO_CACHE_ENTRIES", DEFAULT_GO_CACHE_ENTRIES))))
+register_runner(SQLiteRunner())
+
+
+def execute_code(code_string: str, timeout: int = DEFAULT_TIMEOUT_SECONDS, language: str = "python",
+                 **options) -> dict:
+    """
+    THE MAIN TOOL: Called by the Agent.
+    Manages the Sandbox (Process), Timeout logic, and Resource Limits.
+    
+    Args:
+        code_string (str): The code to execute.
+        timeout (int): The maximum execution time in seconds.
+        language (str): python (default), javascript, go or sql.
+        **options: Runner settings, e.g. dataset="<name>" for SQL problems with data.
+        
+    Returns:
+        dict: Contains 'status', 'output', 'error_msg', 'execution_time' and 'output_truncated';
+              Python runs also report 'cpu_time' (seconds), SQL runs 'vm_steps'.
+    """
+    runner = get_runner(language)
+    if runner is None:
+        return {
+            "status": "error",
+            "output": "",
+            "error_msg": f"Unsupported language: '{language}'. Supported languages: {', '.join(RUNNERS)}.",
+            "execution_time": 0.0,
+        }
+    if not runner.available():
+        return {
+            "status": "error",
+            "output": "",
+            "error_msg": f"The {runner.language} toolchain is not installed on this server.",
+            "execution_time": 0.0,
+        }
+
+    violation = runner.check(code_string)
+    if violation:
+        return {
+            "status": "security_violation", 
+            "output": violation,
+            "error_msg": "Security Policy Violation: Use of potentially unsafe keywords is not allowed.",
+            "execution_time": 0.0
+        }
+
+    return runner.run(code_string, timeout, DEFAULT_MEMORY_LIMIT_MB, **options)
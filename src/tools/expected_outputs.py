@@ -0,0 +1,212 @@
+# EXPECTED OUTPUTS 🎯
+# Expected outputs of coding problems, generated by running each problem's
+# reference solution in the sandbox instead of being typed into the problem.
+#
+# An output is computed once per problem version (a hash of everything that
+# determines it: reference solution, test code, language, dataset) and kept
+# on disk in cache/expected_outputs/, so restarts and other processes reuse
+# it. Small outputs travel with the session as text; large ones are graded by
+# digest: the session only holds the SHA-256 of the expected output, and the
+# text is read back from disk, line by line, only to locate a mismatch.
+#
+# Precompute every problem's output (e.g. at deploy time):
+#   python -m src.tools.expected_outputs
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .code_sandbox import execute_code, get_runner
+from .sql_assessment import result_rows
+
+
+# --- Configuration ---
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "expected_outputs"
+INLINE_LIMIT = 4 * 1024            # Larger outputs are graded by digest (characters).
+REFERENCE_TIMEOUT_SECONDS = 30     # Reference solutions may process large generated inputs.
+OUTPUT_FORMAT = 1                  # Bump when normalization changes: invalidates cached outputs.
+
+
+@dataclass
+class ExpectedOutput:
+    """Expected output of one problem version."""
+    problem_id: str
+    version: str
+    digest: str              # SHA-256 of the normalized output.
+    size: int                # Characters.
+    lines: int
+    text: Optional[str] = None  # Only for outputs up to INLINE_LIMIT.
+
+    @property
+    def inline(self) -> bool:
+        return self.text is not None
+
+
+def normalize_output(output: str, ordered: bool = True) -> str:
+    """The form outputs are compared in: stripped, rows sorted when order is not graded."""
+    return result_rows(output.strip(), ordered)
+
+
+def output_digest(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def reference_program(problem: dict) -> str:
+    """
+    The program whose output is expected. Python and JavaScript references
+    define the solution and the problem's test code is appended, as candidates
+    do; Go references are complete programs and SQL references single queries.
+    """
+    if problem.get("language", "python") in ("python", "javascript"):
+        return f"{problem['reference_solution'].rstrip()}\n\n{problem['test_code']}\n"
+    return problem["reference_solution"]
+
+
+def problem_version(problem: dict) -> str:
+    """Hash of the fields that determine a problem's expected output."""
+    fields = {name: problem.get(name) for name in
+              ("language", "reference_solution", "test_code", "expected_output", "dataset", "ordered")}
+    fields["format"] = OUTPUT_FORMAT
+    if problem.get("dataset"):
+        fields["dataset_digest"] = get_runner("sql").dataset_digest(problem["dataset"])
+    canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+class ExpectedOutputStore:
+    """
+    Disk-backed cache of expected outputs, keyed by problem version.
+
+    Args:
+        cache_dir: Folder of <version>.json (metadata) and <version>.txt (output) files.
+        inline_limit: Outputs longer than this are graded by digest.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, inline_limit: int = INLINE_LIMIT):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.inline_limit = inline_limit
+        self._memory: Dict[str, ExpectedOutput] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "generated": 0, "failures": 0}
+
+    def get(self, problem: dict) -> ExpectedOutput:
+        """
+        Returns a problem's expected output, running its reference solution on
+        first use. Problems without a reference solution use their expected_output.
+        Raises ValueError if the reference solution does not run cleanly.
+        """
+        version = problem_version(problem)
+        with self._lock:
+            cached = self._memory.get(version)
+            if cached is not None:
+                self._stats["memory_hits"] += 1
+                return cached
+            version_lock = self._locks.setdefault(version, threading.Lock())
+        with version_lock:  # Concurrent first presentations run the reference once.
+            expected = self._load(version)
+            if expected is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+            else:
+                expected = self._generate(problem, version)
+            with self._lock:
+                self._memory[version] = expected
+                self._locks.pop(version, None)
+        return expected
+
+    def _load(self, version: str) -> Optional[ExpectedOutput]:
+        try:
+            return ExpectedOutput(**json.loads((self.cache_dir / f"{version}.json").read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _generate(self, problem: dict, version: str) -> ExpectedOutput:
+        ordered = problem.get("ordered", True)
+        if problem.get("reference_solution"):
+            language = problem.get("language", "python")
+            options = {"dataset": problem["dataset"]} if problem.get("dataset") else {}
+            result = execute_code(reference_program(problem), timeout=REFERENCE_TIMEOUT_SECONDS,
+                                  language=language, **options)
+            if result["status"] != "success" or result.get("output_truncated"):
+                with self._lock:
+                    self._stats["failures"] += 1
+                reason = "output exceeds the sandbox output limit" if result["status"] == "success" \
+                    else f"{result['status']}: {result.get('error_msg')}"
+                raise ValueError(f"Reference solution of '{problem.get('id')}' failed ({reason})")
+            output = result["output"]
+        else:
+            output = problem.get("expected_output", "")
+        normalized = normalize_output(output, ordered)
+
+        expected = ExpectedOutput(
+            problem_id=problem.get("id") or problem.get("title", ""),
+            version=version,
+            digest=output_digest(normalized),
+            size=len(normalized),
+            lines=normalized.count("\n") + 1 if normalized else 0,
+            text=normalized if len(normalized) <= self.inline_limit else None,
+        )
+        # Output first, metadata last: a metadata file always has its output.
+        for name, content in ((f"{version}.txt", normalized), (f"{version}.json", json.dumps(asdict(expected)))):
+            partial = self.cache_dir / f".{name}.{threading.get_ident()}.tmp"
+            partial.write_text(content, encoding="utf-8")
+            os.replace(partial, self.cache_dir / name)
+        with self._lock:
+            self._stats["generated"] += 1
+        return expected
+
+    def lines(self, version: str) -> Optional[Iterator[str]]:
+        """The lines of a stored output, read lazily from disk (None if it is not stored)."""
+        path = self.cache_dir / f"{version}.txt"
+        if not path.exists():
+            return None
+
+        def read():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    yield line.rstrip("\n")
+        return read()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, in_memory=len(self._memory))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["generated"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_store: Optional[ExpectedOutputStore] = None
+_store_lock = threading.Lock()
+
+
+def get_expected_outputs() -> ExpectedOutputStore:
+    """Returns the process-wide expected output store (EXPECTED_OUTPUTS_DIR overrides the folder)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ExpectedOutputStore(Path(os.getenv("EXPECTED_OUTPUTS_DIR", DEFAULT_CACHE_DIR)))
+        return _store
+
+
+if __name__ == "__main__":
+    from .problem_bank import get_problem_bank
+
+    store = get_expected_outputs()
+    for problem in sorted(get_problem_bank().problems(), key=lambda p: p["id"]):
+        start = time.perf_counter()
+        try:
+            expected = store.get(problem)
+        except ValueError as e:
+            print(f"❌ {problem['id']}: {e}")
+            continue
+        mode = "inline" if expected.inline else "digest"
+        print(f"✅ {problem['id']:34} {expected.version}  {expected.lines:6} lines  {expected.size:8} chars  "
+              f"{mode:6}  {(time.perf_counter() - start) * 1000:8.1f} ms")
+    print(store.stats())
@@ -0,0 +1,333 @@
+# JOB EMBEDDINGS 🧭
+# Semantic job search with precomputed embeddings and an IVF index.
+#
+# Jobs are embedded offline with a hashing vectorizer (CPU-only, no model
+# download): words, word bigrams and whole skills are hashed into a fixed
+# number of dimensions, log-scaled and L2-normalized. The vectors of a job
+# database are written next to it (<db>.emb.npy, memory-mapped at query time)
+# together with an inverted-file index (<db>.ivf.npz): k-means centroids and,
+# for each centroid, a contiguous range of the vectors assigned to it. A query
+# scores the centroids, then only the vectors of the nprobe closest lists.
+#
+# Build or refresh the index of a database offline with:
+#   python -m src.tools.job_embeddings jobs/jobs.db
+# Queries never build an index: a missing or stale one is rebuilt in a
+# background thread, and a stale one keeps being served until then.
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+DEFAULT_DIM = 256                 # Embedding dimensions.
+DEFAULT_NPROBE = 16               # Inverted lists scanned per query.
+EXACT_SEARCH_MAX_ROWS = 5000      # Below this size, every vector is scanned.
+KMEANS_ITERATIONS = 12
+KMEANS_SAMPLE_PER_LIST = 32       # Training sample size per centroid.
+BATCH_ROWS = 65536                # Rows per matrix product when assigning/scoring.
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+# Field weights: skills and title say more about a job than its prose.
+SKILL_WEIGHT = 3.0
+TITLE_WEIGHT = 2.0
+TEXT_WEIGHT = 1.0
+
+
+# =============================================================================
+# Hashing Vectorizer
+# =============================================================================
+
+def _features(text: str, weight: float, skills: Iterable[str] = ()) -> List[Tuple[str, float]]:
+    words = _WORD_RE.findall(text.lower())
+    features = [(w, weight) for w in words]
+    features += [(f"{a} {b}", weight) for a, b in zip(words, words[1:])]
+    features += [(f"skill:{s.strip().lower()}", SKILL_WEIGHT) for s in skills if s.strip()]
+    return features
+
+
+def embed_features(features: Iterable[Tuple[str, float]], dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Hashes weighted features into a normalized float32 vector."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed_job(job: dict, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Embeds a job (title, skills, description, responsibilities)."""
+    skills = [str(s) for s in job.get("skills") or []]
+    features = _features(job.get("title") or "", TITLE_WEIGHT)
+    features += _features(" ".join(skills), SKILL_WEIGHT, skills)
+    features += _features(f"{job.get('description') or ''} {job.get('responsibilities') or ''}", TEXT_WEIGHT)
+    return embed_features(features, dim)
+
+
+def embed_query(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Embeds a CV summary: comma-separated skills are also matched as whole skills."""
+    skills = [s for s in text.split(",") if s.strip()]
+    return embed_features(_features(text, SKILL_WEIGHT, skills), dim)
+
+
+# =============================================================================
+# IVF Index
+# =============================================================================
+
+def _kmeans(vectors: np.ndarray, n_lists: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors; returns normalized centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        lists, starts = np.unique(assign[order], return_index=True)
+        centroids[lists] = np.add.reduceat(sample[order], starts, axis=0)
+        # Empty lists restart from random sample points.
+        empty = np.setdiff1d(np.arange(n_lists), lists)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), BATCH_ROWS):
+        assign[start:start + BATCH_ROWS] = np.argmax(vectors[start:start + BATCH_ROWS] @ centroids.T, axis=1)
+    return assign
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if len(scores) <= k:
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class IvfIndex:
+    """
+    Inverted-file index over memory-mapped vectors.
+
+    Args:
+        vectors: (n, dim) float32 vectors, grouped by list (memmap or array).
+        ids: (n,) job ids, in the same order.
+        centroids: (n_lists, dim) normalized centroids.
+        offsets: (n_lists + 1,) start of each list in `vectors`.
+        fingerprint: Identifies the database content the index was built from.
+
+    `stale` is set when the database changed since the index was built.
+    """
+
+    def __init__(self, vectors, ids, centroids, offsets, fingerprint: str = ""):
+        self.vectors = vectors
+        self.ids = ids
+        self.centroids = centroids
+        self.offsets = offsets
+        self.fingerprint = fingerprint
+        self.stale = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, ids: np.ndarray, n_lists: Optional[int] = None,
+              fingerprint: str = "") -> "IvfIndex":
+        """Clusters the vectors and groups them by list (ids follow the new order)."""
+        if n_lists is None:
+            n_lists = 1 if len(vectors) <= EXACT_SEARCH_MAX_ROWS else int(min(4096, 4 * np.sqrt(len(vectors))))
+        n_lists = max(1, min(n_lists, len(vectors)))
+        if n_lists == 1:
+            centroids = np.zeros((1, vectors.shape[1]), dtype=np.float32)
+            return cls(vectors, ids, centroids, np.array([0, len(vectors)], dtype=np.int64), fingerprint)
+        centroids = _kmeans(vectors, n_lists)
+        assign = _assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1)).astype(np.int64)
+        return cls(vectors[order], ids[order], centroids, offsets, fingerprint)
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[int, float]]:
+        """Returns up to k (job_id, cosine similarity) pairs, best first."""
+        n_lists = len(self.centroids)
+        if n_lists == 1 or nprobe >= n_lists:
+            probe = np.arange(n_lists)
+        else:
+            probe = _top_k(self.centroids @ query, nprobe)
+        candidates, scores = [], []
+        for lst in probe:
+            start, end = self.offsets[lst], self.offsets[lst + 1]
+            if end > start:
+                candidates.append(np.arange(start, end))
+                scores.append(np.asarray(self.vectors[start:end]) @ query)
+        if not candidates:
+            return []
+        candidates, scores = np.concatenate(candidates), np.concatenate(scores)
+        top = _top_k(scores, k)
+        return [(int(self.ids[candidates[i]]), float(scores[i])) for i in top]
+
+    def search_exact(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Brute-force search over all vectors (reference for recall)."""
+        scores = np.concatenate([
+            np.asarray(self.vectors[start:start + BATCH_ROWS]) @ query
+            for start in range(0, len(self.ids), BATCH_ROWS)
+        ]) if len(self.ids) else np.zeros(0, dtype=np.float32)
+        return [(int(self.ids[i]), float(scores[i])) for i in _top_k(scores, k)]
+
+    # --- Persistence ---
+
+    @staticmethod
+    def paths(db_path: Path) -> Tuple[Path, Path, Path]:
+        db_path = Path(db_path)
+        return (db_path.with_suffix(".emb.npy"), db_path.with_suffix(".ids.npy"), db_path.with_suffix(".ivf.npz"))
+
+    def save(self, db_path: Path) -> None:
+        """Writes the index next to the database (atomically, file by file)."""
+        vectors_path, ids_path, ivf_path = self.paths(db_path)
+        for path, write in (
+            (vectors_path, lambda f: np.save(f, np.asarray(self.vectors, dtype=np.float32))),
+            (ids_path, lambda f: np.save(f, np.asarray(self.ids, dtype=np.int64))),
+            (ivf_path, lambda f: np.savez(f, centroids=self.centroids, offsets=self.offsets,
+                                          fingerprint=np.array(self.fingerprint))),
+        ):
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, db_path: Path) -> Optional["IvfIndex"]:
+        """Loads an index with its vectors memory-mapped, or None if it does not exist."""
+        vectors_path, ids_path, ivf_path = cls.paths(db_path)
+        if not (vectors_path.exists() and ids_path.exists() and ivf_path.exists()):
+            return None
+        with np.load(ivf_path) as ivf:
+            centroids, offsets, fingerprint = ivf["centroids"], ivf["offsets"], str(ivf["fingerprint"])
+        return cls(np.load(vectors_path, mmap_mode="r"), np.load(ids_path), centroids, offsets, fingerprint)
+
+
+# =============================================================================
+# Job Database Indexes
+# =============================================================================
+
+def db_fingerprint(conn: sqlite3.Connection) -> str:
+    """
+    Identifies the jobs content of a database: its catalog version (see
+    job_store.CATALOG_VERSION_SCHEMA), or the row count and highest id for
+    catalogs without one.
+    """
+    try:
+        return f"v{conn.execute('SELECT version FROM catalog_version').fetchone()[0]}"
+    except sqlite3.OperationalError:
+        pass
+    count, max_id = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM jobs").fetchone()
+    return f"{count}:{max_id}"
+
+
+def build_job_index(db_path: Path, dim: int = DEFAULT_DIM, n_lists: Optional[int] = None) -> IvfIndex:
+    """Embeds every job of a database and writes its index next to it."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        fingerprint = db_fingerprint(conn)
+        rows = conn.execute(
+            "SELECT id, title, description, responsibilities, skills_required FROM jobs ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    vectors = np.zeros((len(rows), dim), dtype=np.float32)
+    ids = np.zeros(len(rows), dtype=np.int64)
+    for i, (job_id, title, description, responsibilities, skills_json) in enumerate(rows):
+        try:
+            skills = json.loads(skills_json)
+        except Exception:
+            skills = []
+        ids[i] = job_id
+        vectors[i] = embed_job({"title": title, "description": description,
+                                "responsibilities": responsibilities, "skills": skills}, dim)
+    index = IvfIndex.build(vectors, ids, n_lists, fingerprint)
+    index.save(db_path)
+    return IvfIndex.load(db_path)
+
+
+_indexes = {}
+_rebuilds = {}  # db_path -> running rebuild thread
+_indexes_lock = threading.Lock()
+
+
+def _rebuild(db_path: Path) -> None:
+    try:
+        start = time.perf_counter()
+        index = build_job_index(db_path)
+        with _indexes_lock:
+            _indexes[db_path] = index
+        logger.info("Job index built for %s: %d jobs in %.2fs", db_path.name, len(index), time.perf_counter() - start)
+    except Exception as e:
+        logger.warning("Job index rebuild failed for %s: %r", db_path.name, e)
+    finally:
+        with _indexes_lock:
+            _rebuilds.pop(db_path, None)
+
+
+def rebuild_job_index_async(db_path: Path) -> threading.Thread:
+    """Starts rebuilding the index of a job database in the background (once at a time per database)."""
+    db_path = Path(db_path)
+    with _indexes_lock:
+        thread = _rebuilds.get(db_path)
+        if thread is None:
+            thread = _rebuilds[db_path] = threading.Thread(
+                target=_rebuild, args=(db_path,), name=f"job-index-{db_path.stem}", daemon=True
+            )
+            thread.start()
+        return thread
+
+
+def get_job_index(db_path: Path, conn: sqlite3.Connection) -> Optional[IvfIndex]:
+    """
+    Returns the last built index of a job database, or None if it was never
+    built. A missing or stale index (the jobs changed since it was built) is
+    rebuilt in the background; the stale one is served meanwhile, flagged
+    with `stale`.
+    """
+    db_path = Path(db_path)
+    fingerprint = db_fingerprint(conn)
+    with _indexes_lock:
+        index = _indexes.get(db_path)
+        rebuilding = db_path in _rebuilds
+    if (index is None or index.fingerprint != fingerprint) and not rebuilding:
+        # The index may have been rebuilt offline (vectors are memory-mapped: loading is cheap).
+        loaded = IvfIndex.load(db_path)
+        if loaded is not None and (index is None or loaded.fingerprint != index.fingerprint):
+            with _indexes_lock:
+                index = _indexes[db_path] = loaded
+    if index is None or index.fingerprint != fingerprint:
+        rebuild_job_index_async(db_path)
+    if index is not None:
+        index.stale = index.fingerprint != fingerprint
+    return index
+
+
+def default_nprobe() -> int:
+    """Inverted lists scanned per query (JOB_INDEX_NPROBE overrides the default)."""
+    return int(os.getenv("JOB_INDEX_NPROBE", DEFAULT_NPROBE))
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["jobs/jobs.db"]:
+        start = time.perf_counter()
+        built = build_job_index(Path(path))
+        print(f"✅ {path}: {len(built)} jobs, {len(built.centroids)} lists, {time.perf_counter() - start:.1f}s")
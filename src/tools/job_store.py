@@ -0,0 +1,511 @@
+# JOB STORE 🗂️
+# Multi-tenant job catalog: one SQLite database (shard) per client company.
+#
+# Shards live in jobs/shards/<tenant>.db; the original jobs/jobs.db is served
+# as the "default" tenant. A shard is only opened when a query touches its
+# tenant, so looking up one company's postings never scans the others. Queries
+# across tenants rank inside each shard (in SQL, top-k only) and merge the
+# per-shard results with a heap. Rankings are kept in an LRU cache until the
+# catalog version of one of the shards they were computed from changes.
+
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+# --- Configuration ---
+REPO_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_JOBS_DB = REPO_ROOT / "jobs" / "jobs.db"
+DEFAULT_SHARDS_DIR = REPO_ROOT / "jobs" / "shards"
+DEFAULT_TENANT = "default"
+MAX_OPEN_SHARDS = 64              # Open connections kept per thread (LRU).
+DEFAULT_RANKING_CACHE_SIZE = 256  # Cached rankings (LRU); 0 disables the cache.
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    company TEXT,
+    location TEXT,
+    description TEXT,
+    responsibilities TEXT,
+    skills_required TEXT -- JSON array of skills
+)
+"""
+
+# Normalized skills, one row per (skill, job): ranking reads this index instead
+# of parsing every job's JSON. Shards created by JobStore have it; legacy
+# catalogs without it are ranked with json_each.
+SKILLS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_skills (
+    skill TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID
+"""
+
+# Catalog version: a counter bumped by triggers on every insert, update or
+# delete of a job, so readers can tell that cached rankings are stale.
+CATALOG_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS jobs_version_insert AFTER INSERT ON jobs
+BEGIN UPDATE catalog_version SET version = version + 1; END;
+CREATE TRIGGER IF NOT EXISTS jobs_version_update AFTER UPDATE ON jobs
+BEGIN UPDATE catalog_version SET version = version + 1; END;
+CREATE TRIGGER IF NOT EXISTS jobs_version_delete AFTER DELETE ON jobs
+BEGIN UPDATE catalog_version SET version = version + 1; END;
+"""
+
+_JOB_COLUMNS = "j.id, j.title, j.company, j.location, j.description, j.responsibilities, j.skills_required"
+
+
+def tenant_key(name: str) -> str:
+    """Normalizes a company name into a tenant key (safe as a file name)."""
+    key = re.sub(r"[^a-z0-9]+", "-", name.strip().lower()).strip("-")
+    if not key:
+        raise ValueError(f"Invalid tenant name: {name!r}")
+    return key
+
+
+def _row_to_job(tenant: str, row, score: int) -> dict:
+    job_id, title, company, location, description, responsibilities, skills_json = row
+    try:
+        skills = json.loads(skills_json)
+    except Exception:
+        skills = []
+    return {
+        "tenant": tenant,
+        "id": job_id,
+        "title": title,
+        "company": company,
+        "location": location,
+        "description": description,
+        "responsibilities": responsibilities,
+        "skills": skills,
+        "score": score,
+    }
+
+
+def job_score(job: dict, skills: Iterable[str]) -> int:
+    """Ranking score of a job for the given skills (same as the SQL ranking)."""
+    wanted = {s.strip().lower() for s in skills if s.strip()}
+    if not wanted:
+        return 1
+    return len(wanted & {str(s).strip().lower() for s in job["skills"]})
+
+
+def matched_skills(job: dict, skills: Iterable[str]) -> List[str]:
+    """The job's required skills that the candidate has, in the job's order."""
+    wanted = {s.strip().lower() for s in skills if s.strip()}
+    return [s for s in job["skills"] if str(s).strip().lower() in wanted]
+
+
+def rank_key(job: dict) -> tuple:
+    """Keyset of a ranked job: (score, tenant, id)."""
+    return job["score"], job["tenant"], job["id"]
+
+
+def install_catalog_version(conn: sqlite3.Connection) -> None:
+    """Adds the catalog version table and its triggers to a job database (idempotent)."""
+    conn.execute(JOBS_SCHEMA)
+    conn.executescript(CATALOG_VERSION_SCHEMA)
+
+
+class RankingCache:
+    """
+    LRU cache of ranked job lists.
+
+    Each entry stores the catalog versions of the shards it was computed from,
+    and is only served while they are unchanged.
+
+    Args:
+        max_entries: Maximum number of cached rankings (0 disables the cache).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_RANKING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key: tuple, versions: tuple) -> Optional[List[dict]]:
+        """Returns a copy of the cached ranking, or None on a miss or a stale entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != versions:
+                self.misses += 1
+                if entry is not None:
+                    self.stale += 1
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(job) for job in entry[1]]
+
+    def put(self, key: tuple, versions: tuple, jobs: List[dict]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (versions, [dict(job) for job in jobs])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the hit rate since process start."""
+        with self._lock:
+            stats = {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "stale": self.stale}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class JobStore:
+    """
+    Router over per-tenant job shards.
+
+    Args:
+        shards_dir: Directory holding one <tenant>.db per tenant.
+        default_db: Legacy single catalog, served as the "default" tenant.
+        cache_size: Rankings kept in the LRU cache (0 disables it).
+    """
+
+    def __init__(self, shards_dir: Path = DEFAULT_SHARDS_DIR, default_db: Optional[Path] = DEFAULT_JOBS_DB,
+                 cache_size: int = DEFAULT_RANKING_CACHE_SIZE):
+        self.shards_dir = Path(shards_dir)
+        self.default_db = Path(default_db) if default_db else None
+        self.cache = RankingCache(cache_size)
+        self._vocabulary = None  # (catalog versions, skills)
+        self._local = threading.local()
+
+    # --- Routing ---
+
+    def shard_path(self, tenant: str) -> Path:
+        if tenant == DEFAULT_TENANT and self.default_db is not None:
+            return self.default_db
+        return self.shards_dir / f"{tenant_key(tenant)}.db"
+
+    def tenants(self) -> List[str]:
+        """Returns the tenants that have a shard."""
+        tenants = sorted(p.stem for p in self.shards_dir.glob("*.db")) if self.shards_dir.is_dir() else []
+        if self.default_db is not None and self.default_db.exists():
+            tenants.insert(0, DEFAULT_TENANT)
+        return tenants
+
+    def _connection(self, tenant: str) -> sqlite3.Connection:
+        """Opens the tenant's shard on first use (per thread; least recently used ones are closed)."""
+        shards = getattr(self._local, "shards", None)
+        if shards is None:
+            shards = self._local.shards = OrderedDict()
+        path = self.shard_path(tenant)
+        conn = shards.get(path)
+        if conn is None:
+            if not path.exists():
+                raise FileNotFoundError(f"No job catalog for tenant '{tenant}' ({path})")
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            shards[path] = conn
+            while len(shards) > MAX_OPEN_SHARDS:
+                closed = shards.popitem(last=False)[1]
+                getattr(self._local, "tables", {}).pop(closed, None)
+                closed.close()
+        shards.move_to_end(path)
+        return conn
+
+    def _has_table(self, conn: sqlite3.Connection, name: str) -> bool:
+        cached = getattr(self._local, "tables", None)
+        if cached is None:
+            cached = self._local.tables = {}
+        if conn not in cached:
+            cached[conn] = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return name in cached[conn]
+
+    def catalog_version(self, tenant: str) -> str:
+        """
+        Returns the tenant's catalog version. Catalogs without the version
+        table fall back to the file's modification time and size.
+        """
+        conn = self._connection(tenant)
+        if self._has_table(conn, "catalog_version"):
+            return str(conn.execute("SELECT version FROM catalog_version").fetchone()[0])
+        stat = self.shard_path(tenant).stat()
+        return f"mtime:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _cached(self, key: tuple, tenants: List[str], rank) -> List[dict]:
+        """Serves a ranking from the cache while the tenants' catalogs are unchanged."""
+        versions = tuple(self.catalog_version(tenant) for tenant in tenants)
+        jobs = self.cache.get(key, versions)
+        if jobs is None:
+            jobs = rank()
+            self.cache.put(key, versions, jobs)
+        return jobs
+
+    def close(self) -> None:
+        """Closes the shards opened by the current thread."""
+        for conn in getattr(self._local, "shards", {}).values():
+            conn.close()
+        self._local.shards = OrderedDict()
+        self._local.tables = {}
+
+    # --- Queries ---
+
+    @staticmethod
+    def _after_clause(tenant: str, after: Optional[tuple], id_column: str):
+        """
+        SQL condition (on `score` and `id_column`) selecting the jobs ranked
+        after the keyset `after` = (score, tenant, id), for one shard.
+        """
+        if after is None:
+            return "1", ()
+        score, after_tenant, after_id = after
+        if tenant > after_tenant:
+            return "score <= ?", (score,)
+        if tenant == after_tenant:
+            return f"(score < ? OR (score = ? AND {id_column} > ?))", (score, score, after_id)
+        return "score < ?", (score,)
+
+    def top_jobs_in_shard(self, tenant: str, skills: Iterable[str], k: int, after: Optional[tuple] = None) -> List[dict]:
+        """
+        Returns the k best jobs of one tenant, ranked by the number of required
+        skills found in `skills` (case-insensitive). Without skills, returns
+        the first k jobs.
+
+        Args:
+            tenant: Tenant to query.
+            skills: Candidate skills.
+            k: Number of jobs.
+            after: Optional keyset (score, tenant, id): only jobs ranked after it are returned.
+        """
+        skills = sorted({s.strip().lower() for s in skills if s.strip()})
+        conn = self._connection(tenant)
+        if not skills:
+            # Every job scores 1: the keyset reduces to (tenant, id).
+            if after is not None and tenant < after[1]:
+                return []
+            after_id = after[2] if after is not None and tenant == after[1] else 0
+            rows = conn.execute(
+                f"SELECT {_JOB_COLUMNS}, 1 FROM jobs j WHERE j.id > ? ORDER BY j.id LIMIT ?", (after_id, k)
+            ).fetchall()
+        elif self._has_table(conn, "job_skills"):
+            condition, params = self._after_clause(tenant, after, "job_id")
+            placeholders = ",".join("?" * len(skills))
+            rows = conn.execute(f"""
+                SELECT {_JOB_COLUMNS}, m.score
+                FROM (
+                    SELECT job_id, COUNT(*) AS score FROM job_skills
+                    WHERE skill IN ({placeholders})
+                    GROUP BY job_id
+                    HAVING {condition}
+                    ORDER BY score DESC, job_id
+                    LIMIT ?
+                ) m JOIN jobs j ON j.id = m.job_id
+                ORDER BY m.score DESC, j.id
+            """, (*skills, *params, k)).fetchall()
+        else:
+            condition, params = self._after_clause(tenant, after, "j.id")
+            placeholders = ",".join("?" * len(skills))
+            rows = conn.execute(f"""
+                SELECT {_JOB_COLUMNS}, COUNT(DISTINCT lower(trim(s.value))) AS score
+                FROM jobs j, json_each(CASE WHEN json_valid(j.skills_required) THEN j.skills_required ELSE '[]' END) s
+                WHERE lower(trim(s.value)) IN ({placeholders})
+                GROUP BY j.id
+                HAVING {condition}
+                ORDER BY score DESC, j.id
+                LIMIT ?
+            """, (*skills, *params, k)).fetchall()
+        return [_row_to_job(tenant, row[:-1], row[-1]) for row in rows]
+
+    def top_jobs(self, skills: Iterable[str], k: int = 5, tenants: Optional[Iterable[str]] = None,
+                 after: Optional[tuple] = None) -> List[dict]:
+        """
+        Returns the k best jobs across tenants (all of them by default).
+        Each shard returns its own top k; the sorted lists are merged with a heap.
+        Pass `after` = rank_key(last job) to get the next page (keyset pagination).
+        Results are cached per canonical skill set (see RankingCache).
+        """
+        skills = sorted({s.strip().lower() for s in skills if s.strip()})
+        tenants = list(tenants) if tenants is not None else self.tenants()
+
+        def rank():
+            per_shard = [self.top_jobs_in_shard(tenant, skills, k, after) for tenant in tenants]
+            merged = heapq.merge(*per_shard, key=lambda job: (-job["score"], job["tenant"], job["id"]))
+            return list(islice(merged, k))
+
+        return self._cached(("skills", tuple(skills), k, tuple(tenants), after), tenants, rank)
+
+    def semantic_top_jobs(self, query_text: str, k: int = 5, tenants: Optional[Iterable[str]] = None,
+                          nprobe: Optional[int] = None) -> List[dict]:
+        """
+        Returns the k jobs most similar to `query_text` (e.g. a CV summary),
+        using each shard's embedding index. `score` is the cosine similarity,
+        rounded to 3 decimals. Indexes are rebuilt in the background: a stale
+        one is served until then, and while a shard has none yet the jobs are
+        ranked by skills match (query_text read as comma-separated skills).
+        """
+        # Imported here so numpy is only loaded when semantic search is used.
+        from .job_embeddings import default_nprobe, embed_query, get_job_index
+
+        query_text = " ".join(query_text.lower().split())
+        nprobe = nprobe or default_nprobe()
+        tenants = list(tenants) if tenants is not None else self.tenants()
+        indexes = {tenant: get_job_index(self.shard_path(tenant), self._connection(tenant)) for tenant in tenants}
+        if any(index is None for index in indexes.values()):
+            return self.top_jobs([s.strip() for s in query_text.split(",") if s.strip()], k, tenants=tenants)
+
+        def rank():
+            query = embed_query(query_text)
+            per_shard = []
+            for tenant, index in indexes.items():
+                hits = index.search(query, k, nprobe)
+                per_shard.append(sorted((-round(score, 3), tenant, job_id) for job_id, score in hits))
+            jobs = []
+            for neg_score, tenant, job_id in islice(heapq.merge(*per_shard), k):
+                job = self.get_job(tenant, job_id)
+                if job is not None:
+                    job["score"] = -neg_score
+                    jobs.append(job)
+            return jobs
+
+        # Keyed by index too: rankings from a stale index are recomputed once it is rebuilt.
+        built_from = tuple((index.fingerprint, index.stale) for index in indexes.values())
+        return self._cached(("semantic", query_text, k, tuple(tenants), nprobe, built_from), tenants, rank)
+
+    def skill_vocabulary(self, tenants: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Returns the distinct required skills (lowercase) of the tenants' catalogs,
+        recomputed only when a catalog version changes.
+        """
+        tenants = list(tenants) if tenants is not None else self.tenants()
+        versions = tuple((tenant, self.catalog_version(tenant)) for tenant in tenants)
+        cached = self._vocabulary
+        if cached is not None and cached[0] == versions:
+            return list(cached[1])
+
+        skills = set()
+        for tenant in tenants:
+            conn = self._connection(tenant)
+            if self._has_table(conn, "job_skills"):
+                rows = conn.execute("SELECT DISTINCT skill FROM job_skills").fetchall()
+            else:
+                rows = conn.execute("""
+                    SELECT DISTINCT lower(trim(s.value))
+                    FROM jobs j, json_each(CASE WHEN json_valid(j.skills_required) THEN j.skills_required ELSE '[]' END) s
+                """).fetchall()
+            skills.update(row[0] for row in rows if row[0])
+        self._vocabulary = (versions, sorted(skills))
+        return list(self._vocabulary[1])
+
+    def get_job(self, tenant: str, job_id: int) -> Optional[dict]:
+        row = self._connection(tenant).execute(
+            f"SELECT {_JOB_COLUMNS} FROM jobs j WHERE j.id = ?", (job_id,)
+        ).fetchone()
+        return _row_to_job(tenant, row, 0) if row else None
+
+    def find_job_by_title(self, title: str, tenants: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """Returns the first job (default tenant first) whose title matches, ignoring case."""
+        for tenant in (list(tenants) if tenants is not None else self.tenants()):
+            row = self._connection(tenant).execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs j WHERE j.title = ? COLLATE NOCASE LIMIT 1", (title.strip(),)
+            ).fetchone()
+            if row:
+                return _row_to_job(tenant, row, 0)
+        return None
+
+    # --- Writes ---
+
+    def add_jobs(self, tenant: str, jobs: List[Dict]) -> int:
+        """
+        Inserts jobs into a tenant's shard, creating it if needed.
+
+        Args:
+            tenant: Tenant (company) name.
+            jobs: Dicts with title, company, location, description,
+                responsibilities and skills_required (list).
+
+        Returns:
+            Number of inserted jobs.
+        """
+        path = self.shard_path(tenant)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        try:
+            install_catalog_version(conn)
+            with conn:
+                conn.execute(SKILLS_SCHEMA)
+                for job in jobs:
+                    skills = job.get("skills_required", [])
+                    cursor = conn.execute(
+                        "INSERT INTO jobs (title, company, location, description, responsibilities, skills_required) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (job["title"], job.get("company"), job.get("location"), job.get("description"),
+                         job.get("responsibilities"), json.dumps(skills)),
+                    )
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO job_skills (skill, job_id) VALUES (?, ?)",
+                        [(skill.strip().lower(), cursor.lastrowid) for skill in skills if skill.strip()],
+                    )
+        finally:
+            conn.close()
+        return len(jobs)
+
+    def split_by_company(self, source_db: Path) -> Dict[str, int]:
+        """Copies a single-catalog database into one shard per company."""
+        conn = sqlite3.connect(source_db)
+        try:
+            rows = conn.execute(
+                "SELECT title, company, location, description, responsibilities, skills_required FROM jobs"
+            ).fetchall()
+        finally:
+            conn.close()
+        per_tenant: Dict[str, List[Dict]] = {}
+        for title, company, location, description, responsibilities, skills_json in rows:
+            try:
+                skills = json.loads(skills_json)
+            except Exception:
+                skills = []
+            per_tenant.setdefault(tenant_key(company or DEFAULT_TENANT), []).append({
+                "title": title, "company": company, "location": location, "description": description,
+                "responsibilities": responsibilities, "skills_required": skills,
+            })
+        return {tenant: self.add_jobs(tenant, jobs) for tenant, jobs in per_tenant.items()}
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Returns the process-wide job store (JOBS_SHARDS_DIR / JOBS_DB_PATH override
+    the locations, JOB_RANKING_CACHE_SIZE the number of cached rankings).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore(
+                Path(os.getenv("JOBS_SHARDS_DIR", DEFAULT_SHARDS_DIR)),
+                Path(os.getenv("JOBS_DB_PATH", DEFAULT_JOBS_DB)),
+                int(os.getenv("JOB_RANKING_CACHE_SIZE", DEFAULT_RANKING_CACHE_SIZE)),
+            )
+        return _store
+
+
+def ranking_cache_stats() -> dict:
+    """Returns the ranking cache hit/miss metrics of the process-wide job store."""
+    return get_job_store().cache.stats()
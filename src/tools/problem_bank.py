@@ -0,0 +1,230 @@
+# PROBLEM BANK 📚
+# Coding problems stored as JSON files (problems/<id>.json), tagged with the
+# roles, skills and difficulty they assess.
+#
+# Parsed problems are kept in memory with an inverted index from skill to
+# problem ids; a problem is picked for a job by the overlap between the job's
+# skills_required and the problem's skills, plus a bonus when a role keyword
+# appears in the job title. The directory is re-scanned (file names, mtimes
+# and sizes only) at most every few seconds: new or edited problems are
+# served without restarting the app, and only changed files are re-parsed. A
+# file that fails to parse keeps its last good version.
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# --- Configuration ---
+DEFAULT_PROBLEMS_DIR = Path(__file__).parent.parent.parent / "problems"
+DEFAULT_RELOAD_SECONDS = 2.0   # Minimum interval between directory scans.
+ROLE_WEIGHT = 2                # A role keyword in the job title counts as this many matching skills.
+MAX_SKILL_WORDS = 3            # Longest skill phrase looked up in the index (words).
+DIFFICULTIES = ("easy", "medium", "hard")
+REQUIRED_FIELDS = ("id", "title", "description", "test_code")
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+def skill_phrases(skill: str) -> List[str]:
+    """
+    The skill and the word n-grams in it, so that a tag such as "nlp" matches a
+    requirement written as "Strong understanding of NLP tasks and metrics".
+    """
+    words = re.findall(r"[\w+#.-]+", normalize_skill(skill))
+    phrases = {normalize_skill(skill)}
+    for n in range(1, min(MAX_SKILL_WORDS, len(words)) + 1):
+        phrases.update(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return list(phrases)
+
+
+def parse_problem(data: dict) -> dict:
+    """
+    Validates a problem definition and returns it in the shape of
+    get_coding_problem (title, description, test_code, ...). The expected
+    output comes from reference_solution (see expected_outputs) or, for
+    problems without one, from expected_output.
+    Raises ValueError for a malformed definition.
+    """
+    missing = [name for name in REQUIRED_FIELDS if name not in data]
+    if "reference_solution" not in data and "expected_output" not in data:
+        missing.append("reference_solution")
+    if missing or not data.get("id"):
+        raise ValueError(f"missing fields: {', '.join(missing or ['id'])}")
+    tags = data.get("tags") or {}
+    difficulty = tags.get("difficulty", "easy")
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+    problem = dict(data)
+    problem["language"] = data.get("language", "python")
+    problem["tags"] = {
+        "roles": [role.lower() for role in tags.get("roles", [])],
+        "skills": [normalize_skill(skill) for skill in tags.get("skills", [])],
+        "difficulty": difficulty,
+    }
+    problem["priority"] = int(data.get("priority", 100))
+    return problem
+
+
+class ProblemBank:
+    """
+    In-memory view of the problem directory, reloaded when files change.
+
+    Args:
+        directory: Folder of problem JSON files.
+        reload_seconds: Minimum interval between checks for changed files (0: every call).
+    """
+
+    def __init__(self, directory: Path = DEFAULT_PROBLEMS_DIR, reload_seconds: float = DEFAULT_RELOAD_SECONDS):
+        self.directory = Path(directory)
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._files: Dict[str, tuple] = {}       # file name -> (mtime_ns, size, problem)
+        self._problems: Dict[str, dict] = {}     # problem id -> problem
+        self._skill_index: Dict[str, set] = {}   # skill -> problem ids
+        self._signature = None
+        self._checked_at = 0.0
+        self._stats = {"scans": 0, "reloads": 0, "parsed": 0, "parse_errors": 0, "selections": 0}
+
+    # --- Loading ---
+
+    def _scan(self) -> Dict[str, tuple]:
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return {}
+        return {entry.name: (entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries if entry.name.endswith(".json") and entry.is_file()}
+
+    def _refresh(self, force: bool = False) -> None:
+        """Re-parses changed files if the directory changed since the last check (lock held)."""
+        now = time.monotonic()
+        if not force and self._signature is not None and now - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = now
+        self._stats["scans"] += 1
+        listing = self._scan()
+        if listing == self._signature:
+            return
+
+        files = {}
+        for name, (mtime, size) in listing.items():
+            cached = self._files.get(name)
+            if cached is not None and cached[:2] == (mtime, size):
+                files[name] = cached
+                continue
+            try:
+                problem = parse_problem(json.loads((self.directory / name).read_text(encoding="utf-8")))
+                files[name] = (mtime, size, problem)
+                self._stats["parsed"] += 1
+            except (OSError, ValueError) as e:
+                # json.JSONDecodeError is a ValueError. Keeps serving the last good version.
+                self._stats["parse_errors"] += 1
+                logger.warning("Problem file %s skipped: %r", name, e)
+                if cached is not None:
+                    files[name] = cached
+
+        problems, index = {}, defaultdict(set)
+        for name in sorted(files):
+            problem = files[name][2]
+            if problem["id"] in problems:
+                logger.warning("Duplicate problem id %s in %s: skipped", problem["id"], name)
+                continue
+            problems[problem["id"]] = problem
+            for skill in problem["tags"]["skills"]:
+                index[skill].add(problem["id"])
+        self._files, self._problems, self._skill_index = files, problems, dict(index)
+        self._signature = listing
+        self._stats["reloads"] += 1
+
+    def reload(self) -> None:
+        """Checks the directory now, regardless of the reload interval."""
+        with self._lock:
+            self._refresh(force=True)
+
+    # --- Queries ---
+
+    def problems(self) -> List[dict]:
+        with self._lock:
+            self._refresh()
+            return list(self._problems.values())
+
+    def get(self, problem_id: str) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            problem = self._problems.get(problem_id)
+        return dict(problem) if problem else None
+
+    def matching_skills(self, skills: Iterable[str]) -> Dict[str, set]:
+        """Problem id -> the problem's skills matched by `skills` (inverted index lookup)."""
+        matches = defaultdict(set)
+        with self._lock:
+            self._refresh()
+            for skill in skills:
+                for phrase in skill_phrases(skill):
+                    for problem_id in self._skill_index.get(phrase, ()):
+                        matches[problem_id].add(phrase)
+        return dict(matches)
+
+    def select(self, job_title: str = "", skills: Optional[Iterable[str]] = None,
+               difficulty: Optional[str] = None) -> Optional[dict]:
+        """
+        Picks the problem for a job: most skills in common with the job's
+        skills_required, plus ROLE_WEIGHT if one of its role keywords is in the
+        title; ties go to the lower priority. Falls back to the default problem.
+
+        Args:
+            job_title: Title of the selected job.
+            skills: The job's skills_required.
+            difficulty: Only consider problems of this difficulty (ignored if none match).
+        """
+        title = (job_title or "").lower()
+        matches = self.matching_skills(skills or [])
+        with self._lock:
+            self._stats["selections"] += 1
+            candidates = list(self._problems.values())
+        if difficulty in DIFFICULTIES:
+            candidates = [p for p in candidates if p["tags"]["difficulty"] == difficulty] or candidates
+
+        def score(problem):
+            role = any(keyword in title for keyword in problem["tags"]["roles"])
+            return ROLE_WEIGHT * role + len(matches.get(problem["id"], ())), -problem["priority"]
+
+        scored = [(score(problem), problem) for problem in candidates]
+        best = max(scored, key=lambda item: item[0], default=None)
+        if best is None or best[0][0] == 0:
+            best = next(((0, p) for p in candidates if p.get("default")), best)
+        return dict(best[1]) if best else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, problems=len(self._problems), skills_indexed=len(self._skill_index))
+
+
+_bank: Optional[ProblemBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_problem_bank() -> ProblemBank:
+    """
+    Returns the process-wide problem bank (PROBLEM_BANK_DIR and
+    PROBLEM_BANK_RELOAD_SECONDS override the folder and the reload interval).
+    """
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = ProblemBank(
+                Path(os.getenv("PROBLEM_BANK_DIR", DEFAULT_PROBLEMS_DIR)),
+                float(os.getenv("PROBLEM_BANK_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS)),
+            )
+        return _bank
@@ -0,0 +1,247 @@
+# Interview slot finding for the scheduler agent.
+#
+# Busy intervals are merged into a sorted, non-overlapping index (bisect-based
+# lookups), intersected with working hours in the recruiter's time zone, and cut
+# into ranked free slots, so the agent doesn't have to reason about calendar
+# conflicts itself. Busy lookups are cached per calendar window for a short TTL
+# and invalidated after a booking.
+
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+DEFAULT_TIMEZONE = "Europe/Rome"
+DEFAULT_WORK_START = "09:00"
+DEFAULT_WORK_END = "18:00"
+DEFAULT_SLOT_STEP_MINUTES = 30     # Slot start times are aligned to this step.
+DEFAULT_BUSY_CACHE_TTL = 60        # Seconds a busy lookup is reused.
+DEFAULT_BUSY_CACHE_SIZE = 256      # Busy lookups kept (least recently used dropped first).
+WORKDAYS = {0, 1, 2, 3, 4}         # Monday to Friday.
+
+
+def parse_calendar_time(value: str, tz) -> datetime:
+    """Parses an event start/end (dateTime or all-day date) into an aware datetime."""
+    if len(value) == 10:
+        return tz.localize(datetime.combine(date.fromisoformat(value), dtime.min))
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = tz.localize(parsed)
+    return parsed
+
+
+def _parse_hhmm(value: str) -> dtime:
+    hours, minutes = value.split(":")
+    return dtime(int(hours), int(minutes))
+
+
+class BusyIndex:
+    """
+    Sorted, merged busy intervals with O(log n) overlap checks.
+
+    Args:
+        intervals: Iterable of (start, end) aware datetimes, in any order.
+    """
+
+    def __init__(self, intervals=()):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def intervals(self) -> List[Tuple[datetime, datetime]]:
+        return list(zip(self._starts, self._ends))
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """True if [start, end) intersects any busy interval."""
+        i = bisect_right(self._starts, start) - 1
+        if i >= 0 and self._ends[i] > start:
+            return True
+        j = bisect_left(self._starts, end)
+        return j > i + 1
+
+    def free_gaps(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Returns the free sub-intervals of [start, end)."""
+        gaps = []
+        cursor = start
+        i = max(bisect_right(self._starts, start) - 1, 0)
+        while i < len(self._starts) and self._starts[i] < end:
+            if self._ends[i] > cursor:
+                if self._starts[i] > cursor:
+                    gaps.append((cursor, self._starts[i]))
+                cursor = max(cursor, self._ends[i])
+            i += 1
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+
+def _ceil_to_step(moment: datetime, step: timedelta, day_start: datetime) -> datetime:
+    offset = moment - day_start
+    steps = -(-offset // step)  # Ceiling division.
+    return day_start + steps * step
+
+
+def find_free_slots(
+    busy: BusyIndex,
+    window_start: datetime,
+    window_end: datetime,
+    duration_minutes: int = 60,
+    timezone: str = DEFAULT_TIMEZONE,
+    work_start: str = DEFAULT_WORK_START,
+    work_end: str = DEFAULT_WORK_END,
+    max_slots: int = 5,
+    step_minutes: int = DEFAULT_SLOT_STEP_MINUTES,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Finds free slots of the given duration inside working hours.
+
+    Slots are ranked so the first ones are the earliest, spread across
+    different days (one per day in round-robin), then returned in
+    chronological order.
+
+    Args:
+        busy: Busy intervals of the calendar.
+        window_start: Earliest slot start (aware datetime).
+        window_end: Latest slot end (aware datetime).
+        duration_minutes: Length of each slot.
+        timezone: Time zone of the working hours.
+        work_start: Start of the working day, "HH:MM".
+        work_end: End of the working day, "HH:MM".
+        max_slots: Maximum number of slots returned.
+        step_minutes: Alignment of the slot start times.
+
+    Returns:
+        List of (start, end) datetimes in the given time zone.
+    """
+    tz = pytz.timezone(timezone)
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    open_time, close_time = _parse_hhmm(work_start), _parse_hhmm(work_end)
+
+    per_day: Dict[date, List[Tuple[datetime, datetime]]] = {}
+    day = window_start.astimezone(tz).date()
+    last_day = window_end.astimezone(tz).date()
+    while day <= last_day:
+        if day.weekday() in WORKDAYS:
+            day_open = tz.localize(datetime.combine(day, open_time))
+            day_close = tz.localize(datetime.combine(day, close_time))
+            lower, upper = max(day_open, window_start), min(day_close, window_end)
+            slots = []
+            for gap_start, gap_end in busy.free_gaps(lower, upper) if lower < upper else []:
+                slot_start = _ceil_to_step(gap_start, step, day_open)
+                while slot_start + duration <= gap_end and len(slots) < max_slots:
+                    slots.append((slot_start, slot_start + duration))
+                    slot_start += max(duration, step)
+            if slots:
+                per_day[day] = slots
+        day += timedelta(days=1)
+
+    ranked = []
+    queues = [list(slots) for _, slots in sorted(per_day.items())]
+    while queues and len(ranked) < max_slots:
+        for queue in queues:
+            if queue and len(ranked) < max_slots:
+                ranked.append(queue.pop(0))
+        queues = [queue for queue in queues if queue]
+    return sorted(ranked)
+
+
+def business_days_window(now: datetime, days: int, timezone: str = DEFAULT_TIMEZONE) -> Tuple[datetime, datetime]:
+    """
+    Returns a whole-day window from the start of today to the end of the
+    `days`-th business day, so repeated lookups share the same cache key.
+    """
+    tz = pytz.timezone(timezone)
+    today = now.astimezone(tz).date()
+    last, counted = today, 0
+    while True:
+        if last.weekday() in WORKDAYS:
+            counted += 1
+            if counted >= days:
+                break
+        last += timedelta(days=1)
+    start = tz.localize(datetime.combine(today, dtime.min))
+    end = tz.localize(datetime.combine(last + timedelta(days=1), dtime.min))
+    return start, end
+
+
+# =============================================================================
+# Busy Cache
+# =============================================================================
+
+class BusyCache:
+    """
+    Short-TTL LRU cache of busy intervals keyed by (calendar ids, mode, window).
+    Expired entries are pruned on every insert.
+
+    Args:
+        ttl_seconds: How long a lookup is reused.
+        max_entries: Maximum number of cached lookups.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_BUSY_CACHE_TTL, max_entries: int = DEFAULT_BUSY_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[float, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_fetch(self, calendar_ids: Tuple[str, ...], mode: str, start: str, end: str,
+                     fetch: Callable[[], list]) -> list:
+        """Returns the cached busy slots for the window, calling `fetch` on a miss."""
+        key = (tuple(calendar_ids), mode, start, end)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        busy_slots = fetch()
+        with self._lock:
+            self.misses += 1
+            for expired in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[expired]
+            self._entries[key] = (now + self.ttl_seconds, busy_slots)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(1, self.max_entries):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return busy_slots
+
+    def invalidate(self, calendar_id: Optional[str] = None) -> None:
+        """Drops the cached windows of a calendar (or of all calendars)."""
+        with self._lock:
+            if calendar_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if calendar_id in k[0]]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+busy_cache = BusyCache(
+    float(os.getenv("BUSY_CACHE_TTL_SECONDS", DEFAULT_BUSY_CACHE_TTL)),
+    int(os.getenv("BUSY_CACHE_SIZE", DEFAULT_BUSY_CACHE_SIZE)),
+)
@@ -0,0 +1,121 @@
+# SQL ASSESSMENT 🗃️
+# Datasets and grading helpers for SQL coding problems.
+#
+# A problem names a dataset (a setup script registered with the sandbox's SQL
+# runner). The script runs once, into a template in-memory database; every
+# candidate query runs against a private copy of it (SQLite backup API), so
+# grading never replays the inserts. Results are compared row by row, in
+# order or as a multiset, and the query's cost (virtual machine instructions,
+# query plan) is compared with the problem's reference query so correct but
+# inefficient solutions can be flagged.
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from .code_sandbox import DEFAULT_TIMEOUT_SECONDS, get_runner
+
+logger = logging.getLogger(__name__)
+
+
+# --- Configuration ---
+COST_FACTOR = 3.0          # A query costing more than this times the reference is flagged.
+MIN_FLAGGED_STEPS = 10_000  # Below this, differences are noise (instructions).
+
+
+# An online shop: 500 customers (the last 20 without orders) and 20,000 orders
+# over 2024. Values are derived from the row number, so the data is the same
+# everywhere and expected outputs never change.
+SHOP_DATASET = """
+CREATE TABLE customers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    country TEXT NOT NULL,
+    signup_date TEXT NOT NULL
+);
+CREATE TABLE orders (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL REFERENCES customers(id),
+    amount REAL NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX idx_orders_customer ON orders(customer_id);
+
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 500)
+INSERT INTO customers
+SELECT i, 'Customer ' || i,
+       CASE i % 5 WHEN 0 THEN 'IT' WHEN 1 THEN 'DE' WHEN 2 THEN 'FR' WHEN 3 THEN 'ES' ELSE 'NL' END,
+       date('2023-01-01', '+' || (i % 365) || ' days')
+FROM n;
+
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 20000)
+INSERT INTO orders
+SELECT i, (i * 7919) % 480 + 1, round((i * 37) % 1000 / 4.0 + 5, 2),
+       CASE WHEN i % 11 = 0 THEN 'cancelled' ELSE 'completed' END,
+       date('2024-01-01', '+' || (i % 366) || ' days')
+FROM n;
+"""
+
+DATASETS = {"shop": SHOP_DATASET}
+
+
+def register_datasets() -> None:
+    """Registers the datasets with the sandbox's SQL runner (templates are built on first use)."""
+    runner = get_runner("sql")
+    for name, script in DATASETS.items():
+        runner.register_dataset(name, script)
+
+
+register_datasets()
+
+
+# =============================================================================
+# Grading
+# =============================================================================
+
+def result_rows(output: str, ordered: bool) -> str:
+    """Output rows as compared: as printed, or sorted when row order does not matter."""
+    return output if ordered else "\n".join(sorted(output.splitlines()))
+
+
+_reference_steps: Dict[tuple, Optional[int]] = {}
+_reference_lock = threading.Lock()
+
+
+def reference_steps(dataset: str, query: str) -> Optional[int]:
+    """Cost of the problem's reference query on its dataset (run once per process)."""
+    key = (dataset, query)
+    with _reference_lock:
+        if key in _reference_steps:
+            return _reference_steps[key]
+    result = get_runner("sql").run(query, DEFAULT_TIMEOUT_SECONDS, 128, dataset=dataset)
+    steps = result.get("vm_steps") if result["status"] == "success" else None
+    if steps is None:
+        logger.warning("Reference query failed on dataset %s: %s", dataset, result.get("error_msg"))
+    with _reference_lock:
+        _reference_steps[key] = steps
+    return steps
+
+
+def is_inefficient(steps: int, reference: Optional[int]) -> bool:
+    """Whether a query costs far more than the reference query (never, without a reference)."""
+    return bool(reference) and steps > max(reference * COST_FACTOR, MIN_FLAGGED_STEPS)
+
+
+def efficiency_report(result: dict, dataset: str, reference_query: Optional[str] = None) -> List[str]:
+    """
+    Report lines on a query's cost: instructions executed, its query plan and,
+    if a reference query is known, a warning when it costs far more.
+    """
+    steps = result.get("vm_steps", 0)
+    lines = [f"Query cost: ~{steps:,} VM instructions"]
+    reference = reference_steps(dataset, reference_query) if reference_query else None
+    if reference:
+        lines[0] += f" (reference solution: ~{reference:,})"
+        if is_inefficient(steps, reference):
+            lines.append(f"⚠️ Inefficient query: {steps / reference:.1f}x the cost of the reference solution. "
+                         "Check the plan for full table scans or temporary sorts an index or join could avoid.")
+    if result.get("query_plan"):
+        lines.append("Query plan:\n" + "\n".join(result["query_plan"]))
+    return lines
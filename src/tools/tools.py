@@ -2,20 +2,43 @@
 from dotenv import load_dotenv
 load_dotenv()
 from pathlib import Path
-from typing import Dict, Union, Optional, Any
+from typing import Dict, List, Union, Optional, Any
 from google.genai import types
 from google.adk.tools import FunctionTool
-import sqlite3
 import json
-from .code_sandbox import execute_code
+import sqlite3
+from .code_sandbox import DEFAULT_MEMORY_LIMIT_MB, execute_code, normalize_language, warm_up_runners
+from .job_store import DEFAULT_TENANT, get_job_store, job_score, matched_skills, tenant_key
+from .calendar_client import get_calendar_client
+from .bookings import book_slots
+from .calendar_sync import get_calendar_mirror, query_freebusy
+from .upload_pipeline import cached_cv_text, extract_cv_text
+from .upload_store import UPLOAD_SESSION_KEY, get_upload_store
+from .sql_assessment import efficiency_report, is_inefficient, reference_steps
+from .assessments import (
+    CANDIDATE_ID_KEY,
+    PRESENTED_PROBLEM_KEY,
+    AssessmentResult,
+    PresentedProblem,
+    compare_lines,
+    get_assessment_store,
+)
+from .expected_outputs import get_expected_outputs, normalize_output, output_digest
+from .scheduling import (
+    DEFAULT_TIMEZONE,
+    BusyIndex,
+    busy_cache,
+    business_days_window,
+    find_free_slots as compute_free_slots,
+    parse_calendar_time,
+)
 from datetime import datetime, timedelta, timezone
-from dateutil import parser
-import requests
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+import logging
 import os
 import pytz
 
+logger = logging.getLogger(__name__)
+
 
 # Try to import Context. If not available, a mock ToolContext is used for compatibility.
 try:
@@ -33,97 +56,218 @@ except ImportError:
             return self._data.get(key, default)
 
 
+# =============================================================================
+# Context Helpers
+# =============================================================================
+
+def _context_get(context, key: str, default=None):
+    """
+    Reads a value from an ADK ToolContext (session state), a plain dict,
+    or the mock ToolContext used for compatibility.
+    """
+    state = getattr(context, "state", None)
+    if state is not None:
+        return state.get(key, default)
+    return context.get(key, default)
+
+
+def _context_set(context, key: str, value) -> None:
+    """
+    Writes a value to an ADK ToolContext (session state), a plain dict,
+    or the mock ToolContext used for compatibility.
+    """
+    state = getattr(context, "state", None)
+    if state is not None:
+        state[key] = value
+    elif isinstance(context, dict):
+        context[key] = value
+    else:
+        context.set(key, value)
+
+
 # =============================================================================
 # Custom ADK Functions
 # =============================================================================
 
 # --- Calendar Tools ---
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-import os
-
 CALENDAR_ID = os.getenv("CALENDAR_ID", "primary")  # Set your Gmail calendar ID here.
 
 def get_calendar_service():
     """
     Returns an authenticated Google Calendar service using OAuth credentials from .env.
+    The service comes from a process-wide cached client: the discovery document is
+    loaded once, the access token is reused until it expires, and each thread keeps
+    its own persistent HTTP connection.
     """
-    # Check if credentials are configured
     try:
-        refresh_token = os.getenv("GOOGLE_REFRESH_TOKEN")
-        client_id = os.getenv("GOOGLE_CLIENT_ID")
-        client_secret = os.getenv("GOOGLE_CLIENT_SECRET")
-        
-        if not all([refresh_token, client_id, client_secret]):
-            raise ValueError(
-                "Google Calendar credentials not configured. "
-                "Please set GOOGLE_REFRESH_TOKEN, GOOGLE_CLIENT_ID, and GOOGLE_CLIENT_SECRET in .env file."
-            )
-        
-        creds = Credentials(
-            token=None,
-            refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=client_id,
-            client_secret=client_secret,
-            scopes=["https://www.googleapis.com/auth/calendar"]
-        )
-
-        service = build('calendar', 'v3', credentials=creds)
-        return service
+        return get_calendar_client().service()
     
     except Exception as e:
         print("RAW ERROR:", repr(e))
 
 
-def calendar_get_busy_fn(start: str, end: str) -> str:
+BUSY_MODES = ("events", "freebusy", "sync")
+
+
+def _resolve_calendar_ids(calendar_ids: Optional[str]) -> list:
+    """Splits a comma-separated list of calendar IDs, defaulting to CALENDAR_ID."""
+    ids = [c.strip() for c in (calendar_ids or os.getenv("CALENDAR_ID") or "").split(",") if c.strip()]
+    if not ids:
+        raise ValueError("CALENDAR_ID not configured. Please set CALENDAR_ID in your .env file.")
+    return ids
+
+
+def _resolve_busy_mode(mode: Optional[str]) -> str:
+    mode = (mode or os.getenv("CALENDAR_BUSY_MODE", "freebusy")).lower()
+    if mode not in BUSY_MODES:
+        raise ValueError(f"Unknown busy mode '{mode}'. Use one of: {', '.join(BUSY_MODES)}.")
+    return mode
+
+
+def _fetch_busy_slots(calendar_ids: list, start: str, end: str, mode: str = "events") -> list:
+    """
+    Returns the busy slots of one or more calendars in a window, reusing a
+    recent lookup of the same window (see scheduling.busy_cache).
+
+    Modes:
+        events: events.list per calendar (includes event summaries).
+        freebusy: a single freebusy query for all calendars (busy intervals only).
+        sync: local mirror updated incrementally with sync tokens (see calendar_sync).
+    """
+    def fetch():
+        service = get_calendar_service()
+        if mode == "freebusy":
+            return query_freebusy(service, calendar_ids, start, end)
+
+        busy_slots = []
+        for calendar_id in calendar_ids:
+            if mode == "sync":
+                mirror = get_calendar_mirror(calendar_id)
+                mirror.sync(service)
+                slots = mirror.busy(start, end)
+            else:
+                events_result = service.events().list(
+                    calendarId=calendar_id,
+                    timeMin=start,
+                    timeMax=end,
+                    singleEvents=True,
+                    orderBy='startTime'
+                ).execute()
+                slots = [
+                    {
+                        "start": event['start'].get('dateTime', event['start'].get('date')),
+                        "end": event['end'].get('dateTime', event['end'].get('date')),
+                        "summary": event.get('summary', '')
+                    }
+                    for event in events_result.get('items', [])
+                    if event.get('transparency') != 'transparent'
+                ]
+            if len(calendar_ids) > 1:
+                slots = [{**slot, "calendar": calendar_id} for slot in slots]
+            busy_slots.extend(slots)
+        return busy_slots
+
+    return busy_cache.get_or_fetch(tuple(calendar_ids), mode, start, end, fetch)
+
+
+def calendar_get_busy_fn(start: str, end: str, calendar_ids: str = None, mode: str = None) -> str:
     """
     Query busy slots directly from Google Calendar.
     
     Args:
         start: ISO format datetime string with timezone (e.g., 2025-11-30T10:00:00+01:00)
         end: ISO format datetime string with timezone
+        calendar_ids: Optional comma-separated calendar IDs (default: CALENDAR_ID)
+        mode: Optional lookup mode: "freebusy" (one request for all calendars, no summaries),
+              "events" (full events with summaries) or "sync" (incremental local mirror).
+              Default: CALENDAR_BUSY_MODE or "freebusy".
 
     Returns:
         JSON string with busy slots or detailed error.
     """
     try:
-        CALENDAR_ID = os.getenv("CALENDAR_ID")
-        if not CALENDAR_ID:
-            raise ValueError(
-                "CALENDAR_ID not configured. Please set CALENDAR_ID in your .env file."
-            )
-        
-        service = get_calendar_service()
-        events_result = service.events().list(
-            calendarId=CALENDAR_ID,
-            timeMin=start,
-            timeMax=end,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        busy_slots = [
-            {
-                "start": event['start'].get('dateTime', event['start'].get('date')),
-                "end": event['end'].get('dateTime', event['end'].get('date')),
-                "summary": event.get('summary', '')
-            }
-            for event in events_result.get('items', [])
-        ]
+        ids = _resolve_calendar_ids(calendar_ids)
+        mode = _resolve_busy_mode(mode)
+
+        busy_slots = _fetch_busy_slots(ids, start, end, mode)
 
         return json.dumps({
             "status": "success",
             "start": start,
             "end": end,
+            "mode": mode,
             "busy_slots": busy_slots
+        }, separators=(",", ":"))
+
+    except ValueError as ve:
+        return json.dumps({
+            "status": "error",
+            "type": "CALENDAR_NOT_CONFIGURED" if "CALENDAR_ID" in str(ve) else "INVALID_ARGUMENT",
+            "message": str(ve)
+        }, indent=2)
+
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "type": "CALENDAR_API_ERROR",
+            "error_type": type(e).__name__,
+            "message": str(e)
         }, indent=2)
 
+
+def find_free_slots_fn(duration_minutes: int = 60, business_days: int = 5, max_slots: int = 5,
+                       timezone: str = None, calendar_ids: str = None) -> str:
+    """
+    Finds free interview slots in the recruiter's calendar, within working hours,
+    for the next business days. Conflicts are resolved deterministically: no
+    need to fetch or compare busy slots yourself.
+
+    Args:
+        duration_minutes: Length of the interview in minutes.
+        business_days: Number of business days to search, starting today.
+        max_slots: Maximum number of slots to return (earliest first, spread across days).
+        timezone: IANA time zone of the working hours (default: SCHEDULER_TIMEZONE or Europe/Rome).
+        calendar_ids: Optional comma-separated calendar IDs that must all be free (default: CALENDAR_ID).
+
+    Returns:
+        Compact JSON string with the free slots (ISO start/end) or detailed error.
+    """
+    try:
+        ids = _resolve_calendar_ids(calendar_ids)
+        timezone = timezone or os.getenv("SCHEDULER_TIMEZONE", DEFAULT_TIMEZONE)
+        tz = pytz.timezone(timezone)
+        now = datetime.now(tz)
+        window_start, window_end = business_days_window(now, business_days, timezone)
+
+        busy_slots = _fetch_busy_slots(ids, window_start.isoformat(), window_end.isoformat(), _resolve_busy_mode(None))
+        busy = BusyIndex(
+            (parse_calendar_time(slot["start"], tz), parse_calendar_time(slot["end"], tz))
+            for slot in busy_slots
+        )
+
+        slots = compute_free_slots(
+            busy,
+            window_start=now,
+            window_end=window_end,
+            duration_minutes=duration_minutes,
+            timezone=timezone,
+            work_start=os.getenv("SCHEDULER_WORK_START", "09:00"),
+            work_end=os.getenv("SCHEDULER_WORK_END", "18:00"),
+            max_slots=max_slots,
+        )
+
+        return json.dumps({
+            "status": "success",
+            "timezone": timezone,
+            "duration_minutes": duration_minutes,
+            "slots": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in slots]
+        }, separators=(",", ":"))
+
     except ValueError as ve:
         return json.dumps({
             "status": "error",
-            "type": "CALENDAR_NOT_CONFIGURED",
+            "type": "CALENDAR_NOT_CONFIGURED" if "CALENDAR_ID" in str(ve) else "INVALID_ARGUMENT",
             "message": str(ve)
         }, indent=2)
 
@@ -138,6 +282,8 @@ def calendar_get_busy_fn(start: str, end: str) -> str:
 def calendar_book_slot_fn(start: str, end: str, summary: str = "Interview", attendee_email: str = None) -> str:
     """
     Books an event directly on Google Calendar, only for today or future dates.
+    The slot is reserved first and re-checked against the calendar, so two
+    sessions can never book overlapping interviews.
 
     Args:
         start: ISO format start datetime string with timezone
@@ -154,40 +300,59 @@ def calendar_book_slot_fn(start: str, end: str, summary: str = "Interview", atte
         if not CALENDAR_ID:
             raise ValueError("CALENDAR_ID not configured. Please set CALENDAR_ID in your .env file.")
 
-        # Convert start/end to datetime objects in Rome timezone
-        rome_tz = pytz.timezone("Europe/Rome")
-        start_dt = datetime.fromisoformat(start).astimezone(rome_tz)
-        end_dt = datetime.fromisoformat(end).astimezone(rome_tz)
-        now_dt = datetime.now(rome_tz)
+        service = get_calendar_service()
+        slot = {"start": start, "end": end, "summary": summary, "attendee_email": attendee_email}
+        result = book_slots(service, CALENDAR_ID, [slot])[0]
 
-        if start_dt < now_dt:
-            raise ValueError(f"Cannot book in the past. Next available start datetime is after {now_dt.isoformat()}")
+        return json.dumps(result, indent=2)
 
-        service = get_calendar_service()
+    except ValueError as ve:
+        return json.dumps({
+            "status": "error",
+            "type": "CALENDAR_NOT_CONFIGURED" if "CALENDAR_ID" in str(ve) else "INVALID_DATE",
+            "message": str(ve)
+        }, indent=2)
+
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "type": "CALENDAR_BOOKING_ERROR",
+            "error_type": type(e).__name__,
+            "message": str(e)
+        }, indent=2)
 
-        event = {
-            "summary": summary,
-            "start": {"dateTime": start_dt.isoformat(), "timeZone": "Europe/Rome"},
-            "end": {"dateTime": end_dt.isoformat(), "timeZone": "Europe/Rome"},
-        }
 
-        if attendee_email:
-            event["attendees"] = [{"email": attendee_email}]
+def calendar_book_slots_fn(slots: List[Dict[str, str]]) -> str:
+    """
+    Books several interviews on Google Calendar in one go (e.g. a panel of
+    candidates). Every slot is reserved and re-checked against the calendar;
+    the events are created with a single batch request.
 
-        created_event = service.events().insert(calendarId=CALENDAR_ID, body=event).execute()
+    Args:
+        slots: List of slots, each with "start" and "end" (ISO datetime with timezone),
+               and optional "summary" and "attendee_email".
+
+    Returns:
+        Compact JSON string with one result per slot (booked event or error).
+    """
+    try:
+        CALENDAR_ID = os.getenv("CALENDAR_ID")
+        if not CALENDAR_ID:
+            raise ValueError("CALENDAR_ID not configured. Please set CALENDAR_ID in your .env file.")
+
+        service = get_calendar_service()
+        results = book_slots(service, CALENDAR_ID, slots)
 
         return json.dumps({
-            "status": "success",
-            "event_id": created_event.get("id"),
-            "summary": created_event.get("summary"),
-            "start": created_event['start'].get('dateTime'),
-            "end": created_event['end'].get('dateTime')
-        }, indent=2)
+            "status": "success" if all(r["status"] == "success" for r in results) else "partial",
+            "booked": sum(r["status"] == "success" for r in results),
+            "results": results
+        }, separators=(",", ":"))
 
     except ValueError as ve:
         return json.dumps({
             "status": "error",
-            "type": "CALENDAR_NOT_CONFIGURED" if "CALENDAR_ID" in str(ve) else "INVALID_DATE",
+            "type": "CALENDAR_NOT_CONFIGURED",
             "message": str(ve)
         }, indent=2)
 
@@ -201,88 +366,242 @@ def calendar_book_slot_fn(start: str, end: str, summary: str = "Interview", atte
 
 
 
-def run_code_assignment(code: str, expected_output: str = None, context: Optional[object] = None) -> str:
+OUTPUT_PREVIEW_CHARS = 2000  # Output shown in feedback (passing runs, truncated runs).
+
+# Sandbox failures as reported to the candidate: (label, message if the sandbox gave none).
+_FAILURE_LABELS = {
+    "timeout": ("Timeout Error", "Execution timed out."),
+    "security_violation": ("Security Error", "A security violation was detected."),
+}
+
+
+def _failure_feedback(result: dict, graded: bool) -> str:
+    label, default = _FAILURE_LABELS.get(result["status"], ("Execution Error", "An unknown error occurred."))
+    message = result.get("error_msg") or default
+    if graded:
+        return f"❌ FAIL: {label} - {message}"
+    return f"❌ {label}:\n{message}" if label == "Execution Error" else f"❌ {label}: {message}"
+
+
+def _describe_line(line: Optional[str]) -> str:
+    return "<no more output>" if line is None else line[:OUTPUT_PREVIEW_CHARS]
+
+
+def _presented_problem(context) -> Optional[PresentedProblem]:
+    """The problem presented in this session, or None if there is none."""
+    if context is None or not _context_get(context, "problem_generated"):
+        return None
+    problem = PresentedProblem.from_dict(_context_get(context, PRESENTED_PROBLEM_KEY))
+    if problem is None and _context_get(context, "last_expected_output") is not None:
+        # Sessions saved before the problem was kept as one typed entry.
+        problem = PresentedProblem(
+            expected_output=_context_get(context, "last_expected_output"),
+            language=_context_get(context, "last_problem_language") or "python",
+            dataset=_context_get(context, "last_problem_dataset"),
+            ordered=_context_get(context, "last_problem_ordered", True),
+        )
+    return problem
+
+
+def assess_code(code: str, expected_output: str = None, context: Optional[ToolContext] = None,
+                language: str = None) -> AssessmentResult:
+    """
+    Runs a submission and, if a problem was presented, grades it.
+    See run_code_assignment for the three modes.
+    """
+    # Execute code in sandbox. SQL problems run against a copy of their dataset.
+    problem = _presented_problem(context)
+    if language is None and problem is not None:
+        language = problem.language
+    language = normalize_language(language)
+    dataset = problem.dataset if problem is not None and language == "sql" else None
+    result = execute_code(code, language=language, **({"dataset": dataset} if dataset else {}))
+    assessment = AssessmentResult.from_execution(result, language, DEFAULT_MEMORY_LIMIT_MB)
+
+    # MODE 1: Store expected output (for problem generation).
+    if expected_output is not None:
+        if context is not None:
+            _context_set(context, PRESENTED_PROBLEM_KEY, PresentedProblem(expected_output, language).to_dict())
+            _context_set(context, "problem_generated", True)
+        assessment.feedback = "✅ Expected output stored successfully!" if result["status"] == "success" \
+            else _failure_feedback(result, graded=False)
+        return assessment
+
+    # MODE 3: Backwards compatible - no context or expected output.
+    # This is the old behavior for existing code.
+    if problem is None:
+        assessment.feedback = f"✅ Code executed successfully!\nOutput:\n{result['output']}" \
+            if result["status"] == "success" else _failure_feedback(result, graded=False)
+        return assessment
+
+    # MODE 2: Compare with stored expected output (for evaluation).
+    assessment.graded = True
+    assessment.problem_id, assessment.problem_version = problem.problem_id, problem.expected_version
+    if result["status"] != "success":
+        assessment.feedback = _failure_feedback(result, graded=True)
+        return assessment
+
+    # The sandbox kept only the head and tail of the output: it cannot match.
+    if result.get("output_truncated"):
+        assessment.status = "output_limit"
+        assessment.feedback = ("❌ FAIL: Output limit exceeded - the program printed more than the sandbox keeps.\n"
+                               f"Actual (truncated):\n{result['output'][:OUTPUT_PREVIEW_CHARS]}")
+        return assessment
+
+    # Execution succeeded - compare outputs line by line; each line is one check.
+    # Problems that do not grade row order (SQL) compare the sorted rows.
+    actual = normalize_output(result['output'], problem.ordered)
+    if problem.expected_digest and output_digest(actual) == problem.expected_digest:
+        # Large expected output: equal digests, no need to read it back from disk.
+        lines = actual.count("\n") + 1
+        total, passed, failures = lines, lines, []
+    elif problem.expected_digest:
+        expected_lines = get_expected_outputs().lines(problem.expected_version or "")
+        if expected_lines is None:
+            assessment.status = "fail"
+            assessment.feedback = "❌ FAIL: Output mismatch (the expected output is no longer stored to locate the difference)"
+            return assessment
+        total, passed, failures = compare_lines(actual, expected_lines)
+    else:
+        total, passed, failures = compare_lines(actual, normalize_output(problem.expected_output, problem.ordered))
+    assessment.tests_total, assessment.tests_passed, assessment.failed_tests = total, passed, failures
+
+    if failures:
+        first = failures[0]
+        assessment.status = "fail"
+        assessment.feedback = (
+            f"❌ FAIL: Output mismatch ({'line' if problem.ordered else 'sorted row'} {first.line}; "
+            f"{passed}/{total} lines match)\n"
+            f"Expected:\n{_describe_line(first.expected)}\n\nActual:\n{_describe_line(first.actual)}")
+        return assessment
+
+    assessment.status = "pass"
+    shown = result['output'].strip()
+    if len(shown) > OUTPUT_PREVIEW_CHARS:
+        shown = f"{shown[:OUTPUT_PREVIEW_CHARS]}\n... ({len(shown) - OUTPUT_PREVIEW_CHARS:,} more characters)"
+    assessment.feedback = f"✅ PASS: Code executed successfully and output matches expected!\nOutput:\n{shown}"
+    if dataset:
+        if problem.reference_solution:
+            assessment.reference_steps = reference_steps(dataset, problem.reference_solution)
+            assessment.inefficient = is_inefficient(assessment.vm_steps or 0, assessment.reference_steps)
+        report = efficiency_report(result, dataset, problem.reference_solution)
+        assessment.feedback += "\n\n" + "\n".join(report)
+    return assessment
+
+
+def _record_assessment(assessment: AssessmentResult, context: Optional[ToolContext]) -> None:
+    """Appends a graded result to the assessments table (never fails the grading)."""
+    if not assessment.graded:
+        return
+    candidate_id = _context_get(context, CANDIDATE_ID_KEY) or _context_get(context, UPLOAD_SESSION_KEY)
+    try:
+        get_assessment_store().record(assessment, candidate_id, _context_get(context, "selected_job"))
+    except sqlite3.Error as e:
+        logger.warning("Assessment not recorded for %s: %r", candidate_id, e)
+
+
+def run_code_assignment(code: str, expected_output: str = None, context: Optional[ToolContext] = None,
+                        language: str = None) -> str:
     """
     Executes the candidate's code submission in a secure sandbox environment.
-    Used by the code_assessment_agent to evaluate solutions. Returns a structured
-    string indicating success or failure. Supports Context for reliable output comparison.
+    Used by the code_assessment_agent to evaluate solutions. Supports Context
+    for reliable output comparison.
 
     Args:
         code: The Python code string submitted by the candidate.
         expected_output: (Optional) If provided, stores this as the expected output in context.
                         If not provided, retrieves expected output from context and compares.
         context: (Optional) ToolContext for storing/retrieving expected outputs.
+        language: (Optional) python, javascript, go or sql. Defaults to the language
+                  of the presented problem, else python.
 
     Returns:
-        A string with the execution result, prefixed with '✅' for success
-        or '❌' for errors, timeouts, or security violations.
-        If context is available and expected_output was stored:
-        - Compares actual output with expected output
-        - Returns detailed pass/fail message
+        A compact JSON AssessmentResult: "status" ("pass", "fail", "output_limit",
+        "timeout", "memory_error", "security_violation", "error", or "success" for
+        an ungraded run), "verdict" ("pass" / "not pass") when graded against a
+        presented problem, check counts, the first failed checks, timings,
+        resource use and "feedback" (prefixed with '✅' or '❌').
     """
-    
-    # Execute code in sandbox.
-    result = execute_code(code)
-    
-    # MODE 1: Store expected output (for problem generation).
-    if expected_output is not None:
-        if context:
-            context.set("last_expected_output", expected_output)
-            context.set("problem_generated", True)
-        # Return normal execution result
-        if result["status"] == "success":
-            feedback = f"✅ Expected output stored successfully!"
-        elif result["status"] == "timeout":
-            feedback = f"❌ Timeout Error: {result.get('error_msg', 'Execution timed out.')}"
-        elif result["status"] == "security_violation":
-             feedback = f"❌ Security Error: {result.get('error_msg', 'A security violation was detected.')}"
-        else:
-            feedback = f"❌ Execution Error:\n{result.get('error_msg', 'An unknown error occurred.')}"
-        return feedback
-    
-    # MODE 2: Compare with stored expected output (for evaluation).
-    if context and context.get("problem_generated"):
-        expected = context.get("last_expected_output", "")
-        
-        # First check if execution succeeded
-        if result["status"] != "success":
-            if result["status"] == "timeout":
-                return f"❌ FAIL: Timeout Error - {result.get('error_msg', 'Execution timed out.')}"
-            elif result["status"] == "security_violation":
-                return f"❌ FAIL: Security Error - {result.get('error_msg', 'A security violation was detected.')}"
-            else:
-                return f"❌ FAIL: Execution Error - {result.get('error_msg', 'An unknown error occurred.')}"
-        
-        # Execution succeeded - compare outputs
-        actual = result['output'].strip()
-        expected = expected.strip()
-        
-        if actual == expected:
-            return f"✅ PASS: Code executed successfully and output matches expected!\nOutput:\n{actual}"
+    assessment = assess_code(code, expected_output, context, language)
+    if expected_output is None:
+        _record_assessment(assessment, context)
+    return assessment.to_json()
+
+
+def grade_code_submission_fn(code: str, context: Optional[ToolContext] = None) -> str:
+    """
+    Grades a candidate's code submission directly, without an intermediate LLM call.
+    Runs the code through assess_code against the expected output stored
+    by problem_presenter_tool and takes the verdict from the typed result.
+
+    Args:
+        code: The exact Python code submitted by the candidate.
+        context: ToolContext holding the expected output of the presented problem.
+
+    Returns:
+        'pass' if the output matches the expected output, otherwise 'not pass'.
+    """
+    assessment = assess_code(code, context=context)
+    _record_assessment(assessment, context)
+
+    # Store the verdict for the language assessment and scheduling steps.
+    if context is not None:
+        _context_set(context, "assignment_result", assessment.verdict)
+        _context_set(context, "last_assignment_feedback", assessment.feedback)
+        _context_set(context, "last_assessment", assessment.to_dict())
+
+    return assessment.verdict
+
+
+PROBLEM_INSTRUCTIONS = {
+    "python": """- Write your solution function
+- Include the test cases at the end of your code
+- DO NOT use import statements
+- Only use built-in functions: print, range, len, sum, min, max, abs, round, int, str, list, dict, tuple, set, float, bool, sorted, enumerate, zip, reversed
+
+**Please submit your complete code (function + test cases).**""",
+    "javascript": """- Write your solution function
+- Include the test cases at the end of your code, printing with console.log
+- DO NOT use require, import, process or eval
+
+**Please submit your complete code (function + test cases).**""",
+    "go": """- Write a complete program (package main) with your solution and the test cases in main()
+- Print with fmt; only standard library packages such as fmt, strings, strconv, sort and math are allowed
+
+**Please submit your complete program.**""",
+    "sql": """- Write a single SQLite query (SELECT or WITH ... SELECT)
+- The tables above are already loaded; do not create or modify them
+- Correct but inefficient queries (e.g. avoidable full table scans) are flagged
+
+**Please submit your query.**""",
+}
+
+
+def _job_skills(job_title: str, job_id: Optional[str] = None) -> Optional[List[str]]:
+    """skills_required of the selected job, by id or else by title (None if not in the catalog)."""
+    try:
+        store = get_job_store()
+        if job_id:
+            tenant, number = _parse_job_id(job_id)
+            job = store.get_job(tenant, number)
         else:
-            return f"❌ FAIL: Output mismatch\nExpected:\n{expected}\n\nActual:\n{actual}"
-    
-    # MODE 3: Backwards compatible - no context or expected output.
-    # This is the old behavior for existing code.
-    if result["status"] == "success":
-        feedback = f"✅ Code executed successfully!\nOutput:\n{result['output']}"
-    elif result["status"] == "timeout":
-        feedback = f"❌ Timeout Error: {result.get('error_msg', 'Execution timed out.')}"
-    elif result["status"] == "security_violation":
-         feedback = f"❌ Security Error: {result.get('error_msg', 'A security violation was detected.')}"
-    else:
-        feedback = f"❌ Execution Error:\n{result.get('error_msg', 'An unknown error occurred.')}"
-    
-    return feedback
+            job = store.find_job_by_title(job_title) if job_title else None
+    except (ValueError, FileNotFoundError, sqlite3.Error) as e:
+        logger.warning("Job skills unavailable for problem selection: %r", e)
+        return None
+    return job["skills"] if job else None
 
 
-def present_coding_problem_fn(job_title: str = "default", context: Optional[object] = None) -> str:
+def present_coding_problem_fn(job_title: str = "default", job_id: str = None, difficulty: str = None,
+                              context: Optional[ToolContext] = None) -> str:
     """
-    Presents a coding problem from templates based on job category.
-    Automatically stores expected output for later evaluation.
+    Presents a coding problem from the problem bank, picked by the selected job's
+    required skills (and its title). Automatically stores expected output for later evaluation.
     
     Args:
-        job_title: The job title to determine the appropriate problem.
+        job_title: The title of the selected job.
+        job_id: (Optional) The job's id as listed by list_jobs (e.g. "12" or "acme:12").
+        difficulty: (Optional) easy, medium or hard.
         context: ToolContext for storing expected output.
         
     Returns:
@@ -292,77 +611,86 @@ def present_coding_problem_fn(job_title: str = "default", context: Optional[obje
     from ..agents.agents import get_coding_problem
     
     # Get the appropriate problem.
-    problem = get_coding_problem(job_title)
-    
-    # Store the expected output in context for later comparison.
-    if context:
-        context.set("last_expected_output", problem['expected_output'])
-        context.set("problem_generated", True)
+    problem = get_coding_problem(job_title, skills=_job_skills(job_title, job_id), difficulty=difficulty)
+    # Interpreter workers and build caches get ready while the candidate reads the problem.
+    warm_up_runners([problem.get('language', 'python')], background=True)
+
+    # Its expected output, generated from the reference solution on first use.
+    try:
+        expected = get_expected_outputs().get(problem)
+    except ValueError as e:
+        return f"❌ Problem unavailable: {e}"
+    
+    # Store the expected output in context for later comparison. Large outputs
+    # are kept on disk and only their digest goes into the session.
+    if context is not None:
+        presented = PresentedProblem(
+            expected_output=expected.text or "",
+            language=problem.get('language', 'python'),
+            problem_id=problem.get('id'),
+            expected_digest=None if expected.inline else expected.digest,
+            expected_version=expected.version,
+            dataset=problem.get('dataset'),
+            ordered=problem.get('ordered', True),
+            reference_solution=problem.get('reference_solution'),
+        )
+        _context_set(context, PRESENTED_PROBLEM_KEY, presented.to_dict())
+        _context_set(context, "problem_generated", True)
+        _context_set(context, "selected_job", job_title)
     
     # Format the problem for display.
+    language = problem.get('language', 'python')
     formatted_problem = f"""**Coding Assessment: {problem['title']}**
 
 **Problem Description:**
 {problem['description']}
 
-**Test Cases:**
-```python
+**{'Tables' if language == 'sql' else 'Test Cases'}:**
+```{language}
 {problem['test_code']}
 ```
 
 **Instructions:**
-- Write your solution function
-- Include the test cases at the end of your code
-- DO NOT use import statements
-- Only use built-in functions: print, range, len, sum, min, max, abs, round, int, str, list, dict, tuple, set, float, bool, sorted, enumerate, zip, reversed
-
-**Please submit your complete code (function + test cases).**"""
+{PROBLEM_INSTRUCTIONS.get(language, PROBLEM_INSTRUCTIONS['python'])}"""
 
     return formatted_problem
 
 
-def read_cv_fn(filename: str) -> str:
+def read_cv_fn(filename: str, context: Optional[ToolContext] = None) -> str:
     """
     Reads a CV file that has been uploaded for analysis.
     
     Args:
         filename: Name of the CV file to read and analyze (supports .txt and .pdf formats).
+        context: ToolContext whose state identifies the uploader's session.
     
     Returns:
         A readable text output of the CV content.
     """
-    base_path = Path(__file__).parent.parent.parent
-    temp_uploads_path = base_path / "temp_uploads" / filename
-    dummy_files_path = base_path / "dummy_files_for_testing" / filename
-    
-    if temp_uploads_path.exists():
-        file_path = temp_uploads_path
-    elif dummy_files_path.exists():
+    dummy_dir = (Path(__file__).parent.parent.parent / "dummy_files_for_testing").resolve()
+    # Resolved and checked: an absolute or "../" name must not reach files outside the folder.
+    dummy_files_path = (dummy_dir / filename).resolve()
+    upload_session = _context_get(context, UPLOAD_SESSION_KEY) if context is not None else None
+
+    if (uploaded := get_upload_store().resolve(filename, upload_session)) is not None:
+        file_path = uploaded
+    elif dummy_files_path.is_relative_to(dummy_dir) and dummy_files_path.exists():
         file_path = dummy_files_path
     else:
         return f"❌ Error: Could not find the CV file '{filename}'. Please ensure the file was uploaded successfully."
     
     try:
-        if file_path.suffix == '.txt':
-            content = file_path.read_text(encoding='utf-8')
-            if not content.strip():
-                content = "Not provided"
-            return f"✅ Successfully read {filename}:\n\n{content}"
-        
-        elif file_path.suffix == '.pdf':
-            try:
-                import pdfplumber
-                text = ""
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() or ""
-                if not text.strip():
-                    text = "Not provided"
-                return f"✅ Successfully read {filename}:\n\n{text}"
-            except ImportError:
-                return "⚠️ PDF reading requires pdfplumber. Install with: pip install pdfplumber"
-        else:
+        if file_path.suffix not in (".txt", ".pdf"):
             return f"❌ Unsupported file type: {file_path.suffix}. Supported types: .txt, .pdf"
+        # Uploads are extracted in the background as soon as they land (see upload_pipeline).
+        text = cached_cv_text(file_path)
+        if text is None:
+            text = extract_cv_text(file_path)
+        if not text.strip():
+            text = "Not provided"
+        return f"✅ Successfully read {filename}:\n\n{text}"
+    except ImportError:
+        return "⚠️ PDF reading requires pdfplumber. Install with: pip install pdfplumber"
     except Exception as e:
         return f"❌ Error reading file: {str(e)}"
 
@@ -398,7 +726,8 @@ def list_available_cvs_fn() -> str:
 def compare_candidates_fn(
     filename1: str,
     filename2: str,
-    criteria: str
+    criteria: str,
+    context: Optional[ToolContext] = None
 ) -> str:
     """
     Compares two candidate CVs based on specific criteria.
@@ -407,12 +736,13 @@ def compare_candidates_fn(
         filename1: First CV filename.
         filename2: Second CV filename.
         criteria: Comparison criteria (e.g., 'Python experience').
+        context: ToolContext whose state identifies the uploader's session.
     
     Returns:
         A comparison of both candidates based on the specified criteria.
     """
-    cv1 = read_cv_fn(filename1)
-    cv2 = read_cv_fn(filename2)
+    cv1 = read_cv_fn(filename1, context)
+    cv2 = read_cv_fn(filename2, context)
     
     return f"""
 Comparing two candidates on: {criteria}
@@ -426,53 +756,92 @@ Comparing two candidates on: {criteria}
 Please compare these candidates specifically on: {criteria}
 """
 
-def list_jobs_from_db(cv_summary: str = None, max_results: int = 5) -> str:
+COMPACT_MATCHED_SKILLS = 5    # Matched skills listed per job in compact mode.
+JOB_LIST_MODES = ("text", "compact", "semantic")
+
+
+def _parse_job_id(job_id: str) -> tuple:
+    """Splits a compact job id ("tenant:id", or a plain id for the default catalog)."""
+    tenant, _, number = str(job_id).rpartition(":")
+    return tenant or DEFAULT_TENANT, int(number)
+
+
+def _resolve_list_mode(mode: Optional[str]) -> str:
+    mode = (mode or "text").lower()
+    if mode not in JOB_LIST_MODES:
+        raise ValueError(f"Unknown listing mode '{mode}'. Use one of: {', '.join(JOB_LIST_MODES)}.")
+    return mode
+
+
+def list_jobs_from_db(cv_summary: str = None, max_results: int = 5, company: str = None,
+                      mode: str = "text", after_id: str = None, limit: int = None) -> str:
     """
-    Lists jobs from SQLite DB, ranked by skills match. Returns a numbered list for selection.
+    Lists jobs from the SQLite job catalog, ranked by skills match. Returns a numbered list for selection.
+
+    Args:
+        cv_summary: Comma-separated candidate skills (empty: list jobs without filtering)
+        max_results: Number of jobs to return
+        company: Optional client company; only that company's catalog is searched
+        mode: "text" (numbered list with full details), "compact" (JSON with id, title,
+              company, score and matched skills; use get_job_details for the full posting) or
+              "semantic" (compact JSON ranked by similarity of the whole CV summary to each posting)
+        after_id: Compact mode only: id of the last job of the previous page, to get the next page
+        limit: Compact and semantic modes: page size (default: max_results)
     """
     try:
-        conn = sqlite3.connect("jobs/jobs.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, title, company, location, description, responsibilities, skills_required FROM jobs")
-        jobs = cursor.fetchall()
+        mode = _resolve_list_mode(mode)
+    except ValueError as e:
+        return json.dumps({"status": "error", "message": str(e)})
+    store = get_job_store()
+    cv_skills = [s.strip() for s in cv_summary.split(",")] if cv_summary else []
+    semantic = mode == "semantic"
+    compact = mode == "compact" or semantic
+    k = (limit or max_results) if compact else max_results
+    try:
+        tenants = None
+        if company:
+            tenant = tenant_key(company)
+            if tenant not in store.tenants():
+                return f"❌ No job catalog for company '{company}'. Available: {', '.join(store.tenants()) or 'none'}."
+            tenants = [tenant]
+
+        after = None
+        if compact and after_id:
+            after_tenant, after_number = _parse_job_id(after_id)
+            last_job = store.get_job(after_tenant, after_number)
+            if last_job is None:
+                return json.dumps({"status": "error", "message": f"Unknown job id '{after_id}'."})
+            after = (job_score(last_job, cv_skills), after_tenant, after_number)
+
+        if semantic:
+            matched_jobs = store.semantic_top_jobs(cv_summary or "", k, tenants=tenants)
+        else:
+            matched_jobs = store.top_jobs(cv_skills, k, tenants=tenants, after=after)
     except Exception as e:
-        return f"❌ Could not read jobs.db: {e}"
-    finally:
-        conn.close()
+        return f"❌ Could not read the job catalog: {e}"
 
-    matched_jobs = []
+    if compact:
+        jobs = [
+            {
+                "id": f"{job['tenant']}:{job['id']}",
+                "title": job["title"],
+                "company": job["company"],
+                "score": job["score"],
+                "matched": matched_skills(job, cv_skills)[:COMPACT_MATCHED_SKILLS],
+            }
+            for job in matched_jobs
+        ]
+        return json.dumps({
+            "status": "success",
+            "jobs": jobs,
+            "next_after_id": jobs[-1]["id"] if len(jobs) == k and not semantic else None,
+        }, ensure_ascii=False, separators=(",", ":"))
 
-    for job in jobs:
-        job_id, title, company, location, description, responsibilities, skills_json = job
-        try:
-            skills = json.loads(skills_json)
-        except Exception:
-            skills = []
-
-        score = 0
-        if cv_summary:
-            cv_skills = [s.strip().lower() for s in cv_summary.split(",")]
-            score = len(set(cv_skills) & set([s.lower() for s in skills]))
-        else:
-            score = 1
-
-        if score > 0:
-            matched_jobs.append((score, {
-                "id": job_id,
-                "title": title,
-                "company": company,
-                "location": location,
-                "description": description,
-                "responsibilities": responsibilities,
-                "skills": skills
-            }))
-
-    matched_jobs.sort(key=lambda x: x[0], reverse=True)
     if not matched_jobs:
         return "❌ No matching jobs found."
 
     response = ""
-    for i, (_, job) in enumerate(matched_jobs[:max_results], start=1):
+    for i, job in enumerate(matched_jobs, start=1):
         response += (
             f"{i}. {job['title']} at {job['company']}\n"
             f"   Location: {job['location']}\n"
@@ -485,6 +854,35 @@ def list_jobs_from_db(cv_summary: str = None, max_results: int = 5) -> str:
     return response
 
 
+def get_job_details_fn(job_id: str) -> str:
+    """
+    Returns the full posting of a job listed in compact mode.
+
+    Args:
+        job_id: Job id from the compact listing (e.g. "default:3")
+
+    Returns:
+        JSON string with location, description, responsibilities and required skills, or error.
+    """
+    try:
+        tenant, number = _parse_job_id(job_id)
+        job = get_job_store().get_job(tenant, number)
+    except Exception as e:
+        return json.dumps({"status": "error", "message": f"Could not read job '{job_id}': {e}"})
+    if job is None:
+        return json.dumps({"status": "error", "message": f"Unknown job id '{job_id}'."})
+    return json.dumps({
+        "status": "success",
+        "id": f"{tenant}:{number}",
+        "title": job["title"],
+        "company": job["company"],
+        "location": job["location"],
+        "description": job["description"],
+        "responsibilities": job["responsibilities"],
+        "skills": job["skills"],
+    }, ensure_ascii=False, separators=(",", ":"))
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -543,7 +941,11 @@ read_cv = FunctionTool(func=read_cv_fn)
 list_available_cvs = FunctionTool(func=list_available_cvs_fn)
 compare_candidates = FunctionTool(func=compare_candidates_fn)
 job_listing_tool = FunctionTool(func=list_jobs_from_db)
+job_details_tool = FunctionTool(func=get_job_details_fn)
 code_execution_tool = FunctionTool(func=run_code_assignment)
+code_grading_tool = FunctionTool(func=grade_code_submission_fn)
 problem_presenter_tool = FunctionTool(func=present_coding_problem_fn)
 calendar_get_busy = FunctionTool(func=calendar_get_busy_fn)
+calendar_book_slots = FunctionTool(func=calendar_book_slots_fn)
+find_free_slots = FunctionTool(func=find_free_slots_fn)
 calendar_book_slot = FunctionTool(func=calendar_book_slot_fn)
\ No newline at end of file
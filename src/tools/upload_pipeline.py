@@ -0,0 +1,307 @@
+# UPLOAD PIPELINE 📥
+# Background processing of uploaded CVs. As soon as a file lands, a worker
+# extracts its text and a structured profile (contacts, skills, languages)
+# without any model call; the app polls the job's status and, when the user
+# clicks Analyze, read_cv_fn serves the already extracted text.
+#
+# Jobs are keyed by file content, so re-uploading the same CV reuses the
+# finished job. Text extraction is CPU-bound (pdfplumber) but short; a small
+# thread pool keeps the Streamlit script thread free without the cost of
+# spawning processes.
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# --- Configuration ---
+DEFAULT_WORKERS = 2
+MAX_JOBS = 256                    # Finished jobs kept in memory (oldest dropped first).
+CV_SUFFIXES = (".txt", ".pdf")
+
+# Skills recognized even if no job in the catalog requires them yet.
+BASE_SKILLS = (
+    "python", "java", "javascript", "typescript", "go", "rust", "c++", "c#", "sql", "nosql databases",
+    "docker", "kubernetes", "aws", "gcp", "azure", "linux", "git", "react", "node.js", "fastapi",
+    "flask", "django", "pytorch", "tensorflow", "scikit-learn", "pandas", "numpy", "spark", "airflow",
+    "terraform", "postgresql", "mongodb", "redis", "graphql", "rest apis", "microservices",
+)
+LANGUAGES = (
+    "english", "italian", "spanish", "french", "german", "portuguese", "dutch", "polish", "romanian",
+    "russian", "ukrainian", "arabic", "chinese", "mandarin", "japanese", "korean", "hindi", "turkish",
+)
+LANGUAGE_LEVELS = r"native|mother tongue|fluent|proficient|advanced|intermediate|basic|beginner|[abc][12]"
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<!\w)\+?\d[\d ()./-]{7,}\d")
+LINK_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com)/[\w\-/]+", re.IGNORECASE)
+YEARS_RE = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)", re.IGNORECASE)
+
+
+# =============================================================================
+# Extraction
+# =============================================================================
+
+def extract_cv_text(path: Path) -> str:
+    """
+    Returns the text of a .txt or .pdf CV ("" if it has none).
+    Raises ImportError if pdfplumber is missing, ValueError for other file types.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".txt":
+        return path.read_text(encoding="utf-8")
+    if suffix == ".pdf":
+        import pdfplumber
+        text = ""
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                text += page.extract_text() or ""
+        return text
+    raise ValueError(f"Unsupported file type: {path.suffix}. Supported types: .txt, .pdf")
+
+
+def _skill_vocabulary() -> List[str]:
+    """Base skills plus every skill required by the job catalog."""
+    try:
+        from .job_store import get_job_store
+        catalog = get_job_store().skill_vocabulary()
+    except Exception as e:
+        logger.warning("Job catalog skills unavailable for profile extraction: %r", e)
+        catalog = []
+    return sorted(set(BASE_SKILLS) | set(catalog))
+
+
+def _term_pattern(term: str) -> str:
+    # Word boundaries that also work for terms such as "c++", "c#" or "node.js".
+    return rf"(?<![\w+#.]){re.escape(term)}(?![\w+#])"
+
+
+def extract_profile(text: str, vocabulary: Optional[List[str]] = None) -> dict:
+    """
+    Extracts a structured profile from CV text with pattern matching (no model call).
+
+    Args:
+        text: CV text.
+        vocabulary: Skills to look for (default: base skills + job catalog skills).
+
+    Returns:
+        Dict with full_name, email, phone, links, skills, languages ({language: level or None})
+        and years_experience (largest "N years" mentioned, or None).
+    """
+    lowered = text.lower()
+    vocabulary = vocabulary if vocabulary is not None else _skill_vocabulary()
+    skills = [skill for skill in vocabulary if skill and re.search(_term_pattern(skill), lowered)]
+
+    languages = {}
+    for language in LANGUAGES:
+        match = re.search(rf"\b{language}\b[^\n]{{0,25}}?\b({LANGUAGE_LEVELS})\b", lowered)
+        if match:
+            languages[language.title()] = match.group(1).upper() if len(match.group(1)) == 2 else match.group(1).title()
+        elif re.search(rf"\b{language}\b", lowered):
+            languages[language.title()] = None
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    name = next((line for line in lines[:5] if not EMAIL_RE.search(line) and not any(c.isdigit() for c in line)
+                 and 1 < len(line.split()) <= 5), None)
+    years = [int(y) for y in YEARS_RE.findall(text)]
+    email, phone = EMAIL_RE.search(text), PHONE_RE.search(text)
+    return {
+        "full_name": name,
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0).strip() if phone else None,
+        "links": sorted(set(LINK_RE.findall(text))),
+        "skills": skills,
+        "languages": languages,
+        "years_experience": max(years) if years else None,
+    }
+
+
+# =============================================================================
+# Job Queue
+# =============================================================================
+
+@dataclass
+class UploadJob:
+    """Processing state of one uploaded CV."""
+    key: str
+    filename: str
+    path: Path
+    status: str = "queued"            # queued -> extracting -> profiling -> done | error
+    text: Optional[str] = None
+    profile: Optional[dict] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    timings: Dict[str, float] = field(default_factory=dict)
+    future: Optional[Future] = field(default=None, repr=False)
+    file_ids: List[tuple] = field(default_factory=list, repr=False)  # Its entries in UploadPipeline._texts.
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+    def snapshot(self) -> dict:
+        """Status for polling (safe to show in the UI)."""
+        return {
+            "key": self.key,
+            "filename": self.filename,
+            "status": self.status,
+            "error": self.error,
+            "elapsed_s": round(time.monotonic() - self.submitted_at, 3),
+            "timings": dict(self.timings),
+            "profile": self.profile,
+        }
+
+
+def file_key(path: Path) -> str:
+    """Content hash of an uploaded file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class UploadPipeline:
+    """
+    Thread pool processing uploaded CVs in the background.
+
+    Args:
+        max_workers: Worker threads.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="upload")
+        self._jobs: Dict[str, UploadJob] = {}
+        self._texts: Dict[tuple, str] = {}  # (resolved path, mtime_ns, size) -> extracted text (dropped with the job)
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "deduplicated": 0, "text_hits": 0, "text_misses": 0}
+
+    @staticmethod
+    def _file_id(path: Path) -> tuple:
+        stat = path.stat()
+        return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+    def submit(self, path: Path, filename: Optional[str] = None) -> str:
+        """Queues an uploaded file; returns its job key. Identical content reuses the existing job."""
+        path = Path(path)
+        key = file_key(path)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != "error" and job.path.exists():
+                self._stats["deduplicated"] += 1
+                if job.path != path and job.text is not None:
+                    self._add_text(job, self._file_id(path))
+                return key
+            if job is not None:
+                self._drop_texts(job)
+            job = self._jobs[key] = UploadJob(key=key, filename=filename or path.name, path=path)
+            self._stats["submitted"] += 1
+            while len(self._jobs) > MAX_JOBS:
+                oldest = next(k for k, j in self._jobs.items() if j.finished or k == key)
+                if oldest == key:
+                    break
+                self._drop_texts(self._jobs.pop(oldest))
+        job.future = self._executor.submit(self._process, job)
+        return key
+
+    def _add_text(self, job: UploadJob, file_id: tuple) -> None:
+        # Caller holds self._lock.
+        self._texts[file_id] = job.text
+        job.file_ids.append(file_id)
+
+    def _drop_texts(self, job: UploadJob) -> None:
+        # Caller holds self._lock.
+        for file_id in job.file_ids:
+            self._texts.pop(file_id, None)
+        job.file_ids.clear()
+
+    def _process(self, job: UploadJob) -> None:
+        try:
+            start = time.perf_counter()
+            job.status = "extracting"
+            job.text = extract_cv_text(job.path)
+            job.timings["text_s"] = round(time.perf_counter() - start, 4)
+            with self._lock:
+                if self._jobs.get(job.key) is job:  # Not replaced or dropped meanwhile.
+                    self._add_text(job, self._file_id(job.path))
+
+            start = time.perf_counter()
+            job.status = "profiling"
+            job.profile = extract_profile(job.text)
+            job.timings["profile_s"] = round(time.perf_counter() - start, 4)
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "error"
+            logger.warning("Upload processing failed for %s: %r", job.filename, e)
+
+    def warm_up(self, fn: Callable[[], object]) -> Future:
+        """Runs a preparation step (e.g. building the agents) on the pool."""
+        return self._executor.submit(fn)
+
+    def status(self, key: str) -> Optional[dict]:
+        """Current state of a job, or None for an unknown key."""
+        job = self._jobs.get(key)
+        return job.snapshot() if job else None
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """Waits up to `timeout` seconds for a job to finish; returns its state."""
+        job = self._jobs.get(key)
+        if job is None:
+            return None
+        if job.future is not None:
+            try:
+                job.future.result(timeout)
+            except Exception:
+                pass  # Timeout: the snapshot shows the current stage.
+        return job.snapshot()
+
+    def text_for(self, path: Path) -> Optional[str]:
+        """Extracted text of a file if a finished job covers its current content, else None."""
+        try:
+            file_id = self._file_id(Path(path))
+        except OSError:
+            return None
+        with self._lock:
+            text = self._texts.get(file_id)
+            self._stats["text_hits" if text is not None else "text_misses"] += 1
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            jobs = list(self._jobs.values())
+            stats["texts"] = len(self._texts)
+        for status in ("queued", "extracting", "profiling", "done", "error"):
+            stats[status] = sum(job.status == status for job in jobs)
+        lookups = stats["text_hits"] + stats["text_misses"]
+        stats["hit_rate"] = round(stats["text_hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_pipeline: Optional[UploadPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_upload_pipeline() -> UploadPipeline:
+    """Returns the process-wide upload pipeline (UPLOAD_WORKERS sets the pool size)."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = UploadPipeline(int(os.getenv("UPLOAD_WORKERS", DEFAULT_WORKERS)))
+        return _pipeline
+
+
+def cached_cv_text(path: Path) -> Optional[str]:
+    """Text extracted at upload time for this file, if any (does not start the pipeline)."""
+    return _pipeline.text_for(path) if _pipeline is not None else None
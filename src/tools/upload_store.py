@@ -0,0 +1,209 @@
+# UPLOAD STORE 📎
+# Content-addressed storage for uploaded CVs.
+#
+# Each file is stored once, as temp_uploads/blobs/<sha256><suffix>, whoever
+# uploads it and under whatever name. A SQLite index maps (upload session,
+# original file name) to the blob, so two users uploading "cv.pdf" never see
+# each other's file. Blobs are evicted least recently used first once the
+# store exceeds its size cap, and after a maximum age; their mappings go with
+# them. Clearing a session only removes its mappings (and the blobs no other
+# session references).
+
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+# --- Configuration ---
+DEFAULT_UPLOADS_DIR = Path(__file__).parent.parent.parent / "temp_uploads"
+DEFAULT_MAX_MB = 512
+DEFAULT_MAX_AGE_HOURS = 24
+UPLOAD_SESSION_KEY = "upload_session"  # Session state key holding the app's upload session id.
+
+
+class UploadStore:
+    """
+    Deduplicated upload blobs plus the session -> file name mapping.
+
+    Args:
+        root: Directory of the store (blobs/ and the uploads.db index).
+        max_bytes: Total size of the blobs above which the least recently used are evicted.
+        max_age_seconds: Blobs not accessed for this long are evicted.
+    """
+
+    def __init__(self, root: Path = DEFAULT_UPLOADS_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_HOURS * 3600):
+        self.root = Path(root)
+        self.blobs_dir = self.root / "blobs"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._stats = {"stores": 0, "deduplicated": 0, "hits": 0, "misses": 0, "evictions": 0}
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    blob TEXT PRIMARY KEY,  -- <sha256><suffix>
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    blob TEXT NOT NULL,
+                    uploaded_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, name)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_name ON uploads(name, uploaded_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_blob ON uploads(blob)")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.root / "uploads.db", timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def blob_path(self, blob: str) -> Path:
+        return self.blobs_dir / blob
+
+    def put(self, session_id: str, name: str, data: bytes) -> Path:
+        """
+        Stores an upload of a session under its original name; returns the blob path.
+        Identical content is stored once; re-uploading a name replaces the session's mapping.
+        """
+        # The suffix is part of the blob name: text extraction dispatches on it.
+        blob = hashlib.sha256(data).hexdigest() + Path(name).suffix.lower()
+        path = self.blob_path(blob)
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            if path.exists():
+                self._stats["deduplicated"] += 1
+            else:
+                tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            conn.execute(
+                "INSERT INTO blobs (blob, size, created_at, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(blob) DO UPDATE SET last_access = excluded.last_access",
+                (blob, len(data), now, now),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads (session_id, name, blob, uploaded_at) VALUES (?, ?, ?, ?)",
+                (session_id, name, blob, now),
+            )
+            self._stats["stores"] += 1
+            self._evict(conn, keep=blob)
+        return path
+
+    def resolve(self, name: str, session_id: Optional[str]) -> Optional[Path]:
+        """
+        Returns the blob of a session's upload, or None. Without a session (e.g.
+        a tool called outside the app) there is no upload: other sessions' files
+        are never served.
+        """
+        if session_id is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock, self._transaction() as conn:
+            row = conn.execute(
+                "SELECT blob FROM uploads WHERE session_id = ? AND name = ?", (session_id, name),
+            ).fetchone()
+            path = self.blob_path(row[0]) if row else None
+            if path is None or not path.exists():
+                self._stats["misses"] += 1
+                return None
+            conn.execute("UPDATE blobs SET last_access = ? WHERE blob = ?", (time.time(), row[0]))
+            self._stats["hits"] += 1
+            return path
+
+    def session_files(self, session_id: str) -> List[str]:
+        """Original names of a session's uploads, most recent first."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT name FROM uploads WHERE session_id = ? ORDER BY uploaded_at DESC", (session_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear_session(self, session_id: str) -> int:
+        """Removes a session's uploads; returns how many. Blobs still referenced elsewhere are kept."""
+        with self._lock, self._transaction() as conn:
+            blobs = [row[0] for row in conn.execute("SELECT blob FROM uploads WHERE session_id = ?", (session_id,))]
+            conn.execute("DELETE FROM uploads WHERE session_id = ?", (session_id,))
+            for blob in set(blobs):
+                if conn.execute("SELECT 1 FROM uploads WHERE blob = ? LIMIT 1", (blob,)).fetchone() is None:
+                    self._delete_blob(conn, blob)
+        return len(blobs)
+
+    def _delete_blob(self, conn, blob: str) -> None:
+        conn.execute("DELETE FROM blobs WHERE blob = ?", (blob,))
+        conn.execute("DELETE FROM uploads WHERE blob = ?", (blob,))
+        self.blob_path(blob).unlink(missing_ok=True)
+
+    def _evict(self, conn, keep: Optional[str] = None) -> None:
+        """Drops expired blobs, then the least recently used ones while over the size cap."""
+        cutoff = time.time() - self.max_age_seconds
+        for (blob,) in conn.execute("SELECT blob FROM blobs WHERE last_access < ?", (cutoff,)).fetchall():
+            if blob != keep:
+                self._delete_blob(conn, blob)
+                self._stats["evictions"] += 1
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for blob, size in conn.execute("SELECT blob, size FROM blobs ORDER BY last_access ASC").fetchall():
+            if blob == keep:
+                continue
+            self._delete_blob(conn, blob)
+            self._stats["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def evict(self) -> None:
+        """Applies the age and size limits now (they are also applied on every upload)."""
+        with self._lock, self._transaction() as conn:
+            self._evict(conn)
+
+    def stats(self) -> dict:
+        """Returns store counters, total size and the resolve hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+        with self._transaction() as conn:
+            stats["blobs"], stats["bytes"] = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            stats["uploads"] = conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_store: Optional[UploadStore] = None
+_store_lock = threading.Lock()
+
+
+def get_upload_store() -> UploadStore:
+    """
+    Returns the process-wide upload store (UPLOADS_DIR, UPLOAD_STORE_MAX_MB and
+    UPLOAD_STORE_MAX_AGE_HOURS override the location and limits).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UploadStore(
+                root=Path(os.getenv("UPLOADS_DIR", DEFAULT_UPLOADS_DIR)),
+                max_bytes=int(float(os.getenv("UPLOAD_STORE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+                max_age_seconds=float(os.getenv("UPLOAD_STORE_MAX_AGE_HOURS", DEFAULT_MAX_AGE_HOURS)) * 3600,
+            )
+        return _store
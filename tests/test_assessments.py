@@ -0,0 +1,82 @@
+# Assessment results: compact JSON, and the table graded results are aggregated from.
+
+import json
+
+import pytest
+
+from src.tools import assessments
+from src.tools.assessments import AssessmentResult, AssessmentStore, PRESENTED_PROBLEM_KEY, PresentedProblem
+from src.tools.tools import run_code_assignment
+
+
+def _result(status, problem_id="two-sum", language="python", tests=(3, 3), execution_ms=10.0):
+    passed, total = tests if tests else (None, None)
+    return AssessmentResult(status=status, language=language, problem_id=problem_id, graded=True,
+                            tests_passed=passed, tests_total=total, execution_ms=execution_ms)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AssessmentStore(tmp_path / "assessments.db")
+    store.record_many([
+        (_result("pass"), "alice", "Backend"),
+        (_result("fail", tests=(1, 3), execution_ms=30.0), "bob", "Backend"),
+        (_result("pass", execution_ms=20.0), "bob", "Backend"),
+        (_result("timeout", tests=None, execution_ms=3000.0), "carol", "Data"),
+        (_result("pass", problem_id="top-customers", language="sql"), "alice", "Data"),
+    ])
+    return store
+
+
+def test_result_json_omits_empty_fields():
+    data = json.loads(_result("fail", tests=(1, 3)).to_json())
+    assert data["verdict"] == "not pass"
+    assert "failed_tests" not in data and "error" not in data and "inefficient" not in data
+    assert json.loads(AssessmentResult("success", "python").to_json()) == {
+        "status": "success", "language": "python", "feedback": "", "execution_ms": 0.0, "output_chars": 0}
+
+
+def test_summary_per_problem(store):
+    two_sum, top_customers = store.summary()
+    assert two_sum == {
+        "problem_id": "two-sum", "attempts": 4, "candidates": 3, "candidates_passed": 2, "pass_rate": 0.5,
+        "avg_execution_ms": 765.0, "max_execution_ms": 3000.0,
+        # The timeout never got to compare outputs: not part of the average.
+        "avg_tests_passed": round((1 + 1 / 3 + 1) / 3, 4),
+        "statuses": {"pass": 2, "fail": 1, "timeout": 1},
+    }
+    assert (top_customers["problem_id"], top_customers["attempts"]) == ("top-customers", 1)
+
+
+def test_summary_groups_and_filters(store):
+    assert [(row["language"], row["attempts"]) for row in store.summary("language")] == [("python", 4), ("sql", 1)]
+    assert [(row["candidate_id"], row["pass_rate"]) for row in store.summary("candidate_id", job_title="Backend")] \
+        == [("bob", 0.5), ("alice", 1.0)]
+    assert [row["job_title"] for row in store.summary("job_title", problem_id="top-customers")] == ["Data"]
+
+
+def test_summary_since(store):
+    assert store.summary(since=0)[0]["attempts"] == 4
+    assert store.summary(since=float("inf")) == []
+
+
+def test_unknown_groups_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.summary("status; DROP TABLE assessments")
+
+
+def test_history_returns_the_full_results(store):
+    history = store.history("bob")
+    assert {entry["status"] for entry in history} == {"pass", "fail"}
+    assert all(entry["job_title"] == "Backend" for entry in history)
+
+
+def test_graded_submissions_are_recorded(tmp_path, monkeypatch):
+    store = AssessmentStore(tmp_path / "assessments.db")
+    monkeypatch.setattr(assessments, "_store", store)
+    context = {PRESENTED_PROBLEM_KEY: PresentedProblem(expected_output="1\n2", problem_id="count").to_dict(),
+               "problem_generated": True, "candidate_id": "dana", "selected_job": "Backend"}
+    assert json.loads(run_code_assignment("print(1)\nprint(2)", context=context))["verdict"] == "pass"
+    # Ungraded runs are not recorded.
+    run_code_assignment("print(1)")
+    assert [(entry["problem_id"], entry["job_title"]) for entry in store.history("dana")] == [("count", "Backend")]
@@ -0,0 +1,95 @@
+# Booking reservation tests (local store, and book_slots against the fake Calendar server).
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from src.tools.bookings import ReservationStore, book_slots
+from src.tools.calendar_client import CalendarClient
+
+TZ = pytz.timezone("Europe/Rome")
+DAY = datetime.now(TZ).date() + timedelta(days=30)
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return TZ.localize(datetime(DAY.year, DAY.month, DAY.day, hour, minute))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReservationStore(tmp_path / "bookings.db")
+
+
+def test_adjacent_slots_off_the_grid_do_not_conflict(store):
+    assert store.reserve("cal", _at(10), _at(10, 20)) is not None
+    assert store.reserve("cal", _at(10, 20), _at(11)) is not None
+    assert store.reserve("cal", _at(9, 50), _at(10, 5)) is None
+    assert store.reserve("cal", _at(10, 10), _at(10, 30)) is None
+    assert store.reserve("other", _at(10, 10), _at(10, 30)) is not None
+    assert store.stats() == {"held": 3}
+
+
+def test_overlap_is_enforced_by_the_database(store):
+    store.reserve("cal", _at(10), _at(11))
+    with sqlite3.connect(store.path) as conn, pytest.raises(sqlite3.IntegrityError):
+        conn.execute(
+            "INSERT INTO slot_reservations (reservation_id, calendar_id, slot_start, slot_end, status) "
+            "VALUES ('x', 'cal', ?, ?, 'held')",
+            tuple(moment.astimezone(pytz.utc).strftime("%Y-%m-%dT%H:%M:%SZ") for moment in (_at(10, 30), _at(12))),
+        )
+
+
+def test_released_and_expired_reservations_free_the_range(tmp_path, store):
+    reservation_id = store.reserve("cal", _at(10), _at(11))
+    store.release(reservation_id)
+    assert store.reserve("cal", _at(10), _at(11)) is not None
+
+    expired = ReservationStore(tmp_path / "bookings.db", lease_seconds=-1)
+    expired.reserve("cal", _at(12), _at(13))
+    expired.confirm(expired.reserve("cal", _at(13), _at(14)), "event-1")
+    assert store.reserve("cal", _at(12), _at(14)) is not None
+
+
+def test_concurrent_overlapping_reservations_have_one_winner(store):
+    barrier = threading.Barrier(16)
+    results = []
+
+    def reserve(i):
+        barrier.wait()
+        results.append(store.reserve("cal", _at(10, i), _at(10, 30 + i)))
+
+    threads = [threading.Thread(target=reserve, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(result is not None for result in results) == 1
+
+
+def test_booked_rows_are_dropped_once_freebusy_shows_the_event(store):
+    with FakeCalendarServer() as server:
+        service = CalendarClient("client-id", "client-secret", "refresh-token",
+                                 token_uri=server.token_uri, api_endpoint=server.api_endpoint).service()
+        slot = lambda start, end: {"start": start.isoformat(), "end": end.isoformat()}
+
+        first = book_slots(service, "cal", [slot(_at(10), _at(10, 20))], store=store, timezone="Europe/Rome")
+        assert first[0]["status"] == "success"
+        assert store.stats() == {"booked": 1}
+
+        results = book_slots(service, "cal", [slot(_at(9), _at(10)), slot(_at(10, 20), _at(11))],
+                             store=store, timezone="Europe/Rome")
+        assert [result["status"] for result in results] == ["success", "success"]
+        # The first booking is now covered by freebusy; only the two new ones are kept.
+        assert store.stats() == {"booked": 2}
+        assert len(server.list_events("cal")) == 3
+
+
+def test_scheduler_agent_has_the_batch_booking_tool():
+    from src.agents.agents import get_agent
+    from src.tools.tools import calendar_book_slots_fn
+
+    assert calendar_book_slots_fn in get_agent("scheduler_agent").tools
@@ -0,0 +1,85 @@
+# Calendar client tests against the local fake Calendar server.
+
+import threading
+
+import pytest
+from google.auth import _helpers
+
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from src.tools.calendar_client import CalendarClient
+
+
+@pytest.fixture
+def server():
+    with FakeCalendarServer() as fake:
+        yield fake
+
+
+def _client(server) -> CalendarClient:
+    return CalendarClient("client-id", "client-secret", "refresh-token",
+                          token_uri=server.token_uri, api_endpoint=server.api_endpoint)
+
+
+def _list_events(client) -> dict:
+    return client.service().events().list(calendarId="primary").execute()
+
+
+def test_token_is_reused_until_it_expires(server):
+    client = _client(server)
+    for _ in range(5):
+        _list_events(client)
+    assert server.stats["token"] == 1
+    assert server.stats["events.list"] == 5
+
+    client._credentials.expiry = _helpers.utcnow()
+    _list_events(client)
+    _list_events(client)
+    assert server.stats["token"] == 2
+    assert client.token_refreshes == 2
+
+
+def test_concurrent_callers_trigger_exactly_one_refresh(server):
+    server.token_latency = 0.2
+    client = _client(server)
+    barrier = threading.Barrier(16)
+    errors = []
+
+    def call():
+        try:
+            barrier.wait()
+            _list_events(client)
+        except Exception as e:  # pragma: no cover - surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert server.stats["token"] == 1
+    assert client.token_refreshes == 1
+    assert server.stats["events.list"] == 16
+
+
+def test_service_and_transport_are_reused_per_thread(server):
+    client = _client(server)
+    service = client.service()
+    transport = client._local.transport
+    for _ in range(3):
+        _list_events(client)
+    assert client.service() is service
+    assert client._local.transport is transport
+    # One persistent keep-alive connection to the fake server.
+    assert len(transport.connections) == 1
+
+    other = {}
+    thread = threading.Thread(target=lambda: other.update(service=client.service(),
+                                                          transport=client._local.transport))
+    thread.start()
+    thread.join()
+    assert other["service"] is not service
+    assert other["transport"] is not transport
+    # The discovery document is parsed once per client.
+    assert client._load_discovery_doc() is client._load_discovery_doc()
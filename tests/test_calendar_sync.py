@@ -0,0 +1,115 @@
+# Busy-time source tests (freebusy and sync-token mirror) against the local fake Calendar server.
+
+import pytest
+
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from src.tools import calendar_sync
+from src.tools.calendar_client import CalendarClient
+from src.tools.calendar_sync import CalendarMirror, query_freebusy
+
+WINDOW = ("2026-03-02T00:00:00Z", "2026-03-03T00:00:00Z")
+
+
+@pytest.fixture
+def server():
+    with FakeCalendarServer() as fake:
+        yield fake
+
+
+@pytest.fixture
+def service(server):
+    client = CalendarClient("client-id", "client-secret", "refresh-token",
+                            token_uri=server.token_uri, api_endpoint=server.api_endpoint)
+    return client.service()
+
+
+def test_freebusy_queries_many_calendars_in_chunks_of_50(server, service):
+    calendar_ids = [f"interviewer-{i}@example.com" for i in range(120)]
+    for i, calendar_id in enumerate(calendar_ids):
+        hour = 8 + i % 10
+        server.add_event(calendar_id, f"2026-03-02T{hour:02d}:00:00Z", f"2026-03-02T{hour:02d}:30:00Z")
+    # Overlapping events are merged, transparent ones are not busy time.
+    server.add_event(calendar_ids[0], "2026-03-02T08:15:00Z", "2026-03-02T09:00:00Z")
+    server.add_event(calendar_ids[1], "2026-03-02T12:00:00Z", "2026-03-02T13:00:00Z", transparency="transparent")
+
+    busy = query_freebusy(service, calendar_ids, *WINDOW)
+
+    assert server.stats["freebusy"] == 3
+    assert {slot["calendar"] for slot in busy} == set(calendar_ids)
+    assert len(busy) == 120
+    first = [slot for slot in busy if slot["calendar"] == calendar_ids[0]]
+    assert first == [{"start": "2026-03-02T08:00:00Z", "end": "2026-03-02T09:00:00Z",
+                      "calendar": calendar_ids[0]}]
+
+
+def test_freebusy_single_calendar_is_one_request(server, service):
+    server.add_event("primary", "2026-03-02T10:00:00Z", "2026-03-02T11:00:00Z")
+    busy = query_freebusy(service, ["primary"], *WINDOW)
+    assert server.stats["freebusy"] == 1
+    assert [(slot["start"], slot["end"]) for slot in busy] == [("2026-03-02T10:00:00Z", "2026-03-02T11:00:00Z")]
+
+
+def test_mirror_transfers_only_deltas_after_the_first_sync(server, service, monkeypatch):
+    monkeypatch.setattr(calendar_sync, "SYNC_PAGE_SIZE", 10)
+    events = [server.add_event("primary", f"2026-03-02T{8 + i // 4:02d}:{15 * (i % 4):02d}:00Z",
+                               f"2026-03-02T{8 + i // 4:02d}:{15 * (i % 4) + 10:02d}:00Z")
+              for i in range(25)]
+    mirror = CalendarMirror("primary")
+
+    mirror.sync(service)
+    assert mirror.full_syncs == 1
+    assert mirror.events_received == 25
+    assert server.stats["events.list"] == 3  # Paged by SYNC_PAGE_SIZE.
+    full_bytes = server.stats["bytes.events.list"]
+
+    added = server.add_event("primary", "2026-03-02T16:00:00Z", "2026-03-02T17:00:00Z", summary="New")
+    server.delete_event("primary", events[0]["id"])
+    mirror.sync(service)
+
+    assert mirror.full_syncs == 1
+    assert mirror.incremental_syncs == 1
+    assert mirror.events_received == 27
+    assert server.stats["bytes.events.list"] - full_bytes < full_bytes / 5
+    assert events[0]["id"] not in mirror.events
+    assert added["id"] in mirror.events
+    assert len(mirror.events) == 25
+
+    # Nothing changed: the delta is empty.
+    mirror.sync(service)
+    assert mirror.events_received == 27
+    assert mirror.incremental_syncs == 2
+
+
+def test_mirror_runs_a_full_resync_after_410(server, service):
+    server.add_event("primary", "2026-03-02T09:00:00Z", "2026-03-02T10:00:00Z")
+    mirror = CalendarMirror("primary")
+    mirror.sync(service)
+    old_token = mirror.sync_token
+
+    server.expire_sync_tokens()
+    added = server.add_event("primary", "2026-03-02T11:00:00Z", "2026-03-02T12:00:00Z", summary="After expiry")
+    mirror.sync(service)
+
+    assert mirror.full_syncs == 2
+    assert mirror.incremental_syncs == 0
+    assert mirror.stats()["expired_tokens"] == 1
+    assert mirror.sync_token != old_token
+    assert added["id"] in mirror.events
+    assert [slot["summary"] for slot in mirror.busy(*WINDOW)] == ["Busy", "After expiry"]
+
+    # The new token works for deltas again.
+    mirror.sync(service)
+    assert mirror.full_syncs == 2
+    assert mirror.incremental_syncs == 1
+
+
+def test_mirror_all_day_events_follow_the_exclusive_window_end():
+    mirror = CalendarMirror("primary")
+    mirror._apply(mirror.events, [
+        {"id": "day-1", "start": {"date": "2026-03-02"}, "end": {"date": "2026-03-03"}, "summary": "Conference"},
+        {"id": "day-2", "start": {"date": "2026-03-03"}, "end": {"date": "2026-03-04"}, "summary": "Holiday"},
+    ])
+    assert [slot["summary"] for slot in mirror.busy(*WINDOW)] == ["Conference"]
+    # A window ending during a day still overlaps that day's all-day event.
+    assert [slot["summary"] for slot in mirror.busy("2026-03-03T00:00:00Z", "2026-03-03T09:00:00Z")] == ["Holiday"]
+    assert mirror.busy("2026-03-01T00:00:00Z", "2026-03-02T00:00:00Z") == []
@@ -0,0 +1,133 @@
+# Sandbox runners: static security checks, runtime isolation and limits.
+
+import pytest
+
+from src.tools.code_sandbox import execute_code, get_runner
+
+node = pytest.mark.skipif(not get_runner("javascript").available(), reason="node is not installed")
+go = pytest.mark.skipif(not get_runner("go").available(), reason="go is not installed")
+
+
+# --- Static checks ---
+
+@pytest.mark.parametrize("code", [
+    "this.constructor.constructor('return process')().exit()",
+    "[]['constructor']['constructor']('return 1')()",
+    "const fs = require('fs')",
+    "process.exit(1)",
+    "import('fs')",
+    "globalThis.x = 1",
+    "({}).__proto__.polluted = 1",
+])
+def test_javascript_check_blocks_escapes(code):
+    assert get_runner("javascript").check(code) is not None
+
+
+def test_javascript_check_allows_plain_code():
+    assert get_runner("javascript").check("function f(a) { return a.map((x) => x * 2); }\nconsole.log(f([1]));") is None
+
+
+@pytest.mark.parametrize("code", [
+    'package main\n\nimport "os"\n\nfunc main() { os.Exit(1) }',
+    'package main\n\nimport (\n\t"fmt"\n\t"os/exec"\n)\n\nfunc main() { fmt.Println(exec.Command("id")) }',
+    'package main\n\nimport x "net/http"\n\nfunc main() { x.Get("http://example.com") }',
+    'package main\n\nimport "unsafe"\n\nfunc main() {}',
+    'package main\n\n//go:linkname f runtime.f\nfunc main() {}',
+])
+def test_go_check_enforces_the_import_allow_list(code):
+    assert get_runner("go").check(code) is not None
+
+
+def test_go_check_allows_standard_packages():
+    code = 'package main\n\nimport (\n\t"fmt"\n\t"sort"\n\t"strings"\n)\n\nfunc main() { fmt.Println(sort.IntsAreSorted(nil), strings.ToUpper("a")) }'
+    assert get_runner("go").check(code) is None
+
+
+@pytest.mark.parametrize("query", [
+    "ATTACH DATABASE '/tmp/other.db' AS other",
+    "PRAGMA max_page_count = 1000000",
+    "PRAGMA writable_schema = ON",
+    "SELECT load_extension('/tmp/evil.so')",
+])
+def test_sql_authorizer_denies_files_extensions_and_limit_pragmas(query):
+    result = execute_code(query, language="sql")
+    assert result["status"] == "error"
+    assert "not authorized" in result["error_msg"]
+
+
+def test_sql_authorizer_allows_schema_pragmas():
+    result = execute_code("CREATE TABLE t (a INTEGER); PRAGMA table_info(t);", language="sql")
+    assert result["status"] == "success"
+    assert result["output"].startswith("0|a|INTEGER")
+
+
+# --- Runtime isolation ---
+
+@node
+def test_javascript_vm_has_no_process_or_code_generation():
+    # Passes the static check: the vm context and the disabled code generation still hold.
+    code = ("const c = 'constr' + 'uctor', r = 'req' + 'uire', p = 'proc' + 'ess';\n"
+            "console.log(typeof this[r], typeof this[p]);\n"
+            "console.log(this[c][c]('return 1')());")
+    assert get_runner("javascript").check(code) is None
+    result = execute_code(code, language="javascript")
+    assert result["status"] == "error"
+    assert result["output"] == "undefined undefined"
+    assert "Code generation from strings disallowed" in result["error_msg"]
+
+
+# --- Limits ---
+
+@pytest.mark.parametrize("language, code", [
+    ("python", "while True:\n    pass"),
+    ("sql", "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n;"),
+    pytest.param("javascript", "while (true) {}", marks=node),
+    pytest.param("go", "package main\n\nfunc main() {\n\tfor {\n\t}\n}", marks=go),
+])
+def test_runaway_code_times_out(language, code):
+    assert execute_code(code, timeout=1, language=language)["status"] == "timeout"
+
+
+@pytest.mark.parametrize("language, code", [
+    ("python", "x = [0] * (10 ** 9)"),
+    ("sql", "CREATE TABLE t (a TEXT);\n"
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n LIMIT 200000)\n"
+            "INSERT INTO t SELECT printf('%.1000c', 'x') FROM n;"),
+    pytest.param("javascript", "const a = [];\nwhile (true) a.push(new Array(1e6).fill(1));", marks=node),
+])
+def test_memory_limit_is_enforced(language, code):
+    assert execute_code(code, timeout=10, language=language)["status"] == "memory_error"
+
+
+@pytest.mark.parametrize("language, code", [
+    ("python", "for i in range(200000):\n    print(i)"),
+    ("sql", "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n LIMIT 200000) SELECT i FROM n;"),
+    pytest.param("javascript", "for (let i = 0; i < 200000; i++) console.log(i);", marks=node),
+])
+def test_output_is_bounded(language, code, monkeypatch):
+    monkeypatch.setenv("SANDBOX_MAX_OUTPUT_BYTES", "1000")
+    result = execute_code(code, timeout=10, language=language)
+    assert result["status"] == "success"
+    assert result["output_truncated"]
+    assert len(result["output"]) < 1200
+
+
+# --- Shipped problems ---
+
+def test_every_runner_has_a_problem():
+    from src.tools.problem_bank import ProblemBank
+
+    assert {problem["language"] for problem in ProblemBank().problems()} == {"python", "javascript", "go", "sql"}
+
+
+@pytest.mark.parametrize("problem_id", [
+    pytest.param("top-words-counter", marks=node),
+    pytest.param("merge-maintenance-windows", marks=go),
+])
+def test_reference_solutions_pass_the_sandbox_checks_and_run(problem_id, tmp_path):
+    from src.tools.expected_outputs import ExpectedOutputStore, reference_program
+    from src.tools.problem_bank import ProblemBank
+
+    problem = ProblemBank().get(problem_id)
+    assert get_runner(problem["language"]).check(reference_program(problem)) is None
+    assert ExpectedOutputStore(tmp_path).get(problem).lines > 3
@@ -0,0 +1,106 @@
+# Expected outputs: generated from reference solutions once per problem version and kept on disk.
+
+import pytest
+
+from src.tools import expected_outputs
+from src.tools.assessments import PRESENTED_PROBLEM_KEY, PresentedProblem
+from src.tools.expected_outputs import ExpectedOutputStore, output_digest, problem_version
+from src.tools.tools import assess_code
+
+SOLUTION = "def square(x):\n    return x * x"
+TEST_CODE = "for i in range(5):\n    print(square(i))"
+
+
+def _problem(**fields):
+    return dict({"id": "squares", "title": "Squares", "description": "Square numbers.",
+                 "reference_solution": SOLUTION, "test_code": TEST_CODE}, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExpectedOutputStore(tmp_path, inline_limit=20)
+
+
+def test_version_changes_only_with_what_determines_the_output():
+    version = problem_version(_problem())
+    assert problem_version(_problem(title="Squares!", description="Reworded.", priority=1)) == version
+    assert problem_version(_problem(reference_solution=SOLUTION + "  # faster")) != version
+    assert problem_version(_problem(test_code=TEST_CODE.replace("5", "6"))) != version
+    assert problem_version(_problem(ordered=False)) != version
+
+
+def test_outputs_are_generated_once_and_reused_from_disk(store, tmp_path):
+    expected = store.get(_problem())
+    assert (expected.text, expected.lines) == ("0\n1\n4\n9\n16", 5)
+    assert store.get(_problem()) is expected
+    assert (tmp_path / f"{expected.version}.txt").read_text(encoding="utf-8") == expected.text
+
+    restarted = ExpectedOutputStore(tmp_path)
+    assert restarted.get(_problem()) == expected
+    assert restarted.stats()["generated"] == 0
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_an_edited_reference_gets_a_new_output(store):
+    first = store.get(_problem())
+    second = store.get(_problem(test_code=TEST_CODE.replace("5", "3")))
+    assert second.version != first.version
+    assert second.text == "0\n1\n4"
+    assert store.stats()["generated"] == 2
+
+
+def test_large_outputs_are_kept_by_digest_only(store):
+    expected = store.get(_problem(test_code=TEST_CODE.replace("5", "100")))
+    assert not expected.inline
+    assert expected.text is None
+    stored = "\n".join(store.lines(expected.version))
+    assert output_digest(stored) == expected.digest
+    assert stored.splitlines()[-1] == "9801"
+
+
+def test_problems_without_a_reference_use_their_expected_output(store):
+    problem = _problem(expected_output="b\na\n", ordered=False)
+    del problem["reference_solution"]
+    assert store.get(problem).text == "a\nb"
+
+
+@pytest.mark.parametrize("solution, reason", [
+    ("def square(x):\n    raise RuntimeError('boom')", "error"),
+    ("def square(x):\n    while True:\n        pass", "timeout"),
+])
+def test_a_failing_reference_raises(store, monkeypatch, solution, reason):
+    monkeypatch.setattr(expected_outputs, "REFERENCE_TIMEOUT_SECONDS", 1)
+    with pytest.raises(ValueError, match=reason):
+        store.get(_problem(reference_solution=solution))
+    assert store.stats()["failures"] == 1
+    assert list(store.cache_dir.iterdir()) == []
+
+
+def test_a_reference_exceeding_the_output_limit_raises(store, monkeypatch):
+    monkeypatch.setenv("SANDBOX_MAX_OUTPUT_BYTES", "100")
+    with pytest.raises(ValueError, match="output limit"):
+        store.get(_problem(test_code=TEST_CODE.replace("5", "1000")))
+
+
+# --- Grading by digest ---
+
+@pytest.fixture
+def digest_context(store, monkeypatch):
+    monkeypatch.setattr(expected_outputs, "_store", store)
+    expected = store.get(_problem(test_code=TEST_CODE.replace("5", "100")))
+    presented = PresentedProblem(problem_id="squares", expected_digest=expected.digest,
+                                 expected_version=expected.version)
+    return {PRESENTED_PROBLEM_KEY: presented.to_dict(), "problem_generated": True}
+
+
+def test_matching_output_passes_on_the_digest(digest_context):
+    result = assess_code("for i in range(100):\n    print(i * i)", context=digest_context)
+    assert result.status == "pass"
+    assert result.tests_total == 100
+
+
+def test_a_mismatch_is_located_from_the_stored_output(digest_context):
+    result = assess_code("for i in range(100):\n    print(i * i if i != 42 else 0)", context=digest_context)
+    assert result.status == "fail"
+    assert (result.tests_total, result.tests_passed) == (100, 99)
+    assert result.failed_tests[0].line == 43
@@ -0,0 +1,13 @@
+# Import-time tests: heavy optional dependencies load only when used.
+
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def test_importing_the_tools_does_not_load_numpy():
+    code = "import sys, src.tools.tools; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
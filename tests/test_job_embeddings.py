@@ -0,0 +1,50 @@
+# Semantic job search: indexes are rebuilt in the background, never on the query path.
+
+import pytest
+
+from src.tools import job_embeddings
+from src.tools.job_embeddings import build_job_index, rebuild_job_index_async
+from src.tools.job_store import JobStore
+
+
+def _job(title, skills):
+    return {"title": title, "company": "Acme", "location": "Remote", "description": f"{title} role",
+            "responsibilities": "Build things", "skills_required": skills}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "shards", default_db=None)
+    store.add_jobs("acme", [_job("Python Developer", ["python", "django"]),
+                            _job("Frontend Engineer", ["javascript", "react"])])
+    yield store
+    store.close()
+
+
+def test_missing_index_is_built_in_the_background(store):
+    jobs = store.semantic_top_jobs("python, django", 1)
+    # No index yet: ranked by skills match meanwhile.
+    assert [job["title"] for job in jobs] == ["Python Developer"]
+    rebuild_job_index_async(store.shard_path("acme")).join()
+    jobs = store.semantic_top_jobs("python, django", 1)
+    assert [job["title"] for job in jobs] == ["Python Developer"]
+    assert 0 < jobs[0]["score"] <= 1
+
+
+def test_stale_index_is_served_until_the_rebuild_completes(store, monkeypatch):
+    path = store.shard_path("acme")
+    build_job_index(path)
+    assert [job["title"] for job in store.semantic_top_jobs("golang, kubernetes", 1)] != ["Go Developer"]
+
+    started = []
+    monkeypatch.setattr(job_embeddings, "rebuild_job_index_async", lambda db_path: started.append(db_path))
+    store.add_jobs("acme", [_job("Go Developer", ["golang", "kubernetes"])])
+    jobs = store.semantic_top_jobs("golang, kubernetes", 1)
+    assert [job["title"] for job in jobs] != ["Go Developer"]
+    assert job_embeddings._indexes[path].stale
+    assert started == [path]
+
+    monkeypatch.undo()
+    rebuild_job_index_async(path).join()
+    assert [job["title"] for job in store.semantic_top_jobs("golang, kubernetes", 1)] == ["Go Developer"]
+    assert not job_embeddings._indexes[path].stale
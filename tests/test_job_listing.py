@@ -0,0 +1,50 @@
+# list_jobs_from_db: listing modes and compact pagination.
+
+import json
+
+import pytest
+
+from src.tools import tools
+from src.tools.job_store import JobStore
+from src.tools.tools import list_jobs_from_db
+
+
+def test_unknown_mode_is_an_error_listing_the_valid_modes():
+    result = json.loads(list_jobs_from_db("python", mode="fancy"))
+    assert result["status"] == "error"
+    assert "text, compact, semantic" in result["message"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "shards", default_db=None)
+    for company in ("Acme", "Globex"):
+        store.add_jobs(company, [
+            {"title": f"{company} Engineer {i}", "company": company, "location": "Remote",
+             "description": "", "responsibilities": "",
+             "skills_required": ["Python", "SQL", "Docker"][:1 + i % 3]}
+            for i in range(12)
+        ])
+    monkeypatch.setattr(tools, "get_job_store", lambda: store)
+    yield store
+    store.close()
+
+
+def test_compact_pages_follow_next_after_id(store):
+    ids, after_id = [], None
+    while True:
+        page = json.loads(list_jobs_from_db("python, sql, docker", mode="compact", limit=5, after_id=after_id))
+        assert page["status"] == "success"
+        ids += [job["id"] for job in page["jobs"]]
+        after_id = page["next_after_id"]
+        if after_id is None:
+            break
+    assert len(ids) == len(set(ids)) == 24
+    first = json.loads(list_jobs_from_db("python, sql, docker", mode="compact", limit=5))["jobs"][0]
+    assert first == {"id": "acme:3", "title": "Acme Engineer 2", "company": "Acme", "score": 3,
+                     "matched": ["Python", "SQL", "Docker"]}
+
+
+def test_compact_mode_rejects_an_unknown_after_id(store):
+    result = json.loads(list_jobs_from_db("python", mode="compact", after_id="acme:999"))
+    assert result == {"status": "error", "message": "Unknown job id 'acme:999'."}
@@ -0,0 +1,114 @@
+# JobStore tests: per-tenant shards, cross-shard ranking and keyset pagination.
+
+import json
+import sqlite3
+
+import pytest
+
+from src.tools.job_store import JOBS_SCHEMA, JobStore, job_score, rank_key, tenant_key
+
+SKILLS = ["python", "sql", "docker", "aws", "react", "go"]
+
+
+def _job(i, company):
+    # Deterministic skill mix: every job has 1 to 4 of SKILLS.
+    skills = [SKILLS[(i + j * 2) % len(SKILLS)] for j in range(1 + i % 4)]
+    return {"title": f"Job {i}", "company": company, "location": "Remote", "description": "",
+            "responsibilities": "", "skills_required": [s.title() for s in skills]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "shards", default_db=None, cache_size=0)
+    for company in ("Acme Corp", "Globex", "Initech"):
+        store.add_jobs(company, [_job(i, company) for i in range(40)])
+    yield store
+    store.close()
+
+
+def _brute_force(store, skills, tenants=None):
+    jobs = []
+    for tenant in tenants or store.tenants():
+        for job_id in range(1, 41):
+            job = store.get_job(tenant, job_id)
+            jobs.append((-job_score(job, skills), tenant, job_id))
+    return sorted(jobs)
+
+
+def test_tenant_keys_are_file_safe():
+    assert tenant_key("  Acme Corp. ") == "acme-corp"
+    with pytest.raises(ValueError):
+        tenant_key("../")
+
+
+def test_each_company_gets_its_own_shard(store):
+    assert store.tenants() == ["acme-corp", "globex", "initech"]
+    assert sorted(p.name for p in store.shards_dir.iterdir()) == ["acme-corp.db", "globex.db", "initech.db"]
+
+
+def test_cross_tenant_ranking_matches_a_full_scan(store):
+    skills = ["Python", "docker", " AWS "]
+    ranked = store.top_jobs(skills, 25)
+    assert [(-job["score"], job["tenant"], job["id"]) for job in ranked] == _brute_force(store, skills)[:25]
+
+
+def test_a_tenant_query_only_opens_its_shard(store):
+    store.close()
+    jobs = store.top_jobs(["python"], 5, tenants=["globex"])
+    assert {job["tenant"] for job in jobs} == {"globex"}
+    assert list(store._local.shards) == [store.shard_path("globex")]
+
+
+def test_legacy_catalog_is_the_default_tenant_and_ranks_without_the_skills_index(tmp_path, store):
+    legacy = tmp_path / "jobs.db"
+    conn = sqlite3.connect(legacy)
+    with conn:
+        conn.execute(JOBS_SCHEMA)
+        for i in range(40):
+            job = _job(i, "Legacy")
+            conn.execute("INSERT INTO jobs (title, company, skills_required) VALUES (?, ?, ?)",
+                         (job["title"], job["company"], json.dumps(job["skills_required"])))
+    conn.close()
+
+    combined = JobStore(store.shards_dir, default_db=legacy, cache_size=0)
+    assert combined.tenants()[0] == "default"
+    skills = ["sql", "react"]
+    # Same jobs as the "acme-corp" shard: the json_each ranking agrees with the index.
+    default = combined.top_jobs(skills, 10, tenants=["default"])
+    acme = combined.top_jobs(skills, 10, tenants=["acme-corp"])
+    assert [(job["id"], job["score"]) for job in default] == [(job["id"], job["score"]) for job in acme]
+    combined.close()
+
+
+def test_split_by_company(tmp_path):
+    source = tmp_path / "jobs.db"
+    conn = sqlite3.connect(source)
+    with conn:
+        conn.execute(JOBS_SCHEMA)
+        for i, company in enumerate(["Acme", "Globex", "Acme", None]):
+            conn.execute("INSERT INTO jobs (title, company, skills_required) VALUES (?, ?, ?)",
+                         (f"Job {i}", company, json.dumps(["Python"])))
+    conn.close()
+
+    store = JobStore(tmp_path / "shards", default_db=None)
+    assert store.split_by_company(source) == {"acme": 2, "globex": 1, "default": 1}
+    assert [job["title"] for job in store.top_jobs(["python"], 5, tenants=["acme"])] == ["Job 0", "Job 2"]
+    store.close()
+
+
+@pytest.mark.parametrize("skills", [["python", "docker", "aws"], []])
+def test_keyset_pages_cover_the_ranking_exactly_once(store, skills):
+    pages, after = [], None
+    while True:
+        page = store.top_jobs(skills, 7, after=after)
+        if not page:
+            break
+        pages.append(page)
+        after = rank_key(page[-1])
+    seen = [(-job["score"], job["tenant"], job["id"]) for page in pages for job in page]
+    expected = _brute_force(store, skills)
+    if skills:
+        # Jobs without any matching skill are not listed.
+        expected = [key for key in expected if key[0] < 0]
+    assert seen == expected
+    assert all(len(page) == 7 for page in pages[:-1])
@@ -0,0 +1,23 @@
+# Response cache key tests.
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from src.agents.llm_cache import make_cache_key
+
+
+def _request():
+    return LlmRequest(model="gemini-2.5-flash-lite",
+                      contents=[types.Content(role="user", parts=[types.Part(text="hello")])])
+
+
+def test_stub_namespace_changes_the_key_even_when_the_request_names_the_model():
+    live = make_cache_key(_request(), "gemini-2.5-flash-lite")
+    assert make_cache_key(_request(), "gemini-2.5-flash-lite", "scripted:") != live
+    assert make_cache_key(_request(), "gemini-2.5-flash-lite", "replay:") != live
+
+
+def test_key_ignores_formatting_only_differences():
+    spaced = _request()
+    spaced.contents[0].parts[0].text = "  hello \n"
+    assert make_cache_key(spaced, "m") == make_cache_key(_request(), "m")
@@ -0,0 +1,88 @@
+# Output capture and grading: bounded stdout and line-by-line comparison.
+
+from src.tools.assessments import TestOutcome as Outcome, compare_lines
+from src.tools.code_sandbox import BoundedOutput
+from src.tools.tools import assess_code
+
+
+# --- BoundedOutput ---
+
+def test_output_under_the_cap_is_kept_whole():
+    output = BoundedOutput(100)
+    for i in range(10):
+        output.write(f"line {i}\n")
+    assert not output.truncated
+    assert output.getvalue() == "".join(f"line {i}\n" for i in range(10))
+
+
+def test_head_and_tail_are_kept_around_a_truncation_marker():
+    output = BoundedOutput(20)
+    for i in range(1000):
+        output.write(f"{i:04d}\n")
+    value = output.getvalue()
+    assert output.truncated
+    assert output.total_size == 5000
+    assert value.startswith("0000\n0001\n")
+    assert value.endswith("0998\n0999\n")
+    assert "[output truncated: 4980 characters omitted]" in value
+
+
+def test_a_single_large_write_is_split_between_head_and_tail():
+    output = BoundedOutput(10)
+    output.write("a" * 5 + "b" * 100 + "c" * 5)
+    assert output.getvalue() == "aaaaa\n... [output truncated: 100 characters omitted] ...\nccccc"
+
+
+def test_memory_stays_bounded_however_much_is_written():
+    output = BoundedOutput(64)
+    for _ in range(100000):
+        output.write("x" * 7)
+    assert sum(map(len, output._tail)) < 64 + 7
+    assert len(output._tail) <= 64 // 7 + 2
+
+
+# --- compare_lines ---
+
+def test_identical_outputs_pass_every_line():
+    assert compare_lines("a\nb\nc", "a\nb\nc") == (3, 3, [])
+
+
+def test_missing_and_extra_lines_are_failed_checks():
+    assert compare_lines("a\nx", "a\nb\nc") == (3, 1, [Outcome(2, "b", "x"), Outcome(3, "c", None)])
+    assert compare_lines("a\nb\nc", "a") == (3, 1, [Outcome(2, None, "b"), Outcome(3, None, "c")])
+
+
+def test_expected_lines_can_be_an_iterable():
+    assert compare_lines("1\n2\n3", iter(["1", "2", "4"])) == (3, 2, [Outcome(3, "4", "3")])
+
+
+def test_only_the_first_failures_are_listed():
+    actual = "\n".join(str(i) for i in range(100))
+    expected = "\n".join(str(-i) for i in range(100))
+    total, passed, failures = compare_lines(actual, expected, max_listed=3)
+    assert (total, passed) == (100, 1)
+    assert [failure.line for failure in failures] == [2, 3, 4]
+
+
+# --- Grading ---
+
+def _presented(expected_output):
+    context = {}
+    assess_code("print('ok')", expected_output=expected_output, context=context)
+    return context
+
+
+def test_the_first_mismatching_line_is_reported():
+    context = _presented("1\n2\n3")
+    result = assess_code("print(1)\nprint(5)\nprint(3)", context=context)
+    assert (result.status, result.tests_total, result.tests_passed) == ("fail", 3, 2)
+    assert "line 2; 2/3 lines match" in result.feedback
+
+
+def test_truncated_output_fails_without_a_comparison(monkeypatch):
+    monkeypatch.setenv("SANDBOX_MAX_OUTPUT_BYTES", "1000")
+    context = _presented("\n".join(str(i) for i in range(10000)))
+    result = assess_code("for i in range(10000):\n    print(i)", context=context)
+    assert result.status == "output_limit"
+    assert result.output_truncated
+    assert result.tests_total is None
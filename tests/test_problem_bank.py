@@ -0,0 +1,122 @@
+# Problem bank: selection by skills and role, and reloading of edited problem files.
+
+import json
+import os
+
+import pytest
+
+from src.tools.problem_bank import ProblemBank, parse_problem, skill_phrases
+
+
+def _problem(problem_id, skills=(), roles=(), difficulty="easy", priority=100, **extra):
+    return dict({"id": problem_id, "title": problem_id.title(), "description": "", "test_code": "",
+                 "reference_solution": "print(1)",
+                 "tags": {"roles": list(roles), "skills": list(skills), "difficulty": difficulty},
+                 "priority": priority}, **extra)
+
+
+def _write(directory, name, data):
+    path = directory / f"{name}.json"
+    path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+    # Distinct mtimes even on filesystems with a coarse clock.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return path
+
+
+@pytest.fixture
+def bank(tmp_path):
+    _write(tmp_path, "pandas", _problem("pandas", skills=["Pandas", "python"], roles=["data"], priority=20))
+    _write(tmp_path, "nlp", _problem("nlp", skills=["nlp", "python"], difficulty="medium", priority=10))
+    _write(tmp_path, "basics", _problem("basics", skills=["python"], default=True))
+    return ProblemBank(tmp_path, reload_seconds=0)
+
+
+def test_skill_phrases_include_word_ngrams():
+    phrases = skill_phrases("Strong understanding of NLP")
+    assert {"nlp", "strong understanding", "understanding of nlp"} <= set(phrases)
+    assert "strong understanding of nlp" in phrases
+
+
+def test_malformed_problems_are_rejected():
+    with pytest.raises(ValueError, match="reference_solution"):
+        parse_problem({"id": "x", "title": "", "description": "", "test_code": ""})
+    with pytest.raises(ValueError, match="difficulty"):
+        parse_problem(_problem("x", difficulty="expert"))
+
+
+# --- Selection ---
+
+def test_the_most_matching_skills_win(bank):
+    assert bank.select("Engineer", ["Pandas", "Python"])["id"] == "pandas"
+    assert bank.select("Engineer", ["Experience with NLP pipelines", "Python"])["id"] == "nlp"
+
+
+def test_a_role_in_the_title_counts_as_matching_skills(bank):
+    assert bank.select("Data Analyst", ["Python"])["id"] == "pandas"
+
+
+def test_ties_go_to_the_lower_priority(bank):
+    # All three match "python" once: nlp has the lowest priority.
+    assert bank.select("Engineer", ["python"])["id"] == "nlp"
+
+
+def test_difficulty_filters_unless_nothing_matches(bank):
+    assert bank.select("Data Analyst", ["Python"], difficulty="medium")["id"] == "nlp"
+    assert bank.select("Data Analyst", ["Python"], difficulty="hard")["id"] == "pandas"
+
+
+def test_no_match_falls_back_to_the_default_problem(bank):
+    assert bank.select("Designer", ["Figma"])["id"] == "basics"
+    assert bank.select()["id"] == "basics"
+
+
+def test_selected_problems_are_copies(bank):
+    bank.select("Designer")["title"] = "Changed"
+    assert bank.get("basics")["title"] == "Basics"
+
+
+# --- Reloading ---
+
+def test_new_and_edited_files_are_served_without_a_restart(bank, tmp_path):
+    assert bank.select("Engineer", ["Go"])["id"] == "basics"
+    _write(tmp_path, "go", _problem("go", skills=["go"]))
+    assert bank.select("Engineer", ["Go"])["id"] == "go"
+
+    _write(tmp_path, "go", _problem("go", skills=["golang"]))
+    assert bank.select("Engineer", ["Go"])["id"] == "basics"
+    assert bank.stats()["parsed"] == 5
+
+
+def test_unchanged_directories_are_not_reparsed(tmp_path):
+    _write(tmp_path, "basics", _problem("basics", skills=["python"]))
+    bank = ProblemBank(tmp_path, reload_seconds=3600)
+    bank.problems()
+    _write(tmp_path, "go", _problem("go", skills=["go"]))
+    # Within the reload interval: not scanned until reload().
+    assert [p["id"] for p in bank.problems()] == ["basics"]
+    bank.reload()
+    assert sorted(p["id"] for p in bank.problems()) == ["basics", "go"]
+    bank.reload()
+    assert bank.stats()["parsed"] == 2
+
+
+def test_a_broken_edit_keeps_the_last_good_version(bank, tmp_path):
+    assert bank.get("pandas") is not None
+    _write(tmp_path, "pandas", "{not json")
+    assert bank.get("pandas")["tags"]["skills"] == ["pandas", "python"]
+    assert bank.stats()["parse_errors"] == 1
+    _write(tmp_path, "broken", _problem("broken", difficulty="expert"))
+    assert bank.get("broken") is None
+
+
+def test_a_removed_file_is_no_longer_served(bank, tmp_path):
+    (tmp_path / "nlp.json").unlink()
+    assert bank.get("nlp") is None
+    assert bank.select("Engineer", ["NLP"])["id"] == "basics"
+
+
+def test_duplicate_ids_keep_the_first_file(bank, tmp_path):
+    _write(tmp_path, "zz-copy", _problem("pandas", skills=["spark"]))
+    assert bank.get("pandas")["tags"]["skills"] == ["pandas", "python"]
+    assert bank.select("Engineer", ["Spark"])["id"] == "basics"
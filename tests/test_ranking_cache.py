@@ -0,0 +1,71 @@
+# Ranking cache tests: entries are served until a shard's catalog version changes.
+
+import sqlite3
+
+import pytest
+
+from src.tools.job_store import JobStore, RankingCache
+
+
+def _job(title, skills):
+    return {"title": title, "company": "Acme", "location": "Remote", "description": "",
+            "responsibilities": "", "skills_required": skills}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "shards", default_db=None)
+    store.add_jobs("acme", [_job("Backend", ["Python", "SQL"]), _job("Frontend", ["React"])])
+    store.add_jobs("globex", [_job("Data", ["Python", "Spark"])])
+    yield store
+    store.close()
+
+
+def test_equivalent_skill_sets_share_an_entry(store):
+    first = store.top_jobs(["Python", "SQL"], 5)
+    assert store.top_jobs([" sql", "python", "PYTHON"], 5) == first
+    assert store.cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "stale": 0, "hit_rate": 0.5}
+
+
+def test_cached_rankings_are_copies(store):
+    store.top_jobs(["python"], 5)[0]["title"] = "Changed"
+    assert store.top_jobs(["python"], 5)[0]["title"] == "Backend"
+
+
+def test_a_catalog_change_invalidates_the_rankings_of_that_shard(store):
+    assert [job["title"] for job in store.top_jobs(["python"], 5)] == ["Backend", "Data"]
+    globex_only = store.top_jobs(["python"], 5, tenants=["globex"])
+    store.add_jobs("acme", [_job("Platform", ["Python", "SQL", "Docker"])])
+
+    assert store.top_jobs(["python"], 5, tenants=["globex"]) == globex_only
+    assert store.cache.stats()["hits"] == 1
+    updated = store.top_jobs(["python"], 5)
+    assert store.cache.stats()["stale"] == 1
+    assert [job["title"] for job in updated] == ["Backend", "Platform", "Data"]
+
+
+def test_updates_and_deletes_made_outside_the_store_are_seen(store):
+    store.top_jobs(["react"], 5)
+    conn = sqlite3.connect(store.shard_path("acme"))
+    with conn:
+        conn.execute("DELETE FROM jobs WHERE title = 'Frontend'")
+    conn.close()
+    assert store.top_jobs(["react"], 5) == []
+    assert store.cache.stats()["stale"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RankingCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.put((key,), ("v1",), [{"id": key}])
+    cache.get(("a",), ("v1",))
+    cache.put(("c",), ("v1",), [{"id": "c"}])
+    assert cache.get(("b",), ("v1",)) is None
+    assert cache.get(("a",), ("v1",)) == [{"id": "a"}]
+    assert cache.stats()["entries"] == 2
+
+
+def test_a_zero_size_cache_stores_nothing():
+    cache = RankingCache(max_entries=0)
+    cache.put(("a",), ("v1",), [{"id": "a"}])
+    assert cache.get(("a",), ("v1",)) is None
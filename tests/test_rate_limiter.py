@@ -0,0 +1,62 @@
+# Rate limiter regression tests, with a scripted model instead of the Gemini API.
+
+import asyncio
+
+from google.adk.agents import LlmAgent
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import AgentTool
+from google.genai import types
+
+from src.agents.rate_limiter import RateLimitedGemini, get_rate_limiter, reset_rate_limiters
+
+
+class _ScriptedGemini(Gemini):
+    """Calls the `child` tool when it has one and has not heard back from it yet; else answers."""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        parts = llm_request.contents[-1].parts or []
+        if "child" in llm_request.tools_dict and not any(p.function_response for p in parts):
+            part = types.Part(function_call=types.FunctionCall(name="child", args={"request": "hello"}))
+        else:
+            part = types.Part(text="done")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+class _LimitedScriptedGemini(RateLimitedGemini, _ScriptedGemini):
+    pass
+
+
+async def _run_turn(runner, session_id):
+    await runner.session_service.create_session(app_name=runner.app_name, user_id="u", session_id=session_id)
+    message = types.Content(role="user", parts=[types.Part(text="hi")])
+    texts = []
+    async for event in runner.run_async(user_id="u", session_id=session_id, new_message=message):
+        if event.content and event.content.parts:
+            texts.extend(p.text for p in event.content.parts if p.text)
+    return texts
+
+
+def test_nested_agent_tool_does_not_deadlock_at_concurrency_1(monkeypatch):
+    # The parent's model call must not hold the only slot while its AgentTool child calls the same model.
+    monkeypatch.setenv("GEMINI_RATE_LIMIT_ENABLED", "True")
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", "1")
+    reset_rate_limiters()
+    model = "rate-limiter-test-model"
+    child = LlmAgent(name="child", model=_LimitedScriptedGemini(model=model), instruction="Answer.")
+    parent = LlmAgent(name="parent", model=_LimitedScriptedGemini(model=model), instruction="Delegate.",
+                      tools=[AgentTool(agent=child)])
+    runner = InMemoryRunner(agent=parent, app_name="rate_limiter_test")
+
+    async def sessions():
+        return await asyncio.gather(*(_run_turn(runner, f"s{i}") for i in range(3)))
+
+    try:
+        results = asyncio.run(asyncio.wait_for(sessions(), timeout=20))
+    finally:
+        stats = get_rate_limiter(model).stats()
+        reset_rate_limiters()
+    assert all("done" in texts for texts in results)
+    assert stats["in_flight"] == 0
+    assert stats["requests"] == 3 * 3  # Per session: parent call, child call, parent answer.
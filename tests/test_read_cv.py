@@ -0,0 +1,45 @@
+# read_cv_fn path handling: only the session's uploaded CVs are served.
+
+import pytest
+
+from src.tools import upload_store
+from src.tools.tools import read_cv_fn
+from src.tools.upload_store import UPLOAD_SESSION_KEY, UploadStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = UploadStore(root=tmp_path / "uploads")
+    monkeypatch.setattr(upload_store, "_store", store)
+    return store
+
+
+def test_uploaded_cv_is_served_by_name(store):
+    store.put("session-a", "cv.txt", b"Jane Doe\nPython developer")
+    assert "Python developer" in read_cv_fn("cv.txt", context={UPLOAD_SESSION_KEY: "session-a"})
+
+
+def test_other_sessions_uploads_are_not_served(store):
+    store.put("session-a", "cv.txt", b"Jane Doe\nPython developer")
+    result = read_cv_fn("cv.txt", context={UPLOAD_SESSION_KEY: "session-b"})
+    assert result.startswith("❌")
+    assert "Python developer" not in result
+
+
+def test_paths_outside_the_upload_folder_are_rejected(store, tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("not a CV", encoding="utf-8")
+    blob = store.put("session-a", "cv.txt", b"Jane Doe\nPython developer")
+    for name in (str(secret), "../" * 12 + str(secret.relative_to(secret.anchor)), str(blob)):
+        result = read_cv_fn(name, context={UPLOAD_SESSION_KEY: "session-b"})
+        assert result.startswith("❌"), name
+        assert "not a CV" not in result
+        assert "Python developer" not in result
+
+
+def test_uploads_are_not_served_without_a_session(store):
+    store.put("session-a", "cv.txt", b"Jane Doe\nPython developer")
+    assert store.resolve("cv.txt", None) is None
+    result = read_cv_fn("cv.txt")
+    assert result.startswith("❌")
+    assert "Python developer" not in result
@@ -0,0 +1,35 @@
+# Chat message handling of the agent runtime.
+
+import pytest
+
+from src.agents.runtime import extract_code_submission, is_code_submission
+
+
+@pytest.mark.parametrize("message", [
+    "def solve(values):\n    return max(values)",
+    "import math\nprint(math.pi)",
+    "function topWords(text, k) {\n  return [];\n}",
+    "const topWords = (text, k) => [];\nconsole.log(topWords('', 1));",
+    "package main\n\nimport \"fmt\"\n\nfunc main() { fmt.Println(1) }",
+    "func mergeIntervals(intervals [][2]int) [][2]int {\n\treturn intervals\n}",
+    "SELECT name FROM customers;",
+    "with totals AS (SELECT 1) SELECT * FROM totals",
+    "Here is my answer:\n```go\npackage main\n```",
+])
+def test_code_in_every_sandbox_language_is_a_submission(message):
+    assert is_code_submission(message)
+
+
+@pytest.mark.parametrize("message", [
+    "1",
+    "From my experience, Python is the best fit.",
+    "I'd like to select the second job.",
+    "Let me think about it.",
+    "classes start next week",
+])
+def test_chat_messages_are_not_submissions(message):
+    assert not is_code_submission(message)
+
+
+def test_fences_and_their_language_tag_are_stripped():
+    assert extract_code_submission("Here:\n```javascript\nconsole.log(1);\n```\nThanks") == "console.log(1);"
@@ -0,0 +1,31 @@
+# Busy-time cache tests.
+
+from src.tools import scheduling
+from src.tools.scheduling import BusyCache
+
+
+def test_expired_entries_are_pruned_on_insert(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(scheduling.time, "monotonic", lambda: clock[0])
+    cache = BusyCache(ttl_seconds=60)
+    for day in range(10):
+        cache.get_or_fetch(("cal",), "freebusy", f"2026-03-{day + 1:02d}", "end", lambda: [])
+    assert cache.stats()["entries"] == 10
+
+    clock[0] += 61
+    cache.get_or_fetch(("cal",), "freebusy", "2026-04-01", "end", lambda: [])
+    assert cache.stats()["entries"] == 1
+
+
+def test_cache_is_bounded_lru():
+    cache = BusyCache(ttl_seconds=60, max_entries=2)
+    fetches = []
+    fetch = lambda window: (lambda: fetches.append(window) or [window])
+    cache.get_or_fetch(("cal",), "freebusy", "a", "end", fetch("a"))
+    cache.get_or_fetch(("cal",), "freebusy", "b", "end", fetch("b"))
+    cache.get_or_fetch(("cal",), "freebusy", "a", "end", fetch("a"))  # Hit: "a" is now most recent.
+    cache.get_or_fetch(("cal",), "freebusy", "c", "end", fetch("c"))  # Evicts "b".
+    assert cache.get_or_fetch(("cal",), "freebusy", "a", "end", fetch("a")) == ["a"]
+    cache.get_or_fetch(("cal",), "freebusy", "b", "end", fetch("b"))
+    assert fetches == ["a", "b", "c", "b"]
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 4, "evictions": 2}
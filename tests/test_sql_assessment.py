@@ -0,0 +1,81 @@
+# SQL problems: graded on a private copy of their dataset, with the query's cost compared to the reference.
+
+import pytest
+
+from src.tools.assessments import PRESENTED_PROBLEM_KEY, PresentedProblem
+from src.tools.code_sandbox import execute_code
+from src.tools.expected_outputs import ExpectedOutputStore
+from src.tools.problem_bank import ProblemBank
+from src.tools.sql_assessment import efficiency_report, is_inefficient, reference_steps, result_rows
+from src.tools.tools import assess_code
+
+ANTI_JOIN = "SELECT c.name FROM customers c WHERE NOT EXISTS (SELECT 1 FROM orders o WHERE o.customer_id = c.id);"
+# Same rows, but `+ 0` keeps the subquery off the customer_id index: every order is scanned.
+FULL_SCAN = "SELECT name FROM customers WHERE id NOT IN (SELECT customer_id + 0 FROM orders);"
+
+
+def test_rows_are_sorted_only_when_order_is_not_graded():
+    assert result_rows("b\na\nc", ordered=True) == "b\na\nc"
+    assert result_rows("b\na\nc", ordered=False) == "a\nb\nc"
+
+
+def test_each_query_runs_on_a_fresh_copy_of_the_dataset():
+    assert execute_code("DELETE FROM orders; SELECT COUNT(*) FROM orders;", language="sql", dataset="shop")["output"] == "0"
+    assert execute_code("SELECT COUNT(*) FROM orders;", language="sql", dataset="shop")["output"] == "20000"
+
+
+def test_reference_steps_are_measured_once():
+    steps = reference_steps("shop", ANTI_JOIN)
+    assert steps > 0
+    assert reference_steps("shop", ANTI_JOIN) == steps
+    assert reference_steps("shop", "SELECT * FROM missing_table;") is None
+
+
+@pytest.mark.parametrize("steps, reference, flagged", [
+    (90_000, 10_000, True),
+    (25_000, 10_000, False),   # Within the cost factor.
+    (9_000, 1_000, False),     # Too small to tell.
+    (90_000, None, False),     # No reference query.
+])
+def test_is_inefficient(steps, reference, flagged):
+    assert is_inefficient(steps, reference) is flagged
+
+
+def test_efficiency_report_warns_about_costly_queries():
+    report = efficiency_report(execute_code(FULL_SCAN, language="sql", dataset="shop"), "shop", ANTI_JOIN)
+    assert "(reference solution:" in report[0]
+    assert any(line.startswith("⚠️ Inefficient query") for line in report)
+    assert report[-1].startswith("Query plan:")
+
+
+# --- Grading ---
+
+@pytest.fixture
+def context(tmp_path):
+    problem = ProblemBank().get("customers-without-orders")
+    expected = ExpectedOutputStore(tmp_path).get(problem)
+    presented = PresentedProblem(expected_output=expected.text, language="sql", problem_id=problem["id"],
+                                 expected_version=expected.version, dataset=problem["dataset"],
+                                 ordered=problem["ordered"], reference_solution=problem["reference_solution"])
+    return {PRESENTED_PROBLEM_KEY: presented.to_dict(), "problem_generated": True}
+
+
+def test_rows_in_any_order_pass(context):
+    result = assess_code(ANTI_JOIN.rstrip(";") + " ORDER BY c.name DESC;", context=context)
+    assert result.status == "pass"
+    assert result.tests_total == result.tests_passed == 20
+    assert not result.inefficient
+
+
+def test_a_correct_but_costly_query_is_flagged(context):
+    result = assess_code(FULL_SCAN, context=context)
+    assert result.status == "pass"
+    assert result.inefficient
+    assert result.vm_steps > result.reference_steps
+    assert "⚠️ Inefficient query" in result.feedback
+
+
+def test_wrong_rows_fail(context):
+    result = assess_code("SELECT name FROM customers LIMIT 20;", context=context)
+    assert result.status == "fail"
+    assert "sorted row" in result.feedback
@@ -0,0 +1,35 @@
+# Upload pipeline tests.
+
+from src.tools import upload_pipeline
+from src.tools.upload_pipeline import UploadPipeline
+
+
+def test_extracted_texts_are_evicted_with_their_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_pipeline, "MAX_JOBS", 2)
+    pipeline = UploadPipeline(max_workers=1)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"cv_{i}.txt"
+        path.write_text(f"Candidate {i}\nPython developer, {i + 1} years\n", encoding="utf-8")
+        paths.append(path)
+        pipeline.wait(pipeline.submit(path), timeout=10)
+
+    assert pipeline.stats()["texts"] == 2
+    assert [pipeline.text_for(path) is not None for path in paths] == [False, False, False, True, True]
+
+
+def test_duplicate_upload_text_is_dropped_with_the_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_pipeline, "MAX_JOBS", 1)
+    pipeline = UploadPipeline(max_workers=1)
+    first, copy, other = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "c.txt"
+    first.write_text("Same CV\n", encoding="utf-8")
+    copy.write_text("Same CV\n", encoding="utf-8")
+    other.write_text("Other CV\n", encoding="utf-8")
+
+    key = pipeline.wait(pipeline.submit(first), timeout=10)["key"]
+    assert pipeline.submit(copy) == key
+    assert pipeline.text_for(copy) == "Same CV\n"
+
+    pipeline.wait(pipeline.submit(other), timeout=10)
+    assert pipeline.stats()["texts"] == 1
+    assert pipeline.text_for(first) is None and pipeline.text_for(copy) is None